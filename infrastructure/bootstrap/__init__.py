@@ -29,6 +29,7 @@
 from .redis import (
     init_redis,
     get_redis_client,
+    get_async_redis_client,
     get_session_store,
     is_redis_enabled,
     RedisConfig,
@@ -72,6 +73,7 @@ from .sse import (
     get_or_create_sse_queue,
     enqueue_sse_message,
     subscribe_sse_events,
+    open_sse_subscription,
     remove_sse_queue,
 )
 
@@ -104,6 +106,7 @@ __all__ = [
     # Redis
     "init_redis",
     "get_redis_client",
+    "get_async_redis_client",
     "get_session_store",
     "is_redis_enabled",
     "RedisConfig",
@@ -135,6 +138,7 @@ __all__ = [
     "get_or_create_sse_queue",
     "enqueue_sse_message",
     "subscribe_sse_events",
+    "open_sse_subscription",
     "remove_sse_queue",
     # Scheduler
     "start_background_tasks",
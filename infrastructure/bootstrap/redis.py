@@ -21,6 +21,7 @@ class RedisConfig:
     max_connections: int = 50
     timeout: float = 5.0
     session_ttl: int = 86400  # 24小时
+    async_client: bool = True  # 会话存储使用 redis.asyncio 客户端
 
     @classmethod
     def from_env(cls) -> "RedisConfig":
@@ -30,7 +31,8 @@ class RedisConfig:
             url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
             max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
             timeout=float(os.getenv("REDIS_TIMEOUT", "5.0")),
-            session_ttl=int(os.getenv("REDIS_SESSION_TTL", "86400"))
+            session_ttl=int(os.getenv("REDIS_SESSION_TTL", "86400")),
+            async_client=os.getenv("REDIS_ASYNC_CLIENT", "true").lower() == "true"
         )
 
 
@@ -40,25 +42,30 @@ class RedisConfig:
 
 _session_store = None
 _redis_client = None
+_async_redis_client = None
 _initialized = False
 _redis_session_store_cls: Optional[Type[Any]] = None
 _memory_session_store_cls: Optional[Type[Any]] = None
+_async_redis_session_store_cls: Optional[Type[Any]] = None
 
 
 def register_session_store_impls(
     redis_store_cls: Type[Any],
-    memory_store_cls: Type[Any]
+    memory_store_cls: Type[Any],
+    async_redis_store_cls: Optional[Type[Any]] = None
 ) -> None:
     """
     注册会话存储实现
 
     Args:
-        redis_store_cls: Redis 会话存储类
+        redis_store_cls: Redis 会话存储类（同步客户端）
         memory_store_cls: 内存会话存储类
+        async_redis_store_cls: Redis 会话存储类（asyncio 客户端，可选）
     """
-    global _redis_session_store_cls, _memory_session_store_cls
+    global _redis_session_store_cls, _memory_session_store_cls, _async_redis_session_store_cls
     _redis_session_store_cls = redis_store_cls
     _memory_session_store_cls = memory_store_cls
+    _async_redis_session_store_cls = async_redis_store_cls
 
 
 def init_redis(config: Optional[RedisConfig] = None) -> Any:
@@ -84,10 +91,13 @@ def init_redis(config: Optional[RedisConfig] = None) -> Any:
 
     if config.enabled:
         try:
-            if _redis_session_store_cls is None:
+            store_cls = _redis_session_store_cls
+            if config.async_client and _async_redis_session_store_cls is not None:
+                store_cls = _async_redis_session_store_cls
+            if store_cls is None:
                 raise RuntimeError("Redis session store implementation not registered")
 
-            _session_store = _redis_session_store_cls(
+            _session_store = store_cls(
                 redis_url=config.url,
                 max_connections=config.max_connections,
                 socket_timeout=config.timeout,
@@ -101,6 +111,7 @@ def init_redis(config: Optional[RedisConfig] = None) -> Any:
             print(f"   URL: {config.url}")
             print(f"   连接池: {config.max_connections}")
             print(f"   TTL: {config.session_ttl}s ({config.session_ttl/3600:.1f}h)")
+            print(f"   客户端: {'asyncio' if store_cls is _async_redis_session_store_cls else 'sync'}")
 
             # 健康检查
             try:
@@ -157,6 +168,48 @@ def get_redis_client() -> Optional[Any]:
     return _redis_client
 
 
+def get_async_redis_client() -> Optional[Any]:
+    """
+    获取共享的 redis.asyncio 客户端（跨进程共享的缓存使用，如物流状态缓存）
+
+    优先复用 asyncio 会话存储的连接池；未初始化会话存储的进程（如通知服务）
+    按 RedisConfig 创建独立连接池（decode_responses=True）。
+
+    Returns:
+        redis.asyncio 客户端，Redis 被禁用或创建失败时返回 None
+    """
+    global _async_redis_client
+
+    if _async_redis_client is not None:
+        return _async_redis_client
+
+    shared = getattr(_session_store, "aredis", None)
+    if shared is not None:
+        _async_redis_client = shared
+        return _async_redis_client
+
+    config = RedisConfig.from_env()
+    if not config.enabled:
+        return None
+
+    try:
+        from redis import asyncio as aioredis
+
+        _async_redis_client = aioredis.Redis.from_url(
+            config.url,
+            max_connections=config.max_connections,
+            socket_timeout=config.timeout,
+            socket_connect_timeout=config.timeout,
+            decode_responses=True,
+        )
+        print(f"[Bootstrap] ✅ Redis asyncio 客户端已创建: {config.url}")
+    except Exception as e:
+        print(f"[Bootstrap] ❌ Redis asyncio 客户端创建失败: {e}")
+        _async_redis_client = None
+
+    return _async_redis_client
+
+
 def is_redis_enabled() -> bool:
     """检查是否使用 Redis 存储"""
     return _redis_client is not None
@@ -166,7 +219,8 @@ def reset():
     """
     重置初始化状态（仅用于测试）
     """
-    global _session_store, _redis_client, _initialized
+    global _session_store, _redis_client, _async_redis_client, _initialized
     _session_store = None
     _redis_client = None
+    _async_redis_client = None
     _initialized = False
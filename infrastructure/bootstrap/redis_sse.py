@@ -6,15 +6,118 @@
 - 异步发布消息到 Redis 频道
 - 异步订阅 Redis 频道接收消息
 - 自动重连和错误处理
+
+订阅采用进程内多路复用：
+- 每个进程只持有一个 Pub/Sub 连接，由单个读取协程分发消息
+- 频道按本地订阅者引用计数动态 SUBSCRIBE / UNSUBSCRIBE
+- 每个订阅者一个有界 asyncio.Queue，满时丢弃最旧消息
 """
 
 import json
 import asyncio
 import os
-from typing import AsyncGenerator, Optional, Any
+from typing import AsyncGenerator, Optional, Any, Dict, Set
 
 import redis.asyncio as aioredis
 
+try:
+    from prometheus_client import Counter, Gauge
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore[assignment]
+    Gauge = None  # type: ignore[assignment]
+
+
+# 单个订阅者的本地队列容量（满时丢弃最旧消息）
+SSE_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SSE_SUBSCRIBER_QUEUE_SIZE", "100"))
+
+if Gauge is not None:
+    sse_subscribers_gauge = Gauge(
+        "sse_redis_subscribers",
+        "Number of local SSE subscribers attached to the Redis Pub/Sub dispatcher",
+    )
+    sse_channels_gauge = Gauge(
+        "sse_redis_channels",
+        "Number of Redis channels subscribed by this process",
+    )
+else:
+    sse_subscribers_gauge = None
+    sse_channels_gauge = None
+
+if Counter is not None:
+    sse_dropped_counter = Counter(
+        "sse_redis_messages_dropped_total",
+        "SSE messages dropped because a subscriber queue was full",
+    )
+else:
+    sse_dropped_counter = None
+
+
+class SseSubscription:
+    """
+    本地 SSE 订阅者
+
+    由 RedisSseManager.open_subscription() 创建，读取协程把频道消息放入本地队列。
+
+    使用示例：
+        subscription = await manager.open_subscription("sse:session:user_123")
+        try:
+            message = await subscription.get(timeout=30.0)  # 超时返回 None
+        finally:
+            await subscription.close()
+    """
+
+    def __init__(self, manager: "RedisSseManager", channel: str, maxsize: int = SSE_SUBSCRIBER_QUEUE_SIZE):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(maxsize, 1))
+        self.dropped = 0
+        self._manager = manager
+        self._closed = False
+
+    def deliver(self, message: dict):
+        """放入本地队列，队列满时丢弃最旧的消息"""
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        try:
+            self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(message)
+        self.dropped += 1
+        self._manager._dropped += 1
+        if sse_dropped_counter is not None:
+            sse_dropped_counter.inc()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        等待下一条消息
+
+        Args:
+            timeout: 超时时间（秒），None 表示一直等待
+
+        Returns:
+            消息 dict，超时返回 None
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        """取消订阅（最后一个本地订阅者离开时 UNSUBSCRIBE 频道）"""
+        if self._closed:
+            return
+        self._closed = True
+        await self._manager._release(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        return await self.queue.get()
+
 
 class RedisSseManager:
     """
@@ -46,6 +149,15 @@ class RedisSseManager:
         self._pubsub_redis: Optional[aioredis.Redis] = None  # Pub/Sub 专用连接
         self._connected = False
 
+        # 进程内 Pub/Sub 多路复用
+        self._pubsub = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._channels: Dict[str, Set[SseSubscription]] = {}
+        self._sub_lock = asyncio.Lock()
+        self._dropped = 0
+        self._reconnects = 0
+        self._closing = False
+
     async def connect(self) -> bool:
         """
         连接 Redis
@@ -123,6 +235,111 @@ class RedisSseManager:
 
         return result
 
+    async def open_subscription(self, channel: str) -> SseSubscription:
+        """
+        注册本地订阅者
+
+        频道的第一个本地订阅者触发 SUBSCRIBE，之后的订阅者只增加引用计数。
+
+        Args:
+            channel: 频道名
+
+        Returns:
+            SseSubscription 实例，使用完毕必须调用 close()
+        """
+        subscription = SseSubscription(self, channel)
+
+        async with self._sub_lock:
+            if self._pubsub is None:
+                redis = await self._get_pubsub_redis()
+                self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+
+            subscribers = self._channels.get(channel)
+            if subscribers is None:
+                await self._pubsub.subscribe(channel)
+                subscribers = self._channels[channel] = set()
+                print(f"[RedisSse] 📡 订阅频道: {channel}")
+            subscribers.add(subscription)
+            self._update_gauges()
+
+            if self._reader_task is None or self._reader_task.done():
+                self._closing = False
+                self._reader_task = asyncio.create_task(self._reader_loop())
+
+        return subscription
+
+    async def _release(self, subscription: SseSubscription):
+        """移除本地订阅者，引用计数归零时 UNSUBSCRIBE"""
+        async with self._sub_lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+                try:
+                    if self._pubsub is not None:
+                        await self._pubsub.unsubscribe(subscription.channel)
+                    print(f"[RedisSse] 🔌 取消订阅: {subscription.channel}")
+                except Exception as e:
+                    print(f"[RedisSse] ⚠️ 清理订阅失败: {e}")
+            self._update_gauges()
+
+    def _update_gauges(self):
+        if sse_subscribers_gauge is not None:
+            sse_subscribers_gauge.set(sum(len(subs) for subs in self._channels.values()))
+        if sse_channels_gauge is not None:
+            sse_channels_gauge.set(len(self._channels))
+
+    async def _reader_loop(self):
+        """读取共享 Pub/Sub 连接上的消息并分发到本地订阅者"""
+        backoff = 1.0
+        while not self._closing:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                backoff = 1.0
+                if not message or message.get("type") != "message":
+                    continue
+
+                subscribers = self._channels.get(message["channel"])
+                if not subscribers:
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except json.JSONDecodeError as e:
+                    print(f"[RedisSse] ⚠️ JSON 解析失败: {message['data'][:100]}... 错误: {e}")
+                    continue
+                for subscription in list(subscribers):
+                    subscription.deliver(data)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                self._reconnects += 1
+                print(f"[RedisSse] ❌ Pub/Sub 读取异常，{backoff:.0f}s 后重连: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                await self._resubscribe()
+
+    async def _resubscribe(self):
+        """重建 Pub/Sub 并重新订阅所有仍有本地订阅者的频道"""
+        async with self._sub_lock:
+            old = self._pubsub
+            try:
+                redis = await self._get_pubsub_redis()
+                self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+                if self._channels:
+                    await self._pubsub.subscribe(*self._channels.keys())
+                print(f"[RedisSse] 🔄 Pub/Sub 已重连，恢复 {len(self._channels)} 个频道")
+            except Exception as e:
+                print(f"[RedisSse] ⚠️ Pub/Sub 重连失败: {e}")
+            if old is not None and old is not self._pubsub:
+                try:
+                    await old.aclose()
+                except Exception:
+                    pass
+
     async def subscribe(self, channel: str) -> AsyncGenerator[dict, None]:
         """
         订阅 Redis 频道，返回异步生成器
@@ -134,46 +351,50 @@ class RedisSseManager:
             解析后的消息 dict
 
         注意:
-            - 此方法会阻塞直到收到消息或连接断开
+            - 此方法会阻塞直到收到消息
             - 调用方需要在 try/finally 中处理取消
+            - 需要按超时等待时请使用 open_subscription()：
+              对生成器做 wait_for 超时会关闭生成器并取消订阅
         """
-        # 使用 Pub/Sub 专用连接（无超时）
-        redis = await self._get_pubsub_redis()
-
-        pubsub = redis.pubsub()
-        await pubsub.subscribe(channel)
-        print(f"[RedisSse] 📡 订阅频道: {channel}")
-
+        subscription = await self.open_subscription(channel)
         try:
-            async for message in pubsub.listen():
-                if message["type"] == "message":
-                    try:
-                        data = json.loads(message["data"])
-                        yield data
-                    except json.JSONDecodeError as e:
-                        print(f"[RedisSse] ⚠️ JSON 解析失败: {message['data'][:100]}... 错误: {e}")
-                elif message["type"] == "subscribe":
-                    # 订阅确认消息，忽略
-                    pass
+            async for message in subscription:
+                yield message
 
         except asyncio.CancelledError:
             print(f"[RedisSse] ⏹️ 订阅取消: {channel}")
             raise
 
-        except Exception as e:
-            print(f"[RedisSse] ❌ 订阅异常: {channel}, 错误: {e}")
-            raise
-
         finally:
-            try:
-                await pubsub.unsubscribe(channel)
-                await pubsub.close()
-                print(f"[RedisSse] 🔌 取消订阅: {channel}")
-            except Exception as e:
-                print(f"[RedisSse] ⚠️ 清理订阅失败: {e}")
+            await subscription.close()
+
+    def get_stats(self) -> dict:
+        """Pub/Sub 多路复用统计"""
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(len(subs) for subs in self._channels.values()),
+            "dropped_messages": self._dropped,
+            "reconnects": self._reconnects,
+            "reader_running": self._reader_task is not None and not self._reader_task.done(),
+        }
 
     async def close(self):
         """关闭 Redis 连接"""
+        # 停止读取协程并关闭共享 Pub/Sub
+        if self._reader_task is not None:
+            self._closing = True
+            self._reader_task.cancel()
+            await asyncio.wait({self._reader_task}, timeout=2.0)
+            self._reader_task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                print(f"[RedisSse] ⚠️ 关闭 Pub/Sub 失败: {e}")
+            self._pubsub = None
+        self._channels.clear()
+        self._update_gauges()
+
         # 关闭普通连接
         if self._redis:
             try:
@@ -214,7 +435,8 @@ class RedisSseManager:
             return {
                 "status": "healthy",
                 "redis_version": info.get("redis_version", "unknown"),
-                "connected_clients": info.get("connected_clients", "unknown")
+                "connected_clients": info.get("connected_clients", "unknown"),
+                "pubsub": self.get_stats()
             }
 
         except Exception as e:
@@ -5,10 +5,12 @@
 提供后台任务的统一管理，包括：
 - SLA 预警任务
 - 坐席心跳监控
+- 坐席负载集合校正
 - 缓存预热调度
 """
 
 import os
+import time
 import asyncio
 from typing import Optional, Callable, Any
 
@@ -19,12 +21,16 @@ from typing import Optional, Callable, Any
 
 _sla_task: Optional[asyncio.Task] = None
 _heartbeat_task: Optional[asyncio.Task] = None
+_reconcile_task: Optional[asyncio.Task] = None
 _warmup_scheduler = None
 _warmup_service_factory: Optional[Callable[[], Any]] = None
 _initialized = False
 
 # 配置
+# 截止时间索引不可用、降级为全量扫描时的检查间隔
 SLA_CHECK_INTERVAL = int(os.getenv("SLA_CHECK_INTERVAL", "60"))
+# SLA 截止时间索引的最长轮询间隔（新建工单最早的切换点也能及时弹出）
+SLA_DEADLINE_POLL_INTERVAL = float(os.getenv("SLA_DEADLINE_POLL_INTERVAL", "5"))
 AGENT_OFFLINE_THRESHOLD = int(os.getenv("AGENT_OFFLINE_THRESHOLD", "30"))
 AGENT_CHECK_INTERVAL = int(os.getenv("AGENT_CHECK_INTERVAL", "10"))
 WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
@@ -46,23 +52,34 @@ async def sla_alert_background_task(
     """
     SLA 预警后台任务
 
-    定期检查所有活跃工单的 SLA 状态，向负责坐席推送预警
+    按 SLA 截止时间索引只弹出到达状态切换点（warning/urgent/violated）的工单，
+    向负责坐席推送预警；休眠到下一个截止时间（最长 SLA_DEADLINE_POLL_INTERVAL 秒）。
+    索引不可用降级为全量扫描时按 SLA_CHECK_INTERVAL 间隔检查，避免频繁重复推送全部预警。
     """
-    print(f"[Scheduler] 🔔 SLA 预警任务启动 (间隔: {SLA_CHECK_INTERVAL}秒)")
+    print(f"[Scheduler] 🔔 SLA 预警任务启动 (截止时间索引, 轮询上限: {SLA_DEADLINE_POLL_INTERVAL}秒)")
 
+    delay = SLA_DEADLINE_POLL_INTERVAL
     while True:
         try:
-            await asyncio.sleep(SLA_CHECK_INTERVAL)
+            await asyncio.sleep(delay)
+            delay = SLA_DEADLINE_POLL_INTERVAL
 
             if not ticket_store:
                 continue
 
-            # 获取所有预警
-            result = ticket_store.detect_sla_alerts(
-                status_filter=["warning", "urgent", "violated"]
-            )
+            # 弹出到期工单的预警（内存模式与工单写入同在事件循环执行，不进线程池）
+            if getattr(ticket_store, "redis", None):
+                result = await asyncio.to_thread(ticket_store.pop_due_sla_alerts)
+            else:
+                result = ticket_store.pop_due_sla_alerts()
             alerts = result.get("alerts", [])
 
+            next_due = result.get("next_due")
+            if result.get("full_scan"):
+                delay = SLA_CHECK_INTERVAL
+            elif next_due is not None:
+                delay = min(max(next_due - time.time(), 0.5), SLA_DEADLINE_POLL_INTERVAL)
+
             if not alerts:
                 continue
 
@@ -76,7 +93,6 @@ async def sla_alert_background_task(
                     alerts_by_agent[agent_id].append(alert)
 
             # 推送给各坐席
-            import time
             for agent_id, agent_alerts in alerts_by_agent.items():
                 if agent_manager:
                     agent = agent_manager.get_agent_by_id(agent_id)
@@ -96,7 +112,7 @@ async def sla_alert_background_task(
             break
         except Exception as e:
             print(f"[Scheduler] ❌ SLA 预警检查异常: {e}")
-            await asyncio.sleep(5)
+            delay = 5
 
 
 async def agent_heartbeat_monitor_task(agent_manager: Any):
@@ -139,6 +155,32 @@ async def agent_heartbeat_monitor_task(agent_manager: Any):
             await asyncio.sleep(5)
 
 
+async def agent_load_reconcile_task():
+    """
+    坐席负载集合校正后台任务
+
+    每 AGENT_LOAD_RECONCILE_MINUTES 分钟按会话状态索引修复坐席负载集合，
+    与缓存预热调度无关（WARMUP_ENABLED=false 时同样运行）
+    """
+    from infrastructure.scheduler.tasks.reconcile_agent_loads import (
+        reconcile_agent_loads,
+        get_reconcile_interval_minutes,
+    )
+
+    interval = get_reconcile_interval_minutes() * 60
+    print(f"[Scheduler] 🔧 坐席负载校正任务启动 (间隔: {interval}秒)")
+
+    while True:
+        try:
+            await asyncio.sleep(interval)
+            await reconcile_agent_loads()
+        except asyncio.CancelledError:
+            print("[Scheduler] 🔧 坐席负载校正任务已停止")
+            break
+        except Exception as e:
+            print(f"[Scheduler] ❌ 坐席负载校正异常: {e}")
+
+
 def start_background_tasks(
     ticket_store: Any = None,
     agent_manager: Any = None,
@@ -152,7 +194,7 @@ def start_background_tasks(
         agent_manager: 坐席管理器（心跳监控需要）
         sse_queues: SSE 队列（SLA 预警推送需要）
     """
-    global _sla_task, _heartbeat_task, _initialized
+    global _sla_task, _heartbeat_task, _reconcile_task, _initialized
 
     if _initialized:
         return
@@ -169,6 +211,9 @@ def start_background_tasks(
             agent_heartbeat_monitor_task(agent_manager)
         )
 
+    # 坐席负载集合校正任务
+    _reconcile_task = asyncio.create_task(agent_load_reconcile_task())
+
     _initialized = True
     print("[Scheduler] ✅ 后台任务已启动")
 
@@ -253,21 +298,15 @@ def start_warmup_scheduler():
 
 async def shutdown_background_tasks():
     """关闭所有后台任务"""
-    global _sla_task, _heartbeat_task, _warmup_scheduler
-
-    if _sla_task:
-        _sla_task.cancel()
-        try:
-            await _sla_task
-        except asyncio.CancelledError:
-            pass
+    global _sla_task, _heartbeat_task, _reconcile_task, _warmup_scheduler
 
-    if _heartbeat_task:
-        _heartbeat_task.cancel()
-        try:
-            await _heartbeat_task
-        except asyncio.CancelledError:
-            pass
+    for task in (_sla_task, _heartbeat_task, _reconcile_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
     if _warmup_scheduler:
         _warmup_scheduler.shutdown(wait=False)
@@ -278,8 +317,9 @@ async def shutdown_background_tasks():
 
 def reset():
     """重置初始化状态（仅用于测试）"""
-    global _sla_task, _heartbeat_task, _warmup_scheduler, _initialized
+    global _sla_task, _heartbeat_task, _reconcile_task, _warmup_scheduler, _initialized
     _sla_task = None
     _heartbeat_task = None
+    _reconcile_task = None
     _warmup_scheduler = None
     _initialized = False
@@ -184,6 +184,47 @@ async def subscribe_sse_events(target: str) -> AsyncGenerator[dict, None]:
             yield message
 
 
+class _MemorySubscription:
+    """内存队列订阅（降级模式），接口与 SseSubscription 一致"""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.queue = get_or_create_sse_queue(target)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+
+async def open_sse_subscription(target: str):
+    """
+    打开 SSE 订阅（支持按超时等待，适合需要发送心跳的 SSE 端点）
+
+    与 subscribe_sse_events 不同，get(timeout) 超时不会关闭订阅，
+    Redis 模式下同一进程内的订阅者共享一个 Pub/Sub 连接。
+
+    Args:
+        target: 目标标识（session_name 或 agent_id）
+
+    Returns:
+        订阅对象，提供 get(timeout) 和 close()；调用方需在 finally 中 close()
+    """
+    manager = _get_redis_sse_manager()
+    if manager:
+        try:
+            return await manager.open_subscription(f"sse:session:{target}")
+        except Exception as e:
+            print(f"[SSE] ⚠️ Redis 订阅失败，降级到内存队列: {e}")
+
+    print(f"[SSE] 📡 内存队列订阅: {target}")
+    return _MemorySubscription(target)
+
+
 async def _subscribe_from_memory(target: str) -> AsyncGenerator[dict, None]:
     """
     从内存队列订阅消息（降级模式）
@@ -3,7 +3,7 @@
 Infrastructure - Database Module
 
 Provides PostgreSQL database support:
-- Connection pool management
+- Connection pool management (sync psycopg2 + async asyncpg)
 - ORM base class
 - Database migrations (Alembic)
 
@@ -17,6 +17,11 @@ Usage:
     with get_db_session() as session:
         result = session.execute(text("SELECT 1"))
         print(result.scalar())
+
+    # Async (asyncpg) session, usable directly on the event loop
+    init_async_database()
+    async with get_async_db_session() as session:
+        result = await session.execute(text("SELECT 1"))
 """
 
 # Base class
@@ -28,6 +33,9 @@ from .connection import (
     init_database,
     get_engine,
     get_db_session,
+    init_async_database,
+    get_async_db_session,
+    dispose_async_database,
     create_all_tables,
     drop_all_tables,
     check_connection,
@@ -44,6 +52,9 @@ __all__ = [
     "init_database",
     "get_engine",
     "get_db_session",
+    "init_async_database",
+    "get_async_db_session",
+    "dispose_async_database",
     "create_all_tables",
     "drop_all_tables",
     "check_connection",
@@ -7,12 +7,13 @@
 - 连接池：高效复用数据库连接
 - 上下文管理器：自动管理会话生命周期
 - 配置外部化：通过环境变量配置
+- 异步引擎：asyncpg 驱动的 AsyncEngine/AsyncSession，供事件循环内的读写直接使用
 """
 
 import os
 from dataclasses import dataclass
-from typing import Optional, Generator
-from contextlib import contextmanager
+from typing import Optional, Generator, AsyncGenerator
+from contextlib import contextmanager, asynccontextmanager
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
@@ -21,6 +22,20 @@ from sqlalchemy.pool import QueuePool
 
 from .base import Base
 
+# 异步引擎依赖 greenlet + asyncpg（SQLAlchemy[asyncio]），缺失时只提供同步连接
+try:
+    from sqlalchemy.ext.asyncio import (
+        AsyncEngine,
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+except ImportError:
+    AsyncEngine = None
+    AsyncSession = None
+    async_sessionmaker = None
+    create_async_engine = None
+
 
 @dataclass
 class DatabaseConfig:
@@ -57,6 +72,10 @@ _engine: Optional[Engine] = None
 _session_factory: Optional[sessionmaker] = None
 _initialized: bool = False
 
+_async_engine = None
+_async_session_factory = None
+_async_unavailable: bool = False
+
 
 def init_database(config: Optional[DatabaseConfig] = None) -> Engine:
     """
@@ -105,7 +124,7 @@ def init_database(config: Optional[DatabaseConfig] = None) -> Engine:
 
     _initialized = True
 
-    print(f"[Database] ✅ PostgreSQL 初始化成功")
+    print("[Database] ✅ PostgreSQL 初始化成功")
     print(f"   连接池大小: {config.pool_size}")
     print(f"   最大溢出: {config.max_overflow}")
     print(f"   回收时间: {config.pool_recycle}s")
@@ -162,6 +181,113 @@ def get_db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+def _to_async_url(url: str) -> str:
+    """把同步 DATABASE_URL 转换为 asyncpg 驱动的 URL"""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return url
+    return f"postgresql+asyncpg://{rest}"
+
+
+def init_async_database(config: Optional[DatabaseConfig] = None):
+    """
+    初始化异步数据库连接（单例模式，asyncpg 连接池）
+
+    与同步连接池相互独立，连接池大小通过 DB_ASYNC_POOL_SIZE / DB_ASYNC_MAX_OVERFLOW 配置。
+
+    Args:
+        config: 数据库配置，默认从环境变量读取
+
+    Returns:
+        AsyncEngine 实例；未安装 asyncpg/greenlet 时返回 None
+    """
+    global _async_engine, _async_session_factory, _async_unavailable
+
+    if _async_engine is not None:
+        return _async_engine
+    if _async_unavailable:
+        return None
+
+    config = config or DatabaseConfig.from_env()
+    pool_size = int(os.getenv("DB_ASYNC_POOL_SIZE", str(config.pool_size)))
+    max_overflow = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", str(config.max_overflow)))
+
+    try:
+        if create_async_engine is None:
+            raise ImportError("sqlalchemy.ext.asyncio requires greenlet")
+        _async_engine = create_async_engine(
+            _to_async_url(config.url),
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+            echo=config.echo,
+            connect_args={
+                "timeout": 10,
+                "server_settings": {"timezone": "UTC"}
+            }
+        )
+    except ImportError as e:
+        _async_unavailable = True
+        print(f"[Database] ⚠️ 异步引擎不可用，使用同步连接池: {e}")
+        return None
+
+    _async_session_factory = async_sessionmaker(
+        bind=_async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+    print("[Database] ✅ PostgreSQL 异步引擎初始化成功 (asyncpg)")
+    print(f"   连接池大小: {pool_size}")
+    print(f"   最大溢出: {max_overflow}")
+
+    return _async_engine
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator["AsyncSession", None]:
+    """
+    获取异步数据库会话（异步上下文管理器）
+
+    使用示例:
+        async with get_async_db_session() as session:
+            result = await session.execute(text("SELECT 1"))
+
+    Yields:
+        SQLAlchemy AsyncSession 实例
+
+    Raises:
+        RuntimeError: 未初始化或异步引擎不可用时抛出
+
+    注意:
+        - 自动处理事务提交/回滚
+        - 已有 Query 风格代码可通过 session.run_sync(fn) 复用
+    """
+    if _async_session_factory is None:
+        raise RuntimeError("Async database not initialized. Call init_async_database() first.")
+
+    session = _async_session_factory()
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def dispose_async_database() -> None:
+    """关闭异步连接池（应用关闭时调用）"""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
 def create_all_tables() -> None:
     """
     创建所有表（仅用于开发/测试）
@@ -208,11 +334,19 @@ def get_pool_status() -> dict:
         包含连接池信息的字典
     """
     if _engine is None:
-        return {"status": "not_initialized"}
+        status = {"status": "not_initialized"}
+    else:
+        status = {"status": "ok", **_pool_stats(_engine.pool)}
 
-    pool = _engine.pool
+    if _async_engine is not None:
+        status["async_pool"] = {"status": "ok", **_pool_stats(_async_engine.pool)}
+    else:
+        status["async_pool"] = {"status": "unavailable" if _async_unavailable else "not_initialized"}
+    return status
+
+
+def _pool_stats(pool) -> dict:
     return {
-        "status": "ok",
         "pool_size": pool.size(),
         "checked_in": pool.checkedin(),
         "checked_out": pool.checkedout(),
@@ -226,6 +360,7 @@ def reset() -> None:
     重置数据库连接（仅用于测试）
     """
     global _engine, _session_factory, _initialized
+    global _async_engine, _async_session_factory, _async_unavailable
 
     if _engine is not None:
         _engine.dispose()
@@ -233,3 +368,8 @@ def reset() -> None:
     _engine = None
     _session_factory = None
     _initialized = False
+
+    # 异步连接池绑定在事件循环上，这里只丢弃引用
+    _async_engine = None
+    _async_session_factory = None
+    _async_unavailable = False
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+add chat_session_summary
+
+Revision ID: 5d1e7c3a9b42
+Revises: 4c2d8a1f7b90
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "5d1e7c3a9b42"
+down_revision = "4c2d8a1f7b90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_session_summary",
+        sa.Column("session_name", sa.String(length=200), nullable=False, comment="会话标识(session_name)"),
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0", comment="消息总数"),
+        sa.Column("user_count", sa.Integer(), nullable=False, server_default="0", comment="用户消息数"),
+        sa.Column("assistant_count", sa.Integer(), nullable=False, server_default="0", comment="AI 消息数"),
+        sa.Column("agent_count", sa.Integer(), nullable=False, server_default="0", comment="坐席消息数"),
+        sa.Column("conversation_count", sa.Integer(), nullable=False, server_default="0", comment="conversation 数量"),
+        sa.Column("last_conversation_id", sa.String(length=100), nullable=True, comment="最近一条消息的 conversation_id"),
+        sa.Column("response_time_ms_sum", sa.BigInteger(), nullable=False, server_default="0", comment="AI响应耗时累计(毫秒)"),
+        sa.Column("response_time_count", sa.Integer(), nullable=False, server_default="0", comment="带响应耗时的 AI 消息数"),
+        sa.Column("first_message_at", sa.Float(), nullable=False, comment="首条消息时间(Unix时间戳)"),
+        sa.Column("last_message_at", sa.Float(), nullable=False, comment="最后消息时间(Unix时间戳)"),
+        sa.Column("last_preview", sa.String(length=160), nullable=True, comment="最后一条消息预览"),
+        sa.PrimaryKeyConstraint("session_name"),
+        comment="聊天会话汇总（由消息写入增量维护）",
+    )
+
+    op.create_index("ix_chat_session_summary_last_message_at", "chat_session_summary", ["last_message_at"], unique=False)
+    op.create_index("ix_chat_session_summary_first_message_at", "chat_session_summary", ["first_message_at"], unique=False)
+
+    # 回填已有消息（一次性全量聚合）
+    op.execute(
+        """
+INSERT INTO chat_session_summary (
+    session_name, message_count, user_count, assistant_count, agent_count,
+    conversation_count, last_conversation_id, response_time_ms_sum, response_time_count,
+    first_message_at, last_message_at, last_preview
+)
+SELECT
+    agg.session_name, agg.message_count, agg.user_count, agg.assistant_count, agg.agent_count,
+    agg.conversation_count, last_msg.conversation_id, agg.response_time_ms_sum, agg.response_time_count,
+    agg.first_message_at, agg.last_message_at, LEFT(last_msg.content, 160)
+FROM (
+    SELECT
+        session_name,
+        COUNT(*) AS message_count,
+        COUNT(*) FILTER (WHERE role = 'user') AS user_count,
+        COUNT(*) FILTER (WHERE role = 'assistant') AS assistant_count,
+        COUNT(*) FILTER (WHERE role = 'agent') AS agent_count,
+        COUNT(DISTINCT conversation_id) AS conversation_count,
+        COALESCE(SUM(response_time_ms) FILTER (WHERE role = 'assistant'), 0) AS response_time_ms_sum,
+        COUNT(response_time_ms) FILTER (WHERE role = 'assistant') AS response_time_count,
+        MIN(created_at) AS first_message_at,
+        MAX(created_at) AS last_message_at
+    FROM chat_messages
+    GROUP BY session_name
+) AS agg
+JOIN (
+    SELECT DISTINCT ON (session_name) session_name, conversation_id, content
+    FROM chat_messages
+    ORDER BY session_name, created_at DESC, id DESC
+) AS last_msg ON last_msg.session_name = agg.session_name;
+"""
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_session_summary_first_message_at", table_name="chat_session_summary")
+    op.drop_index("ix_chat_session_summary_last_message_at", table_name="chat_session_summary")
+    op.drop_table("chat_session_summary")
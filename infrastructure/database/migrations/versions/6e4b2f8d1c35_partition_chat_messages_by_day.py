@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+partition chat_messages by day
+
+chat_messages 改为按 created_at（Unix 时间戳，UTC 自然日）RANGE 分区：
+- 每天一个分区 chat_messages_pYYYYMMDD，另有 chat_messages_default 兜底
+- chat_messages_ensure_partitions(from_day, to_day) 负责提前创建分区
+  （应用启动与每日清理任务会调用）
+- 主键/唯一约束必须包含分区键：PK(id, created_at)，UNIQUE(message_id, created_at)
+  消息写入重试复用同一个 created_at，幂等性不受影响
+
+Revision ID: 6e4b2f8d1c35
+Revises: 5d1e7c3a9b42
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "6e4b2f8d1c35"
+down_revision = "5d1e7c3a9b42"
+branch_labels = None
+depends_on = None
+
+
+# 迁移时额外预建的未来分区天数
+PREMAKE_DAYS = 7
+
+_COLUMNS = (
+    "id, message_id, session_name, conversation_id, role, content, "
+    "agent_id, agent_name, response_time_ms, created_at, content_tsv"
+)
+
+_INDEXES = (
+    ("ix_chat_messages_session_name", ["session_name"]),
+    ("ix_chat_messages_conversation_id", ["conversation_id"]),
+    ("ix_chat_messages_role", ["role"]),
+    ("ix_chat_messages_created_at", ["created_at"]),
+    ("ix_chat_messages_message_id", ["message_id"]),
+    ("ix_chat_messages_time_session", ["created_at", "session_name"]),
+)
+
+
+def _columns():
+    return [
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('chat_messages_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("message_id", sa.String(length=36), nullable=False, comment="消息ID(UUID)"),
+        sa.Column("session_name", sa.String(length=200), nullable=False, comment="会话标识(session_name)"),
+        sa.Column("conversation_id", sa.String(length=100), nullable=True, comment="Coze conversation_id"),
+        sa.Column("role", sa.String(length=20), nullable=False, comment="角色: user/assistant/agent"),
+        sa.Column("content", sa.Text(), nullable=False, comment="消息内容"),
+        sa.Column("agent_id", sa.String(length=100), nullable=True, comment="坐席ID"),
+        sa.Column("agent_name", sa.String(length=100), nullable=True, comment="坐席名称"),
+        sa.Column("response_time_ms", sa.Integer(), nullable=True, comment="AI响应耗时(毫秒)"),
+        sa.Column("created_at", sa.Float(), nullable=False, comment="创建时间(Unix时间戳)"),
+        sa.Column("content_tsv", postgresql.TSVECTOR(), nullable=False, comment="全文检索向量(to_tsvector)"),
+    ]
+
+
+def _detach_old_table(old_name: str, unique_name: str, pkey_name: str) -> None:
+    """重命名旧表并释放其索引/约束/序列名，便于新表沿用原名"""
+    op.execute(f"ALTER TABLE chat_messages RENAME TO {old_name};")
+    op.execute(f"DROP TRIGGER IF EXISTS chat_messages_content_tsv_trigger ON {old_name};")
+    op.execute("DROP INDEX IF EXISTS ix_chat_messages_content_tsv;")
+    for name, _ in _INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name};")
+    op.execute(f"ALTER TABLE {old_name} DROP CONSTRAINT IF EXISTS {unique_name};")
+    op.execute(f"ALTER TABLE {old_name} DROP CONSTRAINT IF EXISTS {pkey_name};")
+    op.execute(f"ALTER TABLE {old_name} ALTER COLUMN id DROP DEFAULT;")
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY NONE;")
+
+
+def _finish_new_table(old_name: str) -> None:
+    """复制数据后建索引、触发器，并接管序列"""
+    op.execute(f"INSERT INTO chat_messages ({_COLUMNS}) SELECT {_COLUMNS} FROM {old_name};")
+    op.execute("SELECT setval('chat_messages_id_seq', GREATEST((SELECT max(id) FROM chat_messages), 1));")
+    op.execute(f"DROP TABLE {old_name};")
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id;")
+
+    for name, columns in _INDEXES:
+        op.create_index(name, "chat_messages", columns, unique=False)
+    op.create_index(
+        "ix_chat_messages_content_tsv",
+        "chat_messages",
+        ["content_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.execute(
+        """
+CREATE TRIGGER chat_messages_content_tsv_trigger
+BEFORE INSERT OR UPDATE OF content ON chat_messages
+FOR EACH ROW EXECUTE FUNCTION chat_messages_content_tsv_update();
+"""
+    )
+
+
+def upgrade() -> None:
+    _detach_old_table("chat_messages_legacy", "uq_chat_messages_message_id", "chat_messages_pkey")
+
+    op.create_table(
+        "chat_messages",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="chat_messages_pkey"),
+        sa.UniqueConstraint("message_id", "created_at", name="uq_chat_messages_message_id"),
+        comment="聊天消息表（按天分区）",
+        postgresql_partition_by="RANGE (created_at)",
+    )
+
+    op.execute(
+        """
+CREATE OR REPLACE FUNCTION chat_messages_ensure_partitions(from_day date, to_day date)
+RETURNS integer AS $$
+DECLARE
+  d date := from_day;
+  created integer := 0;
+  part_name text;
+BEGIN
+  WHILE d <= to_day LOOP
+    part_name := 'chat_messages_p' || to_char(d, 'YYYYMMDD');
+    IF to_regclass(part_name) IS NULL THEN
+      BEGIN
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF chat_messages FOR VALUES FROM (%s) TO (%s)',
+          part_name,
+          extract(epoch FROM d::timestamp AT TIME ZONE 'UTC'),
+          extract(epoch FROM (d + 1)::timestamp AT TIME ZONE 'UTC')
+        );
+        created := created + 1;
+      EXCEPTION WHEN others THEN
+        -- 通常是默认分区里已有该日期的数据；保留在默认分区，不影响写入
+        RAISE WARNING 'chat_messages partition % not created: %', part_name, SQLERRM;
+      END;
+    END IF;
+    d := d + 1;
+  END LOOP;
+  RETURN created;
+END
+$$ LANGUAGE plpgsql;
+"""
+    )
+
+    # 按旧数据的时间范围建分区，再预建未来分区；超出范围的数据进入默认分区
+    op.execute(
+        f"""
+SELECT chat_messages_ensure_partitions(
+  COALESCE(
+    (SELECT (to_timestamp(min(created_at)) AT TIME ZONE 'UTC')::date FROM chat_messages_legacy),
+    (now() AT TIME ZONE 'UTC')::date
+  ),
+  (now() AT TIME ZONE 'UTC')::date + {PREMAKE_DAYS}
+);
+"""
+    )
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT;")
+
+    _finish_new_table("chat_messages_legacy")
+
+
+def downgrade() -> None:
+    _detach_old_table("chat_messages_partitioned", "uq_chat_messages_message_id", "chat_messages_pkey")
+
+    op.create_table(
+        "chat_messages",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", name="chat_messages_pkey"),
+        sa.UniqueConstraint("message_id", name="uq_chat_messages_message_id"),
+        comment="聊天消息表",
+    )
+
+    _finish_new_table("chat_messages_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS chat_messages_ensure_partitions(date, date);")
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+add chat_messages (session_name, created_at, id) index
+
+会话消息按 (created_at, id) 游标翻页（keyset pagination），
+该索引让任意深度的翻页都只扫描一页的数据。
+
+Revision ID: 7a3c5e9d2f61
+Revises: 6e4b2f8d1c35
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+
+revision = "7a3c5e9d2f61"
+down_revision = "6e4b2f8d1c35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_messages_session_time",
+        "chat_messages",
+        ["session_name", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_session_time", table_name="chat_messages")
@@ -26,6 +26,7 @@ from .session import SessionArchiveModel
 # 聊天消息
 from .chat_message import ChatMessageModel
 from .chat_session_meta import ChatSessionMetaModel
+from .chat_session_summary import ChatSessionSummaryModel
 from .chat_export_job import ChatExportJobModel
 
 # 邮件记录
@@ -50,6 +51,7 @@ __all__ = [
     # 聊天消息
     "ChatMessageModel",
     "ChatSessionMetaModel",
+    "ChatSessionSummaryModel",
     "ChatExportJobModel",
     # 邮件记录
     "EmailRecordModel",
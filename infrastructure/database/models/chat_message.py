@@ -3,9 +3,12 @@
 聊天消息 ORM 模型
 
 用于持久化存储聊天记录（用户 / AI / 坐席）。
+
+表按 created_at 每天一个 RANGE 分区（见迁移 6e4b2f8d1c35），
+主键和唯一约束都包含分区键 created_at。
 """
 
-from sqlalchemy import Column, String, Text, Integer, Float, Index
+from sqlalchemy import Column, String, Text, Integer, Float, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from ..base import Base
@@ -16,11 +19,11 @@ class ChatMessageModel(Base):
 
     __tablename__ = "chat_messages"
 
-    # 主键
+    # 主键（id + 分区键 created_at）
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    # 幂等键（用于安全重试，避免重复写入）
-    message_id = Column(String(36), unique=True, nullable=False, index=True, comment="消息ID(UUID)")
+    # 幂等键（用于安全重试，避免重复写入；重试复用同一个 created_at）
+    message_id = Column(String(36), nullable=False, index=True, comment="消息ID(UUID)")
 
     # 会话标识
     session_name = Column(String(200), nullable=False, index=True, comment="会话标识(session_name)")
@@ -37,14 +40,16 @@ class ChatMessageModel(Base):
     # AI 响应耗时（仅 role=assistant 时）
     response_time_ms = Column(Integer, nullable=True, comment="AI响应耗时(毫秒)")
 
-    # 时间戳
-    created_at = Column(Float, nullable=False, index=True, comment="创建时间(Unix时间戳)")
+    # 时间戳（分区键）
+    created_at = Column(Float, primary_key=True, nullable=False, index=True, comment="创建时间(Unix时间戳)")
 
     # 全文检索字段（由数据库触发器维护）
     content_tsv = Column(TSVECTOR, nullable=False, comment="全文检索向量(to_tsvector)")
 
     __table_args__ = (
+        UniqueConstraint("message_id", "created_at", name="uq_chat_messages_message_id"),
         Index("ix_chat_messages_time_session", "created_at", "session_name"),
-        {"comment": "聊天消息表"},
+        Index("ix_chat_messages_session_time", "session_name", "created_at", "id"),
+        {"comment": "聊天消息表（按天分区）", "postgresql_partition_by": "RANGE (created_at)"},
     )
 
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Chat session summary ORM model.
+
+One row per `session_name`, maintained incrementally by the message writer
+(`MessageStoreService`) in the same transaction as the `chat_messages` INSERT,
+so history listing and statistics do not need to aggregate `chat_messages`.
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Index
+
+from ..base import Base
+
+
+class ChatSessionSummaryModel(Base):
+    """Chat session rollup table (one row per session_name)."""
+
+    __tablename__ = "chat_session_summary"
+
+    session_name = Column(String(200), primary_key=True, comment="会话标识(session_name)")
+
+    message_count = Column(Integer, nullable=False, default=0, comment="消息总数")
+    user_count = Column(Integer, nullable=False, default=0, comment="用户消息数")
+    assistant_count = Column(Integer, nullable=False, default=0, comment="AI 消息数")
+    agent_count = Column(Integer, nullable=False, default=0, comment="坐席消息数")
+
+    # 会话内不同 Coze conversation 的数量（同 COUNT(DISTINCT conversation_id)，
+    # 写入时 conversation 在该会话首次出现才计数）
+    conversation_count = Column(Integer, nullable=False, default=0, comment="conversation 数量")
+    last_conversation_id = Column(String(100), nullable=True, comment="最近一条消息的 conversation_id")
+
+    # AI 响应耗时累计（用于统计平均值）
+    response_time_ms_sum = Column(BigInteger, nullable=False, default=0, comment="AI响应耗时累计(毫秒)")
+    response_time_count = Column(Integer, nullable=False, default=0, comment="带响应耗时的 AI 消息数")
+
+    first_message_at = Column(Float, nullable=False, comment="首条消息时间(Unix时间戳)")
+    last_message_at = Column(Float, nullable=False, comment="最后消息时间(Unix时间戳)")
+    last_preview = Column(String(160), nullable=True, comment="最后一条消息预览")
+
+    __table_args__ = (
+        Index("ix_chat_session_summary_last_message_at", "last_message_at"),
+        Index("ix_chat_session_summary_first_message_at", "first_message_at"),
+        {"comment": "聊天会话汇总（由消息写入增量维护）"},
+    )
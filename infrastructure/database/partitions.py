@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+基础设施 - chat_messages 分区管理
+
+chat_messages 按 created_at（UTC 自然日）RANGE 分区，分区名 chat_messages_pYYYYMMDD。
+本模块负责：
+- 预建未来分区（调用迁移中定义的 chat_messages_ensure_partitions 函数）
+- 按保留期整块 DETACH + DROP 过期分区，替代大范围 DELETE
+
+配置环境变量：
+- CHAT_HISTORY_PARTITION_PREMAKE_DAYS: 预建未来分区天数（默认7）
+- CHAT_HISTORY_PARTITION_LOCK_TIMEOUT: DETACH 获取锁的超时（默认"5s"，超时则下次再试）
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "chat_messages"
+DEFAULT_PARTITION = "chat_messages_default"
+PREMAKE_DAYS = int(os.getenv("CHAT_HISTORY_PARTITION_PREMAKE_DAYS", "7"))
+LOCK_TIMEOUT = os.getenv("CHAT_HISTORY_PARTITION_LOCK_TIMEOUT", "5s")
+
+_BOUND_RE = re.compile(r"FROM \('?([0-9.eE+-]+)'?\) TO \('?([0-9.eE+-]+)'?\)")
+
+
+@dataclass(frozen=True)
+class ChatMessagePartition:
+    """一个按天分区（默认分区 lower/upper 为 None）"""
+    name: str
+    lower: Optional[float]
+    upper: Optional[float]
+
+
+def is_partitioned(session) -> bool:
+    """chat_messages 是否已迁移为分区表"""
+    return bool(session.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": PARENT_TABLE},
+    ).scalar())
+
+
+def list_partitions(session) -> List[ChatMessagePartition]:
+    """列出 chat_messages 的全部分区（按下界升序，默认分区在最后）"""
+    rows = session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name AND pg_table_is_visible(p.oid)"
+        ),
+        {"name": PARENT_TABLE},
+    ).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            partitions.append(ChatMessagePartition(name, float(match.group(1)), float(match.group(2))))
+        else:
+            partitions.append(ChatMessagePartition(name, None, None))
+    partitions.sort(key=lambda p: (p.lower is None, p.lower or 0.0))
+    return partitions
+
+
+def ensure_partitions(days_ahead: Optional[int] = None) -> int:
+    """
+    预建从今天起 days_ahead 天的分区（幂等）
+
+    Returns:
+        新建的分区数量；表未分区时返回 0
+    """
+    from infrastructure.database import init_database, get_db_session
+
+    days = PREMAKE_DAYS if days_ahead is None else max(days_ahead, 0)
+    init_database()
+    try:
+        with get_db_session() as session:
+            created = session.execute(
+                text(
+                    "SELECT chat_messages_ensure_partitions("
+                    "(now() AT TIME ZONE 'UTC')::date, "
+                    "(now() AT TIME ZONE 'UTC')::date + CAST(:days AS integer))"
+                ),
+                {"days": days},
+            ).scalar()
+    except ProgrammingError:
+        # 迁移未执行：chat_messages 仍是普通表
+        return 0
+
+    if created:
+        logger.info(f"[Partitions] 已预建 chat_messages 分区: {created} 个")
+    return int(created or 0)
+
+
+def drop_partitions_before(cutoff: float) -> Dict[str, int]:
+    """
+    DETACH + DROP 所有上界不晚于 cutoff 的按天分区
+
+    每个分区单独一个事务，并设置 lock_timeout，获取不到锁时跳过，下次清理再处理。
+
+    Returns:
+        已删除的分区名 -> 分区内行数
+    """
+    from infrastructure.database import init_database, get_db_session
+
+    init_database()
+    with get_db_session() as session:
+        expired = [
+            p for p in list_partitions(session)
+            if p.upper is not None and p.upper <= cutoff
+        ]
+
+    dropped: Dict[str, int] = {}
+    for partition in expired:
+        try:
+            with get_db_session() as session:
+                session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                session.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{partition.name}"'))
+                rows = session.execute(text(f'SELECT count(*) FROM "{partition.name}"')).scalar()
+                session.execute(text(f'DROP TABLE "{partition.name}"'))
+            dropped[partition.name] = int(rows or 0)
+        except Exception as e:
+            logger.warning(f"[Partitions] 删除分区失败 {partition.name}: {e}")
+
+    if dropped:
+        logger.info(f"[Partitions] 已删除过期分区: {', '.join(dropped)}")
+    return dropped
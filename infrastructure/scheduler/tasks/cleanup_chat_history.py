@@ -2,12 +2,61 @@
 """
 Chat history cleanup task.
 
-Deletes `chat_messages` rows older than the configured retention window.
+Removes `chat_messages` rows older than the configured retention window.
+
+When `chat_messages` is partitioned by day, whole expired partitions are
+detached and dropped (no row-level DELETE, no index churn), and future
+partitions are pre-created. Rows that landed in the default partition, or a
+table that has not been migrated yet, are deleted in bounded batches.
+
+`chat_session_summary` follows the retained messages: rows of sessions with
+no remaining messages are deleted, and sessions that span the cutoff are
+recomputed from what is left.
 """
 
+import asyncio
+import logging
 import os
 import time
 
+logger = logging.getLogger(__name__)
+
+# Rows per DELETE transaction for the non-partitioned path
+DELETE_BATCH_SIZE = 5000
+# Summary rows recomputed per transaction
+SUMMARY_BATCH_SIZE = 500
+
+# Recompute the locked summary rows from the messages inside the retention window
+# (a partially expired day partition may still hold older rows); the writer's
+# additive upserts for these sessions wait on the row locks, so no delta is lost
+_RECOMPUTE_SUMMARY_SQL = """
+UPDATE chat_session_summary AS s SET
+    message_count = agg.message_count,
+    user_count = agg.user_count,
+    assistant_count = agg.assistant_count,
+    agent_count = agg.agent_count,
+    conversation_count = agg.conversation_count,
+    response_time_ms_sum = agg.response_time_ms_sum,
+    response_time_count = agg.response_time_count,
+    first_message_at = agg.first_message_at
+FROM (
+    SELECT
+        session_name,
+        COUNT(*) AS message_count,
+        COUNT(*) FILTER (WHERE role = 'user') AS user_count,
+        COUNT(*) FILTER (WHERE role = 'assistant') AS assistant_count,
+        COUNT(*) FILTER (WHERE role = 'agent') AS agent_count,
+        COUNT(DISTINCT conversation_id) AS conversation_count,
+        COALESCE(SUM(response_time_ms) FILTER (WHERE role = 'assistant'), 0) AS response_time_ms_sum,
+        COUNT(response_time_ms) FILTER (WHERE role = 'assistant') AS response_time_count,
+        MIN(created_at) AS first_message_at
+    FROM chat_messages
+    WHERE session_name = ANY(:names) AND created_at >= :cutoff
+    GROUP BY session_name
+) AS agg
+WHERE s.session_name = agg.session_name
+"""
+
 
 def _get_retention_days() -> int:
     raw = os.getenv("CHAT_HISTORY_RETENTION_DAYS", "30").strip()
@@ -18,6 +67,96 @@ def _get_retention_days() -> int:
         return 30
 
 
+def _delete_in_batches(cutoff: float, table: str) -> int:
+    from sqlalchemy import text
+
+    from infrastructure.database import get_db_session
+
+    deleted = 0
+    while True:
+        with get_db_session() as session:
+            result = session.execute(
+                text(
+                    f"DELETE FROM {table} WHERE ctid IN ("
+                    f"SELECT ctid FROM {table} WHERE created_at < :cutoff LIMIT :limit)"
+                ),
+                {"cutoff": cutoff, "limit": DELETE_BATCH_SIZE},
+            )
+            count = int(result.rowcount or 0)
+        deleted += count
+        if count < DELETE_BATCH_SIZE:
+            return deleted
+
+
+def _cleanup(cutoff: float) -> int:
+    from infrastructure.database import init_database, get_db_session
+    from infrastructure.database import partitions
+
+    # Ensure DB is initialized in worker contexts (idempotent).
+    init_database()
+
+    with get_db_session() as session:
+        partitioned = partitions.is_partitioned(session)
+
+    if partitioned:
+        dropped = partitions.drop_partitions_before(cutoff)
+        deleted = sum(dropped.values())
+        deleted += _delete_in_batches(cutoff, partitions.DEFAULT_PARTITION)
+        partitions.ensure_partitions()
+    else:
+        deleted = _delete_in_batches(cutoff, "chat_messages")
+
+    try:
+        _cleanup_summaries(cutoff)
+    except Exception as e:
+        logger.warning("[Cleanup] chat_session_summary cleanup skipped: %s", e)
+
+    return deleted
+
+
+def _cleanup_summaries(cutoff: float) -> int:
+    """
+    Bring `chat_session_summary` in line with the retained messages.
+
+    Returns:
+        Number of summary rows recomputed.
+    """
+    from sqlalchemy import text
+
+    from infrastructure.database import get_db_session
+
+    # Sessions with no remaining messages leave the rollup
+    with get_db_session() as session:
+        session.execute(
+            text("DELETE FROM chat_session_summary WHERE last_message_at < :cutoff"),
+            {"cutoff": cutoff},
+        )
+
+    # Sessions spanning the cutoff lost their oldest messages
+    recomputed = 0
+    while True:
+        with get_db_session() as session:
+            names = list(session.execute(
+                text(
+                    "SELECT session_name FROM chat_session_summary WHERE first_message_at < :cutoff "
+                    "ORDER BY session_name LIMIT :limit FOR UPDATE"
+                ),
+                {"cutoff": cutoff, "limit": SUMMARY_BATCH_SIZE},
+            ).scalars())
+            if not names:
+                return recomputed
+            session.execute(text(_RECOMPUTE_SUMMARY_SQL), {"names": names, "cutoff": cutoff})
+            # No messages left despite last_message_at >= cutoff: drop the row
+            session.execute(
+                text(
+                    "DELETE FROM chat_session_summary "
+                    "WHERE session_name = ANY(:names) AND first_message_at < :cutoff"
+                ),
+                {"names": names, "cutoff": cutoff},
+            )
+        recomputed += len(names)
+
+
 async def cleanup_old_chat_messages() -> int:
     """
     Cleanup old chat messages.
@@ -30,19 +169,6 @@ async def cleanup_old_chat_messages() -> int:
         return 0
 
     cutoff = time.time() - (retention_days * 24 * 60 * 60)
-
-    from infrastructure.database import init_database, get_db_session
-    from infrastructure.database.models import ChatMessageModel
-
-    # Ensure DB is initialized in worker contexts (idempotent).
-    init_database()
-
-    with get_db_session() as session:
-        deleted = (
-            session.query(ChatMessageModel)
-            .filter(ChatMessageModel.created_at < cutoff)
-            .delete(synchronize_session=False)
-        )
-        session.commit()
-
-    return int(deleted or 0)
+    deleted = await asyncio.to_thread(_cleanup, cutoff)
+    logger.info("[Cleanup] chat history older than %s days removed: %s rows", retention_days, deleted)
+    return deleted
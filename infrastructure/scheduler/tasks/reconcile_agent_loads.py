@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Agent load reconciliation task.
+
+Per-agent load sets (`agent_load:{manual|pending}:{agent_id}`) are maintained
+incrementally on every session save. This task rebuilds the expected
+membership from the session status indexes and repairs drift left by
+expired sessions or racing writers.
+"""
+
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def get_reconcile_interval_minutes() -> int:
+    raw = os.getenv("AGENT_LOAD_RECONCILE_MINUTES", "10").strip()
+    try:
+        return max(int(raw), 1)
+    except ValueError:
+        return 10
+
+
+async def reconcile_agent_loads() -> int:
+    """
+    Reconcile agent load sets with session state.
+
+    Returns:
+        Number of sessions whose load membership was fixed.
+    """
+    from infrastructure.bootstrap.redis import get_session_store
+
+    try:
+        store = get_session_store()
+    except RuntimeError:
+        return 0
+
+    # In-memory store counts on demand, nothing to reconcile
+    if not hasattr(store, "reconcile_agent_loads"):
+        return 0
+
+    result = await asyncio.to_thread(store.reconcile_agent_loads)
+    if result.get("fixed"):
+        logger.info("[Reconcile] agent load sets fixed: %s sessions", result["fixed"])
+    return int(result.get("fixed", 0))
@@ -16,7 +16,7 @@ import jwt
 import bcrypt
 import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
@@ -275,10 +275,202 @@ class AgentTokenManager:
 # 坐席账号管理器
 # ====================
 
+import os
+import json
+import uuid
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# 坐席变更广播频道（各 worker 据此更新进程内坐席注册表）
+AGENT_REGISTRY_CHANNEL = "agent_registry:changes"
+# 坐席记录乐观锁冲突时的最大重试次数
+AGENT_UPDATE_MAX_RETRIES = 5
+
+
+class AgentRegistry:
+    """
+    进程内坐席注册表
+
+    username -> Agent、agent_id -> username 两个字典，鉴权和坐席列表直接读内存。
+    - 首次访问时 SCAN + MGET 全量加载一次（之后的全量加载都在后台线程执行，请求只读当前快照）
+    - 本进程写入/删除时同步更新，并通过 Redis Pub/Sub 广播给其他 worker（消息携带坐席 JSON）
+    - 订阅断开重连后、或超过 AGENT_REGISTRY_MAX_AGE 秒时全量重新加载，兜底丢失的消息
+    - 存储不支持 Pub/Sub（内存降级模式，单进程）时只做本地维护
+
+    快照可能滞后，读-改-写（状态、心跳、登录）必须以 Redis 中的记录为准，见 AgentManager._modify_agent。
+
+    配置环境变量：
+    - AGENT_REGISTRY_MAX_AGE: 全量重新加载间隔（秒，默认300）
+    """
+
+    def __init__(self, redis_client, key_prefix: str):
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.max_age = float(os.getenv("AGENT_REGISTRY_MAX_AGE", "300"))
+        self.origin = uuid.uuid4().hex
+        self._by_username: Dict[str, Agent] = {}
+        self._ids: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self._listener: Optional[threading.Thread] = None
+        self._reloading = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def broadcast_enabled(self) -> bool:
+        return hasattr(self.redis, "pubsub") and hasattr(self.redis, "publish")
+
+    def _ensure_loaded(self) -> None:
+        if self.broadcast_enabled and (self._listener is None or not self._listener.is_alive()):
+            self._start_listener()
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            # 首次加载：尚无快照可用，只能同步加载
+            self.reload()
+        elif time.time() - loaded_at > self.max_age:
+            self._reload_in_background()
+
+    def _reload_in_background(self) -> None:
+        """后台线程全量重新加载（同一时间只有一个），期间继续使用当前快照"""
+        if self._reloading.is_set():
+            return
+        self._reloading.set()
+
+        def run() -> None:
+            try:
+                self.reload()
+            except Exception as e:
+                logger.warning(f"[AgentRegistry] 后台重新加载坐席失败: {e}")
+            finally:
+                self._reloading.clear()
+
+        threading.Thread(target=run, name="agent-registry-reload", daemon=True).start()
+
+    def reload(self) -> int:
+        """从 Redis 全量加载坐席（SCAN + 分批 MGET）"""
+        keys = [key for key in self.redis.scan_iter(f"{self.key_prefix}*", count=100)]
+        values: List[Any] = []
+        if hasattr(self.redis, "mget"):
+            for start in range(0, len(keys), 200):
+                values.extend(self.redis.mget(keys[start:start + 200]))
+        else:
+            values = [self.redis.get(key) for key in keys]
+
+        by_username: Dict[str, Agent] = {}
+        for data in values:
+            if not data:
+                continue
+            try:
+                agent = Agent.parse_raw(data)
+            except Exception:
+                continue
+            by_username[agent.username] = agent
+
+        with self._lock:
+            self._by_username = by_username
+            self._ids = {agent.id: agent.username for agent in by_username.values()}
+            self._loaded_at = time.time()
+        return len(by_username)
+
+    def get(self, username: str) -> Optional[Agent]:
+        self._ensure_loaded()
+        agent = self._by_username.get(username)
+        return agent.model_copy(deep=True) if agent else None
+
+    def get_by_id(self, agent_id: str) -> Optional[Agent]:
+        self._ensure_loaded()
+        username = self._ids.get(agent_id)
+        return self.get(username) if username else None
+
+    def all(self) -> List[Agent]:
+        self._ensure_loaded()
+        return [agent.model_copy(deep=True) for agent in list(self._by_username.values())]
+
+    def put(self, agent: Agent, publish: bool = True) -> None:
+        """本地写入（publish=True 时广播给其他 worker）"""
+        with self._lock:
+            previous = self._by_username.get(agent.username)
+            if previous is not None and previous.id != agent.id:
+                self._ids.pop(previous.id, None)
+            self._by_username[agent.username] = agent.model_copy(deep=True)
+            self._ids[agent.id] = agent.username
+        if publish:
+            self._publish({"op": "put", "username": agent.username, "data": agent.json()})
+
+    def remove(self, username: str, publish: bool = True) -> None:
+        with self._lock:
+            agent = self._by_username.pop(username, None)
+            if agent is not None:
+                self._ids.pop(agent.id, None)
+        if publish:
+            self._publish({"op": "delete", "username": username})
+
+    # ==================== Pub/Sub ====================
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        if not self.broadcast_enabled:
+            return
+        try:
+            self.redis.publish(AGENT_REGISTRY_CHANNEL, json.dumps({**message, "origin": self.origin}))
+        except Exception as e:
+            # 其他 worker 会在 max_age 后全量重新加载
+            logger.warning(f"[AgentRegistry] 广播坐席变更失败: {e}")
+
+    def _apply_message(self, raw: Any) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") == self.origin:
+            return
+        username = message.get("username")
+        if not username:
+            return
+        if message.get("op") == "delete":
+            self.remove(username, publish=False)
+            return
+        try:
+            self.put(Agent.parse_raw(message["data"]), publish=False)
+        except Exception as e:
+            logger.warning(f"[AgentRegistry] 坐席变更消息解析失败: {e}")
+
+    def _start_listener(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, name="agent-registry-listener", daemon=True)
+            self._listener.start()
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(AGENT_REGISTRY_CHANNEL)
+                # 订阅建立前的变更可能丢失，在订阅线程中全量重新加载
+                if self._loaded_at is not None:
+                    self.reload()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply_message(message.get("data"))
+            except Exception as e:
+                logger.warning(f"[AgentRegistry] 坐席变更订阅中断，稍后重连: {e}")
+                self._stop.wait(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def stop(self) -> None:
+        """停止订阅线程"""
+        self._stop.set()
+
 
 class AgentManager:
     """坐席账号管理器（支持 PostgreSQL + Redis 双写模式）"""
@@ -296,6 +488,8 @@ class AgentManager:
         self.id_index_prefix = "agent_id:"
         self.default_ttl = 86400 * 365  # 1年
         self._pg_enabled = enable_postgres
+        # 进程内注册表：鉴权、坐席列表不再逐请求访问 Redis
+        self.registry = AgentRegistry(self.redis, self.key_prefix)
 
     def enable_postgres(self):
         """启用 PostgreSQL 双写"""
@@ -332,6 +526,65 @@ class AgentManager:
             except Exception:
                 logger.warning(f"[AgentManager] Redis 缓存写入失败: {e}")
 
+        # 3. 更新进程内注册表并通知其他 worker
+        self.registry.put(agent)
+
+    def _load_agent_record(self, username: str) -> Optional[Agent]:
+        """从 Redis 读取坐席最新记录（不经过可能滞后的进程内注册表）"""
+        data = self.redis.get(self._username_key(username))
+        return Agent.parse_raw(data) if data else None
+
+    def _modify_agent(self, username: str, mutate: Callable[[Agent], None]) -> Optional[Agent]:
+        """
+        以 Redis 中的最新记录为基础修改坐席并写回
+
+        注册表快照可能滞后（订阅中断时最长 AGENT_REGISTRY_MAX_AGE 秒），若用快照整体写回，
+        会覆盖其他 worker 刚做的密码/状态修改。支持事务的 Redis 上用 WATCH/MULTI 乐观锁，
+        记录在读取后被其他 worker 修改时重试。
+
+        Args:
+            username: 用户名
+            mutate: 原地修改坐席
+
+        Returns:
+            修改后的坐席；坐席不存在时返回 None
+        """
+        if not hasattr(self.redis, "pipeline"):
+            # 内存降级模式（单进程），无并发写入方
+            agent = self._load_agent_record(username)
+            if agent is None:
+                return None
+            mutate(agent)
+            self._store_agent_record(agent)
+            return agent
+
+        import redis as redis_lib
+
+        key = self._username_key(username)
+        for _ in range(AGENT_UPDATE_MAX_RETRIES):
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if not data:
+                        return None
+                    agent = Agent.parse_raw(data)
+                    mutate(agent)
+                    pipe.multi()
+                    pipe.set(key, agent.json(), ex=self.default_ttl)
+                    pipe.set(self._id_index_key(agent.id), agent.username, ex=self.default_ttl)
+                    pipe.execute()
+                except redis_lib.WatchError:
+                    continue
+
+            if self._pg_enabled:
+                self._pg_save_agent(agent)
+            self.registry.put(agent)
+            return agent
+
+        logger.warning(f"[AgentManager] 坐席记录并发修改冲突，放弃本次更新: {username}")
+        return None
+
     def _pg_save_agent(self, agent: Agent):
         """写入 PostgreSQL"""
         try:
@@ -421,11 +674,16 @@ class AgentManager:
         Returns:
             坐席账号或 None
         """
-        key = self._username_key(username)
-        data = self.redis.get(key)
+        agent = self.registry.get(username)
+        if agent:
+            return agent
 
+        # 注册表未命中（其他 worker 刚创建、广播尚未到达）时回源 Redis
+        data = self.redis.get(self._username_key(username))
         if data:
-            return Agent.parse_raw(data)
+            agent = Agent.parse_raw(data)
+            self.registry.put(agent, publish=False)
+            return agent
         return None
 
     def get_agent_by_id(self, agent_id: str) -> Optional[Agent]:
@@ -435,6 +693,10 @@ class AgentManager:
         Args:
             agent_id: 坐席ID
         """
+        agent = self.registry.get_by_id(agent_id)
+        if agent:
+            return agent
+
         username = self.redis.get(self._id_index_key(agent_id))
         if username:
             if isinstance(username, bytes):
@@ -455,14 +717,27 @@ class AgentManager:
                 return agent
         return None
 
-    def update_agent(self, agent: Agent):
+    def update_agent(self, agent: Agent, fields: Optional[List[str]] = None) -> Optional[Agent]:
         """
         更新坐席账号
 
         Args:
             agent: 坐席账号
+            fields: 只更新这些字段（在 Redis 最新记录上修改，不覆盖其他 worker 的并发修改）；
+                为 None 时整体写入
+
+        Returns:
+            写入后的坐席账号；指定 fields 且坐席已不存在时返回 None
         """
-        self._store_agent_record(agent)
+        if fields is None:
+            self._store_agent_record(agent)
+            return agent
+
+        def copy_fields(current: Agent) -> None:
+            for field_name in fields:
+                setattr(current, field_name, getattr(agent, field_name))
+
+        return self._modify_agent(agent.username, copy_fields)
 
     def authenticate(self, username: str, password: str) -> Optional[Agent]:
         """
@@ -475,7 +750,8 @@ class AgentManager:
         Returns:
             坐席账号（验证成功）或 None（验证失败）
         """
-        agent = self.get_agent_by_username(username)
+        # 密码以 Redis 中的最新记录为准（其他 worker 可能刚修改过密码）
+        agent = self._load_agent_record(username)
 
         if not agent:
             return None
@@ -485,14 +761,15 @@ class AgentManager:
             return None
 
         # 更新最后登录时间
-        agent.last_login = time.time()
-        agent.status = AgentStatus.ONLINE
-        agent.status_note = None
-        agent.status_updated_at = time.time()
-        agent.last_active_at = time.time()
-        self.update_agent(agent)
+        def mark_login(current: Agent) -> None:
+            now = time.time()
+            current.last_login = now
+            current.status = AgentStatus.ONLINE
+            current.status_note = None
+            current.status_updated_at = now
+            current.last_active_at = now
 
-        return agent
+        return self._modify_agent(username, mark_login)
 
     def update_status(
         self,
@@ -507,17 +784,15 @@ class AgentManager:
             username: 用户名
             status: 新状态
         """
-        agent = self.get_agent_by_username(username)
-        if agent:
+        def apply_status(agent: Agent) -> None:
             agent.status = status
             if status_note is not None:
                 note = status_note.strip()
                 agent.status_note = note if note else None
             agent.status_updated_at = time.time()
             agent.last_active_at = time.time()
-            self.update_agent(agent)
-            return agent
-        return None
+
+        return self._modify_agent(username, apply_status)
 
     def update_last_active(self, username: str) -> Optional[float]:
         """
@@ -529,13 +804,11 @@ class AgentManager:
         Returns:
             float: 更新时间戳或 None（坐席不存在）
         """
-        agent = self.get_agent_by_username(username)
-        if not agent:
-            return None
+        def touch(agent: Agent) -> None:
+            agent.last_active_at = time.time()
 
-        agent.last_active_at = time.time()
-        self.update_agent(agent)
-        return agent.last_active_at
+        agent = self._modify_agent(username, touch)
+        return agent.last_active_at if agent else None
 
     def get_all_agents(self) -> list:
         """
@@ -544,17 +817,7 @@ class AgentManager:
         Returns:
             坐席列表
         """
-        agents = []
-        # 使用 SCAN 遍历所有坐席 key
-        for key in self.redis.scan_iter(f"{self.key_prefix}*", count=100):
-            data = self.redis.get(key)
-            if data:
-                try:
-                    agent = Agent.parse_raw(data)
-                    agents.append(agent)
-                except Exception:
-                    pass
-        return agents
+        return self.registry.all()
 
     def delete_agent(self, username: str) -> bool:
         """
@@ -577,6 +840,7 @@ class AgentManager:
         result = self.redis.delete(key)
         if agent:
             self.redis.delete(self._id_index_key(agent.id))
+        self.registry.remove(username)
         return result > 0
 
     def _pg_delete_agent(self, agent_id: str):
@@ -51,9 +51,21 @@ export interface HistorySessionsResponse {
   page_size: number;
 }
 
-export interface HistorySessionDetailResponse {
+/**
+ * Keyset pagination: pass `next_cursor` back as `cursor` to fetch the next page.
+ * `total` is null when counting was skipped (count=none, the default with a cursor).
+ */
+export interface HistoryPageInfo {
+  total: number | null;
+  total_is_estimate?: boolean;
+  has_more?: boolean;
+  next_cursor?: string | null;
+}
+
+export type HistoryCountMode = 'exact' | 'estimate' | 'none';
+
+export interface HistorySessionDetailResponse extends HistoryPageInfo {
   session_name: string;
-  total: number;
   items: HistoryMessageItem[];
   order?: 'asc' | 'desc';
 }
@@ -62,9 +74,8 @@ export interface HistorySearchItem extends HistoryMessageItem {
   rank: number;
 }
 
-export interface HistorySearchResponse {
+export interface HistorySearchResponse extends HistoryPageInfo {
   items: HistorySearchItem[];
-  total: number;
   page: number;
   page_size: number;
 }
@@ -86,6 +97,9 @@ export interface HistoryListParams {
 export interface HistoryDetailParams {
   limit?: number;
   offset?: number;
+  order?: 'asc' | 'desc';
+  cursor?: string;
+  count?: HistoryCountMode;
 }
 
 export interface HistorySearchParams {
@@ -96,6 +110,8 @@ export interface HistorySearchParams {
   session_name?: string;
   page?: number;
   page_size?: number;
+  cursor?: string;
+  count?: HistoryCountMode;
 }
 
 export interface HistoryExportParams {
@@ -104,7 +120,7 @@ export interface HistoryExportParams {
   end_time?: number;
 }
 
-export interface HistorySearchSessionsResponse {
+export interface HistorySearchSessionsResponse extends HistoryPageInfo {
   items: Array<{
     session_name: string;
     meta?: HistorySessionMeta | null;
@@ -112,7 +128,6 @@ export interface HistorySearchSessionsResponse {
     last_match_at: number;
     last_match_preview: string;
   }>;
-  total: number;
   page: number;
   page_size: number;
 }
@@ -170,19 +185,30 @@ export interface HistoryTranslateResponse {
   translated_text: string;
 }
 
+export interface HistoryTranslateBatchRequest {
+  session_name: string;
+  roles?: HistoryRole[];
+  limit?: number;
+}
+
+export interface HistoryTranslateBatchResponse {
+  session_name: string;
+  items: Array<{ message_id: string; translated_text: string }>;
+}
+
 export async function listSessions(params?: HistoryListParams): Promise<HistorySessionsResponse> {
   const response = await apiClient.get<HistorySessionsResponse>('/history/sessions', { params });
   return response.data;
 }
 
-export async function searchSessions(params: { q: string; start_time?: number; end_time?: number; page?: number; page_size?: number }): Promise<HistorySearchSessionsResponse> {
+export async function searchSessions(params: { q: string; start_time?: number; end_time?: number; page?: number; page_size?: number; cursor?: string; count?: HistoryCountMode }): Promise<HistorySearchSessionsResponse> {
   const response = await apiClient.get<HistorySearchSessionsResponse>('/history/sessions/search', { params });
   return response.data;
 }
 
 export async function getSessionDetail(
   sessionName: string,
-  params?: HistoryDetailParams & { order?: 'asc' | 'desc' }
+  params?: HistoryDetailParams
 ): Promise<HistorySessionDetailResponse> {
   const response = await apiClient.get<HistorySessionDetailResponse>(`/history/sessions/${encodeURIComponent(sessionName)}`, { params });
   return response.data;
@@ -243,6 +269,11 @@ export async function translateToZh(payload: HistoryTranslateRequest): Promise<H
   return response.data;
 }
 
+export async function translateSessionToZh(payload: HistoryTranslateBatchRequest): Promise<HistoryTranslateBatchResponse> {
+  const response = await apiClient.post<HistoryTranslateBatchResponse>('/history/translate/batch', payload);
+  return response.data;
+}
+
 export const historyApi = {
   listSessions,
   searchSessions,
@@ -257,6 +288,7 @@ export const historyApi = {
   getExportJobDownloadUrl,
   downloadExportJobCsv,
   translateToZh,
+  translateSessionToZh,
 };
 
 export default historyApi;
@@ -137,7 +137,7 @@ async def create_agent(
 
     if request.avatar_url:
         agent.avatar_url = request.avatar_url
-        agent_manager.update_agent(agent)
+        agent_manager.update_agent(agent, fields=["avatar_url"])
 
     agent_dict = agent.dict()
     agent_dict.pop("password_hash", None)
@@ -170,18 +170,15 @@ async def update_agent(
                 detail="LAST_ADMIN: Cannot demote the last admin"
             )
 
-    if request.name is not None:
-        agent.name = request.name
-    if request.role is not None:
-        agent.role = request.role
-    if request.max_sessions is not None:
-        agent.max_sessions = request.max_sessions
-    if request.status is not None:
-        agent.status = request.status
-    if request.avatar_url is not None:
-        agent.avatar_url = request.avatar_url
+    changed = []
+    for field_name in ("name", "role", "max_sessions", "status", "avatar_url"):
+        value = getattr(request, field_name)
+        if value is not None:
+            setattr(agent, field_name, value)
+            changed.append(field_name)
 
-    agent_manager.update_agent(agent)
+    if changed:
+        agent = agent_manager.update_agent(agent, fields=changed) or agent
 
     agent_dict = agent.dict()
     agent_dict.pop("password_hash", None)
@@ -211,7 +208,7 @@ async def update_agent_skills_endpoint(
         )
 
     agent.skills = request.skills
-    agent_manager.update_agent(agent)
+    agent_manager.update_agent(agent, fields=["skills"])
 
     agent_dict = agent_to_dict(agent)
 
@@ -273,7 +270,7 @@ async def reset_agent_password(
         )
 
     agent.password_hash = PasswordHasher.hash_password(request.new_password)
-    agent_manager.update_agent(agent)
+    agent_manager.update_agent(agent, fields=["password_hash"])
 
     print(f"Reset password for agent: {username}")
 
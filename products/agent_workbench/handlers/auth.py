@@ -35,7 +35,6 @@ from infrastructure.security.agent_auth import (
     PasswordHasher,
     validate_password,
 )
-from services.session.state import SessionStatus
 
 from products.agent_workbench.dependencies import (
     get_agent_manager, get_agent_token_manager, get_session_store,
@@ -149,15 +148,8 @@ async def _count_agent_live_sessions(agent_identifier: str) -> int:
         return 0
 
     try:
-        live_sessions = await session_store.list_by_status(
-            status=SessionStatus.MANUAL_LIVE,
-            limit=500
-        )
-        return sum(
-            1
-            for session in live_sessions
-            if session.assigned_agent and session.assigned_agent.id == agent_identifier
-        )
+        loads = await session_store.get_agent_loads([agent_identifier])
+        return loads.get(agent_identifier, {}).get("manual", 0)
     except Exception as exc:
         print(f"Warning: Failed to count live sessions: {exc}")
         return 0
@@ -197,7 +189,7 @@ def _auto_adjust_agent_status(agent_obj: Agent) -> Agent:
             agent_obj.status_note = "System detected no activity for 5+ minutes, auto-set to busy"
         agent_obj.status_updated_at = now
         try:
-            agent_manager.update_agent(agent_obj)
+            agent_manager.update_agent(agent_obj, fields=["status", "status_note", "status_updated_at"])
         except Exception as exc:
             print(f"Warning: Failed to auto-update agent status: {exc}")
     return agent_obj
@@ -508,7 +500,7 @@ async def change_password(
 
         # Update password
         current_agent.password_hash = PasswordHasher.hash_password(password_request.new_password)
-        agent_manager.update_agent(current_agent)
+        agent_manager.update_agent(current_agent, fields=["password_hash"])
 
         print(f"Agent changed password: {username}")
 
@@ -560,7 +552,7 @@ async def update_profile(
         if profile_request.avatar_url is not None:
             current_agent.avatar_url = profile_request.avatar_url
 
-        agent_manager.update_agent(current_agent)
+        agent_manager.update_agent(current_agent, fields=["name", "avatar_url"])
 
         # Return result (hide password)
         agent_dict = current_agent.dict()
@@ -688,7 +680,7 @@ async def upload_avatar(
         current_agent = agent_manager.get_agent_by_username(username)
         if current_agent:
             current_agent.avatar_url = avatar_url
-            agent_manager.update_agent(current_agent)
+            agent_manager.update_agent(current_agent, fields=["avatar_url"])
 
         print(f"Agent uploaded avatar: {username} -> {filename}")
 
@@ -16,6 +16,7 @@ Endpoints:
 - GET /history/export-jobs/{job_id}
 - GET /history/export-jobs/{job_id}/download
 - POST /history/translate (Coze; optional)
+- POST /history/translate/batch (Coze; optional)
 """
 
 from __future__ import annotations
@@ -23,9 +24,9 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import time
+import re
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
@@ -37,6 +38,10 @@ from products.agent_workbench.dependencies import require_agent, get_message_sto
 router = APIRouter(prefix="/history", tags=["Chat History"])
 
 
+_CURSOR_DESCRIPTION = "Opaque continuation token (next_cursor of the previous page); page/offset are ignored"
+_COUNT_DESCRIPTION = "Total: exact/estimate (capped)/none; default exact on the first page, none with a cursor"
+
+
 def _require_message_store():
     store = get_message_store()
     if store is None:
@@ -84,11 +89,21 @@ async def search_sessions(
     end_time: Optional[float] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=_CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, description=_COUNT_DESCRIPTION),
     agent: Dict[str, Any] = Depends(require_agent),
 ):
     store = _require_message_store()
     try:
-        return await store.search_sessions(q=q, start_time=start_time, end_time=end_time, page=page, page_size=page_size)
+        return await store.search_sessions(
+            q=q,
+            start_time=start_time,
+            end_time=end_time,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            count=count,
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -99,10 +114,17 @@ async def get_session_detail(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     order: str = Query("asc", description="Sort order: asc/desc"),
+    cursor: Optional[str] = Query(None, description=_CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, description=_COUNT_DESCRIPTION),
     agent: Dict[str, Any] = Depends(require_agent),
 ):
     store = _require_message_store()
-    return await store.get_messages_by_session(session_name, limit=limit, offset=offset, order=order)
+    try:
+        return await store.get_messages_by_session(
+            session_name, limit=limit, offset=offset, order=order, cursor=cursor, count=count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 class SessionMetaUpdateRequest(BaseModel):
@@ -152,6 +174,8 @@ async def search_messages(
     session_name: Optional[str] = Query(None, description="Filter by session_name"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=_CURSOR_DESCRIPTION),
+    count: Optional[str] = Query(None, description=_COUNT_DESCRIPTION),
     agent: Dict[str, Any] = Depends(require_agent),
 ):
     store = _require_message_store()
@@ -164,6 +188,8 @@ async def search_messages(
             session_name=session_name,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count=count,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -339,6 +365,26 @@ def _get_translate_config() -> dict[str, str]:
     return {"workflow_id": workflow_id, "app_id": app_id, "api_base": api_base, "input_key": input_key}
 
 
+_token_manager = None
+
+# Numbered segment markers used to translate several messages in one workflow call
+_SEGMENT_MARKER_RE = re.compile(r"<<<(\d+)>>>")
+_BATCH_MAX_CHARS = int(os.getenv("COZE_TRANSLATE_BATCH_MAX_CHARS", "6000"))
+_FALLBACK_CONCURRENCY = 4
+
+
+def _get_token_manager():
+    """Process-wide token manager so Coze access tokens are cached between clicks."""
+    global _token_manager
+
+    if _token_manager is None:
+        from services.coze.token_manager import OAuthTokenManager
+
+        _load_repo_dotenv()
+        _token_manager = OAuthTokenManager.from_env()
+    return _token_manager
+
+
 async def _coze_translate_to_zh(*, text: str, session_name: str) -> str:
     """
     Translate via Coze workflow chat API.
@@ -347,13 +393,11 @@ async def _coze_translate_to_zh(*, text: str, session_name: str) -> str:
     """
     import httpx
 
-    from services.coze.token_manager import OAuthTokenManager
+    from services.coze.http_client import get_coze_http_client
 
     cfg = _get_translate_config()
     try:
-        _load_repo_dotenv()
-        token_manager = OAuthTokenManager.from_env()
-        access_token = token_manager.get_access_token(session_name=session_name)
+        access_token = await _get_token_manager().aget_access_token(session_name=session_name)
     except HTTPException:
         raise
     except Exception as e:
@@ -408,36 +452,97 @@ async def _coze_translate_to_zh(*, text: str, session_name: str) -> str:
     best_answer: Optional[str] = None
     event_type: Optional[str] = None
 
-    async with httpx.AsyncClient(timeout=timeout, trust_env=False) as client:
-        async with client.stream("POST", url, json=payload, headers=headers) as response:
-            if response.status_code != 200:
-                body = await response.aread()
-                raise HTTPException(status_code=502, detail=f"Coze translate failed: {body.decode(errors='ignore')}")
-
-            async for line in response.aiter_lines():
-                if not line:
-                    continue
-                line = line.strip()
-                if line.startswith("event:"):
-                    event_type = line[6:].strip()
-                    continue
-                if not line.startswith("data:"):
-                    continue
-
-                data_str = line[5:].strip()
-                try:
-                    data = json.loads(data_str)
-                except json.JSONDecodeError:
-                    continue
+    client = get_coze_http_client()
+    async with client.stream("POST", url, json=payload, headers=headers, timeout=timeout) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            raise HTTPException(status_code=502, detail=f"Coze translate failed: {body.decode(errors='ignore')}")
+
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            line = line.strip()
+            if line.startswith("event:"):
+                event_type = line[6:].strip()
+                continue
+            if not line.startswith("data:"):
+                continue
+
+            data_str = line[5:].strip()
+            try:
+                data = json.loads(data_str)
+            except json.JSONDecodeError:
+                continue
+
+            extracted = _extract_text(data)
+            if not extracted:
+                continue
+
+            if data.get("role") == "assistant" and data.get("type") == "answer":
+                best_answer = extracted
 
-                extracted = _extract_text(data)
-                if not extracted:
-                    continue
+    return (best_answer or "").strip()
 
-                if data.get("role") == "assistant" and data.get("type") == "answer":
-                    best_answer = extracted
 
-    return (best_answer or "").strip()
+def _split_segments(texts: List[str]) -> List[List[int]]:
+    """Group text indexes into workflow calls of at most _BATCH_MAX_CHARS characters."""
+    groups: List[List[int]] = []
+    size = 0
+    for i, text in enumerate(texts):
+        if groups and size + len(text) <= _BATCH_MAX_CHARS:
+            groups[-1].append(i)
+            size += len(text)
+        else:
+            groups.append([i])
+            size = len(text)
+    return groups
+
+
+async def _translate_group(texts: List[str], session_name: str) -> List[str]:
+    """
+    Translate several texts in one workflow call using numbered markers.
+
+    Falls back to one call per text if the model does not keep the markers intact.
+    """
+    if len(texts) == 1:
+        return [await _coze_translate_to_zh(text=texts[0], session_name=session_name)]
+
+    joined = "\n".join(f"<<<{i}>>>\n{text}" for i, text in enumerate(texts, 1))
+    answer = await _coze_translate_to_zh(text=joined, session_name=session_name)
+
+    parts = _SEGMENT_MARKER_RE.split(answer)
+    segments = {int(parts[i]): parts[i + 1].strip() for i in range(1, len(parts) - 1, 2)}
+    if set(segments) == set(range(1, len(texts) + 1)) and all(segments.values()):
+        return [segments[i] for i in range(1, len(texts) + 1)]
+
+    semaphore = asyncio.Semaphore(_FALLBACK_CONCURRENCY)
+
+    async def _one(text: str) -> str:
+        async with semaphore:
+            return await _coze_translate_to_zh(text=text, session_name=session_name)
+
+    return list(await asyncio.gather(*(_one(text) for text in texts)))
+
+
+async def _translate_texts(texts: List[str], *, session_name: str) -> List[str]:
+    """Cached + coalesced translation of `texts` (same order)."""
+    from services.coze.translation_cache import get_translation_cache
+
+    # Fail fast (503) before touching the cache when translation is not configured
+    _get_translate_config()
+
+    async def _translate_batch(missing: List[str]) -> List[str]:
+        groups = _split_segments(missing)
+        translated = await asyncio.gather(
+            *(_translate_group([missing[i] for i in group], session_name) for group in groups)
+        )
+        results = [""] * len(missing)
+        for group, values in zip(groups, translated):
+            for i, value in zip(group, values):
+                results[i] = (value or "").strip()
+        return results
+
+    return await get_translation_cache().translate(texts, _translate_batch)
 
 
 @router.post("/translate", response_model=TranslateResponse)
@@ -449,8 +554,55 @@ async def translate_message(
     Translate arbitrary text to Chinese for UI assistance (display only; not persisted).
     """
     username = agent.get("username") or agent.get("agent_id") or "agent"
-    session_name = f"workbench_translate_{username}_{int(time.time() * 1000)}"
-    translated = await _coze_translate_to_zh(text=req.text, session_name=session_name)
+    # Stable per-agent session_name so the Coze access token is reused
+    translated = (await _translate_texts([req.text], session_name=f"workbench_translate_{username}"))[0]
     if not translated:
         raise HTTPException(status_code=502, detail="Coze translate returned empty result")
     return TranslateResponse(translated_text=translated)
+
+
+class TranslateBatchRequest(BaseModel):
+    session_name: str = Field(..., min_length=1, max_length=200)
+    roles: List[str] = Field(default_factory=lambda: ["user"], description="Roles to translate: user/assistant/agent")
+    limit: int = Field(default=200, ge=1, le=500, description="Max messages (oldest first)")
+
+
+class TranslateBatchItem(BaseModel):
+    message_id: str
+    translated_text: str
+
+
+class TranslateBatchResponse(BaseModel):
+    session_name: str
+    items: List[TranslateBatchItem]
+
+
+@router.post("/translate/batch", response_model=TranslateBatchResponse)
+async def translate_session_messages(
+    req: TranslateBatchRequest,
+    agent: Dict[str, Any] = Depends(require_agent),
+):
+    """
+    Translate a session's messages to Chinese, batched into as few workflow calls as possible.
+
+    Messages already translated (by any agent) are served from the cache.
+    """
+    store = _require_message_store()
+    roles = {r.strip().lower() for r in req.roles if r and r.strip()}
+    page = await store.get_messages_by_session(req.session_name, limit=req.limit, order="asc", count="none")
+    messages = [m for m in page["items"] if m["role"] in roles and (m.get("content") or "").strip()]
+    if not messages:
+        return TranslateBatchResponse(session_name=req.session_name, items=[])
+
+    username = agent.get("username") or agent.get("agent_id") or "agent"
+    translated = await _translate_texts(
+        [m["content"] for m in messages],
+        session_name=f"workbench_translate_{username}",
+    )
+    return TranslateBatchResponse(
+        session_name=req.session_name,
+        items=[
+            TranslateBatchItem(message_id=m["message_id"], translated_text=text)
+            for m, text in zip(messages, translated)
+        ],
+    )
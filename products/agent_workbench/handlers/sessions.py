@@ -45,7 +45,7 @@ from products.agent_workbench.dependencies import (
     require_agent, verify_agent_token_from_query,
     get_message_store
 )
-from infrastructure.bootstrap.sse import enqueue_sse_message, subscribe_sse_events
+from infrastructure.bootstrap.sse import enqueue_sse_message, open_sse_subscription
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
@@ -884,20 +884,20 @@ async def session_events(
                 history = jsonable_encoder(session_state.history)
                 yield f"data: {json.dumps({'type': 'history', 'messages': history}, ensure_ascii=False)}\n\n"
 
-            # 使用统一订阅接口（支持 Redis 跨进程）
-            subscription = subscribe_sse_events(session_name)
+            # 使用统一订阅接口（支持 Redis 跨进程，进程内共享 Pub/Sub 连接）
+            subscription = await open_sse_subscription(session_name)
 
-            while True:
-                try:
+            try:
+                while True:
                     # 等待下一条消息，30秒超时发送心跳
-                    payload = await asyncio.wait_for(subscription.__anext__(), timeout=30.0)
+                    payload = await subscription.get(timeout=30.0)
+                    if payload is None:
+                        # 发送心跳保持连接
+                        yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': int(time.time())}, ensure_ascii=False)}\n\n"
+                        continue
                     yield f"data: {json.dumps(jsonable_encoder(payload), ensure_ascii=False)}\n\n"
-                except asyncio.TimeoutError:
-                    # 发送心跳保持连接
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': int(time.time())}, ensure_ascii=False)}\n\n"
-                except StopAsyncIteration:
-                    # 订阅结束
-                    break
+            finally:
+                await subscription.close()
         except asyncio.CancelledError:
             print(f"⏹️  会话事件 SSE 断开: session={session_name}, agent={agent_name}")
             raise
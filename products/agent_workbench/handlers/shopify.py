@@ -25,6 +25,7 @@ Endpoints:
 - GET /shopify/health - UK健康检查（兼容）
 """
 
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException
@@ -478,35 +479,39 @@ async def get_shopify_site_order_tracking(
         tracking_number = primary_tracking.get("number") if primary_tracking else None
 
         if tracking_data and tracking_number:
-            try:
-                tracking_service = get_tracking_service()
-                tracking_info = await tracking_service.get_tracking_info_with_auto_register(
+            tracking_service = get_tracking_service()
+            # 主运单轨迹与各包裹状态并发查询（拆单发货时不逐个等待 17track）
+            tracking_info, _ = await asyncio.gather(
+                tracking_service.get_tracking_info_with_auto_register(
                     tracking_number=tracking_number,
                     carrier=primary_tracking.get("company"),
                     order_id=order_id,
                     order_number=tracking_data.get("order_number"),
-                )
-                if tracking_info:
-                    # 添加 17track 返回的事件列表
-                    events = []
-                    if tracking_info.events:
-                        for event in tracking_info.events:
-                            events.append({
-                                "timestamp": event.timestamp_str or (event.timestamp.isoformat() if event.timestamp else None),
-                                "description": event.description or event.status,
-                                "description_zh": event.status_zh or event.description_zh,
-                                "location": event.location,
-                            })
-                    tracking_data["events"] = events
-                    # 添加物流状态
-                    if tracking_info.status:
-                        tracking_data["shipment_status"] = tracking_info.status.value
-                        tracking_data["shipment_status_zh"] = tracking_info.status.zh
-                    if tracking_info.is_pending:
-                        tracking_data["is_pending"] = True
-            except Exception as e:
+                ),
+                service.attach_fulfillment_statuses(tracking_data),
+                return_exceptions=True,
+            )
+            if isinstance(tracking_info, Exception):
                 # 17track 查询失败不影响主流程，记录日志即可
-                print(f"⚠️ 17track 物流查询失败: {tracking_number}, 错误: {e}")
+                print(f"⚠️ 17track 物流查询失败: {tracking_number}, 错误: {tracking_info}")
+            elif tracking_info:
+                # 添加 17track 返回的事件列表
+                events = []
+                if tracking_info.events:
+                    for event in tracking_info.events:
+                        events.append({
+                            "timestamp": event.timestamp_str or (event.timestamp.isoformat() if event.timestamp else None),
+                            "description": event.description or event.status,
+                            "description_zh": event.status_zh or event.description_zh,
+                            "location": event.location,
+                        })
+                tracking_data["events"] = events
+                # 添加物流状态
+                if tracking_info.status:
+                    tracking_data["shipment_status"] = tracking_info.status.value
+                    tracking_data["shipment_status_zh"] = tracking_info.status.zh
+                if tracking_info.is_pending:
+                    tracking_data["is_pending"] = True
 
         # 添加前端兼容字段（从 primary_tracking 提取）
         if tracking_data and primary_tracking:
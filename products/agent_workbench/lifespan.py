@@ -122,4 +122,16 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
 
+    try:
+        from infrastructure.database import dispose_async_database
+        await dispose_async_database()
+    except Exception:
+        pass
+
+    try:
+        from services.shopify.client import close_all_clients
+        await close_all_clients()
+    except Exception:
+        pass
+
     print(f"✅ {config.product_name} 已关闭\n")
@@ -0,0 +1,60 @@
+import unittest
+
+import fakeredis
+
+from services.session.async_redis_store import AsyncRedisSessionStore
+from services.session.redis_store import AGENT_LOAD_LOCK_KEY, RedisSessionStore, agent_load_key
+from services.session.state import AgentInfo, SessionState, SessionStatus
+
+
+def _make_store(cls):
+    """Build a store on fakeredis without opening real connection pools."""
+    server = fakeredis.FakeServer()
+    store = cls.__new__(cls)
+    store.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+    if cls is AsyncRedisSessionStore:
+        store.aredis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    store.default_ttl = 3600
+    store._updated_index_ready = False
+    store._agent_load_ready = False
+    return store
+
+
+def _manual(name, agent_id, status=SessionStatus.MANUAL_LIVE):
+    return SessionState(session_name=name, status=status, assigned_agent=AgentInfo(id=agent_id, name=agent_id))
+
+
+class AgentLoadIndexTest(unittest.IsolatedAsyncioTestCase):
+    async def test_transfer_moves_the_session_between_load_sets(self):
+        for cls in (RedisSessionStore, AsyncRedisSessionStore):
+            with self.subTest(store=cls.__name__):
+                store = _make_store(cls)
+                await store.save(_manual("s1", "agent-a"))
+                await store.save(_manual("s1", "agent-b"))
+
+                self.assertEqual(store.redis.smembers(agent_load_key("agent-a", "manual")), set())
+                self.assertEqual(store.redis.smembers(agent_load_key("agent-b", "manual")), {"s1"})
+                loads = await store.get_agent_loads(["agent-a", "agent-b"])
+                self.assertEqual(loads["agent-a"]["manual"], 0)
+                self.assertEqual(loads["agent-b"]["manual"], 1)
+
+                await store.delete("s1")
+                self.assertEqual(store.redis.smembers(agent_load_key("agent-b", "manual")), set())
+
+    async def test_loads_are_counted_from_sessions_while_another_worker_backfills(self):
+        for cls in (RedisSessionStore, AsyncRedisSessionStore):
+            with self.subTest(store=cls.__name__):
+                store = _make_store(cls)
+                await store.save(_manual("s1", "agent-a"))
+                await store.save(_manual("s2", "agent-a", SessionStatus.PENDING_MANUAL))
+                # Load sets not backfilled yet and the backfill lock is held elsewhere
+                store.redis.delete(agent_load_key("agent-a", "manual"), agent_load_key("agent-a", "pending"))
+                store.redis.set(AGENT_LOAD_LOCK_KEY, "1")
+
+                loads = await store.get_agent_loads(["agent-a"])
+
+                self.assertEqual(loads, {"agent-a": {"manual": 1, "pending": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
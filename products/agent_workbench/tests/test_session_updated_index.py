@@ -0,0 +1,69 @@
+import unittest
+
+import fakeredis
+
+from services.session.async_redis_store import AsyncRedisSessionStore
+from services.session.redis_store import (
+    UPDATED_INDEX_LOCK_KEY,
+    UPDATED_INDEX_VERSION,
+    UPDATED_INDEX_VERSION_KEY,
+    RedisSessionStore,
+    updated_index_key,
+)
+from services.session.state import SessionState, SessionStatus
+
+
+def _make_store(cls):
+    server = fakeredis.FakeServer()
+    store = cls.__new__(cls)
+    store.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+    if cls is AsyncRedisSessionStore:
+        store.aredis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    store.default_ttl = 3600
+    store._updated_index_ready = False
+    store._agent_load_ready = False
+    return store
+
+
+def _seed_unindexed(store):
+    """Session data written before the updated_at index existed."""
+    for name, status, updated_at in (
+        ("old", SessionStatus.BOT_ACTIVE, 100.0),
+        ("new", SessionStatus.BOT_ACTIVE, 300.0),
+        ("human", SessionStatus.MANUAL_LIVE, 200.0),
+    ):
+        state = SessionState(session_name=name, status=status, updated_at=updated_at)
+        store.redis.set(f"session:{name}", state.model_dump_json())
+
+
+class UpdatedIndexBackfillTest(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_scan_sessions_while_another_worker_backfills(self):
+        for cls in (RedisSessionStore, AsyncRedisSessionStore):
+            with self.subTest(store=cls.__name__):
+                store = _make_store(cls)
+                _seed_unindexed(store)
+                store.redis.set(UPDATED_INDEX_LOCK_KEY, "1")
+
+                page = await store.list_by_status(SessionStatus.BOT_ACTIVE, limit=10)
+                self.assertEqual([state.session_name for state in page], ["new", "old"])
+                self.assertEqual(await store.count_by_status(SessionStatus.BOT_ACTIVE), 2)
+                everything = await store.list_all(limit=2, offset=1)
+                self.assertEqual([state.session_name for state in everything], ["human", "old"])
+                self.assertIsNone(store.redis.get(UPDATED_INDEX_VERSION_KEY))
+
+    async def test_first_read_backfills_the_index(self):
+        for cls in (RedisSessionStore, AsyncRedisSessionStore):
+            with self.subTest(store=cls.__name__):
+                store = _make_store(cls)
+                _seed_unindexed(store)
+
+                page = await store.list_by_status(SessionStatus.BOT_ACTIVE, limit=10)
+
+                self.assertEqual([state.session_name for state in page], ["new", "old"])
+                self.assertEqual(store.redis.get(UPDATED_INDEX_VERSION_KEY), UPDATED_INDEX_VERSION)
+                self.assertEqual(store.redis.zrevrange(updated_index_key(), 0, -1), ["new", "human", "old"])
+                self.assertEqual(await store.count_by_status(SessionStatus.MANUAL_LIVE), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
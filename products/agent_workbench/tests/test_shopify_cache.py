@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+
+import fakeredis
+
+from services.shopify.cache import CACHE_HIT, CACHE_MISS, CACHE_STALE, ShopifyCache
+
+
+class ShopifyCacheLoadTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.cache = ShopifyCache("uk", redis_client=self.redis)
+        self.key = self.cache._order_detail_key("1001")
+
+    def _store_expired(self, value):
+        # fresh_until already passed, still inside the Redis TTL
+        self.redis.set(self.key, self.cache._wrap(value, -1), ex=600)
+
+    async def _settle(self):
+        while self.cache._refresh_tasks:
+            await asyncio.gather(*list(self.cache._refresh_tasks), return_exceptions=True)
+
+    async def test_concurrent_misses_load_upstream_once(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": "1001", "lines": [1, 2]}
+
+        results = await asyncio.gather(*(
+            self.cache.get_or_load(self.key, loader, 300) for _ in range(5)
+        ))
+        await self._settle()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == ({"id": "1001", "lines": [1, 2]}, CACHE_MISS) for result in results))
+        # Coalesced callers get their own copy
+        self.assertIsNot(results[0][0], results[1][0])
+        self.assertEqual(self.cache.get_counters()["coalesced"], 4)
+
+        value, status = await self.cache.get_or_load(self.key, loader, 300)
+        self.assertEqual((value["id"], status), ("1001", CACHE_HIT))
+        self.assertEqual(len(calls), 1)
+
+    async def test_loader_error_reaches_all_waiters_and_clears_inflight(self):
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("shopify down")
+
+        results = await asyncio.gather(
+            *(self.cache.get_or_load(self.key, loader, 300) for _ in range(3)),
+            return_exceptions=True,
+        )
+        await self._settle()
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(self.cache.get_counters()["inflight"], 0)
+
+    async def test_stale_value_is_served_and_refreshed_in_background(self):
+        self._store_expired({"id": "1001", "version": 1})
+
+        async def loader():
+            return {"id": "1001", "version": 2}
+
+        value, status = await self.cache.get_or_load(self.key, loader, 300)
+        self.assertEqual((value["version"], status), (1, CACHE_STALE))
+
+        await self._settle()
+
+        value, status = await self.cache.get_or_load(self.key, loader, 300)
+        self.assertEqual((value["version"], status), (2, CACHE_HIT))
+        self.assertEqual(self.cache.get_counters()["stale_served"], 1)
+
+    async def test_failed_refresh_keeps_serving_stale_value(self):
+        self._store_expired({"id": "1001", "version": 1})
+
+        async def loader():
+            raise RuntimeError("shopify down")
+
+        value, status = await self.cache.get_or_load(self.key, loader, 300)
+        await self._settle()
+
+        self.assertEqual((value["version"], status), (1, CACHE_STALE))
+        self.assertEqual(self.cache.get_counters()["refresh_errors"], 1)
+        value, status = await self.cache._read(self.key)
+        self.assertEqual((value["version"], status), (1, CACHE_STALE))
+
+
+class ShopifyCacheUpdateOrderTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.cache = ShopifyCache("uk", redis_client=self.redis)
+
+    async def test_concurrent_webhook_write_is_not_reverted(self):
+        await self.cache.set_order_bundle({"order_id": "1001", "order_number": "UK1001", "note": "old"})
+        seen = []
+
+        def mutate(order):
+            seen.append(order["note"])
+            if len(seen) == 1:
+                # orders/updated lands between the read and the write-back
+                newer = {"order_id": "1001", "order_number": "UK1001", "note": "new"}
+                self.redis.set(self.cache._order_detail_key("1001"), self.cache._wrap(newer, 300), ex=600)
+            order["delivery_status"] = "success"
+            return True
+
+        updated = await self.cache.update_order("1001", mutate)
+
+        self.assertEqual(seen, ["old", "new"])
+        self.assertEqual(updated, {"order_id": "1001", "order_number": "UK1001", "note": "new", "delivery_status": "success"})
+        self.cache._l1.clear()
+        self.assertEqual(await self.cache.get_order_detail("1001"), updated)
+        self.assertEqual((await self.cache.get_order_by_number("UK1001"))["note"], "new")
+
+    async def test_uncached_order_is_left_alone(self):
+        self.assertIsNone(await self.cache.update_order("404", lambda order: True))
+        self.assertIsNone(self.redis.get(self.cache._order_detail_key("404")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import unittest
+
+import fakeredis
+
+from services.shopify.cache import (
+    CACHE_HIT,
+    COMPRESS_MIN_BYTES,
+    FORMAT_JSON,
+    FORMAT_ZLIB_JSON,
+    ShopifyCache,
+    decode_value,
+    encode_value,
+)
+
+
+def _order(order_id="1001", line_count=1):
+    return {
+        "order_id": order_id,
+        "order_number": f"#UK{order_id}",
+        "customer_email": "kunde@example.com",
+        "note": "Lieferung an Nachbar – bitte klingeln",
+        "line_items": [{"sku": f"SKU-{i}", "title": "Fiido D11 电动车", "quantity": 1} for i in range(line_count)],
+    }
+
+
+class CacheCodecTest(unittest.TestCase):
+    def test_small_values_are_stored_as_plain_json(self):
+        raw = encode_value({"a": 1})
+
+        self.assertEqual(raw[0], FORMAT_JSON)
+        self.assertEqual(decode_value(raw), {"a": 1})
+
+    def test_large_values_are_compressed_and_round_trip(self):
+        order = _order(line_count=30)
+        raw = encode_value(order)
+
+        self.assertEqual(raw[0], FORMAT_ZLIB_JSON)
+        self.assertLess(len(raw), len(json.dumps(order, ensure_ascii=False).encode("utf-8")))
+        self.assertGreaterEqual(len(json.dumps(order)), COMPRESS_MIN_BYTES)
+        self.assertEqual(decode_value(raw), order)
+
+    def test_legacy_values_without_version_byte_are_readable(self):
+        order = _order()
+        legacy = json.dumps(order, ensure_ascii=False)
+
+        self.assertEqual(decode_value(legacy.encode("utf-8")), order)
+        self.assertEqual(decode_value(legacy), order)
+
+
+class OrderDocumentLayoutTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.cache = ShopifyCache("uk", redis_client=self.redis)
+
+    async def test_order_number_key_points_at_the_single_detail_document(self):
+        order = _order(line_count=30)
+        await self.cache.set_order_bundle(order, tracking={"tracking_number": "TN1"})
+
+        pointer = decode_value(self.redis.get(self.cache._order_search_key("#UK1001")))
+        self.assertEqual(pointer["value"], {"_ref": "1001"})
+
+        self.cache._l1.clear()
+        self.assertEqual(await self.cache.get_order_by_number("uk1001"), order)
+        self.assertEqual(await self.cache.get_order_detail("1001"), order)
+        self.assertEqual(await self.cache.get_tracking("1001"), {"tracking_number": "TN1"})
+
+    async def test_legacy_full_order_under_search_key_is_still_served(self):
+        order = _order()
+        self.redis.set(self.cache._order_search_key("#UK1001"), json.dumps(order))
+
+        value, status = await self.cache._read_order_by_number("#UK1001")
+
+        self.assertEqual((value, status), (order, CACHE_HIT))
+
+    async def test_order_list_reuses_cached_details_and_stores_summaries_for_the_rest(self):
+        detailed = _order("1001", line_count=3)
+        await self.cache.set_order_bundle(detailed)
+        listed = [
+            {"order_id": "1001", "order_number": "#UK1001", "total_price": "10.00"},
+            {"order_id": "1002", "order_number": "#UK1002", "total_price": "20.00"},
+        ]
+
+        await self.cache.set_order_list("Kunde@example.com", listed)
+
+        self.assertIsNone(self.redis.get(self.cache._order_summary_key("1001")))
+        self.assertIsNotNone(self.redis.get(self.cache._order_summary_key("1002")))
+        self.cache._l1.clear()
+        orders = await self.cache.get_order_list("kunde@example.com")
+        self.assertEqual([order["order_id"] for order in orders], ["1001", "1002"])
+        # Projected from the detail document: summary fields only
+        self.assertEqual(orders[0]["customer_email"], "kunde@example.com")
+        self.assertNotIn("line_items", orders[0])
+        self.assertEqual(orders[1], listed[1])
+
+    async def test_order_list_misses_when_a_referenced_order_is_gone(self):
+        await self.cache.set_order_bundle(_order("1001"))
+        await self.cache.set_order_list("kunde@example.com", [{"order_id": "1001", "order_number": "#UK1001"}])
+
+        await self.cache.invalidate_order("1001")
+
+        self.assertIsNone(await self.cache.get_order_list("kunde@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+import fakeredis
+
+from services.ticket.models import Ticket
+from services.ticket.store import SLA_CLAIM_SCRIPT, TicketStore
+
+
+class SlaDeadlineIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.store = TicketStore(redis_client=self.redis)
+        # Created an hour ago: some SLA thresholds already passed, later ones still ahead
+        self.ticket = self.store.create(Ticket(
+            ticket_id="T-1", title="Late parcel", description="", created_by="agent",
+            created_at=time.time() - 3600,
+        ))
+        self.key = self.store.sla_deadline_key
+
+    def _deadline(self):
+        score = self.redis.zscore(self.key, "T-1")
+        return None if score is None else float(score)
+
+    def test_due_entry_is_rescheduled_to_the_next_deadline(self):
+        upcoming = self._deadline()
+        self.assertIsNotNone(upcoming)
+        self.redis.zadd(self.key, {"T-1": time.time() - 1})
+
+        result = self.store.pop_due_sla_alerts()
+
+        self.assertFalse(result["full_scan"])
+        self.assertAlmostEqual(self._deadline(), upcoming, places=3)
+        self.assertAlmostEqual(result["next_due"], upcoming, places=3)
+
+    def test_claimed_entry_stays_indexed_until_the_lease_expires(self):
+        now = time.time()
+        self.redis.zadd(self.key, {"T-1": now - 1})
+
+        # A worker claims the entry and dies before rescheduling it
+        self.redis.eval(SLA_CLAIM_SCRIPT, 1, self.key, repr(now), repr(now + 60), 10)
+
+        self.assertAlmostEqual(self._deadline(), now + 60, places=3)
+        self.assertEqual(self.store.pop_due_sla_alerts()["alerts"], [])
+
+    def test_earlier_deadline_written_during_processing_wins(self):
+        self.redis.zadd(self.key, {"T-1": time.time() - 1})
+        earlier = time.time() + 5
+        load_tickets = self.store._load_tickets
+
+        def concurrent_write(ids):
+            # The ticket is saved by another request while its alert is being built
+            self.redis.zadd(self.key, {"T-1": earlier})
+            return load_tickets(ids)
+
+        self.store._load_tickets = concurrent_write
+        self.store.pop_due_sla_alerts()
+
+        self.assertAlmostEqual(self._deadline(), earlier, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,7 +17,6 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-import httpx
 
 # 导入依赖
 from products.ai_chatbot.dependencies import (
@@ -53,17 +52,10 @@ from infrastructure.security import (
 )
 from products.ai_chatbot.security import RATE_LIMIT_CHAT, limiter
 
-router = APIRouter()
+# 共享的 Coze HTTP 连接池（超时配置见 services/coze/http_client.py，read 默认 120s）
+from services.coze.http_client import get_coze_http_client
 
-# HTTP 超时配置
-# 注意：Coze Workflow 调用插件（如 Shopify 订单查询）可能需要较长时间
-# read 超时需要足够长，建议 120 秒以上
-HTTP_TIMEOUT = httpx.Timeout(
-    connect=float(os.getenv("HTTP_TIMEOUT_CONNECT", 10.0)),
-    read=float(os.getenv("HTTP_TIMEOUT_READ", 120.0)),  # 从 30s 增加到 120s
-    write=float(os.getenv("HTTP_TIMEOUT_WRITE", 30.0)),
-    pool=float(os.getenv("HTTP_TIMEOUT_POOL", 10.0))
-)
+router = APIRouter()
 
 # 会话缓存（后续会迁移到 services/session）
 conversation_cache: dict = {}  # {session_name: conversation_id}
@@ -144,7 +136,7 @@ async def chat(chat_request: ChatRequest, request: Request) -> ChatResponse:
                 print(f"⚠️  状态检查异常（不影响对话）: {str(state_error)}")
 
         # 【会话隔离核心1】将 session_id 作为 session_name 传入 JWT
-        access_token = token_manager.get_access_token(session_name=session_id)
+        access_token = await token_manager.aget_access_token(session_name=session_id)
         print(f"🔐 会话隔离: session_name={session_id}")
 
         # 【会话隔离核心2】管理 conversation_id
@@ -219,48 +211,48 @@ async def chat(chat_request: ChatRequest, request: Request) -> ChatResponse:
             "Content-Type": "application/json"
         }
 
-        # 使用异步客户端避免阻塞事件循环
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, trust_env=False) as http_client:
-            async with http_client.stream('POST', url, json=payload, headers=headers) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Coze API 错误: {error_text.decode()}"
-                    )
-
-                response_messages = []
-                returned_conversation_id = None
-                event_type = None
+        # 复用共享连接池，避免每次请求重新建立 TLS 连接
+        http_client = get_coze_http_client()
+        async with http_client.stream('POST', url, json=payload, headers=headers) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Coze API 错误: {error_text.decode()}"
+                )
 
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
+            response_messages = []
+            returned_conversation_id = None
+            event_type = None
 
-                    line = line.strip()
-                    if line.startswith('event:'):
-                        event_type = line[6:].strip()
-                    elif line.startswith('data:'):
-                        try:
-                            data_str = line[5:].strip()
-                            data = json.loads(data_str)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
 
-                            if 'conversation_id' in data and not returned_conversation_id:
-                                returned_conversation_id = data['conversation_id']
+                line = line.strip()
+                if line.startswith('event:'):
+                    event_type = line[6:].strip()
+                elif line.startswith('data:'):
+                    try:
+                        data_str = line[5:].strip()
+                        data = json.loads(data_str)
 
-                            if event_type == 'conversation.message.delta':
-                                if 'content' in data and data.get('role') == 'assistant':
-                                    content = data['content']
-                                    if content:
-                                        response_messages.append(content)
+                        if 'conversation_id' in data and not returned_conversation_id:
+                            returned_conversation_id = data['conversation_id']
 
-                            elif event_type is None and data.get('type') == 'answer' and data.get('content'):
+                        if event_type == 'conversation.message.delta':
+                            if 'content' in data and data.get('role') == 'assistant':
                                 content = data['content']
-                                response_messages.append(content)
-                                print(f"📤 同步接口收到 answer 类型消息: {len(content)} 字符")
+                                if content:
+                                    response_messages.append(content)
 
-                        except json.JSONDecodeError:
-                            pass
+                        elif event_type is None and data.get('type') == 'answer' and data.get('content'):
+                            content = data['content']
+                            response_messages.append(content)
+                            print(f"📤 同步接口收到 answer 类型消息: {len(content)} 字符")
+
+                    except json.JSONDecodeError:
+                        pass
 
         # 保存自动生成的 conversation_id
         if not conversation_id and returned_conversation_id:
@@ -418,7 +410,7 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
                 except Exception as state_error:
                     print(f"⚠️  流式状态检查异常（不影响对话）: {str(state_error)}")
 
-            access_token = token_manager.get_access_token(session_name=session_id)
+            access_token = await token_manager.aget_access_token(session_name=session_id)
             print(f"🔐 流式会话隔离: session_name={session_id}")
 
             conversation_id = chat_request.conversation_id
@@ -485,78 +477,78 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
                 "Content-Type": "application/json"
             }
 
-            # 使用异步客户端避免阻塞事件循环（关键修复！）
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, trust_env=False) as http_client:
-                async with http_client.stream('POST', url, json=payload, headers=headers) as response:
-                    if response.status_code != 200:
-                        error_text = await response.aread()
-                        error_data = {
-                            "type": "error",
-                            "content": f"Coze API 错误: {error_text.decode()}"
-                        }
-                        yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
-                        return
-
-                    event_type = None
-                    returned_conversation_id = None
-                    full_ai_response = []
-
-                    async for line in response.aiter_lines():
-                        # 检查队列中的人工消息
+            # 复用共享连接池，避免每次请求重新建立 TLS 连接
+            http_client = get_coze_http_client()
+            async with http_client.stream('POST', url, json=payload, headers=headers) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    error_data = {
+                        "type": "error",
+                        "content": f"Coze API 错误: {error_text.decode()}"
+                    }
+                    yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+                    return
+
+                event_type = None
+                returned_conversation_id = None
+                full_ai_response = []
+
+                async for line in response.aiter_lines():
+                    # 检查队列中的人工消息
+                    try:
+                        while not sse_queues[session_id].empty():
+                            queued_msg = await sse_queues[session_id].get()
+                            yield f"data: {json.dumps(queued_msg, ensure_ascii=False)}\n\n"
+                            print(f"✅ SSE 推送队列消息: {queued_msg.get('type')}")
+                    except Exception as queue_error:
+                        print(f"⚠️  SSE 队列检查异常: {str(queue_error)}")
+
+                    if not line:
+                        continue
+
+                    line = line.strip()
+                    if line.startswith('event:'):
+                        event_type = line[6:].strip()
+                    elif line.startswith('data:'):
                         try:
-                            while not sse_queues[session_id].empty():
-                                queued_msg = await sse_queues[session_id].get()
-                                yield f"data: {json.dumps(queued_msg, ensure_ascii=False)}\n\n"
-                                print(f"✅ SSE 推送队列消息: {queued_msg.get('type')}")
-                        except Exception as queue_error:
-                            print(f"⚠️  SSE 队列检查异常: {str(queue_error)}")
-
-                        if not line:
-                            continue
-
-                        line = line.strip()
-                        if line.startswith('event:'):
-                            event_type = line[6:].strip()
-                        elif line.startswith('data:'):
-                            try:
-                                data_str = line[5:].strip()
-                                data = json.loads(data_str)
-
-                                if 'conversation_id' in data and not returned_conversation_id:
-                                    returned_conversation_id = data['conversation_id']
-
-                                if event_type == 'conversation.message.delta':
-                                    if 'content' in data and data.get('role') == 'assistant':
-                                        content = data['content']
-                                        if content:
-                                            full_ai_response.append(content)
-                                            sse_data = {
-                                                "type": "message",
-                                                "content": content
-                                            }
-                                            yield f"data: {json.dumps(sse_data, ensure_ascii=False)}\n\n"
-
-                                elif event_type is None and data.get('type') == 'answer' and data.get('content'):
+                            data_str = line[5:].strip()
+                            data = json.loads(data_str)
+
+                            if 'conversation_id' in data and not returned_conversation_id:
+                                returned_conversation_id = data['conversation_id']
+
+                            if event_type == 'conversation.message.delta':
+                                if 'content' in data and data.get('role') == 'assistant':
                                     content = data['content']
-                                    full_ai_response.append(content)
-                                    sse_data = {
-                                        "type": "message",
-                                        "content": content
-                                    }
-                                    yield f"data: {json.dumps(sse_data, ensure_ascii=False)}\n\n"
-                                    print(f"📤 Workflow answer 类型消息: {len(content)} 字符")
-
-                                elif event_type == 'conversation.chat.failed':
-                                    error_content = data.get('last_error', {}).get('msg', '未知错误')
-                                    error_data = {
-                                        "type": "error",
-                                        "content": error_content
-                                    }
-                                    yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
-                                    return
-
-                            except json.JSONDecodeError:
-                                pass
+                                    if content:
+                                        full_ai_response.append(content)
+                                        sse_data = {
+                                            "type": "message",
+                                            "content": content
+                                        }
+                                        yield f"data: {json.dumps(sse_data, ensure_ascii=False)}\n\n"
+
+                            elif event_type is None and data.get('type') == 'answer' and data.get('content'):
+                                content = data['content']
+                                full_ai_response.append(content)
+                                sse_data = {
+                                    "type": "message",
+                                    "content": content
+                                }
+                                yield f"data: {json.dumps(sse_data, ensure_ascii=False)}\n\n"
+                                print(f"📤 Workflow answer 类型消息: {len(content)} 字符")
+
+                            elif event_type == 'conversation.chat.failed':
+                                error_content = data.get('last_error', {}).get('msg', '未知错误')
+                                error_data = {
+                                    "type": "error",
+                                    "content": error_content
+                                }
+                                yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+                                return
+
+                        except json.JSONDecodeError:
+                            pass
 
             # 保存 conversation_id
             if not conversation_id and returned_conversation_id:
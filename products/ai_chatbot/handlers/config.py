@@ -23,6 +23,7 @@ from products.ai_chatbot.dependencies import (
     get_workflow_id,
     get_app_id,
     set_coze_client,
+    get_message_store,
 )
 
 # 导入班次配置
@@ -66,6 +67,11 @@ async def health_check():
     except RuntimeError:
         pass
 
+    # 聊天记录写入队列指标
+    message_store = get_message_store()
+    if message_store is not None:
+        health_info["message_store"] = message_store.get_metrics()
+
     return health_info
 
 
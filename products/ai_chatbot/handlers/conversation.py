@@ -52,7 +52,7 @@ async def create_conversation(request: NewConversationRequest):
         session_id = request.user_id
 
         # 获取带 session_name 的 token
-        access_token = token_manager.get_access_token(session_name=session_id)
+        access_token = await token_manager.aget_access_token(session_name=session_id)
 
         # 刷新 coze_client (确保使用正确的 token，禁用环境代理)
         api_base = os.getenv("COZE_API_BASE", "https://api.coze.com")
@@ -19,7 +19,7 @@ from services.session.state import (
     SessionState, SessionStatus, Message, EscalationInfo
 )
 from services.session.shift_config import is_in_shift
-from services.email.service import send_escalation_email
+from services.email.service import queue_escalation_email
 from products.ai_chatbot.dependencies import (
     get_session_store, get_regulator,
     get_smart_assignment_engine, get_customer_reply_auto_reopen
@@ -120,7 +120,7 @@ async def manual_escalate(request: dict):
             )
 
             try:
-                email_result = send_escalation_email(session_state)
+                email_result = await queue_escalation_email(session_state)
                 email_sent = email_result.get('success', False)
                 if email_sent:
                     print(f"📧 非工作时间，已发送邮件通知: {session_name}")
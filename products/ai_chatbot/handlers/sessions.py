@@ -18,7 +18,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from products.ai_chatbot.dependencies import get_session_store
-from infrastructure.bootstrap.sse import subscribe_sse_events
+from infrastructure.bootstrap.sse import open_sse_subscription
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
@@ -78,19 +78,20 @@ async def session_events(session_name: str):
             # 发送连接成功事件
             yield f"data: {json.dumps({'type': 'connected', 'session_name': session_name, 'timestamp': int(time.time())}, ensure_ascii=False)}\n\n"
 
-            # 使用统一订阅接口（支持 Redis 跨进程）
-            subscription = subscribe_sse_events(session_name)
+            # 使用统一订阅接口（支持 Redis 跨进程，进程内共享 Pub/Sub 连接）
+            subscription = await open_sse_subscription(session_name)
 
-            while True:
-                try:
+            try:
+                while True:
                     # 等待下一条消息，30秒超时发送心跳
-                    payload = await asyncio.wait_for(subscription.__anext__(), timeout=30.0)
+                    payload = await subscription.get(timeout=30.0)
+                    if payload is None:
+                        # 发送心跳保持连接
+                        yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': int(time.time())}, ensure_ascii=False)}\n\n"
+                        continue
                     yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
-                except asyncio.TimeoutError:
-                    # 发送心跳保持连接
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': int(time.time())}, ensure_ascii=False)}\n\n"
-                except StopAsyncIteration:
-                    break
+            finally:
+                await subscription.close()
         except asyncio.CancelledError:
             print(f"⏹️  用户 SSE 断开: session={session_name}")
             raise
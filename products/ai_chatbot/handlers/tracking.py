@@ -5,6 +5,7 @@
 
 端点:
 - GET /api/tracking/{tracking_number} - 查询物流轨迹
+- POST /api/tracking/batch - 批量查询物流状态
 """
 
 import os
@@ -309,6 +310,18 @@ class TrackingResponse(BaseModel):
     debug: Optional[dict] = Field(None, description="调试信息（仅 debug=1 时返回）")
 
 
+class BatchTrackingItem(BaseModel):
+    """批量查询项"""
+    tracking_number: str = Field(..., description="运单号")
+    carrier: Optional[str] = Field(None, description="承运商代码（可选）")
+
+
+class BatchTrackingRequest(BaseModel):
+    """批量查询请求"""
+    items: List[BatchTrackingItem] = Field(..., max_length=100, description="运单列表（最多100个）")
+    refresh: bool = Field(False, description="是否跳过缓存")
+
+
 # ============ API 端点 ============
 
 @router.get(
@@ -584,6 +597,55 @@ async def get_tracking(
         )
 
 
+@router.post(
+    "/batch",
+    summary="批量查询物流状态",
+    description="一次查询多个运单的状态，缓存未命中的运单合并为 17track 批量请求",
+)
+async def get_tracking_batch(request: BatchTrackingRequest):
+    """
+    批量查询物流状态
+
+    Returns:
+        results: 运单号 -> 状态信息（查询失败为 null）
+    """
+    try:
+        service = get_tracking_service()
+        infos = await service.get_tracking_info_batch(
+            [{"number": item.tracking_number, "carrier": item.carrier} for item in request.items],
+            use_cache=not request.refresh,
+        )
+
+        results = {}
+        for number, info in infos.items():
+            if info is None:
+                results[number] = None
+                continue
+            last_updated = None
+            if info.last_event and info.last_event.timestamp:
+                last_updated = info.last_event.timestamp.isoformat()
+            results[number] = {
+                "tracking_number": number,
+                "carrier": info.carrier.name if info.carrier else None,
+                "status": info.status.value if info.status else None,
+                "status_zh": info.status.zh if info.status else None,
+                "is_delivered": info.is_delivered,
+                "is_exception": info.is_exception,
+                "event_count": len(info.events),
+                "last_updated": last_updated,
+                "order_id": info.order_id,
+            }
+
+        return {"count": len(results), "results": results}
+
+    except Exception as e:
+        logger.error(f"批量查询物流状态失败: {len(request.items)} 个, 错误: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"批量查询物流状态失败: {str(e)}",
+        )
+
+
 @router.get(
     "/{tracking_number}/status",
     summary="查询物流状态",
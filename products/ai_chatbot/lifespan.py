@@ -178,4 +178,28 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
 
+    try:
+        from infrastructure.database import dispose_async_database
+        await dispose_async_database()
+    except Exception:
+        pass
+
+    try:
+        from services.shopify.client import close_all_clients
+        await close_all_clients()
+    except Exception:
+        pass
+
+    try:
+        from services.email import shutdown_email_outbox
+        await shutdown_email_outbox()
+    except Exception:
+        pass
+
+    try:
+        from services.coze.http_client import close_coze_http_client
+        await close_coze_http_client()
+    except Exception:
+        pass
+
     print(f"✅ {config.product_name} 已关闭\n")
@@ -9,6 +9,7 @@ from products.ai_chatbot import dependencies as deps
 from products.ai_chatbot.handlers import chat as chat_module
 from products.ai_chatbot.handlers.chat import router as chat_router
 from products.ai_chatbot.handlers.manual import router as manual_router
+from services.coze.http_client import reset_coze_http_client
 from services.session.regulator import Regulator
 from services.session.state import SessionState, SessionStatus
 
@@ -17,6 +18,9 @@ class _DummyTokenManager:
     def get_access_token(self, session_name: str):
         return "dummy-token"
 
+    async def aget_access_token(self, session_name: str):
+        return "dummy-token"
+
     def invalidate_token(self, session_name: str):
         return None
 
@@ -87,8 +91,10 @@ class ContactOnlyIntegrationTest(unittest.TestCase):
     def setUp(self):
         os.environ.pop("ENABLE_MANUAL_HANDOFF", None)
 
-        self._orig_async_client = chat_module.httpx.AsyncClient
-        chat_module.httpx.AsyncClient = _FakeAsyncClient
+        self._orig_get_http_client = chat_module.get_coze_http_client
+        fake_client = _FakeAsyncClient()
+        chat_module.get_coze_http_client = lambda: fake_client
+        reset_coze_http_client()
 
         store = _TestSessionStore()
         deps.set_session_store(store)
@@ -105,7 +111,8 @@ class ContactOnlyIntegrationTest(unittest.TestCase):
         self._store = store
 
     def tearDown(self):
-        chat_module.httpx.AsyncClient = self._orig_async_client
+        chat_module.get_coze_http_client = self._orig_get_http_client
+        reset_coze_http_client()
 
     def _read_sse_events(self, resp):
         events = []
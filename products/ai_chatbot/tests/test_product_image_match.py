@@ -0,0 +1,104 @@
+import unittest
+from difflib import SequenceMatcher
+
+from services.asset.match_index import KIND_ACCESSORY, KIND_PRODUCT, ProductMatchIndex
+from services.asset.service import MAPPING_FILE, _extract_keywords, load_mapping
+
+
+def _legacy_match(mapping, product_name, sku=None):
+    """The linear scorer match_product_image used before the index (returns kind, key, score)."""
+    best, best_score = None, 0.0
+    sections = ((KIND_ACCESSORY, mapping.get("accessories", {})), (KIND_PRODUCT, mapping.get("products", {})))
+    for kind, items in sections:
+        for key, info in items.items():
+            score = 0.0
+            if sku:
+                for item_sku in info.get("skus", []):
+                    if kind == KIND_ACCESSORY and sku.upper() == item_sku.upper():
+                        score = 1.0
+                        break
+                    if sku.upper() in item_sku.upper() or item_sku.upper() in sku.upper():
+                        score = 1.0 if kind == KIND_PRODUCT else 0.95
+                        break
+            if score < 1.0 and product_name:
+                title = info.get("title", "")
+                if product_name.lower() == title.lower():
+                    score = 0.95
+                else:
+                    name_score = SequenceMatcher(None, product_name.lower(), title.lower()).ratio()
+                    if kind == KIND_PRODUCT:
+                        name_score += 0.1 * sum(1 for kw in _extract_keywords(product_name) if kw.lower() in title.lower())
+                    score = max(score, min(name_score, 0.9))
+            if score > best_score:
+                best, best_score = (kind, key), score
+    if best and best_score > 0.5:
+        return best[0], best[1], best_score
+    return None
+
+
+def _indexed_match(index, product_name, sku=None):
+    result = index.match(product_name, sku)
+    return (result[0], result[1], result[3]) if result else None
+
+
+SAMPLE_MAPPING = {
+    "accessories": {
+        "rack-bag": {"title": "Bike Rack Pannier Bag", "skus": ["A5901"]},
+        "rack-bag-xl": {"title": "Bike Rack Pannier Bag XL", "skus": ["A5901-XL"]},
+        "phone-mount": {"title": "Handlebar Phone Mount", "skus": ["A3100"]},
+    },
+    "products": {
+        "titan": {"title": "Fiido Titan Fat Tire Touring Ebike", "skus": ["M25-145H-US", "M25-145H-UK"]},
+        "d11": {"title": "Fiido D11 Folding Ebike", "skus": ["D11-GR"]},
+        "x": {"title": "Fiido X Folding Ebike", "skus": ["X-BK"]},
+    },
+}
+
+
+class ProductMatchIndexParityTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ProductMatchIndex(SAMPLE_MAPPING, _extract_keywords, cache_size=0)
+
+    def assertParity(self, mapping, index, product_name, sku=None):
+        self.assertEqual(
+            _indexed_match(index, product_name, sku),
+            _legacy_match(mapping, product_name, sku),
+            msg=f"name={product_name!r} sku={sku!r}",
+        )
+
+    def test_sample_queries_match_the_legacy_scorer(self):
+        queries = [
+            ("", "A5901"),            # exact accessory SKU beats the XL variant containing it
+            ("", "A5901-XL-RED"),     # mapping SKU contained in the query
+            ("", "M25-145H"),         # query contained in product SKUs
+            ("", "145H-UK"),
+            ("Bike Rack Pannier Bag", None),
+            ("bike rack pannier bag xl", None),
+            ("Fiido D11 Folding E-bike", None),
+            ("Fiido X", None),
+            ("Titan Fat Tire Touring Ebike", "UNKNOWN"),
+            ("Gift Card", None),      # below threshold
+            ("Phone Mount", "A3100"),
+        ]
+        for product_name, sku in queries:
+            self.assertParity(SAMPLE_MAPPING, self.index, product_name, sku)
+
+    def test_cached_result_matches_first_lookup(self):
+        index = ProductMatchIndex(SAMPLE_MAPPING, _extract_keywords, cache_size=8)
+        first = index.match("Fiido D11 Folding Ebike", "D11-GR")
+        self.assertEqual(index.match("Fiido D11 Folding Ebike", "D11-GR"), first)
+        self.assertEqual(index.get_stats()["cached_matches"], 1)
+
+    @unittest.skipUnless(MAPPING_FILE.exists(), "asset mapping not available")
+    def test_every_mapped_title_and_sku_matches_the_legacy_scorer(self):
+        mapping = load_mapping()
+        index = ProductMatchIndex(mapping, _extract_keywords, cache_size=0)
+        for section in ("accessories", "products"):
+            for info in mapping.get(section, {}).values():
+                self.assertParity(mapping, index, info.get("title", ""))
+                for sku in info.get("skus", [])[:3]:
+                    self.assertParity(mapping, index, "", sku)
+
+
+if __name__ == "__main__":
+    unittest.main()
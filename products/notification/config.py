@@ -25,6 +25,10 @@ class NotificationConfig:
 
     # Webhook 配置
     webhook_secret: str = ""
+    shopify_webhook_secret: str = ""  # Shopify App 的 webhook 签名密钥（未配置时不验签）
+
+    # 17track 推送触发的客户邮件（签收确认/异常告警），开启前不查询订单、不发信
+    customer_emails_enabled: bool = False
 
     # 异常监控阈值（天）
     overseas_warehouse_timeout: int = 7  # 海外仓超时天数
@@ -38,6 +42,8 @@ class NotificationConfig:
             email_from=os.getenv("NOTIFICATION_EMAIL_FROM", "noreply@fiido.com"),
             email_from_name=os.getenv("NOTIFICATION_EMAIL_FROM_NAME", "Fiido Support"),
             webhook_secret=os.getenv("TRACK17_WEBHOOK_SECRET", ""),
+            shopify_webhook_secret=os.getenv("SHOPIFY_WEBHOOK_SECRET", ""),
+            customer_emails_enabled=os.getenv("NOTIFICATION_CUSTOMER_EMAILS", "false").lower() == "true",
             overseas_warehouse_timeout=int(os.getenv("NOTIFICATION_OVERSEAS_TIMEOUT", "7")),
             china_warehouse_timeout=int(os.getenv("NOTIFICATION_CHINA_TIMEOUT", "12")),
         )
@@ -2,13 +2,20 @@
 Notification Handlers
 
 Handlers for processing notifications:
-- shopify_handler: Shopify Webhook processing (fulfillment events)
+- shopify_handler: Shopify Webhook processing (fulfillment and order events)
 - tracking_handler: 17track push processing (status updates)
 - notification_sender: Email notification sending
+- dispatcher: Routes queued webhook events to the handlers above
 """
 
-from .shopify_handler import handle_fulfillment_create, handle_order_create
+from .shopify_handler import (
+    handle_fulfillment_create,
+    handle_fulfillment_update,
+    handle_order_create,
+    handle_order_updated,
+)
 from .tracking_handler import handle_tracking_update, handle_status_change
+from .dispatcher import dispatch_webhook_event
 from .notification_sender import (
     send_split_package_notice,
     send_presale_notice,
@@ -21,10 +28,14 @@ from .notification_sender import (
 __all__ = [
     # Shopify handlers
     "handle_fulfillment_create",
+    "handle_fulfillment_update",
     "handle_order_create",
+    "handle_order_updated",
     # 17track handlers
     "handle_tracking_update",
     "handle_status_change",
+    # Queue dispatch
+    "dispatch_webhook_event",
     # Notification senders
     "send_split_package_notice",
     "send_presale_notice",
@@ -0,0 +1,68 @@
+"""
+Webhook Event Dispatcher
+
+Routes a queued webhook event to its handler:
+- shopify / fulfillments/create -> handle_fulfillment_create
+- shopify / fulfillments/update -> handle_fulfillment_update
+- shopify / orders/create       -> handle_order_create
+- shopify / orders/updated      -> handle_order_updated
+- 17track                       -> handle_tracking_update
+"""
+
+import logging
+from typing import Dict, Any
+
+from .shopify_handler import (
+    handle_fulfillment_create,
+    handle_fulfillment_update,
+    handle_order_create,
+    handle_order_updated,
+)
+from .tracking_handler import handle_tracking_update
+
+logger = logging.getLogger(__name__)
+
+SOURCE_SHOPIFY = "shopify"
+SOURCE_17TRACK = "17track"
+
+# Shopify topics that have a handler; others are acknowledged and ignored
+SHOPIFY_TOPICS = ("fulfillments/create", "fulfillments/update", "orders/create", "orders/updated")
+
+
+async def dispatch_webhook_event(
+    source: str,
+    topic: str,
+    payload: Dict[str, Any],
+    shop_domain: str = "",
+) -> Dict[str, Any]:
+    """
+    Process one webhook event
+
+    Args:
+        source: "shopify" or "17track"
+        topic: Shopify topic or 17track event type
+        payload: Webhook JSON payload
+        shop_domain: Shopify shop domain
+
+    Returns:
+        Handler result
+
+    Raises:
+        ValueError: Unknown source
+    """
+    if source == SOURCE_SHOPIFY:
+        if topic == "fulfillments/create":
+            return await handle_fulfillment_create(payload, shop_domain)
+        if topic == "fulfillments/update":
+            return await handle_fulfillment_update(payload, shop_domain)
+        if topic == "orders/create":
+            return await handle_order_create(payload, shop_domain)
+        if topic == "orders/updated":
+            return await handle_order_updated(payload, shop_domain)
+        logger.debug(f"Unhandled Shopify topic: {topic}")
+        return {"status": "ignored", "topic": topic}
+
+    if source == SOURCE_17TRACK:
+        return await handle_tracking_update(payload)
+
+    raise ValueError(f"Unknown webhook source: {source}")
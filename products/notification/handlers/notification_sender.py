@@ -109,7 +109,7 @@ async def send_split_package_notice(
         subject = f"Your Order {order_number} Update - Package {package_number} of {total_packages}"
 
         service = get_email_service()
-        result = service.send_email(
+        result = await service.queue_email(
             subject=subject,
             html_content=html_content,
             recipients=[email],
@@ -182,7 +182,7 @@ async def send_presale_notice(
         subject = f"Great News - Your Pre-order {order_number} Has Shipped!"
 
         service = get_email_service()
-        result = service.send_email(
+        result = await service.queue_email(
             subject=subject,
             html_content=html_content,
             recipients=[email],
@@ -272,7 +272,7 @@ async def send_exception_alert(
             subject = f"Shipping Update - Order {order_number}"
 
         service = get_email_service()
-        result = service.send_email(
+        result = await service.queue_email(
             subject=subject,
             html_content=html_content,
             recipients=[email],
@@ -348,7 +348,7 @@ async def send_delivery_confirm(
         subject = f"Your Order {order_number} Has Been Delivered!"
 
         service = get_email_service()
-        result = service.send_email(
+        result = await service.queue_email(
             subject=subject,
             html_content=html_content,
             recipients=[email],
@@ -1,11 +1,16 @@
 """
 Shopify Webhook Handler
 
-Handles Shopify fulfillment events:
+Handles Shopify fulfillment and order events:
 - fulfillments/create: Order shipped, register tracking with 17track
+- fulfillments/update: Shipment status / tracking number changed
+- orders/create, orders/updated: Order changed
 - Detects split packages (multiple fulfillments per order)
 - Detects presale items (based on SKU prefix)
 
+Every event writes the latest order through to the shared Shopify order /
+tracking caches, so cached order lookups never go back to Shopify or 17track.
+
 Shopify Fulfillment Webhook payload structure:
 {
     "id": 123456789,
@@ -65,7 +70,11 @@ async def handle_fulfillment_create(
             f"order={order_id}, tracking={tracking_number}"
         )
 
-        # 1. Register tracking with 17track
+        # 1. Write the shipped order through to the order caches
+        if order_id and await _refresh_order_cache(str(order_id), shop_domain):
+            result["actions"].append("order_cache_refreshed")
+
+        # 2. Register tracking with 17track
         if tracking_number:
             await _register_tracking(
                 order_id=str(order_id),
@@ -75,7 +84,7 @@ async def handle_fulfillment_create(
             )
             result["actions"].append("tracking_registered")
 
-        # 2. Check for split package
+        # 3. Check for split package
         is_split = await _check_split_package(order_id, shop_domain)
         if is_split:
             result["is_split_package"] = True
@@ -88,7 +97,7 @@ async def handle_fulfillment_create(
                 shop_domain=shop_domain,
             )
 
-        # 3. Check for presale items
+        # 4. Check for presale items
         presale_skus = _detect_presale_items(line_items)
         if presale_skus:
             result["presale_skus"] = presale_skus
@@ -113,6 +122,95 @@ async def handle_fulfillment_create(
     return result
 
 
+async def handle_fulfillment_update(
+    payload: Dict[str, Any],
+    shop_domain: str,
+) -> Dict[str, Any]:
+    """
+    Handle Shopify fulfillment.update event
+
+    Triggered when a fulfillment's shipment status or tracking number
+    changes. Refreshes the cached order and (re-)registers the tracking
+    number with 17track; no customer notification is sent.
+
+    Args:
+        payload: Shopify fulfillment webhook payload
+        shop_domain: Shop domain
+
+    Returns:
+        Processing result with actions taken
+    """
+    order_id = payload.get("order_id")
+    tracking_number = payload.get("tracking_number")
+    result = {
+        "fulfillment_id": payload.get("id"),
+        "order_id": order_id,
+        "actions": [],
+    }
+
+    if order_id and await _refresh_order_cache(str(order_id), shop_domain):
+        result["actions"].append("order_cache_refreshed")
+
+    if order_id and tracking_number:
+        registered = await _register_tracking(
+            order_id=str(order_id),
+            tracking_number=tracking_number,
+            carrier=payload.get("tracking_company", ""),
+            shop_domain=shop_domain,
+        )
+        if registered:
+            result["actions"].append("tracking_registered")
+
+    result["status"] = "success"
+    return result
+
+
+async def _refresh_order_cache(order_id: str, shop_domain: str) -> bool:
+    """
+    Re-fetch an order and write it through to the order caches
+
+    Args:
+        order_id: Shopify order ID
+        shop_domain: Shop domain for site identification
+
+    Returns:
+        True if the caches were updated
+    """
+    try:
+        from services.shopify import get_shopify_service
+
+        service = get_shopify_service(_get_site_code(shop_domain))
+        await service.refresh_order(order_id)
+        return True
+
+    except Exception as e:
+        logger.error(f"Order cache refresh failed: order={order_id}, {e}")
+        return False
+
+
+async def _write_order_cache(payload: Dict[str, Any], shop_domain: str) -> bool:
+    """
+    Write an order webhook payload through to the order caches (no Shopify call)
+
+    Args:
+        payload: Shopify order webhook payload (full order resource)
+        shop_domain: Shop domain for site identification
+
+    Returns:
+        True if the caches were updated
+    """
+    try:
+        from services.shopify import get_shopify_service
+
+        service = get_shopify_service(_get_site_code(shop_domain))
+        await service.apply_order_webhook(payload)
+        return True
+
+    except Exception as e:
+        logger.error(f"Order cache write failed: order={payload.get('id')}, {e}")
+        return False
+
+
 async def _register_tracking(
     order_id: str,
     tracking_number: str,
@@ -267,13 +365,46 @@ async def handle_order_create(
     Returns:
         Processing result
     """
-    # This handler is optional, mainly for future use
     order_id = payload.get("id")
     logger.info(f"Order created: {order_id}")
 
+    # Replaces a cached "order not found" marker for this order number
+    cached = await _write_order_cache(payload, shop_domain)
+
     return {
         "order_id": order_id,
         "status": "received",
+        "actions": ["order_cache_refreshed"] if cached else [],
+    }
+
+
+async def handle_order_updated(
+    payload: Dict[str, Any],
+    shop_domain: str,
+) -> Dict[str, Any]:
+    """
+    Handle Shopify order.updated event
+
+    Covers payment, refund, cancellation and fulfillment changes; the
+    payload is the full order, so the caches are written without calling
+    Shopify.
+
+    Args:
+        payload: Shopify order webhook payload
+        shop_domain: Shop domain
+
+    Returns:
+        Processing result
+    """
+    order_id = payload.get("id")
+    logger.info(f"Order updated: {order_id}")
+
+    cached = await _write_order_cache(payload, shop_domain)
+
+    return {
+        "order_id": order_id,
+        "status": "success" if cached else "error",
+        "actions": ["order_cache_refreshed"] if cached else [],
     }
 
 
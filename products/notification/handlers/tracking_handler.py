@@ -2,6 +2,8 @@
 17track Webhook Handler
 
 Handles 17track tracking status update pushes:
+- Every push: Write the status through to the tracking cache and the
+  cached Shopify order's line items
 - Delivered: Send delivery confirmation email
 - Alert/Undelivered: Send exception alert email
 - Status changes: Log and process
@@ -90,6 +92,9 @@ async def _process_event(event: WebhookEvent) -> Dict[str, Any]:
     }
 
     try:
+        if await _write_through_status(event):
+            result["cache_updated"] = True
+
         # Check for delivery
         if is_delivery_event(event):
             await handle_delivered(event)
@@ -258,35 +263,88 @@ async def handle_exception(
         return False
 
 
+async def _write_through_status(event: WebhookEvent) -> bool:
+    """
+    Write a pushed status into the tracking cache and the cached order
+
+    The order's site is not known from the push, so every configured site's
+    cache is patched; only the one holding the order changes. Nothing is
+    fetched from Shopify or 17track.
+
+    Args:
+        event: Parsed webhook event
+
+    Returns:
+        True if a cached order was updated
+    """
+    try:
+        service = get_tracking_service()
+        if not await service.apply_push_event(event):
+            return False
+
+        order_id = event.order_id or await service.find_order_by_tracking(event.tracking_number)
+        if not order_id:
+            return False
+
+        from services.shopify import (
+            get_shopify_service,
+            get_all_configured_sites,
+            gather_across_sites,
+        )
+
+        async def patch(site: str) -> bool:
+            return await get_shopify_service(site).apply_delivery_status(
+                order_id, event.tracking_number, event.new_status
+            )
+
+        results = await gather_across_sites(get_all_configured_sites(), patch)
+        return any(updated is True for updated in results.values())
+
+    except Exception as e:
+        logger.error(f"Tracking cache write-through failed: {event.tracking_number}, {e}")
+        return False
+
+
 async def _get_order_info(order_id: str) -> Optional[Dict[str, Any]]:
     """
     Get order information from Shopify
 
+    Only runs when NOTIFICATION_CUSTOMER_EMAILS is enabled; otherwise no
+    order is resolved, so delivery/exception pushes send no customer email.
+
     Args:
         order_id: Order ID
 
     Returns:
         Order info dict with email, order_number, etc.
     """
+    if not get_config().customer_emails_enabled:
+        logger.debug(f"Customer emails disabled, skipping order lookup: {order_id}")
+        return None
+
     try:
-        # Try to find the order across all sites
+        # Query all configured sites concurrently and take the first hit.
         # In production, we should have site info from the tracking registration
-        from services.shopify import get_shopify_service
-
-        # Try UK first (most common)
-        for site in ["uk", "us", "eu", "de"]:
-            try:
-                service = get_shopify_service(site)
-                order = await service.get_order_by_id(order_id)
-                if order:
-                    return {
-                        "email": order.get("email"),
-                        "order_number": order.get("name"),  # e.g., "#UK12345"
-                        "site": site,
-                    }
-            except Exception:
-                continue
+        from services.shopify import (
+            get_shopify_service,
+            get_all_configured_sites,
+            first_across_sites,
+        )
+
+        async def fetch(site: str) -> Optional[Dict[str, Any]]:
+            result = await get_shopify_service(site).get_order_detail(order_id)
+            return result.get("order")
+
+        site, order, errors = await first_across_sites(get_all_configured_sites(), fetch)
+        if order:
+            return {
+                "email": order.get("customer_email"),
+                "order_number": order.get("order_number"),  # e.g., "#UK12345"
+                "site": site,
+            }
 
+        if errors:
+            logger.debug(f"Order {order_id} lookup failed on sites: {', '.join(errors)}")
         return None
 
     except Exception as e:
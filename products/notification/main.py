@@ -10,16 +10,42 @@
     ENABLE_NOTIFICATION=true
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from infrastructure.database import dispose_async_database
+from services.email import get_email_outbox, shutdown_email_outbox
+
 from .config import get_config
+from .webhook_queue import get_webhook_queue, shutdown_webhook_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动邮件发送队列和 Webhook 队列 worker，继续处理上次未完成的任务"""
+    outbox = get_email_outbox()
+    if outbox is not None:
+        await outbox.start()
+
+    webhook_queue = get_webhook_queue()
+    if webhook_queue is not None:
+        await webhook_queue.start()
+
+    yield
+
+    await shutdown_webhook_queue()
+    await shutdown_email_outbox()
+    await dispose_async_database()
+
 
 # 创建 FastAPI 应用
 app = FastAPI(
     title="Fiido 物流通知服务",
     description="接收物流状态更新，发送通知邮件",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 配置
@@ -54,6 +80,24 @@ async def health():
     }
 
 
+@app.get("/api/email/outbox")
+async def email_outbox_stats():
+    """邮件发送队列状态"""
+    outbox = get_email_outbox()
+    if outbox is None:
+        return {"enabled": False}
+    return {"enabled": True, **outbox.get_stats()}
+
+
+@app.get("/api/webhook/queue")
+async def webhook_queue_stats():
+    """Webhook 处理队列状态"""
+    queue = get_webhook_queue()
+    if queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **queue.get_stats()}
+
+
 @app.get("/api/config")
 async def config_info():
     """配置信息（不含敏感数据）"""
@@ -5,23 +5,82 @@ Defines API endpoints for receiving webhooks from:
 - Shopify: Fulfillment events (order shipped)
 - 17track: Tracking status updates
 
+Webhooks are verified, deduplicated and persisted to the webhook queue, then
+acknowledged immediately; workers run the handlers in the background (see
+webhook_queue.py). Without Redis, events are processed inline.
+
 Endpoints:
     POST /webhook/shopify  - Shopify fulfillment webhook
     POST /webhook/17track  - 17track status push
 """
 
+import hmac
+import json
+import base64
+import hashlib
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from fastapi import APIRouter, Request, Response, Header, HTTPException
 
 from .config import get_config
+from .handlers.dispatcher import dispatch_webhook_event, SOURCE_SHOPIFY, SOURCE_17TRACK
+from .webhook_queue import get_webhook_queue, WebhookBacklogFull
 from services.tracking import verify_webhook_signature
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
+# Seconds the sender should wait before retrying when the queue is full
+BACKLOG_RETRY_AFTER = 30
+
+
+def verify_shopify_hmac(body: bytes, signature: str, secret: str) -> bool:
+    """Verify X-Shopify-Hmac-SHA256 (base64 HMAC-SHA256 of the raw body)"""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()
+    expected = base64.b64encode(digest).decode("ascii")
+    return hmac.compare_digest(expected, signature or "")
+
+
+def _content_hash(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _split_17track_push(payload: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Split a 17track push into one queue event per tracking number
+
+    17track sends no event ID, so the ID is the tracking number plus a hash of
+    the pushed item: a redelivered push maps to the same IDs.
+
+    Returns:
+        [(event_id, tracking_number, single-item payload)]
+    """
+    event_type = payload.get("event", "TRACKING_UPDATED")
+    items = payload.get("data", [])
+    if not isinstance(items, list):
+        items = [items]
+
+    events = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        number = str(item.get("number") or "")
+        item_json = json.dumps(item, sort_keys=True, ensure_ascii=False)
+        event_id = f"17track:{number}:{_content_hash(event_type, item_json)}"
+        events.append((event_id, number or event_id, {"event": event_type, "data": item}))
+    return events
+
+
+def _backlog_full(e: WebhookBacklogFull) -> HTTPException:
+    logger.warning(f"Webhook queue backlog full: {e}")
+    return HTTPException(
+        status_code=503,
+        detail="Webhook queue is full, retry later",
+        headers={"Retry-After": str(BACKLOG_RETRY_AFTER)},
+    )
+
 
 @router.post("/shopify")
 async def shopify_webhook(
@@ -29,6 +88,7 @@ async def shopify_webhook(
     x_shopify_topic: str = Header(None, alias="X-Shopify-Topic"),
     x_shopify_hmac_sha256: str = Header(None, alias="X-Shopify-Hmac-SHA256"),
     x_shopify_shop_domain: str = Header(None, alias="X-Shopify-Shop-Domain"),
+    x_shopify_webhook_id: str = Header(None, alias="X-Shopify-Webhook-Id"),
 ):
     """
     Shopify Webhook endpoint
@@ -43,6 +103,7 @@ async def shopify_webhook(
         X-Shopify-Topic: Event type (e.g., "fulfillments/create")
         X-Shopify-Hmac-SHA256: Request signature
         X-Shopify-Shop-Domain: Shop domain
+        X-Shopify-Webhook-Id: Delivery ID (same on Shopify retries)
     """
     config = get_config()
 
@@ -51,27 +112,36 @@ async def shopify_webhook(
         return {"status": "disabled"}
 
     try:
-        payload = await request.json()
-        logger.info(
-            f"Shopify webhook received: topic={x_shopify_topic}, "
-            f"shop={x_shopify_shop_domain}"
-        )
-
-        # Route to appropriate handler based on topic
-        if x_shopify_topic == "fulfillments/create":
-            from .handlers.shopify_handler import handle_fulfillment_create
-            result = await handle_fulfillment_create(payload, x_shopify_shop_domain or "")
-            return {"status": "processed", "topic": x_shopify_topic, "result": result}
+        body = await request.body()
 
-        elif x_shopify_topic == "orders/create":
-            from .handlers.shopify_handler import handle_order_create
-            result = await handle_order_create(payload, x_shopify_shop_domain or "")
-            return {"status": "processed", "topic": x_shopify_topic, "result": result}
+        if config.shopify_webhook_secret:
+            if not verify_shopify_hmac(body, x_shopify_hmac_sha256 or "", config.shopify_webhook_secret):
+                logger.warning("Shopify webhook HMAC verification failed")
+                raise HTTPException(status_code=401, detail="Invalid signature")
 
-        else:
-            logger.debug(f"Unhandled Shopify topic: {x_shopify_topic}")
-            return {"status": "ignored", "topic": x_shopify_topic}
+        payload = json.loads(body)
+        topic = x_shopify_topic or ""
+        shop_domain = x_shopify_shop_domain or ""
+        logger.info(f"Shopify webhook received: topic={topic}, shop={shop_domain}")
+
+        queue = get_webhook_queue()
+        if queue is None:
+            result = await dispatch_webhook_event(SOURCE_SHOPIFY, topic, payload, shop_domain)
+            return {"status": result.get("status") or "processed", "topic": topic, "result": result}
+
+        event_id = f"shopify:{x_shopify_webhook_id or _content_hash(topic, body.decode('utf-8', 'replace'))}"
+        order_id = payload.get("order_id") if topic.startswith("fulfillments/") else payload.get("id")
+        ordering_key = f"order:{order_id}" if order_id else event_id
+        queued = await queue.ingest(
+            SOURCE_SHOPIFY, event_id, topic, ordering_key,
+            body.decode("utf-8"), shop_domain,
+        )
+        return {"status": "queued" if queued else "duplicate", "topic": topic, "event_id": event_id}
 
+    except HTTPException:
+        raise
+    except WebhookBacklogFull as e:
+        raise _backlog_full(e)
     except Exception as e:
         logger.error(f"Shopify webhook error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -109,17 +179,36 @@ async def track17_webhook(
                 logger.warning("17track webhook signature verification failed")
                 raise HTTPException(status_code=401, detail="Invalid signature")
 
-        payload = await request.json()
-        logger.info(f"17track webhook received: event={payload.get('event')}")
-
-        # Process tracking update
-        from .handlers.tracking_handler import handle_tracking_update
-        result = await handle_tracking_update(payload)
-
-        return {"status": "processed", "event": payload.get("event"), "result": result}
+        payload = json.loads(body)
+        event_type = payload.get("event")
+        logger.info(f"17track webhook received: event={event_type}")
+
+        queue = get_webhook_queue()
+        if queue is None:
+            result = await dispatch_webhook_event(SOURCE_17TRACK, event_type or "", payload)
+            return {"status": "processed", "event": event_type, "result": result}
+
+        queued = duplicates = 0
+        for event_id, tracking_number, item_payload in _split_17track_push(payload):
+            if await queue.ingest(
+                SOURCE_17TRACK, event_id, event_type or "", f"tracking:{tracking_number}",
+                json.dumps(item_payload, ensure_ascii=False),
+            ):
+                queued += 1
+            else:
+                duplicates += 1
+
+        return {
+            "status": "queued" if queued else "duplicate",
+            "event": event_type,
+            "queued": queued,
+            "duplicates": duplicates,
+        }
 
     except HTTPException:
         raise
+    except WebhookBacklogFull as e:
+        raise _backlog_full(e)
     except Exception as e:
         logger.error(f"17track webhook error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -133,4 +222,5 @@ async def webhook_health():
         "status": "healthy",
         "enabled": config.enabled,
         "endpoints": ["/webhook/shopify", "/webhook/17track"],
+        "queue": get_webhook_queue() is not None,
     }
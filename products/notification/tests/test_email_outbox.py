@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+import fakeredis
+
+from services.email.outbox import DEAD_KEY, JOBS_KEY, LEASE_KEY_PREFIX, QUEUE_KEY, EmailOutbox
+
+
+class _FakeEmailService:
+    def __init__(self):
+        self.records = []
+
+    def record_email(self, **kwargs):
+        self.records.append(kwargs)
+
+
+class EmailOutboxLeaseTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        self.service = _FakeEmailService()
+        self.outbox = EmailOutbox(self.redis, email_service=self.service)
+        self.outbox.lease_seconds = 1
+        self.outbox.max_attempts = 2
+        self.outbox.backoff_seconds = 30
+        # Drive _claim/_complete directly instead of running the workers
+        self.outbox.start = mock.AsyncMock()
+        self.outbox._wakeup = asyncio.Event()
+
+    async def _enqueue(self, subject="Delivered"):
+        return await self.outbox.enqueue(subject, "<p>hi</p>", ["a@example.com"], email_type="delivery_confirm")
+
+    async def test_leased_job_is_not_claimed_twice(self):
+        job_id = await self._enqueue()
+
+        first = self.outbox._claim(10)
+        # Even if the job becomes due again, the lease keeps other workers off it
+        self.redis.zadd(QUEUE_KEY, {job_id: 0})
+        second = self.outbox._claim(10)
+
+        self.assertEqual([job["id"] for job in first], [job_id])
+        self.assertEqual(second, [])
+
+    async def test_job_is_redelivered_after_lease_expires(self):
+        job_id = await self._enqueue()
+        self.assertEqual(len(self.outbox._claim(10)), 1)
+
+        # Worker crashed without completing: nothing is due until the lease runs out
+        self.assertEqual(self.outbox._claim(10), [])
+        await asyncio.sleep(1.1)
+
+        redelivered = self.outbox._claim(10)
+        self.assertEqual([job["id"] for job in redelivered], [job_id])
+
+    async def test_failed_job_is_rescheduled_with_backoff_then_dead_lettered(self):
+        job_id = await self._enqueue()
+
+        jobs = self.outbox._claim(10)
+        self.outbox._complete(jobs, ["smtp timeout"])
+
+        self.assertFalse(self.redis.exists(f"{LEASE_KEY_PREFIX}{job_id}"))
+        self.assertGreater(self.redis.zscore(QUEUE_KEY, job_id), time.time() + 25)
+        self.assertEqual(json.loads(self.redis.hget(JOBS_KEY, job_id))["attempts"], 1)
+
+        self.redis.zadd(QUEUE_KEY, {job_id: 0})
+        jobs = self.outbox._claim(10)
+        self.outbox._complete(jobs, ["smtp timeout"])
+
+        self.assertIsNone(self.redis.zscore(QUEUE_KEY, job_id))
+        self.assertFalse(self.redis.hexists(JOBS_KEY, job_id))
+        self.assertEqual(json.loads(self.redis.lindex(DEAD_KEY, 0))["id"], job_id)
+        self.assertEqual([record["status"] for record in self.service.records], ["failed"])
+
+    async def test_sent_job_is_removed(self):
+        job_id = await self._enqueue()
+
+        self.outbox._complete(self.outbox._claim(10), [None])
+
+        self.assertEqual(self.redis.zcard(QUEUE_KEY), 0)
+        self.assertFalse(self.redis.hexists(JOBS_KEY, job_id))
+        self.assertEqual(self.service.records[0]["message_id"], job_id)
+
+    async def test_queue_entry_without_job_is_dropped(self):
+        self.redis.zadd(QUEUE_KEY, {"mail_orphan": 0})
+
+        self.assertEqual(self.outbox._claim(10), [])
+        self.assertEqual(self.redis.zcard(QUEUE_KEY), 0)
+        self.assertFalse(self.redis.exists(f"{LEASE_KEY_PREFIX}mail_orphan"))
+
+
+if __name__ == "__main__":
+    unittest.main()
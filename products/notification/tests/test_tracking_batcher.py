@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from services.tracking.batcher import MicroBatcher
+from services.tracking.service import TrackingService
+
+
+class _FakeTrack17Client:
+    """Answers gettrackinfo with the carrier each number was queried with."""
+
+    BATCH_LIMIT = 40
+
+    def __init__(self):
+        self.requests = []
+
+    async def get_tracking_info_batch(self, items):
+        self.requests.append([(item["number"], item.get("carrier")) for item in items])
+        return {item["number"]: {"success": True, "carrier": item.get("carrier")} for item in items}
+
+
+class MicroBatcherTest(unittest.IsolatedAsyncioTestCase):
+    def _batcher(self, max_size=10, window=0.01, fail=None):
+        self.flushed = []
+
+        async def flush(items):
+            self.flushed.append([item["key"] for item in items])
+            if fail:
+                raise fail
+            return {item["key"]: f"result-{item['key']}" for item in items}
+
+        return MicroBatcher("test", flush, max_size=max_size, window=window)
+
+    async def test_concurrent_submits_share_one_flush(self):
+        batcher = self._batcher()
+
+        results = await asyncio.gather(*(batcher.submit(key, {"key": key}) for key in ("a", "b", "c")))
+
+        self.assertEqual(results, ["result-a", "result-b", "result-c"])
+        self.assertEqual(self.flushed, [["a", "b", "c"]])
+
+    async def test_duplicate_keys_are_requested_once(self):
+        batcher = self._batcher()
+
+        results = await asyncio.gather(batcher.submit("a", {"key": "a"}), batcher.submit("a", {"key": "a"}))
+
+        self.assertEqual(results, ["result-a", "result-a"])
+        self.assertEqual(self.flushed, [["a"]])
+
+    async def test_full_batch_flushes_without_waiting_for_the_window(self):
+        batcher = self._batcher(max_size=2, window=60)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a", {"key": "a"}), batcher.submit("b", {"key": "b"})),
+            timeout=1,
+        )
+
+        self.assertEqual(results, ["result-a", "result-b"])
+        self.assertEqual(batcher.get_stats(), {"batches": 1, "items": 2, "pending": 0})
+
+    async def test_flush_failure_reaches_every_caller(self):
+        batcher = self._batcher(fail=RuntimeError("quota"))
+
+        results = await asyncio.gather(
+            batcher.submit("a", {"key": "a"}), batcher.submit("b", {"key": "b"}), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+
+class TrackingQueryBatchingTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = TrackingService.__new__(TrackingService)
+        self.service.client = _FakeTrack17Client()
+        self.service._query_batcher = MicroBatcher("test-query", self.service._flush_queries, 40, 0.01)
+
+    async def test_same_number_with_different_carriers_is_not_merged(self):
+        results = await asyncio.gather(
+            self.service._query_tracking("TN1", "dhl"),
+            self.service._query_tracking("TN1", "ups"),
+            self.service._query_tracking("TN1", "dhl"),
+            self.service._query_tracking("TN2"),
+        )
+
+        self.assertEqual([r["carrier"] for r in results], ["dhl", "ups", "dhl", None])
+        # 17track answers by number only, so the second carrier goes in its own request
+        self.assertEqual(self.service.client.requests, [[("TN1", "dhl"), ("TN2", None)], [("TN1", "ups")]])
+
+
+if __name__ == "__main__":
+    unittest.main()
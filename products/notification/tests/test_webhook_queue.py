@@ -0,0 +1,150 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+import fakeredis
+
+from products.notification.webhook_queue import (
+    DEAD_KEY,
+    GROUP_NAME,
+    LOCK_KEY_PREFIX,
+    WebhookQueue,
+)
+
+
+class _RecordingProcessor:
+    """Records (event_id, attempt) calls and fails the configured event IDs."""
+
+    def __init__(self, failures=None):
+        self.calls = []
+        self.failures = dict(failures or {})
+
+    async def __call__(self, source, topic, payload, shop_domain):
+        event_id = payload["event_id"]
+        self.calls.append(event_id)
+        if self.failures.get(event_id, 0) > 0:
+            self.failures[event_id] -= 1
+            raise RuntimeError(f"boom {event_id}")
+        return {"status": "ok"}
+
+
+class WebhookQueueTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        self.processor = _RecordingProcessor()
+        with mock.patch.dict(os.environ, {"WEBHOOK_QUEUE_PARTITIONS": "1", "WEBHOOK_QUEUE_MAX_ATTEMPTS": "3"}):
+            self.queue = WebhookQueue(self.redis, processor=self.processor)
+        self.queue.retry_idle = 0
+        self.queue._ensure_groups()
+
+    def _ingest(self, event_id, ordering_key="order-1"):
+        fields = {
+            "source": "shopify",
+            "event_id": event_id,
+            "topic": "orders/updated",
+            "ordering_key": ordering_key,
+            "shop": "",
+            "payload": json.dumps({"event_id": event_id}),
+            "received_at": "0",
+        }
+        return self.queue._ingest(self.queue.partition_of(ordering_key), event_id, fields)
+
+    async def _drain(self, rounds=5):
+        """Run reclaim + read cycles the way the worker loop does."""
+        for _ in range(rounds):
+            reclaimed = self.queue._reclaim(0)
+            await self.queue._prune_held(0)
+            if reclaimed:
+                await self.queue._process_entries(0, reclaimed, reclaimed=True)
+            entries = self.queue._read_new(0)
+            if entries:
+                await self.queue._process_entries(0, entries, reclaimed=False)
+
+    async def test_duplicate_event_ids_are_queued_once(self):
+        self.assertTrue(self._ingest("evt-1"))
+        self.assertFalse(self._ingest("evt-1"))
+
+        await self._drain()
+
+        self.assertEqual(self.processor.calls, ["evt-1"])
+        self.assertEqual(self.queue.get_stats()["duplicates"], 1)
+
+    async def test_failed_event_holds_later_events_for_the_same_key(self):
+        self.processor.failures = {"evt-1": 1}
+        self._ingest("evt-1")
+        self._ingest("evt-2")
+        self._ingest("evt-other", ordering_key="order-2")
+
+        await self._drain()
+
+        # evt-2 waits until evt-1 succeeds on retry; other keys are not blocked
+        self.assertEqual(self.processor.calls, ["evt-1", "evt-other", "evt-1", "evt-2"])
+        stats = self.queue.get_stats()
+        self.assertEqual(stats["processed"], 3)
+        self.assertEqual(stats["retried"], 1)
+        self.assertEqual(stats["held"], 0)
+        self.assertEqual(stats["backlog"], 0)
+
+    async def test_reclaimed_entries_wait_behind_the_held_head(self):
+        self.processor.failures = {"evt-1": 1}
+        self._ingest("evt-1")
+        self._ingest("evt-2")
+        # Both entries delivered to this consumer, evt-1 fails
+        await self.queue._process_entries(0, self.queue._read_new(0)[:1], reclaimed=False)
+        # Both come back through XAUTOCLAIM (e.g. evt-2 was left pending by a crashed worker)
+        self.queue._read_new(0)
+
+        await self._drain()
+
+        self.assertEqual(self.processor.calls, ["evt-1", "evt-1", "evt-2"])
+
+    async def test_held_head_finished_by_another_consumer_is_released(self):
+        self.processor.failures = {"evt-1": 1}
+        self._ingest("evt-1")
+        await self.queue._process_entries(0, self.queue._read_new(0), reclaimed=False)
+        self.assertEqual(self.queue.get_stats()["held"], 1)
+
+        # Another worker claims the held head and processes it
+        stream = self.queue._stream_key(0)
+        self.redis.xautoclaim(stream, GROUP_NAME, "other-consumer", min_idle_time=0, start_id="0-0")
+        self.redis.xack(stream, GROUP_NAME, self.queue._held[0]["order-1"][0])
+        self._ingest("evt-2")
+
+        await self._drain()
+
+        self.assertEqual(self.processor.calls, ["evt-1", "evt-2"])
+        self.assertEqual(self.queue.get_stats()["held"], 0)
+
+    async def test_deleted_pending_entry_is_removed_from_the_held_queue(self):
+        self.processor.failures = {"evt-1": 1}
+        self._ingest("evt-1")
+        await self.queue._process_entries(0, self.queue._read_new(0), reclaimed=False)
+        entry_id = self.queue._held[0]["order-1"][0]
+
+        await self.queue._process_entries(0, [(entry_id, {})], reclaimed=True)
+
+        self.assertEqual(self.queue._held[0], {})
+
+    async def test_event_is_dead_lettered_after_max_attempts(self):
+        self.processor.failures = {"evt-1": 10}
+        self._ingest("evt-1")
+
+        await self._drain()
+
+        self.assertEqual(self.processor.calls, ["evt-1"] * 3)
+        dead = [json.loads(item) for item in self.redis.lrange(DEAD_KEY, 0, -1)]
+        self.assertEqual([item["event_id"] for item in dead], ["evt-1"])
+        self.assertEqual(self.queue.get_stats()["backlog"], 0)
+
+    async def test_lock_taken_by_another_consumer_is_not_released(self):
+        lock_key = f"{LOCK_KEY_PREFIX}order-1"
+        self.redis.set(lock_key, "other-consumer")
+
+        self.queue._release_lock(lock_key)
+
+        self.assertEqual(self.redis.get(lock_key), "other-consumer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,468 @@
+"""
+Webhook Ingestion Queue (Redis Streams)
+
+/webhook/shopify and /webhook/17track only verify, dedupe and enqueue, then
+return 200 right away. Background workers consume the events through a Redis
+consumer group and run the handlers (Shopify order lookup, 17track
+registration, email enqueueing).
+
+Storage:
+- notification:webhook:stream:{p}   STREAM  events, partitioned by hash(ordering_key)
+- notification:webhook:seen:{id}    STRING  dedup marker per event ID (SET NX EX)
+- notification:webhook:lock:{key}   STRING  per-order processing lock (SET NX EX)
+- notification:webhook:attempts     HASH    stream entry ID -> failed attempts
+- notification:webhook:dead         LIST    events that exhausted retries (latest 1000)
+
+Event IDs:
+- Shopify: X-Shopify-Webhook-Id header (topic + body hash if missing)
+- 17track: tracking number + hash of the pushed item (17track sends no event ID)
+
+Ordering: events with the same ordering key (Shopify order / tracking number)
+land in the same partition, and each process runs one worker per partition.
+The per-order lock serializes processes. While an entry for a key is waiting
+for a retry, every other entry for that key (new, or reclaimed from a dead
+consumer) is held back in stream-ID order and only the oldest one runs.
+
+Retries: if the handler raises, the entry is not acknowledged and stays in the
+pending list. XAUTOCLAIM picks it up again once it has been idle for
+retry_idle seconds. After max_attempts it is moved to the dead-letter list.
+Errors that handlers catch and report in their result are not retried, since
+emails may already have been queued.
+
+Backpressure: ingest() raises WebhookBacklogFull when a partition holds more
+than max_backlog entries; the route answers 503 so the sender retries later.
+
+Environment:
+- WEBHOOK_QUEUE_ENABLED: use the queue (default true; without Redis, process inline)
+- WEBHOOK_QUEUE_PARTITIONS: partitions / workers per process (default 4)
+- WEBHOOK_QUEUE_BATCH_SIZE: entries per read (default 20)
+- WEBHOOK_QUEUE_MAX_ATTEMPTS: attempts before dead-lettering (default 5)
+- WEBHOOK_QUEUE_RETRY_IDLE_SECONDS: idle time before a failed entry is retried (default 30)
+- WEBHOOK_QUEUE_MAX_BACKLOG: max entries per partition (default 10000)
+- WEBHOOK_QUEUE_DEDUP_TTL: how long event IDs are remembered (default 3 days)
+- WEBHOOK_QUEUE_LOCK_SECONDS: per-order lock lease (default 300)
+"""
+
+import os
+import json
+import time
+import zlib
+import socket
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY_PREFIX = "notification:webhook:stream:"
+SEEN_KEY_PREFIX = "notification:webhook:seen:"
+LOCK_KEY_PREFIX = "notification:webhook:lock:"
+ATTEMPTS_KEY = "notification:webhook:attempts"
+DEAD_KEY = "notification:webhook:dead"
+GROUP_NAME = "notification-workers"
+DEAD_LETTER_LIMIT = 1000
+
+# Delete the per-order lock only if this consumer still owns it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# (source, topic, payload, shop_domain) -> handler result
+WebhookProcessor = Callable[[str, str, Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+StreamEntry = Tuple[str, Optional[Dict[str, str]]]
+
+
+class WebhookBacklogFull(Exception):
+    """Raised by ingest() when the target partition is over max_backlog"""
+
+
+class WebhookQueue:
+    """Durable, deduplicated webhook queue + consumer-group workers"""
+
+    def __init__(self, redis_client, processor: Optional[WebhookProcessor] = None):
+        """
+        Args:
+            redis_client: Sync Redis client (decode_responses=True)
+            processor: Event handler (defaults to dispatch_webhook_event)
+        """
+        self.redis = redis_client
+        self._processor = processor
+        self.partitions = max(int(os.getenv("WEBHOOK_QUEUE_PARTITIONS", 4)), 1)
+        self.batch_size = max(int(os.getenv("WEBHOOK_QUEUE_BATCH_SIZE", 20)), 1)
+        self.max_attempts = max(int(os.getenv("WEBHOOK_QUEUE_MAX_ATTEMPTS", 5)), 1)
+        self.retry_idle = float(os.getenv("WEBHOOK_QUEUE_RETRY_IDLE_SECONDS", 30))
+        self.max_backlog = max(int(os.getenv("WEBHOOK_QUEUE_MAX_BACKLOG", 10000)), 1)
+        self.dedup_ttl = int(os.getenv("WEBHOOK_QUEUE_DEDUP_TTL", 3 * 24 * 3600))
+        self.lock_seconds = int(os.getenv("WEBHOOK_QUEUE_LOCK_SECONDS", 300))
+        self.poll_interval = 1.0
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeups: List[asyncio.Event] = []
+        # Per partition: ordering key -> pending entry IDs held back for ordering
+        self._held: List[Dict[str, Deque[str]]] = [{} for _ in range(self.partitions)]
+        self._stopping = False
+        self._stats = {"received": 0, "duplicates": 0, "rejected": 0, "processed": 0, "retried": 0, "dead": 0}
+
+    @property
+    def processor(self) -> WebhookProcessor:
+        if self._processor is None:
+            from .handlers.dispatcher import dispatch_webhook_event
+            self._processor = dispatch_webhook_event
+        return self._processor
+
+    def partition_of(self, ordering_key: str) -> int:
+        return zlib.crc32(ordering_key.encode("utf-8")) % self.partitions
+
+    @staticmethod
+    def _stream_key(partition: int) -> str:
+        return f"{STREAM_KEY_PREFIX}{partition}"
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Create consumer groups and start one worker per partition (idempotent)"""
+        if self._worker_tasks and not all(task.done() for task in self._worker_tasks):
+            return
+        await asyncio.to_thread(self._ensure_groups)
+        self._stopping = False
+        self._wakeups = [asyncio.Event() for _ in range(self.partitions)]
+        self._worker_tasks = [
+            asyncio.create_task(self._worker_loop(p), name=f"webhook-queue-worker-{p}")
+            for p in range(self.partitions)
+        ]
+        logger.info(f"[WebhookQueue] Started {self.partitions} workers (consumer={self.consumer})")
+
+    def _ensure_groups(self) -> None:
+        import redis
+
+        for p in range(self.partitions):
+            try:
+                self.redis.xgroup_create(self._stream_key(p), GROUP_NAME, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def shutdown(self) -> None:
+        """Stop workers; unacknowledged events stay in Redis"""
+        self._stopping = True
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    # ==================== Ingest ====================
+
+    async def ingest(
+        self,
+        source: str,
+        event_id: str,
+        topic: str,
+        ordering_key: str,
+        body: str,
+        shop_domain: str = "",
+    ) -> bool:
+        """
+        Persist one event
+
+        Args:
+            source: "shopify" or "17track"
+            event_id: Idempotency key
+            topic: Shopify topic / 17track event type
+            ordering_key: Events with the same key are processed in order
+            body: Event JSON (raw request body for Shopify)
+            shop_domain: Shopify shop domain
+
+        Returns:
+            True if queued, False if the event ID was already seen
+
+        Raises:
+            WebhookBacklogFull: Partition is over max_backlog
+        """
+        partition = self.partition_of(ordering_key)
+        fields = {
+            "source": source,
+            "event_id": event_id,
+            "topic": topic or "",
+            "ordering_key": ordering_key,
+            "shop": shop_domain or "",
+            "payload": body,
+            "received_at": str(time.time()),
+        }
+        queued = await asyncio.to_thread(self._ingest, partition, event_id, fields)
+        if queued:
+            await self.start()
+            self._wakeups[partition].set()
+        return queued
+
+    def _ingest(self, partition: int, event_id: str, fields: Dict[str, str]) -> bool:
+        stream = self._stream_key(partition)
+        if self.redis.xlen(stream) >= self.max_backlog:
+            self._stats["rejected"] += 1
+            raise WebhookBacklogFull(f"webhook partition {partition} backlog is full")
+
+        seen_key = f"{SEEN_KEY_PREFIX}{event_id}"
+        if not self.redis.set(seen_key, "1", nx=True, ex=self.dedup_ttl):
+            self._stats["duplicates"] += 1
+            return False
+        try:
+            self.redis.xadd(stream, fields)
+        except Exception:
+            # Let the sender's retry through
+            self.redis.delete(seen_key)
+            raise
+        self._stats["received"] += 1
+        return True
+
+    # ==================== Workers ====================
+
+    async def _worker_loop(self, partition: int) -> None:
+        next_reclaim = 0.0
+        while not self._stopping:
+            try:
+                if time.monotonic() >= next_reclaim:
+                    next_reclaim = time.monotonic() + max(self.retry_idle / 2, self.poll_interval)
+                    reclaimed = await asyncio.to_thread(self._reclaim, partition)
+                    await self._prune_held(partition)
+                    if reclaimed:
+                        await self._process_entries(partition, reclaimed, reclaimed=True)
+
+                entries = await asyncio.to_thread(self._read_new, partition)
+                if not entries:
+                    wakeup = self._wakeups[partition]
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._process_entries(partition, entries, reclaimed=False)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[WebhookQueue] Worker {partition} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _read_new(self, partition: int) -> List[StreamEntry]:
+        response = self.redis.xreadgroup(
+            GROUP_NAME, self.consumer, {self._stream_key(partition): ">"}, count=self.batch_size
+        )
+        return response[0][1] if response else []
+
+    def _reclaim(self, partition: int) -> List[StreamEntry]:
+        """Claim entries (ours or a dead consumer's) that have been pending for retry_idle"""
+        response = self.redis.xautoclaim(
+            self._stream_key(partition),
+            GROUP_NAME,
+            self.consumer,
+            min_idle_time=int(self.retry_idle * 1000),
+            start_id="0-0",
+            count=self.batch_size,
+        )
+        return response[1] if response else []
+
+    async def _process_entries(self, partition: int, entries: List[StreamEntry], reclaimed: bool) -> None:
+        held = self._held[partition]
+        for entry_id, fields in entries:
+            if not fields:
+                # Entry was deleted while pending
+                await asyncio.to_thread(self._ack, partition, entry_id)
+                self._drop_held(held, {entry_id})
+                continue
+
+            key = fields.get("ordering_key") or entry_id
+            queue = held.get(key)
+            if queue:
+                # An earlier event for this key is waiting for a retry: only the oldest held entry runs
+                self._hold(queue, entry_id)
+                if queue[0] != entry_id:
+                    continue
+
+            done = await self._handle(partition, entry_id, fields)
+            if done:
+                if queue and queue[0] == entry_id:
+                    queue.popleft()
+                    if not queue:
+                        del held[key]
+            elif queue is None:
+                held[key] = deque([entry_id])
+
+    async def _prune_held(self, partition: int) -> None:
+        """
+        Forget held entries that are no longer pending for this consumer
+
+        Another consumer may have claimed a held head via XAUTOCLAIM and acked it;
+        left in place it would block its ordering key here forever.
+        """
+        held = self._held[partition]
+        if not held:
+            return
+        entry_ids = [entry_id for queue in held.values() for entry_id in queue]
+        owned = await asyncio.to_thread(self._owned_pending, partition, entry_ids)
+        self._drop_held(held, set(entry_ids) - owned)
+
+    def _owned_pending(self, partition: int, entry_ids: List[str]) -> Set[str]:
+        """Subset of entry_ids in this consumer's pending entries list"""
+        stream = self._stream_key(partition)
+        pipe = self.redis.pipeline(transaction=False)
+        for entry_id in entry_ids:
+            pipe.xpending_range(
+                stream, GROUP_NAME, min=entry_id, max=entry_id, count=1, consumername=self.consumer
+            )
+        return {row["message_id"] for rows in pipe.execute() for row in rows}
+
+    @staticmethod
+    def _drop_held(held: Dict[str, Deque[str]], entry_ids: Set[str]) -> None:
+        if not entry_ids:
+            return
+        for key in list(held):
+            queue = deque(entry_id for entry_id in held[key] if entry_id not in entry_ids)
+            if queue:
+                held[key] = queue
+            else:
+                del held[key]
+
+    @staticmethod
+    def _entry_order(entry_id: str) -> Tuple[int, int]:
+        ms, _, seq = entry_id.partition("-")
+        return int(ms), int(seq or 0)
+
+    def _hold(self, queue: Deque[str], entry_id: str) -> None:
+        """Insert an entry into a key's held queue, keeping stream-ID order"""
+        if entry_id in queue:
+            return
+        order = self._entry_order(entry_id)
+        for index, queued_id in enumerate(queue):
+            if order < self._entry_order(queued_id):
+                queue.insert(index, entry_id)
+                return
+        queue.append(entry_id)
+
+    async def _handle(self, partition: int, entry_id: str, fields: Dict[str, str]) -> bool:
+        """
+        Run the processor for one entry
+
+        Returns:
+            True if the entry was acknowledged (processed or dead-lettered),
+            False if it stays pending for a retry
+        """
+        lock_key = f"{LOCK_KEY_PREFIX}{fields.get('ordering_key') or entry_id}"
+        locked = await asyncio.to_thread(self.redis.set, lock_key, self.consumer, nx=True, ex=self.lock_seconds)
+        if not locked:
+            return False
+
+        try:
+            payload = json.loads(fields.get("payload") or "{}")
+            await self.processor(fields["source"], fields.get("topic", ""), payload, fields.get("shop", ""))
+        except Exception as e:
+            logger.warning(f"[WebhookQueue] {fields.get('source')} event {fields.get('event_id')} failed: {e}")
+            return await asyncio.to_thread(self._fail, partition, entry_id, fields, str(e))
+        else:
+            await asyncio.to_thread(self._ack, partition, entry_id)
+            self._stats["processed"] += 1
+            return True
+        finally:
+            await asyncio.to_thread(self._release_lock, lock_key)
+
+    def _ack(self, partition: int, entry_id: str) -> None:
+        stream = self._stream_key(partition)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xack(stream, GROUP_NAME, entry_id)
+        pipe.xdel(stream, entry_id)
+        pipe.hdel(ATTEMPTS_KEY, entry_id)
+        pipe.execute()
+
+    def _fail(self, partition: int, entry_id: str, fields: Dict[str, str], error: str) -> bool:
+        attempts = self.redis.hincrby(ATTEMPTS_KEY, entry_id, 1)
+        if attempts < self.max_attempts:
+            self._stats["retried"] += 1
+            return False
+
+        dead = {**fields, "entry_id": entry_id, "attempts": attempts, "error": error, "failed_at": time.time()}
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lpush(DEAD_KEY, json.dumps(dead, ensure_ascii=False, default=str))
+        pipe.ltrim(DEAD_KEY, 0, DEAD_LETTER_LIMIT - 1)
+        pipe.execute()
+        self._ack(partition, entry_id)
+        self._stats["dead"] += 1
+        logger.error(f"[WebhookQueue] Event {fields.get('event_id')} dead-lettered after {attempts} attempts: {error}")
+        return True
+
+    def _release_lock(self, lock_key: str) -> None:
+        # Atomic compare-and-delete: the lease may have expired and been taken by another consumer
+        self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, self.consumer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue statistics"""
+        backlog: Optional[int] = 0
+        pending: Optional[int] = 0
+        try:
+            for p in range(self.partitions):
+                backlog += self.redis.xlen(self._stream_key(p))
+                pending += int(self.redis.xpending(self._stream_key(p), GROUP_NAME).get("pending") or 0)
+            dead = self.redis.llen(DEAD_KEY)
+        except Exception:
+            backlog = pending = dead = None
+        return {
+            **self._stats,
+            "backlog": backlog,
+            "pending": pending,
+            "held": sum(len(q) for held in self._held for q in held.values()),
+            "dead_letters": dead,
+            "workers": len([task for task in self._worker_tasks if not task.done()]),
+        }
+
+
+# Global instance
+_webhook_queue: Optional[WebhookQueue] = None
+_queue_unavailable = False
+
+
+def get_webhook_queue() -> Optional[WebhookQueue]:
+    """
+    Get the global webhook queue
+
+    Reuses the bootstrap Redis client; in standalone mode connects to REDIS_URL.
+
+    Returns:
+        WebhookQueue, or None if disabled or Redis is unavailable
+    """
+    global _webhook_queue, _queue_unavailable
+
+    if _webhook_queue is not None:
+        return _webhook_queue
+    if _queue_unavailable or os.getenv("WEBHOOK_QUEUE_ENABLED", "true").lower() != "true":
+        return None
+
+    try:
+        from infrastructure.bootstrap.redis import get_redis_client
+        redis_client = get_redis_client()
+        if redis_client is None:
+            import redis
+            redis_client = redis.Redis.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                decode_responses=True,
+                socket_timeout=5.0,
+                socket_connect_timeout=5.0
+            )
+            redis_client.ping()
+        _webhook_queue = WebhookQueue(redis_client)
+    except Exception as e:
+        _queue_unavailable = True
+        logger.warning(f"[WebhookQueue] Redis unavailable, webhooks will be processed inline: {e}")
+        return None
+
+    return _webhook_queue
+
+
+async def shutdown_webhook_queue() -> None:
+    """Stop the global queue's workers"""
+    if _webhook_queue is not None:
+        await _webhook_queue.shutdown()
@@ -0,0 +1,229 @@
+"""
+产品/配件图片匹配索引
+
+素材映射表加载时构建一次（reload_mapping 时重建），替代逐项全量 SequenceMatcher 比对：
+- SKU 精确匹配：大写 SKU -> 条目
+- SKU 子串匹配：SKU 字典树（插入每个 SKU 的全部后缀），
+  支持「查询 SKU 包含映射 SKU」与「映射 SKU 包含查询 SKU」两个方向，与原逐项比较语义一致
+- 名称匹配：标题精确匹配表 + 标题词倒排索引；只对共享词的候选条目做模糊打分，
+  出现在过多条目中的通用词（fiido / bike / for 等）不参与候选召回
+- (title, sku) 匹配结果 LRU 缓存
+
+评分规则与原实现一致：
+- 配件：SKU 精确 1.0，SKU 包含 0.95，标题精确 0.95，模糊相似度（上限 0.9）
+- 产品：SKU 包含 1.0，标题精确 0.95，模糊相似度 + 关键词加分（上限 0.9）
+- 同分时按映射表顺序取先出现的（配件在前）；得分需大于 0.5
+
+配置环境变量：
+- ASSET_MATCH_CACHE_SIZE: 匹配结果缓存条数（默认4096）
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+MATCH_CACHE_SIZE = int(os.getenv("ASSET_MATCH_CACHE_SIZE", "4096"))
+
+# 出现在超过该比例条目中的标题词不用于候选召回
+COMMON_TOKEN_RATIO = 0.25
+
+KIND_ACCESSORY = "accessory"
+KIND_PRODUCT = "product"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+
+# 条目引用：(类型, 映射表中的 key)
+ItemRef = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """标题分词（小写字母数字，保留 3.005 这类带点编号）"""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    # 经过该节点的后缀所属条目（即 SKU 包含从根到该节点字符串的条目）
+    items: Set[ItemRef] = field(default_factory=set)
+    # 以该节点结束的完整 SKU 所属条目
+    terminal: Set[ItemRef] = field(default_factory=set)
+
+
+class SkuTrie:
+    """SKU 字典树：插入每个 SKU 的全部后缀，支持双向子串查找"""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, sku: str, ref: ItemRef) -> None:
+        for start in range(len(sku)):
+            node = self.root
+            for char in sku[start:]:
+                node = node.children.setdefault(char, _TrieNode())
+                node.items.add(ref)
+            if start == 0:
+                node.terminal.add(ref)
+
+    def containing(self, query: str) -> Set[ItemRef]:
+        """SKU 包含 query 的条目"""
+        node = self.root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.items
+
+    def contained_in(self, query: str) -> Set[ItemRef]:
+        """完整 SKU 是 query 子串的条目（从 query 每个位置沿树向下走）"""
+        found: Set[ItemRef] = set()
+        for start in range(len(query)):
+            node = self.root
+            for char in query[start:]:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                found |= node.terminal
+        return found
+
+
+class ProductMatchIndex:
+    """素材映射表的图片匹配索引（构建后只读，匹配结果带 LRU 缓存）"""
+
+    def __init__(
+        self,
+        mapping: Dict,
+        keyword_extractor: Callable[[str], List[str]],
+        cache_size: int = MATCH_CACHE_SIZE,
+    ):
+        """
+        Args:
+            mapping: 素材映射表（含 products / accessories）
+            keyword_extractor: 产品关键词提取函数（产品模糊匹配加分用）
+            cache_size: 匹配结果缓存条数
+        """
+        self.items: Dict[ItemRef, Dict] = {}
+        self.sku_exact: Dict[str, Set[ItemRef]] = {}
+        self.sku_trie = SkuTrie()
+        self.title_exact: Dict[str, Set[ItemRef]] = {}
+        self.token_index: Dict[str, Set[ItemRef]] = {}
+        self._titles: Dict[ItemRef, str] = {}
+        self._order: Dict[ItemRef, int] = {}
+        self._extract_keywords = keyword_extractor
+        self._cache_size = max(cache_size, 0)
+        self._cache: "OrderedDict[Tuple[str, str], Optional[Tuple[ItemRef, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        for kind, section in ((KIND_ACCESSORY, "accessories"), (KIND_PRODUCT, "products")):
+            for key, info in (mapping.get(section) or {}).items():
+                self._add((kind, key), info)
+
+        # 通用词不参与召回，否则几乎所有条目都会成为候选
+        limit = max(3, int(len(self.items) * COMMON_TOKEN_RATIO))
+        self.token_index = {token: refs for token, refs in self.token_index.items() if len(refs) <= limit}
+
+    def _add(self, ref: ItemRef, info: Dict) -> None:
+        self.items[ref] = info
+        self._order[ref] = len(self._order)
+        for sku in info.get("skus", []) or []:
+            sku_upper = str(sku).upper()
+            if not sku_upper:
+                continue
+            self.sku_exact.setdefault(sku_upper, set()).add(ref)
+            self.sku_trie.insert(sku_upper, ref)
+
+        title = (info.get("title") or "").lower()
+        self._titles[ref] = title
+        if title:
+            self.title_exact.setdefault(title, set()).add(ref)
+        for token in set(tokenize(title)):
+            self.token_index.setdefault(token, set()).add(ref)
+
+    # ==================== 匹配 ====================
+
+    def match(self, product_name: str, sku: Optional[str] = None) -> Optional[Tuple[str, str, Dict, float]]:
+        """
+        匹配最佳条目
+
+        Returns:
+            (类型, key, 条目信息, 得分)；得分不大于 0.5 时返回 None
+        """
+        cache_key = (product_name or "", sku or "")
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                hit = self._cache[cache_key]
+                return (hit[0][0], hit[0][1], self.items[hit[0]], hit[1]) if hit else None
+
+        best = self._match_uncached(product_name or "", sku or "")
+
+        if self._cache_size:
+            with self._lock:
+                self._cache[cache_key] = best
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        if best is None:
+            return None
+        (kind, key), score = best
+        return kind, key, self.items[(kind, key)], score
+
+    def _match_uncached(self, product_name: str, sku: str) -> Optional[Tuple[ItemRef, float]]:
+        scores: Dict[ItemRef, float] = {}
+
+        # SKU：精确、双向包含
+        if sku:
+            sku_upper = sku.upper()
+            exact = self.sku_exact.get(sku_upper, set())
+            related = self.sku_trie.containing(sku_upper) | self.sku_trie.contained_in(sku_upper)
+            for ref in related:
+                if ref[0] == KIND_ACCESSORY:
+                    scores[ref] = 1.0 if ref in exact else 0.95
+                else:
+                    scores[ref] = 1.0
+
+        # 名称：精确匹配 + 倒排索引召回的候选做模糊打分
+        if product_name:
+            name_lower = product_name.lower()
+            exact_title = self.title_exact.get(name_lower, set())
+            candidates: Set[ItemRef] = set(exact_title)
+            for token in set(tokenize(name_lower)):
+                candidates |= self.token_index.get(token, set())
+
+            keywords: Optional[List[str]] = None
+            for ref in candidates:
+                if scores.get(ref, 0.0) >= 1.0:
+                    continue
+                if ref in exact_title:
+                    name_score = 0.95
+                else:
+                    title = self._titles[ref]
+                    ratio = SequenceMatcher(None, name_lower, title).ratio()
+                    if ref[0] == KIND_PRODUCT:
+                        if keywords is None:
+                            keywords = self._extract_keywords(product_name)
+                        ratio += 0.1 * sum(1 for kw in keywords if kw.lower() in title)
+                    name_score = min(ratio, 0.9)
+                scores[ref] = max(scores.get(ref, 0.0), name_score)
+
+        if not scores:
+            return None
+
+        # 同分时按映射表顺序取先出现的（配件在前，与原先顺序遍历、严格更高才替换一致）
+        best_ref = max(scores, key=lambda ref: (scores[ref], -self._order[ref]))
+        best_score = scores[best_ref]
+        if best_score <= 0.5:
+            return None
+        return best_ref, best_score
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "items": len(self.items),
+            "skus": len(self.sku_exact),
+            "tokens": len(self.token_index),
+            "cached_matches": len(self._cache),
+        }
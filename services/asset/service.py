@@ -9,7 +9,8 @@ import json
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from difflib import SequenceMatcher
+
+from .match_index import KIND_ACCESSORY, ProductMatchIndex
 
 # 配置
 ASSETS_DIR = Path(__file__).parent / "data"
@@ -17,11 +18,12 @@ MAPPING_FILE = ASSETS_DIR / "assets_mapping.json"
 
 # 缓存
 _mapping_cache: Optional[Dict] = None
+_match_index: Optional[ProductMatchIndex] = None
 
 
 def load_mapping() -> Dict:
-    """加载素材映射表"""
-    global _mapping_cache
+    """加载素材映射表（同时构建图片匹配索引）"""
+    global _mapping_cache, _match_index
 
     if _mapping_cache is not None:
         return _mapping_cache
@@ -30,11 +32,23 @@ def load_mapping() -> Dict:
         return {"products": {}, "accessories": {}, "brand": {}, "scenes": {}, "cdn_mode": False}
 
     with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-        _mapping_cache = json.load(f)
+        mapping = json.load(f)
+
+    _match_index = ProductMatchIndex(mapping, _extract_keywords)
+    _mapping_cache = mapping
 
     return _mapping_cache
 
 
+def get_match_index() -> ProductMatchIndex:
+    """获取图片匹配索引（随映射表加载构建）"""
+    mapping = load_mapping()
+    if _match_index is None:
+        # 映射文件不存在时使用空索引
+        return ProductMatchIndex(mapping, _extract_keywords, cache_size=0)
+    return _match_index
+
+
 def is_cdn_mode() -> bool:
     """检查是否启用 CDN 模式"""
     mapping = load_mapping()
@@ -42,16 +56,18 @@ def is_cdn_mode() -> bool:
 
 
 def reload_mapping():
-    """重新加载映射表（用于更新后刷新）"""
-    global _mapping_cache
+    """重新加载映射表（用于更新后刷新，匹配索引与匹配缓存一并重建）"""
+    global _mapping_cache, _match_index
     _mapping_cache = None
+    _match_index = None
     return load_mapping()
 
 
 def clear_mapping_cache() -> None:
     """清空映射表缓存（不触发重新加载）"""
-    global _mapping_cache
+    global _mapping_cache, _match_index
     _mapping_cache = None
+    _match_index = None
 
 
 def find_best_product_image(
@@ -96,6 +112,8 @@ def match_product_image(
     """
     根据产品名称或 SKU 匹配产品或配件图片
 
+    通过映射表加载时构建的匹配索引查找（SKU 字典树 + 标题倒排索引），结果按 (名称, SKU) 缓存
+
     Args:
         product_name: 产品/配件名称（如 "Titan Fat Tire Touring Ebike" 或 "Bike Rack Pannier Bag"）
         sku: 产品/配件 SKU（如 "M25-145H-US" 或 "A5901"）
@@ -105,99 +123,15 @@ def match_product_image(
     Returns:
         匹配结果，包含 title, image_url, product_url 等
     """
-    mapping = load_mapping()
-    products = mapping.get("products", {})
-    accessories = mapping.get("accessories", {})
-
-    if not products and not accessories:
-        return None
-
-    best_match = None
-    best_score = 0.0
-    is_accessory = False
-
-    # 先搜索配件（SKU匹配通常更准确）
-    for key, acc_info in accessories.items():
-        score = 0.0
-
-        # SKU 匹配（最高优先级）
-        if sku:
-            acc_skus = acc_info.get("skus", [])
-            for acc_sku in acc_skus:
-                if sku.upper() == acc_sku.upper():
-                    score = 1.0  # 精确匹配
-                    break
-                elif sku.upper() in acc_sku.upper() or acc_sku.upper() in sku.upper():
-                    score = 0.95  # 部分匹配
-                    break
-
-        # 配件名称匹配
-        if score < 1.0 and product_name:
-            title = acc_info.get("title", "")
-
-            # 精确匹配
-            if product_name.lower() == title.lower():
-                score = 0.95
-            else:
-                # 模糊匹配
-                name_score = SequenceMatcher(
-                    None,
-                    product_name.lower(),
-                    title.lower()
-                ).ratio()
-                score = max(score, min(name_score, 0.9))
-
-        if score > best_score:
-            best_score = score
-            best_match = (key, acc_info)
-            is_accessory = True
-
-    # 再搜索产品
-    for key, product_info in products.items():
-        score = 0.0
-
-        # SKU 匹配（最高优先级）
-        if sku:
-            product_skus = product_info.get("skus", [])
-            for product_sku in product_skus:
-                if sku.upper() in product_sku.upper() or product_sku.upper() in sku.upper():
-                    score = 1.0
-                    break
-
-        # 产品名称匹配
-        if score < 1.0 and product_name:
-            title = product_info.get("title", "")
-
-            # 精确匹配
-            if product_name.lower() == title.lower():
-                score = 0.95
-            else:
-                # 模糊匹配
-                name_score = SequenceMatcher(
-                    None,
-                    product_name.lower(),
-                    title.lower()
-                ).ratio()
-
-                # 关键词匹配加分
-                keywords = _extract_keywords(product_name)
-                for kw in keywords:
-                    if kw.lower() in title.lower():
-                        name_score += 0.1
-
-                score = max(score, min(name_score, 0.9))
-
-        if score > best_score:
-            best_score = score
-            best_match = (key, product_info)
-            is_accessory = False
+    index = get_match_index()
+    match = index.match(product_name, sku)
 
     # 只有匹配度大于 0.5 才返回
-    if best_match and best_score > 0.5:
-        key, item_info = best_match
+    if match:
+        kind, _, item_info, best_score = match
         use_cdn = is_cdn_mode()
 
-        if is_accessory:
+        if kind == KIND_ACCESSORY:
             # 配件图片
             # 优先使用 CDN URL
             if use_cdn and item_info.get("cdn_url"):
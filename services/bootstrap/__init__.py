@@ -15,6 +15,7 @@ from infrastructure.bootstrap import (
 )
 
 from services.session.redis_store import RedisSessionStore
+from services.session.async_redis_store import AsyncRedisSessionStore
 from services.session.state import InMemorySessionStore
 from services.ticket.store import TicketStore
 from services.ticket.template import TicketTemplateStore
@@ -40,7 +41,7 @@ def _init_regulator():
 
 
 # 注册依赖实现
-register_session_store_impls(RedisSessionStore, InMemorySessionStore)
+register_session_store_impls(RedisSessionStore, InMemorySessionStore, AsyncRedisSessionStore)
 register_ticket_store_impls(TicketStore, TicketTemplateStore, AuditLogStore, QuickReplyStore)
 register_token_manager_factory(OAuthTokenManager.from_env)
 register_component_initializer(Component.REGULATOR, _init_regulator)
@@ -1,11 +1,14 @@
 """
 Coze AI service module
 
-Provides Coze API token management
+Provides Coze API token management and the shared Coze HTTP client
 """
 
 from services.coze.token_manager import OAuthTokenManager
+from services.coze.http_client import get_coze_http_client, close_coze_http_client
 
 __all__ = [
     "OAuthTokenManager",
+    "get_coze_http_client",
+    "close_coze_http_client",
 ]
@@ -0,0 +1,62 @@
+"""
+Coze HTTP 客户端（进程内共享）
+
+所有对 Coze API 的异步请求（聊天、流式聊天、Access Token）复用同一个
+httpx.AsyncClient 连接池，避免每个请求重新建立 TCP/TLS 连接。
+
+配置环境变量：
+- HTTP_TIMEOUT_CONNECT / HTTP_TIMEOUT_READ / HTTP_TIMEOUT_WRITE / HTTP_TIMEOUT_POOL: 默认超时
+- COZE_HTTP_MAX_CONNECTIONS: 最大连接数（默认100）
+- COZE_HTTP_MAX_KEEPALIVE: 最大空闲长连接数（默认20）
+- COZE_HTTP_KEEPALIVE_EXPIRY: 空闲连接保留时间（秒，默认60）
+"""
+
+import os
+from typing import Optional
+
+import httpx
+
+# 注意：Coze Workflow 调用插件（如 Shopify 订单查询）可能需要较长时间，read 超时需要足够长
+HTTP_TIMEOUT = httpx.Timeout(
+    connect=float(os.getenv("HTTP_TIMEOUT_CONNECT", 10.0)),
+    read=float(os.getenv("HTTP_TIMEOUT_READ", 120.0)),
+    write=float(os.getenv("HTTP_TIMEOUT_WRITE", 30.0)),
+    pool=float(os.getenv("HTTP_TIMEOUT_POOL", 10.0))
+)
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("COZE_HTTP_MAX_CONNECTIONS", 100)),
+    max_keepalive_connections=int(os.getenv("COZE_HTTP_MAX_KEEPALIVE", 20)),
+    keepalive_expiry=float(os.getenv("COZE_HTTP_KEEPALIVE_EXPIRY", 60.0))
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_coze_http_client() -> httpx.AsyncClient:
+    """
+    获取共享的 Coze 异步 HTTP 客户端（首次调用时创建）
+
+    请求结束后不要关闭该客户端，应用关闭时调用 close_coze_http_client()。
+    """
+    global _client
+
+    if _client is None:
+        # 禁用环境代理，与原先每次请求新建客户端的行为一致
+        _client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, trust_env=False)
+    return _client
+
+
+async def close_coze_http_client() -> None:
+    """关闭共享客户端的连接池"""
+    global _client
+
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def reset_coze_http_client() -> None:
+    """丢弃共享客户端引用（仅用于测试）"""
+    global _client
+    _client = None
@@ -1,16 +1,30 @@
 """
 OAuth Token 管理器
 负责使用 JWT 获取和管理 Coze Access Token
+
+- 按 session_name 缓存 Token，LRU 淘汰（最多 COZE_TOKEN_CACHE_SIZE 个，默认5000），过期即失效
+- 异步接口 aget_access_token：同一 session 的并发刷新只发一次请求（single-flight），
+  Token 进入提前续期窗口（COZE_TOKEN_REFRESH_AHEAD 秒，默认1800）后，
+  继续返回缓存的 Token，同时在后台续期
+- 同步接口 get_access_token 保留给启动流程等同步调用方，共用同一份缓存
 """
 
 import time
+import asyncio
+import logging
+import threading
 import requests
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import os
 
+import httpx
+
 from services.coze.jwt_signer import JWTSigner
 
+logger = logging.getLogger(__name__)
+
 
 class OAuthTokenManager:
     """OAuth 令牌管理器 - 使用 JWT 获取和刷新 Access Token"""
@@ -19,7 +33,9 @@ class OAuthTokenManager:
         self,
         jwt_signer: JWTSigner,
         api_base: str = "https://api.coze.com",
-        token_ttl: int = 86399  # 令牌有效期，默认 24 小时 - 1 秒
+        token_ttl: int = 86399,  # 令牌有效期，默认 24 小时 - 1 秒
+        max_cache_size: Optional[int] = None,
+        refresh_ahead: Optional[int] = None
     ):
         """
         初始化令牌管理器
@@ -28,13 +44,26 @@ class OAuthTokenManager:
             jwt_signer: JWT 签名器实例
             api_base: Coze API 基础 URL
             token_ttl: Access Token 请求的有效期（秒），最大 86400
+            max_cache_size: 最多缓存的 session 数（默认读取 COZE_TOKEN_CACHE_SIZE）
+            refresh_ahead: 过期前多少秒开始后台续期（默认读取 COZE_TOKEN_REFRESH_AHEAD）
         """
         self.jwt_signer = jwt_signer
         self.api_base = api_base.rstrip('/')
         self.token_ttl = min(token_ttl, 86400)  # 最大 24 小时
+        self.max_cache_size = max(
+            max_cache_size if max_cache_size is not None else int(os.getenv("COZE_TOKEN_CACHE_SIZE", 5000)),
+            1
+        )
+        self.refresh_ahead = (
+            refresh_ahead if refresh_ahead is not None else int(os.getenv("COZE_TOKEN_REFRESH_AHEAD", 1800))
+        )
 
-        # Token 缓存（按 session_name 分别缓存）
-        self._token_cache: Dict[str, Dict[str, Any]] = {}  # {session_name: {token, expires_at}}
+        # Token 缓存（按 session_name 分别缓存，LRU 顺序）
+        self._token_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # {session_name: {token, expires_at}}
+        self._lock = threading.Lock()
+        # 进行中的异步刷新（single-flight）
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "fetches": 0, "background_renewals": 0, "evictions": 0}
 
     @classmethod
     def from_env(cls) -> "OAuthTokenManager":
@@ -93,6 +122,40 @@ class OAuthTokenManager:
         except requests.exceptions.RequestException as e:
             raise Exception(f"请求 Access Token 失败: {str(e)}")
 
+    async def _arequest_access_token(
+        self,
+        session_name: Optional[str] = None,
+        device_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """_request_access_token 的异步版本（使用共享的 Coze HTTP 客户端）"""
+        from services.coze.http_client import get_coze_http_client
+
+        jwt_token = self.jwt_signer.create_jwt(
+            session_name=session_name,
+            device_id=device_id
+        )
+
+        url = f"{self.api_base}/api/permission/oauth2/token"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {jwt_token}"
+        }
+        payload = {
+            "duration_seconds": self.token_ttl,
+            "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer"
+        }
+
+        try:
+            response = await get_coze_http_client().post(url, json=payload, headers=headers, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            raise Exception(f"请求 Access Token 失败: {str(e)}")
+
+        if "access_token" not in data:
+            raise Exception(f"响应中缺少 access_token: {data}")
+        return data
+
     def get_access_token(
         self,
         session_name: Optional[str] = None,
@@ -102,6 +165,8 @@ class OAuthTokenManager:
         """
         获取有效的 Access Token（带缓存，按 session_name 隔离）
 
+        同步阻塞版本，事件循环中请使用 aget_access_token。
+
         Args:
             session_name: 用户会话名称（用于会话隔离）
             device_id: 设备 ID
@@ -114,9 +179,10 @@ class OAuthTokenManager:
         cache_key = session_name or "default"
 
         # 检查缓存的令牌是否仍然有效
-        if not force_refresh and self._is_token_valid(cache_key):
-            print(f"♻️  使用缓存的 Token (session: {cache_key})")
-            return self._token_cache[cache_key]["token"]
+        if not force_refresh:
+            token_info = self._get_cached(cache_key)
+            if token_info is not None:
+                return token_info["token"]
 
         # 请求新令牌
         print(f"🔄 为 session '{cache_key}' 获取新的 Access Token...")
@@ -124,19 +190,97 @@ class OAuthTokenManager:
             session_name=session_name,
             device_id=device_id
         )
+        return self._store_token(cache_key, token_data, session_name)
+
+    async def aget_access_token(
+        self,
+        session_name: Optional[str] = None,
+        device_id: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> str:
+        """
+        获取有效的 Access Token（异步，带缓存，按 session_name 隔离）
+
+        - 缓存命中直接返回；进入续期窗口时返回旧 Token 并在后台续期
+        - 同一 session 的并发请求共享一次 Token 请求
+
+        Args:
+            session_name: 用户会话名称（用于会话隔离）
+            device_id: 设备 ID
+            force_refresh: 是否强制刷新令牌
 
-        # 更新缓存
+        Returns:
+            有效的 Access Token 字符串
+        """
+        cache_key = session_name or "default"
+
+        if not force_refresh:
+            token_info = self._get_cached(cache_key)
+            if token_info is not None:
+                if datetime.now() >= token_info["refresh_at"] and cache_key not in self._inflight:
+                    self._stats["background_renewals"] += 1
+                    self._start_fetch(cache_key, session_name, device_id)
+                return token_info["token"]
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = self._start_fetch(cache_key, session_name, device_id)
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, cache_key: str, session_name: Optional[str], device_id: Optional[str]) -> asyncio.Task:
+        """发起一次异步 Token 请求，并登记为该 session 的进行中请求"""
+        print(f"🔄 为 session '{cache_key}' 获取新的 Access Token...")
+
+        async def _fetch() -> str:
+            token_data = await self._arequest_access_token(session_name=session_name, device_id=device_id)
+            return self._store_token(cache_key, token_data, session_name)
+
+        task = asyncio.get_running_loop().create_task(_fetch())
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda t: self._on_fetch_done(cache_key, t))
+        return task
+
+    def _on_fetch_done(self, cache_key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # 后台续期没有等待方，异常在这里取出并记录
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[Coze] Access Token 获取失败 (session: {cache_key}): {task.exception()}")
+
+    def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """读取有效的缓存令牌（命中时移到 LRU 队尾，过期条目直接删除）"""
+        with self._lock:
+            token_info = self._token_cache.get(cache_key)
+            if token_info is None:
+                return None
+            if not self._is_token_valid(cache_key):
+                del self._token_cache[cache_key]
+                return None
+            self._token_cache.move_to_end(cache_key)
+            self._stats["hits"] += 1
+            return token_info
+
+    def _store_token(self, cache_key: str, token_data: Dict[str, Any], session_name: Optional[str]) -> str:
+        """写入缓存并按 LRU 淘汰超出容量的 session"""
         access_token = token_data["access_token"]
         expires_in = token_data.get("expires_in", self.token_ttl)
 
         # 计算过期时间（提前 5 分钟刷新，避免边界情况）
         expires_at = datetime.now() + timedelta(seconds=expires_in - 300)
-
-        self._token_cache[cache_key] = {
-            "token": access_token,
-            "expires_at": expires_at,
-            "session_name": session_name
-        }
+        refresh_at = expires_at - timedelta(seconds=min(self.refresh_ahead, max(expires_in - 300, 0) // 2))
+
+        with self._lock:
+            self._token_cache[cache_key] = {
+                "token": access_token,
+                "expires_at": expires_at,
+                "refresh_at": refresh_at,
+                "session_name": session_name
+            }
+            self._token_cache.move_to_end(cache_key)
+            while len(self._token_cache) > self.max_cache_size:
+                self._token_cache.popitem(last=False)
+                self._stats["evictions"] += 1
+            self._stats["fetches"] += 1
 
         print(f"✅ Access Token 获取成功 (session: {cache_key})，有效期至: {expires_at}")
 
@@ -144,10 +288,10 @@ class OAuthTokenManager:
 
     def _is_token_valid(self, cache_key: str) -> bool:
         """检查指定 session 的缓存令牌是否仍然有效"""
-        if cache_key not in self._token_cache:
+        token_info = self._token_cache.get(cache_key)
+        if token_info is None:
             return False
 
-        token_info = self._token_cache[cache_key]
         expires_at = token_info.get("expires_at")
 
         if expires_at is None:
@@ -186,11 +330,13 @@ class OAuthTokenManager:
         """
         if session_name:
             cache_key = session_name
-            if cache_key in self._token_cache:
-                del self._token_cache[cache_key]
+            with self._lock:
+                removed = self._token_cache.pop(cache_key, None)
+            if removed is not None:
                 print(f"🗑️  令牌缓存已清除 (session: {cache_key})")
         else:
-            self._token_cache.clear()
+            with self._lock:
+                self._token_cache.clear()
             print("🗑️  所有令牌缓存已清除")
 
     def get_token_info(self, session_name: Optional[str] = None) -> Dict[str, Any]:
@@ -218,15 +364,20 @@ class OAuthTokenManager:
                 }
         else:
             # 返回所有 session 的信息
+            with self._lock:
+                cached = list(self._token_cache.items())
             return {
-                "total_sessions": len(self._token_cache),
+                "total_sessions": len(cached),
+                "max_sessions": self.max_cache_size,
+                "refreshing": len(self._inflight),
+                "stats": dict(self._stats),
                 "sessions": {
                     key: {
                         "is_valid": self._is_token_valid(key),
                         "expires_at": info["expires_at"].isoformat(),
                         "token_preview": f"{info['token'][:20]}..."
                     }
-                    for key, info in self._token_cache.items()
+                    for key, info in cached
                 }
             }
 
@@ -0,0 +1,195 @@
+"""
+翻译结果缓存（工作台历史消息翻译）
+
+- 按原文内容哈希缓存译文：Redis coze:translate:zh:{sha256}，TTL 默认 7 天；
+  Redis 不可用时退化为进程内 LRU
+- 并发去重：同一原文的并发请求（多个标签页、多个坐席）只调用一次 Coze
+- 批量：一次请求中未命中缓存的原文去重后交给 translate_batch 一次性翻译
+
+配置环境变量：
+- COZE_TRANSLATE_CACHE_TTL: 缓存有效期（秒，默认604800）
+- COZE_TRANSLATE_LOCAL_CACHE_SIZE: 进程内缓存条数（默认2000）
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "coze:translate:zh:"
+
+# 批量翻译函数：接收去重后的原文列表，按相同顺序返回译文
+TranslateBatchFunc = Callable[[List[str]], Awaitable[List[str]]]
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """内容哈希缓存 + 相同原文并发请求合并"""
+
+    def __init__(self, redis_client=None, ttl: Optional[int] = None, local_max_size: Optional[int] = None):
+        """
+        Args:
+            redis_client: 同步 Redis 客户端（decode_responses=True），为 None 时只用进程内缓存
+            ttl: 缓存有效期（秒）
+            local_max_size: 进程内 LRU 条数
+        """
+        self.redis = redis_client
+        self.ttl = ttl if ttl is not None else int(os.getenv("COZE_TRANSLATE_CACHE_TTL", 7 * 24 * 3600))
+        self.local_max_size = max(
+            local_max_size if local_max_size is not None else int(os.getenv("COZE_TRANSLATE_LOCAL_CACHE_SIZE", 2000)),
+            1
+        )
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "batches": 0, "errors": 0}
+
+    async def translate(self, texts: List[str], translate_batch: TranslateBatchFunc) -> List[str]:
+        """
+        翻译一组原文（顺序与输入一致）
+
+        Args:
+            texts: 原文列表（可重复）
+            translate_batch: 实际调用 Coze 的批量翻译函数
+
+        Returns:
+            译文列表
+        """
+        keys = [_text_key(text) for text in texts]
+        unique: Dict[str, str] = dict(zip(keys, texts))
+
+        results = await self._get_many(list(unique))
+        self._stats["hits"] += len(results)
+
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: Dict[str, str] = {}
+        for key, text in unique.items():
+            if key in results:
+                continue
+            if key in self._inflight:
+                waiting[key] = self._inflight[key]
+                self._stats["coalesced"] += 1
+            else:
+                missing[key] = text
+
+        if missing:
+            self._stats["misses"] += len(missing)
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            waiting.update(futures)
+            task = loop.create_task(self._run_batch(missing, futures, translate_batch))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+
+        return [results[key] for key in keys]
+
+    async def _run_batch(
+        self,
+        missing: Dict[str, str],
+        futures: Dict[str, asyncio.Future],
+        translate_batch: TranslateBatchFunc
+    ) -> None:
+        """执行一次批量翻译并把结果分发给所有等待方（调用方断开不影响其他等待方）"""
+        self._stats["batches"] += 1
+        try:
+            translated = await translate_batch(list(missing.values()))
+            if len(translated) != len(missing):
+                raise ValueError(f"expected {len(missing)} translations, got {len(translated)}")
+            done = dict(zip(missing, translated))
+            for key, text in done.items():
+                futures[key].set_result(text)
+            # 空译文不缓存，下次重新翻译
+            await self._set_many({key: text for key, text in done.items() if text})
+        except Exception as e:
+            self._stats["errors"] += 1
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # 没有等待方时避免 "exception was never retrieved"
+                    future.add_done_callback(lambda f: f.exception())
+        finally:
+            for key, future in futures.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    # ==================== 存储 ====================
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        for key in keys:
+            if key in self._local:
+                self._local.move_to_end(key)
+                found[key] = self._local[key]
+
+        remote_keys = [key for key in keys if key not in found]
+        if self.redis is not None and remote_keys:
+            try:
+                values = await asyncio.to_thread(self.redis.mget, [KEY_PREFIX + key for key in remote_keys])
+            except Exception as e:
+                logger.warning(f"[TranslationCache] Redis 读取失败: {e}")
+                values = []
+            for key, value in zip(remote_keys, values):
+                if value:
+                    found[key] = value
+                    self._remember(key, value)
+        return found
+
+    async def _set_many(self, mapping: Dict[str, str]) -> None:
+        if not mapping:
+            return
+        for key, text in mapping.items():
+            self._remember(key, text)
+        if self.redis is None:
+            return
+
+        def _write() -> None:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, text in mapping.items():
+                pipe.set(KEY_PREFIX + key, text, ex=self.ttl)
+            pipe.execute()
+
+        try:
+            await asyncio.to_thread(_write)
+        except Exception as e:
+            logger.warning(f"[TranslationCache] Redis 写入失败: {e}")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._local[key] = text
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "inflight": len(self._inflight),
+            "local_entries": len(self._local),
+        }
+
+
+# 全局实例
+_translation_cache: Optional[TranslationCache] = None
+
+
+def get_translation_cache() -> TranslationCache:
+    """获取全局翻译缓存（优先复用 bootstrap 初始化的 Redis 客户端）"""
+    global _translation_cache
+
+    if _translation_cache is None:
+        redis_client = None
+        try:
+            from infrastructure.bootstrap.redis import get_redis_client
+            redis_client = get_redis_client()
+        except Exception as e:
+            logger.warning(f"[TranslationCache] Redis 不可用，仅使用进程内缓存: {e}")
+        _translation_cache = TranslationCache(redis_client)
+    return _translation_cache
@@ -1,17 +1,30 @@
 """
 Email service module
 
-Provides SMTP email sending functionality
+Provides SMTP email sending functionality, a pooled SMTP connection
+and a Redis-backed outbound queue
 """
 
 from services.email.service import (
     EmailService,
     get_email_service,
     send_escalation_email,
+    queue_escalation_email,
 )
+from services.email.outbox import (
+    EmailOutbox,
+    get_email_outbox,
+    shutdown_email_outbox,
+)
+from services.email.pool import SmtpConnectionPool
 
 __all__ = [
     "EmailService",
     "get_email_service",
     "send_escalation_email",
+    "queue_escalation_email",
+    "EmailOutbox",
+    "get_email_outbox",
+    "shutdown_email_outbox",
+    "SmtpConnectionPool",
 ]
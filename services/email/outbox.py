@@ -0,0 +1,299 @@
+"""
+邮件发送队列（Redis 持久化）
+
+Webhook 处理协程只负责入队，后台 worker 从 Redis 领取邮件并通过 SMTP 连接池发送，
+突发的 17track / Shopify 推送不会阻塞事件循环。
+
+存储结构：
+- email:outbox:jobs          HASH  job_id -> 邮件 JSON（含已尝试次数）
+- email:outbox:queue         ZSET  job_id -> 下次可发送时间戳
+- email:outbox:lease:{id}    STRING 领取租约（SET NX EX），进程崩溃后租约过期自动重新投递
+- email:outbox:dead          LIST  超过最大重试次数的邮件（保留最近 1000 条）
+
+领取流程：ZRANGEBYSCORE 取出到期邮件 -> SET NX 抢租约 -> 把到期时间推后一个租约周期，
+多进程、多 worker 并发领取不会重复发送。
+
+配置环境变量：
+- EMAIL_OUTBOX_ENABLED: 是否启用发送队列（默认true，Redis 不可用时直接异步发送）
+- EMAIL_OUTBOX_WORKERS: worker 数量（默认2）
+- EMAIL_OUTBOX_BATCH_SIZE: 单个 SMTP 会话发送的最大邮件数（默认10）
+- EMAIL_OUTBOX_MAX_ATTEMPTS: 最大发送次数（默认5）
+- EMAIL_OUTBOX_BACKOFF_SECONDS: 重试退避基数，按 2^n 递增（默认30）
+- EMAIL_OUTBOX_LEASE_SECONDS: 领取租约时长（默认120）
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+JOBS_KEY = "email:outbox:jobs"
+QUEUE_KEY = "email:outbox:queue"
+DEAD_KEY = "email:outbox:dead"
+LEASE_KEY_PREFIX = "email:outbox:lease:"
+DEAD_LETTER_LIMIT = 1000
+
+
+class EmailOutbox:
+    """Redis 持久化邮件发送队列 + 后台 worker"""
+
+    def __init__(self, redis_client, email_service=None):
+        """
+        Args:
+            redis_client: 同步 Redis 客户端（decode_responses=True）
+            email_service: EmailService 实例（默认使用全局实例）
+        """
+        self.redis = redis_client
+        self._email_service = email_service
+        self.workers = max(int(os.getenv('EMAIL_OUTBOX_WORKERS', 2)), 1)
+        self.batch_size = max(int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 10)), 1)
+        self.max_attempts = max(int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)), 1)
+        self.backoff_seconds = float(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+        self.lease_seconds = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', 120))
+        self.poll_interval = 1.0
+
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._stats = {"enqueued": 0, "sent": 0, "retried": 0, "dead": 0}
+
+    @property
+    def email_service(self):
+        if self._email_service is None:
+            from services.email.service import get_email_service
+            self._email_service = get_email_service()
+        return self._email_service
+
+    # ==================== 生命周期 ====================
+
+    async def start(self) -> None:
+        """启动后台 worker（重复调用无副作用）"""
+        if self._worker_tasks and not all(task.done() for task in self._worker_tasks):
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker_loop(), name=f"email-outbox-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"[EmailOutbox] 发送队列已启动 (workers={self.workers}, batch={self.batch_size})")
+
+    async def shutdown(self) -> None:
+        """停止后台 worker，未发送的邮件保留在 Redis 中"""
+        self._stopping = True
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self.email_service.pool.close_all()
+
+    # ==================== 入队 ====================
+
+    async def enqueue(
+        self,
+        subject: str,
+        html_content: str,
+        recipients: List[str],
+        email_type: str = "general",
+        related_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        邮件入队
+
+        Returns:
+            job_id（同时作为邮件记录的 record_id）
+        """
+        job_id = f"mail_{uuid.uuid4().hex}"
+        job = {
+            "id": job_id,
+            "subject": subject,
+            "html_content": html_content,
+            "recipients": recipients,
+            "email_type": email_type,
+            "related_id": related_id,
+            "metadata": metadata,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(JOBS_KEY, job_id, json.dumps(job, ensure_ascii=False, default=str))
+        pipe.zadd(QUEUE_KEY, {job_id: time.time()})
+        await asyncio.to_thread(pipe.execute)
+        self._stats["enqueued"] += 1
+
+        await self.start()
+        self._wakeup.set()
+        return job_id
+
+    # ==================== Worker ====================
+
+    async def _worker_loop(self) -> None:
+        while not self._stopping:
+            try:
+                jobs = await asyncio.to_thread(self._claim, self.batch_size)
+                if not jobs:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                messages = [(job["subject"], job["html_content"], job["recipients"]) for job in jobs]
+                errors = await asyncio.to_thread(self.email_service.deliver_batch, messages)
+                await asyncio.to_thread(self._complete, jobs, errors)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[EmailOutbox] worker 异常: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _claim(self, limit: int) -> List[Dict[str, Any]]:
+        """领取到期邮件（SET NX 租约保证同一封邮件只被一个 worker 领取）"""
+        now = time.time()
+        candidates = self.redis.zrangebyscore(QUEUE_KEY, "-inf", now, start=0, num=limit)
+        if not candidates:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in candidates:
+            pipe.set(f"{LEASE_KEY_PREFIX}{job_id}", "1", nx=True, ex=self.lease_seconds)
+        claimed = [job_id for job_id, ok in zip(candidates, pipe.execute()) if ok]
+        if not claimed:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(QUEUE_KEY, {job_id: now + self.lease_seconds for job_id in claimed}, xx=True)
+        pipe.hmget(JOBS_KEY, claimed)
+        _, raw_jobs = pipe.execute()
+
+        jobs = []
+        orphans = []
+        for job_id, raw in zip(claimed, raw_jobs):
+            if raw:
+                jobs.append(json.loads(raw))
+            else:
+                orphans.append(job_id)
+        if orphans:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zrem(QUEUE_KEY, *orphans)
+            pipe.delete(*(f"{LEASE_KEY_PREFIX}{job_id}" for job_id in orphans))
+            pipe.execute()
+        return jobs
+
+    def _complete(self, jobs: List[Dict[str, Any]], errors: List[Optional[str]]) -> None:
+        """根据发送结果删除、重新排期或转入死信"""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        records = []
+
+        for job, error in zip(jobs, errors):
+            job_id = job["id"]
+            if error is None:
+                pipe.hdel(JOBS_KEY, job_id)
+                pipe.zrem(QUEUE_KEY, job_id)
+                self._stats["sent"] += 1
+                records.append((job, "sent", None))
+                print(f"✅ 邮件发送成功: {job['subject']} -> {', '.join(job['recipients'])}")
+            else:
+                job["attempts"] = job.get("attempts", 0) + 1
+                job["last_error"] = error
+                if job["attempts"] >= self.max_attempts:
+                    pipe.hdel(JOBS_KEY, job_id)
+                    pipe.zrem(QUEUE_KEY, job_id)
+                    pipe.lpush(DEAD_KEY, json.dumps(job, ensure_ascii=False, default=str))
+                    pipe.ltrim(DEAD_KEY, 0, DEAD_LETTER_LIMIT - 1)
+                    self._stats["dead"] += 1
+                    records.append((job, "failed", error))
+                    print(f"❌ 邮件发送失败（已重试 {job['attempts']} 次）: {job['subject']}, 错误: {error}")
+                else:
+                    delay = self.backoff_seconds * (2 ** (job["attempts"] - 1))
+                    pipe.hset(JOBS_KEY, job_id, json.dumps(job, ensure_ascii=False, default=str))
+                    pipe.zadd(QUEUE_KEY, {job_id: now + delay})
+                    self._stats["retried"] += 1
+                    print(f"⚠️  邮件发送失败 (尝试 {job['attempts']}/{self.max_attempts})，{delay:.0f}s 后重试: {error}")
+            pipe.delete(f"{LEASE_KEY_PREFIX}{job_id}")
+
+        pipe.execute()
+
+        for job, status, error in records:
+            self.email_service.record_email(
+                subject=job["subject"],
+                recipients=job["recipients"],
+                email_type=job.get("email_type", "general"),
+                related_id=job.get("related_id"),
+                status=status,
+                message_id=job["id"],
+                error=error,
+                metadata=job.get("metadata"),
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        try:
+            pending = self.redis.zcard(QUEUE_KEY)
+            dead = self.redis.llen(DEAD_KEY)
+        except Exception:
+            pending = dead = None
+        return {
+            **self._stats,
+            "pending": pending,
+            "dead_letters": dead,
+            "workers": len([task for task in self._worker_tasks if not task.done()]),
+            "smtp_pool": self.email_service.pool.get_stats(),
+        }
+
+
+# 全局实例
+_email_outbox: Optional[EmailOutbox] = None
+_outbox_unavailable = False
+
+
+def get_email_outbox() -> Optional[EmailOutbox]:
+    """
+    获取全局邮件发送队列
+
+    优先复用 bootstrap 初始化的 Redis 客户端，独立部署（如物流通知服务）时按 REDIS_URL 连接。
+
+    Returns:
+        EmailOutbox 实例，未启用或 Redis 不可用时返回 None
+    """
+    global _email_outbox, _outbox_unavailable
+
+    if _email_outbox is not None:
+        return _email_outbox
+    if _outbox_unavailable or os.getenv('EMAIL_OUTBOX_ENABLED', 'true').lower() != 'true':
+        return None
+
+    try:
+        from infrastructure.bootstrap.redis import get_redis_client
+        redis_client = get_redis_client()
+        if redis_client is None:
+            import redis
+            redis_client = redis.Redis.from_url(
+                os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                decode_responses=True,
+                socket_timeout=5.0,
+                socket_connect_timeout=5.0
+            )
+            redis_client.ping()
+        _email_outbox = EmailOutbox(redis_client)
+    except Exception as e:
+        _outbox_unavailable = True
+        logger.warning(f"[EmailOutbox] Redis 不可用，邮件将直接异步发送: {e}")
+        return None
+
+    return _email_outbox
+
+
+async def shutdown_email_outbox() -> None:
+    """停止全局发送队列的 worker"""
+    if _email_outbox is not None:
+        await _email_outbox.shutdown()
@@ -0,0 +1,136 @@
+"""
+SMTP 连接池
+
+复用已登录的 SMTP 连接，避免每封邮件都重新建立 SSL/TLS 连接并登录。
+
+说明：
+- smtplib 是同步库，连接池线程安全，供 asyncio.to_thread 中的发送逻辑使用
+- 空闲超过 SMTP_POOL_IDLE_CHECK 秒的连接在复用前先发 NOOP 探活
+- 空闲超过 SMTP_POOL_MAX_IDLE 秒的连接直接关闭（服务端通常会主动断开）
+- 发送出错的连接不归还，直接丢弃
+
+配置环境变量：
+- SMTP_POOL_SIZE: 最大连接数（默认4）
+- SMTP_POOL_MAX_IDLE: 连接最大空闲秒数（默认240）
+- SMTP_POOL_IDLE_CHECK: 复用前 NOOP 探活的空闲阈值秒数（默认30）
+"""
+
+import os
+import time
+import queue
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SmtpConnectionPool:
+    """已认证 SMTP 连接池（线程安全）"""
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        max_size: Optional[int] = None,
+        max_idle: Optional[float] = None,
+        idle_check: Optional[float] = None,
+    ):
+        """
+        Args:
+            connect: 创建并登录 SMTP 连接的函数
+            max_size: 最大连接数
+            max_idle: 连接最大空闲秒数
+            idle_check: 复用前 NOOP 探活的空闲阈值秒数
+        """
+        self._connect = connect
+        self.max_size = max(max_size or int(os.getenv('SMTP_POOL_SIZE', 4)), 1)
+        self.max_idle = max_idle if max_idle is not None else float(os.getenv('SMTP_POOL_MAX_IDLE', 240))
+        self.idle_check = idle_check if idle_check is not None else float(os.getenv('SMTP_POOL_IDLE_CHECK', 30))
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self.created = 0
+        self.reused = 0
+
+    def _take_idle(self):
+        """取出一个可用的空闲连接，没有则返回 None"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                server, released_at = self._idle.pop()
+
+            idle_for = time.monotonic() - released_at
+            if idle_for > self.max_idle:
+                self._close(server)
+                continue
+            if idle_for > self.idle_check:
+                try:
+                    code, _ = server.noop()
+                    if code != 250:
+                        raise smtplib.SMTPServerDisconnected(f"NOOP {code}")
+                except Exception:
+                    self._close(server)
+                    continue
+            return server
+
+    @contextmanager
+    def connection(self, timeout: float = 60.0) -> Iterator[smtplib.SMTP]:
+        """
+        借出一个已登录的 SMTP 连接
+
+        Args:
+            timeout: 等待空闲连接的最长时间（秒）
+
+        Raises:
+            queue.Empty: 等待超时
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise queue.Empty("SMTP 连接池已满")
+
+        server = None
+        try:
+            server = self._take_idle()
+            if server is None:
+                server = self._connect()
+                self.created += 1
+            else:
+                self.reused += 1
+
+            yield server
+
+            with self._lock:
+                self._idle.append((server, time.monotonic()))
+            server = None
+        finally:
+            if server is not None:
+                self._close(server)
+            self._slots.release()
+
+    def _close(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "max_size": self.max_size,
+            "idle": idle,
+            "created": self.created,
+            "reused": self.reused,
+        }
@@ -7,6 +7,7 @@
 - 支持 HTML 模板
 - 重试机制和错误处理
 - 邮件发送记录（PostgreSQL）
+- SMTP 连接池复用 + Redis 持久化发送队列（见 pool.py / outbox.py）
 
 配置环境变量：
 - SMTP_HOST: SMTP服务器地址
@@ -16,19 +17,24 @@
 - SMTP_USE_TLS: 是否使用TLS（默认true）
 - EMAIL_RECIPIENTS: 收件人邮箱（逗号分隔）
 - EMAIL_FROM_NAME: 发件人名称
+- SMTP_POOL_SIZE / SMTP_POOL_MAX_IDLE / SMTP_POOL_IDLE_CHECK: 连接池配置（见 pool.py）
+- EMAIL_OUTBOX_*: 发送队列配置（见 outbox.py）
 """
 
 import os
 import smtplib
 import time
+import asyncio
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
+from services.email.pool import SmtpConnectionPool
+
 # 加载环境变量
 load_dotenv()
 
@@ -63,6 +69,7 @@ class EmailService:
         self.max_retries = 3
         self.retry_delay = 2  # 秒
         self._pg_enabled = enable_postgres
+        self.pool = SmtpConnectionPool(self._create_connection)
 
     def enable_postgres(self):
         """启用 PostgreSQL 记录"""
@@ -96,6 +103,137 @@ class EmailService:
         server.login(self.config.smtp_username, self.config.smtp_password)
         return server
 
+    def _build_message(self, subject: str, html_content: str, recipients: List[str]) -> MIMEMultipart:
+        """构造 HTML 邮件"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = formataddr((self.config.from_name, self.config.smtp_username))
+        msg['To'] = ', '.join(recipients)
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg
+
+    def _deliver(self, subject: str, html_content: str, recipients: List[str]):
+        """通过连接池发送单封邮件"""
+        msg = self._build_message(subject, html_content, recipients)
+        with self.pool.connection() as server:
+            server.sendmail(self.config.smtp_username, recipients, msg.as_string())
+
+    def deliver_batch(self, messages: List[Tuple[str, str, List[str]]]) -> List[Optional[str]]:
+        """
+        在同一个 SMTP 会话中发送多封邮件（供发送队列 worker 使用）
+
+        Args:
+            messages: [(subject, html_content, recipients), ...]
+
+        Returns:
+            与 messages 一一对应的错误信息列表，发送成功为 None
+        """
+        errors: List[Optional[str]] = [None] * len(messages)
+        if not self.config.is_configured():
+            return ['邮件服务未配置'] * len(messages)
+
+        pending = 0
+        try:
+            with self.pool.connection() as server:
+                for index, (subject, html_content, recipients) in enumerate(messages):
+                    pending = index
+                    msg = self._build_message(subject, html_content, recipients)
+                    try:
+                        server.sendmail(self.config.smtp_username, recipients, msg.as_string())
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                        # 单封邮件被拒，连接仍可继续使用
+                        errors[index] = str(e)
+                pending = len(messages)
+        except Exception as e:
+            # 连接级错误：当前及之后的邮件都未发送
+            for index in range(pending, len(messages)):
+                errors[index] = errors[index] or str(e)
+
+        return errors
+
+    def _check_sendable(
+        self,
+        subject: str,
+        recipients: Optional[List[str]],
+        email_type: str,
+        related_id: Optional[str],
+        metadata: Optional[Dict[str, Any]]
+    ) -> Tuple[List[str], Optional[dict]]:
+        """
+        检查配置和收件人
+
+        Returns:
+            (收件人列表, 失败结果)，可以发送时失败结果为 None
+        """
+        if not self.config.is_configured():
+            error = '邮件服务未配置'
+            recipients = recipients or []
+        else:
+            recipients = recipients or self.config.recipients
+            error = None if recipients else '没有收件人'
+
+        if error is None:
+            return recipients, None
+
+        # 记录失败的邮件
+        self.record_email(
+            subject=subject,
+            recipients=recipients,
+            email_type=email_type,
+            related_id=related_id,
+            status='failed',
+            error=error,
+            metadata=metadata
+        )
+        return recipients, {
+            'success': False,
+            'message_id': None,
+            'error': error
+        }
+
+    def _finish_send(
+        self,
+        subject: str,
+        recipients: List[str],
+        email_type: str,
+        related_id: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        error: Optional[str]
+    ) -> dict:
+        """记录发送结果并返回"""
+        if error is not None:
+            self.record_email(
+                subject=subject,
+                recipients=recipients,
+                email_type=email_type,
+                related_id=related_id,
+                status='failed',
+                error=error,
+                metadata=metadata
+            )
+            return {
+                'success': False,
+                'message_id': None,
+                'error': error
+            }
+
+        message_id = f"mail_{int(time.time() * 1000)}"
+        print(f"✅ 邮件发送成功: {subject} -> {', '.join(recipients)}")
+        self.record_email(
+            subject=subject,
+            recipients=recipients,
+            email_type=email_type,
+            related_id=related_id,
+            status='sent',
+            message_id=message_id,
+            metadata=metadata
+        )
+        return {
+            'success': True,
+            'message_id': message_id,
+            'error': None
+        }
+
     def send_email(
         self,
         subject: str,
@@ -106,7 +244,7 @@ class EmailService:
         metadata: Optional[Dict[str, Any]] = None
     ) -> dict:
         """
-        发送邮件
+        发送邮件（同步，会阻塞当前线程；异步代码请使用 queue_email）
 
         Args:
             subject: 邮件主题
@@ -119,116 +257,151 @@ class EmailService:
         Returns:
             dict: {success: bool, message_id: str, error: str}
         """
-        if not self.config.is_configured():
-            result = {
-                'success': False,
-                'message_id': None,
-                'error': '邮件服务未配置'
-            }
-            # 记录失败的邮件
-            if self._pg_enabled:
-                self._record_email(
-                    subject=subject,
-                    recipients=recipients or [],
-                    email_type=email_type,
-                    related_id=related_id,
-                    status='failed',
-                    error='邮件服务未配置',
-                    metadata=metadata
-                )
-            return result
+        recipients, failure = self._check_sendable(subject, recipients, email_type, related_id, metadata)
+        if failure:
+            return failure
 
-        recipients = recipients or self.config.recipients
-        if not recipients:
-            result = {
-                'success': False,
-                'message_id': None,
-                'error': '没有收件人'
-            }
-            if self._pg_enabled:
-                self._record_email(
-                    subject=subject,
-                    recipients=[],
-                    email_type=email_type,
-                    related_id=related_id,
-                    status='failed',
-                    error='没有收件人',
-                    metadata=metadata
-                )
-            return result
+        # 重试发送
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                self._deliver(subject, html_content, recipients)
+                last_error = None
+                break
 
-        # 创建邮件
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = formataddr((self.config.from_name, self.config.smtp_username))
-        msg['To'] = ', '.join(recipients)
+            except smtplib.SMTPException as e:
+                last_error = str(e)
+                print(f"⚠️  邮件发送失败 (尝试 {attempt + 1}/{self.max_retries}): {last_error}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(self.retry_delay)
+
+            except Exception as e:
+                last_error = str(e)
+                print(f"❌ 邮件发送异常: {last_error}")
+                break
 
-        # 添加 HTML 内容
-        html_part = MIMEText(html_content, 'html', 'utf-8')
-        msg.attach(html_part)
+        return self._finish_send(subject, recipients, email_type, related_id, metadata, last_error)
+
+    async def send_email_async(
+        self,
+        subject: str,
+        html_content: str,
+        recipients: Optional[List[str]] = None,
+        email_type: str = "general",
+        related_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> dict:
+        """
+        发送邮件（异步，SMTP 交互和记录写入在线程池中执行，重试等待不阻塞事件循环）
+
+        参数和返回值同 send_email
+        """
+        recipients, failure = await asyncio.to_thread(
+            self._check_sendable, subject, recipients, email_type, related_id, metadata
+        )
+        if failure:
+            return failure
 
-        # 重试发送
         last_error = None
         for attempt in range(self.max_retries):
             try:
-                server = self._create_connection()
-                server.sendmail(
-                    self.config.smtp_username,
-                    recipients,
-                    msg.as_string()
-                )
-                server.quit()
-
-                message_id = f"mail_{int(time.time() * 1000)}"
-                print(f"✅ 邮件发送成功: {subject} -> {', '.join(recipients)}")
-
-                # 记录成功的邮件
-                if self._pg_enabled:
-                    self._record_email(
-                        subject=subject,
-                        recipients=recipients,
-                        email_type=email_type,
-                        related_id=related_id,
-                        status='sent',
-                        message_id=message_id,
-                        metadata=metadata
-                    )
-
-                return {
-                    'success': True,
-                    'message_id': message_id,
-                    'error': None
-                }
+                await asyncio.to_thread(self._deliver, subject, html_content, recipients)
+                last_error = None
+                break
 
             except smtplib.SMTPException as e:
                 last_error = str(e)
                 print(f"⚠️  邮件发送失败 (尝试 {attempt + 1}/{self.max_retries}): {last_error}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    await asyncio.sleep(self.retry_delay)
 
             except Exception as e:
                 last_error = str(e)
                 print(f"❌ 邮件发送异常: {last_error}")
                 break
 
-        # 记录失败的邮件
+        return await asyncio.to_thread(
+            self._finish_send, subject, recipients, email_type, related_id, metadata, last_error
+        )
+
+    async def queue_email(
+        self,
+        subject: str,
+        html_content: str,
+        recipients: Optional[List[str]] = None,
+        email_type: str = "general",
+        related_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> dict:
+        """
+        邮件入队，由后台 worker 通过 SMTP 连接池发送
+
+        Redis 不可用时退化为 send_email_async 直接发送。
+
+        Returns:
+            dict: {success: bool, message_id: str, error: str, queued: bool}
+        """
+        recipients, failure = await asyncio.to_thread(
+            self._check_sendable, subject, recipients, email_type, related_id, metadata
+        )
+        if failure:
+            return {**failure, 'queued': False}
+
+        from services.email.outbox import get_email_outbox
+        outbox = await asyncio.to_thread(get_email_outbox)
+        if outbox is not None:
+            try:
+                job_id = await outbox.enqueue(
+                    subject=subject,
+                    html_content=html_content,
+                    recipients=recipients,
+                    email_type=email_type,
+                    related_id=related_id,
+                    metadata=metadata
+                )
+                return {
+                    'success': True,
+                    'message_id': job_id,
+                    'error': None,
+                    'queued': True
+                }
+            except Exception as e:
+                logger.warning(f"[EmailService] 邮件入队失败，改为直接发送: {e}")
+
+        result = await self.send_email_async(
+            subject=subject,
+            html_content=html_content,
+            recipients=recipients,
+            email_type=email_type,
+            related_id=related_id,
+            metadata=metadata
+        )
+        return {**result, 'queued': False}
+
+    def record_email(
+        self,
+        subject: str,
+        recipients: List[str],
+        email_type: str,
+        related_id: Optional[str],
+        status: str,
+        message_id: Optional[str] = None,
+        error: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """记录邮件发送结果（未启用 PostgreSQL 记录时忽略）"""
         if self._pg_enabled:
             self._record_email(
                 subject=subject,
                 recipients=recipients,
                 email_type=email_type,
                 related_id=related_id,
-                status='failed',
-                error=last_error,
+                status=status,
+                message_id=message_id,
+                error=error,
                 metadata=metadata
             )
 
-        return {
-            'success': False,
-            'message_id': None,
-            'error': last_error
-        }
-
     def _record_email(
         self,
         subject: str,
@@ -269,6 +442,19 @@ class EmailService:
         except Exception as e:
             logger.error(f"[EmailService] 邮件记录写入失败: {e}")
 
+    def _escalation_email(self, session_state) -> dict:
+        """生成人工接管邮件参数"""
+        return {
+            'subject': f"[Fiido客服] 人工接管请求 - {session_state.session_name}",
+            'html_content': self._generate_escalation_email_html(session_state),
+            'email_type': "escalation",
+            'related_id': session_state.session_name,
+            'metadata': {
+                "reason": session_state.escalation.reason if session_state.escalation else "unknown",
+                "status": session_state.status.value if hasattr(session_state.status, 'value') else str(session_state.status)
+            }
+        }
+
     def send_manual_escalation_email(self, session_state) -> dict:
         """
         发送人工接管通知邮件
@@ -279,20 +465,7 @@ class EmailService:
         Returns:
             dict: 发送结果
         """
-        # 生成邮件内容
-        subject = f"[Fiido客服] 人工接管请求 - {session_state.session_name}"
-        html_content = self._generate_escalation_email_html(session_state)
-
-        result = self.send_email(
-            subject=subject,
-            html_content=html_content,
-            email_type="escalation",
-            related_id=session_state.session_name,
-            metadata={
-                "reason": session_state.escalation.reason if session_state.escalation else "unknown",
-                "status": session_state.status.value if hasattr(session_state.status, 'value') else str(session_state.status)
-            }
-        )
+        result = self.send_email(**self._escalation_email(session_state))
 
         # 记录发送结果
         if result['success']:
@@ -302,6 +475,17 @@ class EmailService:
 
         return result
 
+    async def queue_manual_escalation_email(self, session_state) -> dict:
+        """人工接管通知邮件入队（异步）"""
+        result = await self.queue_email(**self._escalation_email(session_state))
+
+        if result['success']:
+            print(f"📧 人工接管邮件已{'入队' if result.get('queued') else '发送'}: {session_state.session_name}")
+        else:
+            print(f"❌ 人工接管邮件发送失败: {result['error']}")
+
+        return result
+
     def _generate_escalation_email_html(self, session_state) -> str:
         """生成人工接管邮件 HTML 内容"""
 
@@ -436,3 +620,8 @@ def get_email_service() -> EmailService:
 def send_escalation_email(session_state) -> dict:
     """快捷函数：发送人工接管邮件"""
     return get_email_service().send_manual_escalation_email(session_state)
+
+
+async def queue_escalation_email(session_state) -> dict:
+    """快捷函数：人工接管邮件入队（异步）"""
+    return await get_email_service().queue_manual_escalation_email(session_state)
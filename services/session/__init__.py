@@ -23,6 +23,7 @@ from services.session.state import (
 )
 
 from services.session.redis_store import RedisSessionStore
+from services.session.async_redis_store import AsyncRedisSessionStore
 from services.session.regulator import Regulator, RegulatorConfig
 from services.session.shift_config import get_shift_config, is_in_shift
 from services.session.message_store import MessageStoreService
@@ -38,6 +39,7 @@ __all__ = [
     "SessionStateStore",
     "InMemorySessionStore",
     "RedisSessionStore",
+    "AsyncRedisSessionStore",
 
     # 辅助模型
     "EscalationInfo",
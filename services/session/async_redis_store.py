@@ -0,0 +1,324 @@
+"""
+Redis 会话状态存储 - asyncio 实现
+
+基于 redis.asyncio 客户端，避免 /chat、/chat/stream 热路径上的
+同步 Redis 调用阻塞事件循环。
+
+说明:
+- 与 RedisSessionStore 使用相同的 key 布局，两者可以随时切换
+- 同步客户端 self.redis 仍然保留，供工单、限流、黑名单等同步模块共享
+- save() 使用单次 MULTI 流水线，一次往返完成 SETEX/SADD/SREM/ZADD
+- 列表接口走 updated_at 有序集合索引 + 单次 MGET
+"""
+
+import asyncio
+import logging
+from typing import Optional, List, Sequence, Dict
+from datetime import datetime, timezone
+
+from redis import asyncio as aioredis
+
+from services.session.state import (
+    SessionState,
+    SessionStatus,
+)
+from services.session.redis_store import (
+    RedisSessionStore,
+    status_index_key,
+    updated_index_key,
+    queue_session_save,
+    queue_index_removal,
+    parse_agent_loads,
+    agent_load_key,
+    AGENT_LOAD_PREFIX,
+    deserialize_sessions,
+    HYDRATE_BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisSessionStore(RedisSessionStore):
+    """
+    Redis 会话状态存储（asyncio 客户端）
+
+    接口与 SessionStateStore 一致，所有会话读写走 self.aredis，
+    check_health() 等同步方法沿用父类的同步连接池。
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        max_connections: int = 50,
+        socket_timeout: float = 5.0,
+        socket_connect_timeout: float = 5.0,
+        default_ttl: int = 86400  # 24小时
+    ):
+        """
+        初始化同步 + 异步两个连接池
+
+        Args:
+            redis_url: Redis 连接地址
+            max_connections: 每个连接池的最大连接数
+            socket_timeout: Socket 超时时间
+            socket_connect_timeout: 连接超时时间
+            default_ttl: 默认过期时间（秒）
+        """
+        super().__init__(
+            redis_url=redis_url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            default_ttl=default_ttl
+        )
+
+        async_pool = aioredis.ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            decode_responses=True
+        )
+        self.aredis = aioredis.Redis(connection_pool=async_pool)
+        logger.info(f"✅ Redis asyncio 连接池已创建 (连接池大小: {max_connections})")
+
+    async def close(self) -> None:
+        """关闭异步连接池"""
+        try:
+            await self.aredis.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ 关闭 Redis asyncio 连接池失败: {e}")
+
+    async def save(self, state: SessionState) -> bool:
+        """
+        保存会话到 Redis（单次 MULTI 往返）
+
+        流水线内容: SETEX session:{name} + 状态集合索引 + updated_at 有序集合索引 +
+        坐席负载集合（Lua 脚本在服务端读取旧 owner 并迁移）
+        """
+        try:
+            async with self.aredis.pipeline(transaction=True) as pipe:
+                queue_session_save(pipe, state, self.default_ttl)
+                await pipe.execute()
+
+            logger.debug(f"💾 会话已保存: {state.session_name} (状态: {state.status})")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ 保存会话失败 {state.session_name}: {e}")
+            return False
+
+    async def get(self, session_name: str) -> Optional[SessionState]:
+        """从 Redis 获取会话"""
+        try:
+            json_data = await self.aredis.get(f"session:{session_name}")
+
+            if json_data:
+                state = SessionState.model_validate_json(json_data)
+                logger.debug(f"📖 会话已加载: {session_name}")
+                return state
+
+            logger.debug(f"🔍 会话不存在: {session_name}")
+            return None
+
+        except Exception as e:
+            logger.error(f"❌ 读取会话失败 {session_name}: {e}")
+            return None
+
+    async def delete(self, session_name: str) -> bool:
+        """删除会话并清理状态索引"""
+        try:
+            async with self.aredis.pipeline(transaction=True) as pipe:
+                pipe.delete(f"session:{session_name}")
+                queue_index_removal(pipe, [session_name])
+                await pipe.execute()
+
+            logger.debug(f"🗑️  会话已删除: {session_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ 删除会话失败 {session_name}: {e}")
+            return False
+
+    async def list_by_status(
+        self,
+        status: SessionStatus,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[SessionState]:
+        """按状态查询会话列表（更新时间倒序，ZREVRANGE + MGET）"""
+        try:
+            if await self._updated_index_available():
+                result = await self._apage_from_index(updated_index_key(status), offset, limit)
+            else:
+                result = (await asyncio.to_thread(self._scan_sessions, status))[offset:offset + limit]
+            logger.debug(f"📋 查询会话列表: 状态={status}, 返回={len(result)}")
+            return result
+
+        except Exception as e:
+            logger.error(f"❌ 查询会话列表失败 (状态={status}): {e}")
+            return []
+
+    async def list_all(
+        self,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[SessionState]:
+        """获取所有会话列表（更新时间倒序，ZREVRANGE + MGET）"""
+        try:
+            if await self._updated_index_available():
+                result = await self._apage_from_index(updated_index_key(), offset, limit)
+            else:
+                result = (await asyncio.to_thread(self._scan_sessions))[offset:offset + limit]
+            logger.debug(f"📋 获取会话列表: 返回={len(result)}")
+            return result
+
+        except Exception as e:
+            logger.error(f"❌ 获取会话列表失败: {e}")
+            return []
+
+    async def count_by_status(self, status: SessionStatus) -> int:
+        """统计指定状态的会话数量"""
+        try:
+            if not await self._updated_index_available():
+                return len(await asyncio.to_thread(self._scan_sessions, status))
+            return await self.aredis.scard(status_index_key(status))
+        except Exception as e:
+            logger.error(f"❌ 统计会话数量失败 (状态={status}): {e}")
+            return 0
+
+    async def count_all(self) -> int:
+        """统计所有会话数量"""
+        try:
+            count = 0
+            async for _ in self.aredis.scan_iter("session:*", count=100):
+                count += 1
+            return count
+        except Exception as e:
+            logger.error(f"❌ 统计会话总数失败: {e}")
+            return 0
+
+    async def get_agent_loads(self, agent_ids: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        """坐席负载（单次 pipeline，每个坐席两次 SCARD）"""
+        ids = list(agent_ids)
+        if not ids:
+            return {}
+        try:
+            if not self._agent_load_ready and not await asyncio.to_thread(self._ensure_agent_load_index):
+                # 负载集合回填未完成（其他进程持锁或状态索引未就绪），按会话列表统计
+                return await super(RedisSessionStore, self).get_agent_loads(ids)
+            async with self.aredis.pipeline(transaction=False) as pipe:
+                for agent_id in ids:
+                    pipe.scard(agent_load_key(agent_id, "manual"))
+                    pipe.scard(agent_load_key(agent_id, "pending"))
+                counts = await pipe.execute()
+            return parse_agent_loads(ids, counts)
+        except Exception as e:
+            logger.error(f"❌ 读取坐席负载失败: {e}")
+            return await super(RedisSessionStore, self).get_agent_loads(ids)
+
+    async def get_all_sessions(self) -> List[SessionState]:
+        """获取所有会话（用于统计和管理）"""
+        try:
+            if await self._updated_index_available():
+                sessions = await self._ahydrate(await self.aredis.zrevrange(updated_index_key(), 0, -1))
+            else:
+                sessions = await asyncio.to_thread(self._scan_sessions)
+
+            logger.debug(f"📊 获取所有会话: 总数={len(sessions)}")
+            return sessions
+
+        except Exception as e:
+            logger.error(f"❌ 获取所有会话失败: {e}")
+            return []
+
+    async def clear_all(self) -> int:
+        """清空所有会话数据"""
+        try:
+            deleted = 0
+            session_keys = [key async for key in self.aredis.scan_iter("session:*", count=100)]
+            if session_keys:
+                deleted += await self.aredis.delete(*session_keys)
+
+            await self.aredis.delete(
+                updated_index_key(),
+                *(status_index_key(status) for status in SessionStatus),
+                *(updated_index_key(status) for status in SessionStatus),
+            )
+            load_keys = [key async for key in self.aredis.scan_iter(f"{AGENT_LOAD_PREFIX}*", count=100)]
+            if load_keys:
+                await self.aredis.delete(*load_keys)
+
+            logger.warning(f"🧹 已清空会话数据: 删除 {deleted} 条记录")
+            return deleted
+        except Exception as e:
+            logger.error(f"❌ 清空会话数据失败: {e}")
+            return 0
+
+    async def cleanup_expired_sessions(self, days: int = 7) -> int:
+        """清理超过指定天数未活跃的会话"""
+        try:
+            threshold = datetime.now(timezone.utc).timestamp() - days * 24 * 3600
+            # 索引回填未完成时跳过本轮，过期会话仍由 TTL 清理
+            if not await self._updated_index_available():
+                return 0
+            candidates = await self.aredis.zrangebyscore(updated_index_key(), "-inf", threshold)
+            expired = [
+                state.session_name for state in await self._ahydrate(candidates)
+                if state.updated_at < threshold
+            ]
+            for start in range(0, len(expired), HYDRATE_BATCH_SIZE):
+                chunk = expired[start:start + HYDRATE_BATCH_SIZE]
+                async with self.aredis.pipeline(transaction=True) as pipe:
+                    pipe.delete(*(f"session:{name}" for name in chunk))
+                    queue_index_removal(pipe, chunk)
+                    await pipe.execute()
+            cleaned_count = len(expired)
+
+            if cleaned_count > 0:
+                logger.info(f"🧹 清理过期会话: {cleaned_count} 个（超过 {days} 天未活跃）")
+
+            return cleaned_count
+
+        except Exception as e:
+            logger.error(f"❌ 清理过期会话失败: {e}")
+            return 0
+
+    # ==================== updated_at 索引 ====================
+
+    async def _ahydrate(self, session_names: Sequence[str]) -> List[SessionState]:
+        """按名称分批 MGET 加载会话，并清理已过期的索引成员"""
+        sessions: List[SessionState] = []
+        for start in range(0, len(session_names), HYDRATE_BATCH_SIZE):
+            chunk = list(session_names[start:start + HYDRATE_BATCH_SIZE])
+            raw_items = await self.aredis.mget([f"session:{name}" for name in chunk])
+            states, missing = deserialize_sessions(chunk, raw_items)
+            sessions.extend(states)
+            if missing:
+                await self._aprune_index(missing)
+        return sessions
+
+    async def _apage_from_index(self, index_key: str, offset: int, limit: int) -> List[SessionState]:
+        """ZREVRANGE 分页 + 单次 MGET（同 RedisSessionStore._page_from_index）"""
+        if limit <= 0:
+            return []
+
+        states: List[SessionState] = []
+        for _ in range(3):
+            names = await self.aredis.zrevrange(index_key, offset, offset + limit - 1)
+            if not names:
+                return []
+            raw_items = await self.aredis.mget([f"session:{name}" for name in names])
+            states, missing = deserialize_sessions(names, raw_items)
+            if not missing:
+                break
+            await self._aprune_index(missing)
+        return states
+
+    async def _aprune_index(self, session_names: Sequence[str]) -> None:
+        try:
+            async with self.aredis.pipeline(transaction=False) as pipe:
+                queue_index_removal(pipe, session_names)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ 清理会话索引失败: {e}")
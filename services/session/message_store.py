@@ -6,26 +6,86 @@ This service is a shared dependency used by products to persist and query chat m
 
 Design goals:
 - Best-effort, non-blocking writes via an in-process async queue + background worker(s)
-- Sync SQLAlchemy sessions executed in a thread to avoid blocking the event loop
+- Workers drain the queue into multi-row INSERT batches (size / linger bounded)
+- Reads run on the asyncpg pool (`AsyncSession.run_sync`) so they don't occupy a
+  worker thread; without the async driver they fall back to sync sessions in a thread
+- INSERT batches use sync SQLAlchemy sessions executed in a thread
 - Strong search via PostgreSQL full-text search (tsvector + GIN index)
 """
 
 from __future__ import annotations
 
 import asyncio
+import base64
 import csv
 import io
+import json
+import logging
 import os
 import pathlib
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Any, Optional
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Optional, TypeVar
 
 from sqlalchemy import func
-from sqlalchemy import and_
+from sqlalchemy import and_, cast, tuple_
+from sqlalchemy import REAL
 from sqlalchemy.exc import ProgrammingError
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except Exception:  # pragma: no cover
+    Counter = None  # type: ignore[assignment]
+    Gauge = None  # type: ignore[assignment]
+    Histogram = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+# Prometheus metrics (exported by the product's /metrics endpoint)
+if Gauge is not None:
+    _queue_depth_gauge = Gauge(
+        "chat_history_queue_depth",
+        "Number of chat messages waiting in the write queue",
+    )
+else:
+    _queue_depth_gauge = None
+
+if Counter is not None:
+    _dropped_counter = Counter(
+        "chat_history_dropped_total",
+        "Total number of chat messages dropped before persistence",
+        ["reason"],
+    )
+    _written_counter = Counter(
+        "chat_history_written_total",
+        "Total number of chat messages persisted",
+    )
+else:
+    _dropped_counter = None
+    _written_counter = None
+
+if Histogram is not None:
+    _batch_latency_histogram = Histogram(
+        "chat_history_batch_latency_seconds",
+        "Latency of one chat message INSERT batch",
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    )
+else:
+    _batch_latency_histogram = None
+
+
+def _run_in_sync_session(fn: Callable[[Any], _T]) -> _T:
+    from infrastructure.database import init_database, get_db_session
+
+    init_database()
+    with get_db_session() as session:
+        return fn(session)
+
 
 def _env_bool(name: str, default: bool) -> bool:
     raw = os.getenv(name)
@@ -44,6 +104,46 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+# Upper bound for count="estimate" totals (deep searches stop counting here)
+_COUNT_CAP = _env_int("CHAT_HISTORY_COUNT_CAP", 10000)
+_COUNT_MODES = ("exact", "estimate", "none")
+
+
+def _encode_cursor(values: list[Any]) -> str:
+    """Opaque continuation token for keyset pagination (the last row's sort key)."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str, types: tuple[type, ...]) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [t(v) for t, v in zip(types, values)]
+    except Exception:
+        raise ValueError("invalid cursor") from None
+
+
+def _check_count_mode(count: Optional[str], cursor: Optional[str]) -> str:
+    # Continuation pages skip counting unless asked: the client has the total from page one
+    mode = (count or ("none" if cursor else "exact")).strip().lower()
+    if mode not in _COUNT_MODES:
+        raise ValueError("invalid count mode")
+    return mode
+
+
+def _count_rows(session: Any, q: Any, mode: str) -> tuple[Optional[int], bool]:
+    """Total for a query per count mode -> (total, is_estimate)."""
+    if mode == "none":
+        return None, False
+    q = q.order_by(None)
+    if mode == "exact":
+        return int(q.count()), False
+    capped = session.query(func.count()).select_from(q.limit(_COUNT_CAP + 1).subquery()).scalar() or 0
+    return min(int(capped), _COUNT_CAP), capped > _COUNT_CAP
+
+
 @dataclass(frozen=True)
 class _SaveMessageRequest:
     message_id: str
@@ -57,6 +157,10 @@ class _SaveMessageRequest:
     response_time_ms: Optional[int]
 
 
+_SUMMARY_ROLES = ("user", "assistant", "agent")
+_PREVIEW_CHARS = 160
+
+
 class MessageStoreService:
     """
     Chat message persistence + query service.
@@ -65,18 +169,41 @@ class MessageStoreService:
     - Writes are best-effort: enqueue failures will be dropped to protect request latency.
     - Call `start()` once at product startup to initialize worker(s).
     - Call `shutdown()` on product shutdown for graceful stop.
+    - Every INSERT batch also upserts `chat_session_summary`, which backs
+      `get_sessions()` / `get_statistics()`.
     """
 
+    # Flipped off (process-wide) if the rollup table is missing
+    _summary_writes_enabled = True
+
     def __init__(
         self,
         *,
         enabled: Optional[bool] = None,
         queue_maxsize: Optional[int] = None,
         workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_linger_ms: Optional[int] = None,
     ) -> None:
         self._enabled = _env_bool("CHAT_HISTORY_ENABLED", True) if enabled is None else enabled
         self._queue_maxsize = _env_int("CHAT_HISTORY_QUEUE_MAXSIZE", 2000) if queue_maxsize is None else queue_maxsize
         self._workers = _env_int("CHAT_HISTORY_WORKERS", 1) if workers is None else workers
+        self._batch_size = _env_int("CHAT_HISTORY_BATCH_SIZE", 200) if batch_size is None else batch_size
+        self._batch_linger_ms = (
+            _env_int("CHAT_HISTORY_BATCH_LINGER_MS", 50) if batch_linger_ms is None else batch_linger_ms
+        )
+
+        self._stats: dict[str, Any] = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped_queue_full": 0,
+            "dropped_write_error": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "last_batch_latency_ms": 0.0,
+            "max_batch_latency_ms": 0.0,
+            "total_batch_latency_ms": 0.0,
+        }
 
         self._queue: Optional[asyncio.Queue[_SaveMessageRequest]] = None
         self._worker_tasks: list[asyncio.Task[None]] = []
@@ -102,8 +229,22 @@ class MessageStoreService:
             asyncio.create_task(self._worker_loop(), name=f"message-store-worker-{i}")
             for i in range(worker_count)
         ]
+        # Make sure today's and upcoming chat_messages partitions exist even if
+        # the daily cleanup job is not scheduled in this deployment.
+        self._worker_tasks.append(
+            asyncio.create_task(self._ensure_partitions(), name="message-store-partitions")
+        )
         self._started = True
 
+    @staticmethod
+    async def _ensure_partitions() -> None:
+        try:
+            from infrastructure.database.partitions import ensure_partitions
+
+            await asyncio.to_thread(ensure_partitions)
+        except Exception as e:
+            logger.warning("[MessageStore] ensure chat_messages partitions failed: %s", e)
+
     async def shutdown(self) -> None:
         if not self._started:
             return
@@ -126,6 +267,23 @@ class MessageStoreService:
             return
         await asyncio.wait_for(self._queue.join(), timeout=timeout_s)
 
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Write pipeline metrics snapshot (queue depth, drops, batch latency).
+        """
+        stats = dict(self._stats)
+        batches = stats.pop("total_batch_latency_ms")
+        stats["avg_batch_latency_ms"] = round(batches / stats["batches"], 2) if stats["batches"] else 0.0
+        stats.update({
+            "enabled": self._enabled,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_maxsize": self._queue_maxsize,
+            "workers": self._workers,
+            "batch_size": self._batch_size,
+            "batch_linger_ms": self._batch_linger_ms,
+        })
+        return stats
+
     def enqueue_save_message(
         self,
         *,
@@ -170,45 +328,258 @@ class MessageStoreService:
 
         try:
             self._queue.put_nowait(req)
-            return msg_id
         except asyncio.QueueFull:
+            self._record_dropped("queue_full", 1)
+            if self._stats["dropped_queue_full"] % 100 == 1:
+                logger.warning(
+                    "[MessageStore] write queue full (maxsize=%s), dropped=%s",
+                    self._queue_maxsize,
+                    self._stats["dropped_queue_full"],
+                )
             return None
 
+        self._stats["enqueued"] += 1
+        if _queue_depth_gauge is not None:
+            _queue_depth_gauge.set(self._queue.qsize())
+        return msg_id
+
+    def _record_dropped(self, reason: str, count: int) -> None:
+        self._stats[f"dropped_{reason}"] += count
+        if _dropped_counter is not None:
+            _dropped_counter.labels(reason=reason).inc(count)
+
+    async def _next_batch(self) -> list[_SaveMessageRequest]:
+        """
+        Wait for one message, then keep draining until `batch_size` messages
+        are collected or `batch_linger_ms` has elapsed.
+        """
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        batch_size = max(int(self._batch_size), 1)
+        deadline = time.monotonic() + max(self._batch_linger_ms, 0) / 1000.0
+
+        while len(batch) < batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
     async def _worker_loop(self) -> None:
         assert self._queue is not None
         while True:
-            req = await self._queue.get()
+            batch = await self._next_batch()
             try:
-                try:
-                    await asyncio.to_thread(self._insert_message, req)
-                except Exception:
-                    # Best-effort semantics: drop the message on any DB error.
-                    # Do not crash the worker; keep draining the queue.
-                    pass
+                if _queue_depth_gauge is not None:
+                    _queue_depth_gauge.set(self._queue.qsize())
+                started = time.perf_counter()
+                written = await asyncio.to_thread(self._write_batch, batch)
+                self._record_batch(len(batch), written, time.perf_counter() - started)
+            except Exception:
+                # Best-effort semantics: drop the batch on unexpected errors.
+                # Do not crash the worker; keep draining the queue.
+                self._record_dropped("write_error", len(batch))
             finally:
-                self._queue.task_done()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _record_batch(self, size: int, written: int, elapsed_s: float) -> None:
+        latency_ms = elapsed_s * 1000.0
+        self._stats["batches"] += 1
+        self._stats["written"] += written
+        self._stats["last_batch_size"] = size
+        self._stats["last_batch_latency_ms"] = round(latency_ms, 2)
+        self._stats["max_batch_latency_ms"] = round(max(self._stats["max_batch_latency_ms"], latency_ms), 2)
+        self._stats["total_batch_latency_ms"] += latency_ms
+        if written < size:
+            self._record_dropped("write_error", size - written)
+        if _written_counter is not None and written:
+            _written_counter.inc(written)
+        if _batch_latency_histogram is not None:
+            _batch_latency_histogram.observe(elapsed_s)
+
+    @classmethod
+    def _write_batch(cls, batch: list[_SaveMessageRequest]) -> int:
+        """
+        Insert a batch in one transaction; on failure fall back to per-row
+        inserts so one bad row does not drop its neighbours.
+
+        Returns:
+            number of rows persisted
+        """
+        try:
+            cls._insert_messages(batch)
+            return len(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.warning("[MessageStore] insert failed, message dropped: %s", e)
+                return 0
+            logger.warning("[MessageStore] batch insert of %s rows failed, retrying per row: %s", len(batch), e)
+
+        written = 0
+        for req in batch:
+            try:
+                cls._insert_messages([req])
+                written += 1
+            except Exception as e:
+                logger.warning("[MessageStore] insert failed, message dropped: %s", e)
+        return written
+
+    @classmethod
+    def _insert_messages(cls, batch: list[_SaveMessageRequest]) -> None:
+        from sqlalchemy import insert
 
-    @staticmethod
-    def _insert_message(req: _SaveMessageRequest) -> None:
         from infrastructure.database import init_database, get_db_session
         from infrastructure.database.models import ChatMessageModel
 
         init_database()
         with get_db_session() as session:
-            row = ChatMessageModel(
-                message_id=req.message_id,
-                session_name=req.session_name,
-                conversation_id=req.conversation_id,
-                role=req.role,
-                content=req.content,
-                agent_id=req.agent_id,
-                agent_name=req.agent_name,
-                response_time_ms=req.response_time_ms,
-                created_at=req.created_at,
-                # content_tsv is maintained by DB trigger
-            )
-            session.add(row)
-            session.flush()
+            known = cls._known_conversations(session, batch) if cls._summary_writes_enabled else set()
+            # Multi-row INSERT (executemany); content_tsv is maintained by DB trigger
+            session.execute(insert(ChatMessageModel), [asdict(req) for req in batch])
+            # Rollup rows commit (or roll back) together with the messages
+            cls._upsert_summaries(session, batch, known)
+
+    @staticmethod
+    def _known_conversations(session: Any, batch: list[_SaveMessageRequest]) -> set[tuple[str, str]]:
+        """(session_name, conversation_id) pairs of the batch that already have stored messages."""
+        from infrastructure.database.models import ChatMessageModel as M
+
+        pairs = {(req.session_name, req.conversation_id) for req in batch if req.conversation_id}
+        if not pairs:
+            return set()
+        rows = (
+            session.query(M.session_name, M.conversation_id)
+            .filter(tuple_(M.session_name, M.conversation_id).in_(list(pairs)))
+            .distinct()
+            .all()
+        )
+        return {(r.session_name, r.conversation_id) for r in rows}
+
+    @staticmethod
+    def _summarize_batch(
+        batch: list[_SaveMessageRequest],
+        known_conversations: set[tuple[str, str]],
+    ) -> list[dict[str, Any]]:
+        """
+        Fold a batch into one rollup delta per session.
+
+        `conversation_count` counts distinct conversation_ids, matching
+        `COUNT(DISTINCT conversation_id)` in the backfill and `_sessions_from_messages`:
+        a conversation is counted the first time it appears for the session.
+
+        Args:
+            known_conversations: (session_name, conversation_id) pairs stored before this batch
+        """
+        rows: dict[str, dict[str, Any]] = {}
+        seen = set(known_conversations)
+        for req in sorted(batch, key=lambda r: r.created_at):
+            row = rows.get(req.session_name)
+            if row is None:
+                row = rows[req.session_name] = {
+                    "session_name": req.session_name,
+                    "message_count": 0,
+                    "user_count": 0,
+                    "assistant_count": 0,
+                    "agent_count": 0,
+                    "conversation_count": 0,
+                    "last_conversation_id": None,
+                    "response_time_ms_sum": 0,
+                    "response_time_count": 0,
+                    "first_message_at": req.created_at,
+                    "last_message_at": req.created_at,
+                    "last_preview": None,
+                }
+
+            row["message_count"] += 1
+            if req.role in _SUMMARY_ROLES:
+                row[f"{req.role}_count"] += 1
+            if req.conversation_id:
+                if (req.session_name, req.conversation_id) not in seen:
+                    seen.add((req.session_name, req.conversation_id))
+                    row["conversation_count"] += 1
+                row["last_conversation_id"] = req.conversation_id
+            if req.role == "assistant" and req.response_time_ms is not None:
+                row["response_time_ms_sum"] += int(req.response_time_ms)
+                row["response_time_count"] += 1
+            row["last_message_at"] = req.created_at
+            row["last_preview"] = (req.content or "")[:_PREVIEW_CHARS]
+
+        return list(rows.values())
+
+    @classmethod
+    def _upsert_summaries(
+        cls,
+        session: Any,
+        batch: list[_SaveMessageRequest],
+        known_conversations: set[tuple[str, str]],
+    ) -> None:
+        """Apply a batch to `chat_session_summary` (one additive upsert per session)."""
+        if not cls._summary_writes_enabled:
+            return
+
+        from sqlalchemy import case
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        from infrastructure.database.models import ChatSessionSummaryModel
+
+        t = ChatSessionSummaryModel.__table__.c
+        try:
+            with session.begin_nested():
+                for row in cls._summarize_batch(batch, known_conversations):
+                    stmt = pg_insert(ChatSessionSummaryModel).values(**row)
+                    ex = stmt.excluded
+                    is_newer = ex.last_message_at >= t.last_message_at
+                    session.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=[t.session_name],
+                            set_={
+                                "message_count": t.message_count + ex.message_count,
+                                "user_count": t.user_count + ex.user_count,
+                                "assistant_count": t.assistant_count + ex.assistant_count,
+                                "agent_count": t.agent_count + ex.agent_count,
+                                "conversation_count": t.conversation_count + ex.conversation_count,
+                                "last_conversation_id": case(
+                                    (and_(is_newer, ex.last_conversation_id.isnot(None)), ex.last_conversation_id),
+                                    else_=t.last_conversation_id,
+                                ),
+                                "response_time_ms_sum": t.response_time_ms_sum + ex.response_time_ms_sum,
+                                "response_time_count": t.response_time_count + ex.response_time_count,
+                                "first_message_at": func.least(t.first_message_at, ex.first_message_at),
+                                "last_message_at": func.greatest(t.last_message_at, ex.last_message_at),
+                                "last_preview": case((is_newer, ex.last_preview), else_=t.last_preview),
+                            },
+                        )
+                    )
+        except ProgrammingError as e:
+            # Table not migrated yet: keep persisting messages, reads fall back to chat_messages
+            cls._summary_writes_enabled = False
+            logger.warning("[MessageStore] chat_session_summary unavailable, rollup disabled: %s", e)
+
+    @staticmethod
+    async def _run_db(fn: Callable[[Any], _T]) -> _T:
+        """
+        Run `fn(session)` in one transaction without blocking the event loop.
+
+        On the asyncpg pool the Query-style code runs via `AsyncSession.run_sync`
+        (statements are awaited, no worker thread is held); if the async engine is
+        unavailable (greenlet/asyncpg not installed) a sync session runs in a thread.
+        """
+        from infrastructure.database import init_async_database, get_async_db_session
+
+        if init_async_database() is None:
+            return await asyncio.to_thread(_run_in_sync_session, fn)
+
+        async with get_async_db_session() as session:
+            return await session.run_sync(fn)
 
     async def get_sessions(
         self,
@@ -219,112 +590,183 @@ class MessageStoreService:
         end_time: Optional[float] = None,
     ) -> dict[str, Any]:
         """
-        List sessions aggregated by `session_name` (optionally including metadata).
+        List sessions (optionally including metadata), newest activity first.
+
+        Served from the `chat_session_summary` rollup: a session is listed when
+        its activity overlaps [start_time, end_time], and counts cover the whole
+        session. Falls back to aggregating `chat_messages` if the rollup table
+        has not been migrated yet.
         """
 
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
-            from infrastructure.database.models import ChatMessageModel, ChatSessionMetaModel
+        try:
+            return await self._run_db(
+                lambda session: self._sessions_from_summary(session, page, page_size, start_time, end_time)
+            )
+        except ProgrammingError as e:
+            logger.warning("[MessageStore] chat_session_summary query failed, aggregating chat_messages: %s", e)
 
-            init_database()
+        return await self._run_db(
+            lambda session: self._sessions_from_messages(session, page, page_size, start_time, end_time)
+        )
 
-            with get_db_session() as session:
-                base = session.query(ChatMessageModel)
-                if start_time is not None:
-                    base = base.filter(ChatMessageModel.created_at >= float(start_time))
-                if end_time is not None:
-                    base = base.filter(ChatMessageModel.created_at <= float(end_time))
-
-                # Aggregate per session_name
-                agg = (
-                    base.with_entities(
-                        ChatMessageModel.session_name.label("session_name"),
-                        func.count(ChatMessageModel.id).label("message_count"),
-                        func.min(ChatMessageModel.created_at).label("first_message_at"),
-                        func.max(ChatMessageModel.created_at).label("last_message_at"),
-                        func.count(func.distinct(ChatMessageModel.conversation_id)).label("conversation_count"),
-                    )
-                    .group_by(ChatMessageModel.session_name)
+    @staticmethod
+    def _load_session_meta(session: Any, session_names: list[str]) -> dict[str, Any]:
+        from infrastructure.database.models import ChatSessionMetaModel
+
+        meta_by_session: dict[str, Any] = {}
+        if session_names:
+            try:
+                meta_rows = (
+                    session.query(ChatSessionMetaModel)
+                    .filter(ChatSessionMetaModel.session_name.in_(session_names))
+                    .all()
                 )
+                for m in meta_rows:
+                    meta_by_session[m.session_name] = {
+                        "display_name": m.display_name,
+                        "note": m.note,
+                        "tags": m.tags,
+                        "updated_by": m.updated_by,
+                        "updated_at": m.updated_at,
+                    }
+            except ProgrammingError:
+                meta_by_session = {}
+        return meta_by_session
 
-                total = session.query(func.count()).select_from(agg.subquery()).scalar() or 0
+    @staticmethod
+    def _sessions_from_summary(
+        session: Any,
+        page: int,
+        page_size: int,
+        start_time: Optional[float],
+        end_time: Optional[float],
+    ) -> dict[str, Any]:
+        from infrastructure.database.models import ChatSessionSummaryModel
+
+        base = session.query(ChatSessionSummaryModel)
+        if start_time is not None:
+            base = base.filter(ChatSessionSummaryModel.last_message_at >= float(start_time))
+        if end_time is not None:
+            base = base.filter(ChatSessionSummaryModel.first_message_at <= float(end_time))
+
+        total = base.order_by(None).count()
+        offset = max(page - 1, 0) * max(page_size, 1)
+        rows = (
+            base.order_by(ChatSessionSummaryModel.last_message_at.desc())
+            .offset(offset)
+            .limit(page_size)
+            .all()
+        )
 
-                offset = max(page - 1, 0) * max(page_size, 1)
+        meta_by_session = MessageStoreService._load_session_meta(session, [r.session_name for r in rows])
+
+        items = [
+            {
+                "session_name": r.session_name,
+                "meta": meta_by_session.get(r.session_name),
+                "last_message_preview": r.last_preview or "",
+                "message_count": int(r.message_count or 0),
+                "first_message_at": float(r.first_message_at or 0.0),
+                "last_message_at": float(r.last_message_at or 0.0),
+                "conversation_count": int(r.conversation_count or 0),
+            }
+            for r in rows
+        ]
 
-                rows = (
-                    agg.order_by(func.max(ChatMessageModel.created_at).desc())
-                    .offset(offset)
-                    .limit(page_size)
-                    .all()
-                )
+        return {
+            "items": items,
+            "total": int(total),
+            "page": int(page),
+            "page_size": int(page_size),
+        }
 
-                # Join last message preview + session meta (page_size bounded)
-                session_names = [r.session_name for r in rows]
-                previews: dict[str, str] = {}
-                if session_names:
-                    last_created_at_sq = (
-                        session.query(
-                            ChatMessageModel.session_name.label("session_name"),
-                            func.max(ChatMessageModel.created_at).label("last_created_at"),
-                        )
-                        .filter(ChatMessageModel.session_name.in_(session_names))
-                        .group_by(ChatMessageModel.session_name)
-                        .subquery()
-                    )
-                    msg_rows = (
-                        session.query(ChatMessageModel.session_name, ChatMessageModel.content)
-                        .join(
-                            last_created_at_sq,
-                            and_(
-                                ChatMessageModel.session_name == last_created_at_sq.c.session_name,
-                                ChatMessageModel.created_at == last_created_at_sq.c.last_created_at,
-                            ),
-                        )
-                        .all()
-                    )
-                    for sn, content in msg_rows:
-                        previews[sn] = (content or "")[:160]
-
-                meta_by_session: dict[str, Any] = {}
-                if session_names:
-                    try:
-                        meta_rows = (
-                            session.query(ChatSessionMetaModel)
-                            .filter(ChatSessionMetaModel.session_name.in_(session_names))
-                            .all()
-                        )
-                        for m in meta_rows:
-                            meta_by_session[m.session_name] = {
-                                "display_name": m.display_name,
-                                "note": m.note,
-                                "tags": m.tags,
-                                "updated_by": m.updated_by,
-                                "updated_at": m.updated_at,
-                            }
-                    except ProgrammingError:
-                        meta_by_session = {}
-
-                items = [
-                    {
-                        "session_name": r.session_name,
-                        "meta": meta_by_session.get(r.session_name),
-                        "last_message_preview": previews.get(r.session_name, ""),
-                        "message_count": int(r.message_count or 0),
-                        "first_message_at": float(r.first_message_at or 0.0),
-                        "last_message_at": float(r.last_message_at or 0.0),
-                        "conversation_count": int(r.conversation_count or 0),
-                    }
-                    for r in rows
-                ]
-
-                return {
-                    "items": items,
-                    "total": int(total),
-                    "page": int(page),
-                    "page_size": int(page_size),
-                }
+    @staticmethod
+    def _sessions_from_messages(
+        session: Any,
+        page: int,
+        page_size: int,
+        start_time: Optional[float],
+        end_time: Optional[float],
+    ) -> dict[str, Any]:
+        from infrastructure.database.models import ChatMessageModel
+
+        base = session.query(ChatMessageModel)
+        if start_time is not None:
+            base = base.filter(ChatMessageModel.created_at >= float(start_time))
+        if end_time is not None:
+            base = base.filter(ChatMessageModel.created_at <= float(end_time))
+
+        # Aggregate per session_name
+        agg = (
+            base.with_entities(
+                ChatMessageModel.session_name.label("session_name"),
+                func.count(ChatMessageModel.id).label("message_count"),
+                func.min(ChatMessageModel.created_at).label("first_message_at"),
+                func.max(ChatMessageModel.created_at).label("last_message_at"),
+                func.count(func.distinct(ChatMessageModel.conversation_id)).label("conversation_count"),
+            )
+            .group_by(ChatMessageModel.session_name)
+        )
+
+        total = session.query(func.count()).select_from(agg.subquery()).scalar() or 0
+
+        offset = max(page - 1, 0) * max(page_size, 1)
+
+        rows = (
+            agg.order_by(func.max(ChatMessageModel.created_at).desc())
+            .offset(offset)
+            .limit(page_size)
+            .all()
+        )
+
+        # Join last message preview + session meta (page_size bounded)
+        session_names = [r.session_name for r in rows]
+        previews: dict[str, str] = {}
+        if session_names:
+            last_created_at_sq = (
+                session.query(
+                    ChatMessageModel.session_name.label("session_name"),
+                    func.max(ChatMessageModel.created_at).label("last_created_at"),
+                )
+                .filter(ChatMessageModel.session_name.in_(session_names))
+                .group_by(ChatMessageModel.session_name)
+                .subquery()
+            )
+            msg_rows = (
+                session.query(ChatMessageModel.session_name, ChatMessageModel.content)
+                .join(
+                    last_created_at_sq,
+                    and_(
+                        ChatMessageModel.session_name == last_created_at_sq.c.session_name,
+                        ChatMessageModel.created_at == last_created_at_sq.c.last_created_at,
+                    ),
+                )
+                .all()
+            )
+            for sn, content in msg_rows:
+                previews[sn] = (content or "")[:160]
+
+        meta_by_session = MessageStoreService._load_session_meta(session, session_names)
+
+        items = [
+            {
+                "session_name": r.session_name,
+                "meta": meta_by_session.get(r.session_name),
+                "last_message_preview": previews.get(r.session_name, ""),
+                "message_count": int(r.message_count or 0),
+                "first_message_at": float(r.first_message_at or 0.0),
+                "last_message_at": float(r.last_message_at or 0.0),
+                "conversation_count": int(r.conversation_count or 0),
+            }
+            for r in rows
+        ]
 
-        return await asyncio.to_thread(_query)
+        return {
+            "items": items,
+            "total": int(total),
+            "page": int(page),
+            "page_size": int(page_size),
+        }
 
     async def get_messages_by_session(
         self,
@@ -333,45 +775,96 @@ class MessageStoreService:
         limit: int = 100,
         offset: int = 0,
         order: str = "asc",
+        cursor: Optional[str] = None,
+        count: Optional[str] = None,
     ) -> dict[str, Any]:
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
-            from infrastructure.database.models import ChatMessageModel
-
-            init_database()
+        """
+        Messages of one session ordered by (created_at, id).
 
-            with get_db_session() as session:
-                q = session.query(ChatMessageModel).filter(ChatMessageModel.session_name == session_name)
-                total = q.count()
-                order_key = (order or "asc").strip().lower()
-                if order_key not in {"asc", "desc"}:
-                    order_key = "asc"
+        Pass the previous page's `next_cursor` as `cursor` for keyset paging
+        (`offset` is ignored): every page is an index range scan on
+        (session_name, created_at, id), however deep. `count` is "exact",
+        "estimate" (capped at CHAT_HISTORY_COUNT_CAP) or "none"; it defaults to
+        "exact" on the first page and "none" when a cursor is given.
+        """
+        order_key = (order or "asc").strip().lower()
+        if order_key not in {"asc", "desc"}:
+            order_key = "asc"
+        after = _decode_cursor(cursor, (float, int)) if cursor else None
+        count_mode = _check_count_mode(count, cursor)
+        page_size = min(max(limit, 1), 1000)
+
+        def _query(session: Any) -> dict[str, Any]:
+            from infrastructure.database.models import ChatMessageModel as M
+
+            q = session.query(M).filter(M.session_name == session_name)
+            # Bound by the session's time span so only its day partitions are scanned
+            span = self._session_time_span(session, session_name)
+            if span is not None:
+                q = q.filter(M.created_at.between(*span))
+            total, estimated = _count_rows(session, q, count_mode)
+
+            key = tuple_(M.created_at, M.id)
+            if order_key == "desc":
+                if after is not None:
+                    q = q.filter(key < tuple_(*after))
+                q = q.order_by(M.created_at.desc(), M.id.desc())
+            else:
+                if after is not None:
+                    q = q.filter(key > tuple_(*after))
+                q = q.order_by(M.created_at.asc(), M.id.asc())
+            if after is None:
+                q = q.offset(max(offset, 0))
+
+            rows = q.limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            items = [
+                {
+                    "id": r.id,
+                    "message_id": r.message_id,
+                    "session_name": r.session_name,
+                    "conversation_id": r.conversation_id,
+                    "role": r.role,
+                    "content": r.content,
+                    "agent_id": r.agent_id,
+                    "agent_name": r.agent_name,
+                    "response_time_ms": r.response_time_ms,
+                    "created_at": r.created_at,
+                }
+                for r in rows
+            ]
+            return {
+                "session_name": session_name,
+                "total": total,
+                "total_is_estimate": estimated,
+                "items": items,
+                "order": order_key,
+                "has_more": has_more,
+                "next_cursor": _encode_cursor([rows[-1].created_at, rows[-1].id]) if has_more else None,
+            }
+
+        return await self._run_db(_query)
 
-                ordered = q.order_by(ChatMessageModel.created_at.desc() if order_key == "desc" else ChatMessageModel.created_at.asc())
+    @staticmethod
+    def _session_time_span(session: Any, session_name: str) -> Optional[tuple[float, float]]:
+        """(first_message_at, last_message_at) from the rollup, or None if unknown."""
+        from infrastructure.database.models import ChatSessionSummaryModel
 
-                rows = (
-                    ordered.offset(max(offset, 0))
-                    .limit(min(max(limit, 1), 1000))
-                    .all()
+        if not MessageStoreService._summary_writes_enabled:
+            return None
+        try:
+            with session.begin_nested():
+                row = (
+                    session.query(ChatSessionSummaryModel.first_message_at, ChatSessionSummaryModel.last_message_at)
+                    .filter(ChatSessionSummaryModel.session_name == session_name)
+                    .first()
                 )
-                items = [
-                    {
-                        "id": r.id,
-                        "message_id": r.message_id,
-                        "session_name": r.session_name,
-                        "conversation_id": r.conversation_id,
-                        "role": r.role,
-                        "content": r.content,
-                        "agent_id": r.agent_id,
-                        "agent_name": r.agent_name,
-                        "response_time_ms": r.response_time_ms,
-                        "created_at": r.created_at,
-                    }
-                    for r in rows
-                ]
-                return {"session_name": session_name, "total": int(total), "items": items, "order": order_key}
-
-        return await asyncio.to_thread(_query)
+        except ProgrammingError:
+            return None
+        if row is None:
+            return None
+        return float(row[0]), float(row[1])
 
     async def search_sessions(
         self,
@@ -381,132 +874,145 @@ class MessageStoreService:
         end_time: Optional[float] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         Search sessions by message full-text match and return aggregated session list.
+
+        Sessions are ordered by (last_match_at, session_name) descending; pass the
+        previous page's `next_cursor` to continue without OFFSET (`page` is then
+        ignored). `count` works as in `get_messages_by_session`.
         """
         query_text = (q or "").strip()
         if len(query_text) < 2:
             raise ValueError("query too short")
+        after = _decode_cursor(cursor, (float, str)) if cursor else None
+        count_mode = _check_count_mode(count, cursor)
 
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _query(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatMessageModel, ChatSessionMetaModel
 
-            init_database()
             ts_query = func.websearch_to_tsquery("simple", query_text)
 
-            with get_db_session() as session:
-                base = session.query(ChatMessageModel).filter(ChatMessageModel.content_tsv.op("@@")(ts_query))
-                if start_time is not None:
-                    base = base.filter(ChatMessageModel.created_at >= float(start_time))
-                if end_time is not None:
-                    base = base.filter(ChatMessageModel.created_at <= float(end_time))
+            base = session.query(ChatMessageModel).filter(ChatMessageModel.content_tsv.op("@@")(ts_query))
+            if start_time is not None:
+                base = base.filter(ChatMessageModel.created_at >= float(start_time))
+            if end_time is not None:
+                base = base.filter(ChatMessageModel.created_at <= float(end_time))
+
+            agg = (
+                base.with_entities(
+                    ChatMessageModel.session_name.label("session_name"),
+                    func.count(ChatMessageModel.id).label("match_count"),
+                    func.max(ChatMessageModel.created_at).label("last_match_at"),
+                )
+                .group_by(ChatMessageModel.session_name)
+            )
 
-                agg = (
+            total, estimated = _count_rows(session, agg, count_mode)
+
+            last_match = func.max(ChatMessageModel.created_at)
+            ordered = agg.order_by(last_match.desc(), ChatMessageModel.session_name.desc())
+            if after is not None:
+                ordered = ordered.having(tuple_(last_match, ChatMessageModel.session_name) < tuple_(*after))
+            else:
+                ordered = ordered.offset(max(page - 1, 0) * max(page_size, 1))
+            rows = ordered.limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+
+            session_names = [r.session_name for r in rows]
+            previews: dict[str, str] = {}
+            if session_names:
+                last_match_sq = (
                     base.with_entities(
                         ChatMessageModel.session_name.label("session_name"),
-                        func.count(ChatMessageModel.id).label("match_count"),
                         func.max(ChatMessageModel.created_at).label("last_match_at"),
                     )
+                    .filter(ChatMessageModel.session_name.in_(session_names))
                     .group_by(ChatMessageModel.session_name)
+                    .subquery()
                 )
-
-                total = session.query(func.count()).select_from(agg.subquery()).scalar() or 0
-                offset = max(page - 1, 0) * max(page_size, 1)
-                rows = (
-                    agg.order_by(func.max(ChatMessageModel.created_at).desc())
-                    .offset(offset)
-                    .limit(page_size)
+                msg_rows = (
+                    session.query(ChatMessageModel.session_name, ChatMessageModel.content)
+                    .join(
+                        last_match_sq,
+                        and_(
+                            ChatMessageModel.session_name == last_match_sq.c.session_name,
+                            ChatMessageModel.created_at == last_match_sq.c.last_match_at,
+                        ),
+                    )
                     .all()
                 )
+                for sn, content in msg_rows:
+                    previews[sn] = (content or "")[:160]
 
-                session_names = [r.session_name for r in rows]
-                previews: dict[str, str] = {}
-                if session_names:
-                    last_match_sq = (
-                        base.with_entities(
-                            ChatMessageModel.session_name.label("session_name"),
-                            func.max(ChatMessageModel.created_at).label("last_match_at"),
-                        )
-                        .filter(ChatMessageModel.session_name.in_(session_names))
-                        .group_by(ChatMessageModel.session_name)
-                        .subquery()
-                    )
-                    msg_rows = (
-                        session.query(ChatMessageModel.session_name, ChatMessageModel.content)
-                        .join(
-                            last_match_sq,
-                            and_(
-                                ChatMessageModel.session_name == last_match_sq.c.session_name,
-                                ChatMessageModel.created_at == last_match_sq.c.last_match_at,
-                            ),
-                        )
+            meta_by_session: dict[str, Any] = {}
+            if session_names:
+                try:
+                    meta_rows = (
+                        session.query(ChatSessionMetaModel)
+                        .filter(ChatSessionMetaModel.session_name.in_(session_names))
                         .all()
                     )
-                    for sn, content in msg_rows:
-                        previews[sn] = (content or "")[:160]
-
-                meta_by_session: dict[str, Any] = {}
-                if session_names:
-                    try:
-                        meta_rows = (
-                            session.query(ChatSessionMetaModel)
-                            .filter(ChatSessionMetaModel.session_name.in_(session_names))
-                            .all()
-                        )
-                        for m in meta_rows:
-                            meta_by_session[m.session_name] = {
-                                "display_name": m.display_name,
-                                "note": m.note,
-                                "tags": m.tags,
-                                "updated_by": m.updated_by,
-                                "updated_at": m.updated_at,
-                            }
-                    except ProgrammingError:
-                        meta_by_session = {}
-
-                items = [
-                    {
-                        "session_name": r.session_name,
-                        "meta": meta_by_session.get(r.session_name),
-                        "match_count": int(r.match_count or 0),
-                        "last_match_at": float(r.last_match_at or 0.0),
-                        "last_match_preview": previews.get(r.session_name, ""),
-                    }
-                    for r in rows
-                ]
+                    for m in meta_rows:
+                        meta_by_session[m.session_name] = {
+                            "display_name": m.display_name,
+                            "note": m.note,
+                            "tags": m.tags,
+                            "updated_by": m.updated_by,
+                            "updated_at": m.updated_at,
+                        }
+                except ProgrammingError:
+                    meta_by_session = {}
+
+            items = [
+                {
+                    "session_name": r.session_name,
+                    "meta": meta_by_session.get(r.session_name),
+                    "match_count": int(r.match_count or 0),
+                    "last_match_at": float(r.last_match_at or 0.0),
+                    "last_match_preview": previews.get(r.session_name, ""),
+                }
+                for r in rows
+            ]
 
-                return {"items": items, "total": int(total), "page": int(page), "page_size": int(page_size)}
+            return {
+                "items": items,
+                "total": total,
+                "total_is_estimate": estimated,
+                "page": int(page),
+                "page_size": int(page_size),
+                "has_more": has_more,
+                "next_cursor": _encode_cursor([float(rows[-1].last_match_at), rows[-1].session_name]) if has_more else None,
+            }
 
-        return await asyncio.to_thread(_query)
+        return await self._run_db(_query)
 
     async def get_session_meta(self, session_name: str) -> dict[str, Any]:
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _query(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatSessionMetaModel
 
-            init_database()
-            with get_db_session() as session:
-                try:
-                    row = session.query(ChatSessionMetaModel).filter(ChatSessionMetaModel.session_name == session_name).first()
-                except ProgrammingError:
-                    return {"session_name": session_name, "meta": None}
-                if not row:
-                    return {"session_name": session_name, "meta": None}
-                return {
-                    "session_name": session_name,
-                    "meta": {
-                        "display_name": row.display_name,
-                        "note": row.note,
-                        "tags": row.tags,
-                        "updated_by": row.updated_by,
-                        "created_at": row.created_at,
-                        "updated_at": row.updated_at,
-                    },
-                }
-
-        return await asyncio.to_thread(_query)
+            try:
+                row = session.query(ChatSessionMetaModel).filter(ChatSessionMetaModel.session_name == session_name).first()
+            except ProgrammingError:
+                return {"session_name": session_name, "meta": None}
+            if not row:
+                return {"session_name": session_name, "meta": None}
+            return {
+                "session_name": session_name,
+                "meta": {
+                    "display_name": row.display_name,
+                    "note": row.note,
+                    "tags": row.tags,
+                    "updated_by": row.updated_by,
+                    "created_at": row.created_at,
+                    "updated_at": row.updated_at,
+                },
+            }
+
+        return await self._run_db(_query)
 
     async def upsert_session_meta(
         self,
@@ -517,49 +1023,46 @@ class MessageStoreService:
         tags: Any,
         updated_by: Optional[str],
     ) -> dict[str, Any]:
-        def _write() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _write(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatSessionMetaModel
 
-            init_database()
             now = time.time()
-            with get_db_session() as session:
-                try:
-                    row = session.query(ChatSessionMetaModel).filter(ChatSessionMetaModel.session_name == session_name).first()
-                except ProgrammingError as e:
-                    raise RuntimeError(f"chat_session_meta unavailable: {e}")
-                if not row:
-                    row = ChatSessionMetaModel(
-                        session_name=session_name,
-                        display_name=display_name.strip() if isinstance(display_name, str) and display_name.strip() else None,
-                        note=note.strip() if isinstance(note, str) and note.strip() else None,
-                        tags=tags,
-                        updated_by=updated_by,
-                        created_at=now,
-                        updated_at=now,
-                    )
-                    session.add(row)
-                else:
-                    row.display_name = display_name.strip() if isinstance(display_name, str) and display_name.strip() else None
-                    row.note = note.strip() if isinstance(note, str) and note.strip() else None
-                    row.tags = tags
-                    row.updated_by = updated_by
-                    row.updated_at = now
-                session.flush()
+            try:
+                row = session.query(ChatSessionMetaModel).filter(ChatSessionMetaModel.session_name == session_name).first()
+            except ProgrammingError as e:
+                raise RuntimeError(f"chat_session_meta unavailable: {e}")
+            if not row:
+                row = ChatSessionMetaModel(
+                    session_name=session_name,
+                    display_name=display_name.strip() if isinstance(display_name, str) and display_name.strip() else None,
+                    note=note.strip() if isinstance(note, str) and note.strip() else None,
+                    tags=tags,
+                    updated_by=updated_by,
+                    created_at=now,
+                    updated_at=now,
+                )
+                session.add(row)
+            else:
+                row.display_name = display_name.strip() if isinstance(display_name, str) and display_name.strip() else None
+                row.note = note.strip() if isinstance(note, str) and note.strip() else None
+                row.tags = tags
+                row.updated_by = updated_by
+                row.updated_at = now
+            session.flush()
 
-                return {
-                    "session_name": session_name,
-                    "meta": {
-                        "display_name": row.display_name,
-                        "note": row.note,
-                        "tags": row.tags,
-                        "updated_by": row.updated_by,
-                        "created_at": row.created_at,
-                        "updated_at": row.updated_at,
-                    },
-                }
+            return {
+                "session_name": session_name,
+                "meta": {
+                    "display_name": row.display_name,
+                    "note": row.note,
+                    "tags": row.tags,
+                    "updated_by": row.updated_by,
+                    "created_at": row.created_at,
+                    "updated_at": row.updated_at,
+                },
+            }
 
-        return await asyncio.to_thread(_write)
+        return await self._run_db(_write)
 
     async def create_export_job(
         self,
@@ -567,11 +1070,9 @@ class MessageStoreService:
         created_by: str,
         request: dict[str, Any],
     ) -> dict[str, Any]:
-        def _write() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _write(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatExportJobModel
 
-            init_database()
             now = time.time()
             job_id = str(uuid.uuid4())
             row = ChatExportJobModel(
@@ -582,15 +1083,14 @@ class MessageStoreService:
                 created_at=now,
                 updated_at=now,
             )
-            with get_db_session() as session:
-                try:
-                    session.add(row)
-                    session.flush()
-                except ProgrammingError as e:
-                    raise RuntimeError(f"chat_export_jobs unavailable: {e}")
+            try:
+                session.add(row)
+                session.flush()
+            except ProgrammingError as e:
+                raise RuntimeError(f"chat_export_jobs unavailable: {e}")
             return {"job_id": job_id, "status": "pending", "created_by": created_by}
 
-        return await asyncio.to_thread(_write)
+        return await self._run_db(_write)
 
     async def list_export_jobs(
         self,
@@ -599,70 +1099,64 @@ class MessageStoreService:
         limit: int = 50,
         offset: int = 0,
     ) -> dict[str, Any]:
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _query(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatExportJobModel
 
-            init_database()
-            with get_db_session() as session:
-                try:
-                    q = session.query(ChatExportJobModel).filter(ChatExportJobModel.created_by == created_by)
-                except ProgrammingError as e:
-                    raise RuntimeError(f"chat_export_jobs unavailable: {e}")
-                total = q.count()
-                rows = (
-                    q.order_by(ChatExportJobModel.created_at.desc())
-                    .offset(max(offset, 0))
-                    .limit(min(max(limit, 1), 200))
-                    .all()
+            try:
+                q = session.query(ChatExportJobModel).filter(ChatExportJobModel.created_by == created_by)
+            except ProgrammingError as e:
+                raise RuntimeError(f"chat_export_jobs unavailable: {e}")
+            total = q.count()
+            rows = (
+                q.order_by(ChatExportJobModel.created_at.desc())
+                .offset(max(offset, 0))
+                .limit(min(max(limit, 1), 200))
+                .all()
+            )
+            items = []
+            for r in rows:
+                items.append(
+                    {
+                        "job_id": r.job_id,
+                        "created_by": r.created_by,
+                        "status": r.status,
+                        "request": r.request,
+                        "row_count": r.row_count,
+                        "file_path": r.file_path,
+                        "error": r.error,
+                        "created_at": r.created_at,
+                        "updated_at": r.updated_at,
+                        "finished_at": r.finished_at,
+                    }
                 )
-                items = []
-                for r in rows:
-                    items.append(
-                        {
-                            "job_id": r.job_id,
-                            "created_by": r.created_by,
-                            "status": r.status,
-                            "request": r.request,
-                            "row_count": r.row_count,
-                            "file_path": r.file_path,
-                            "error": r.error,
-                            "created_at": r.created_at,
-                            "updated_at": r.updated_at,
-                            "finished_at": r.finished_at,
-                        }
-                    )
-                return {"items": items, "total": int(total), "limit": int(limit), "offset": int(offset)}
+            return {"items": items, "total": int(total), "limit": int(limit), "offset": int(offset)}
 
-        return await asyncio.to_thread(_query)
+        return await self._run_db(_query)
 
     async def get_export_job(self, job_id: str) -> dict[str, Any]:
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _query(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatExportJobModel
 
-            init_database()
-            with get_db_session() as session:
-                try:
-                    r = session.query(ChatExportJobModel).filter(ChatExportJobModel.job_id == job_id).first()
-                except ProgrammingError as e:
-                    raise RuntimeError(f"chat_export_jobs unavailable: {e}")
-                if not r:
-                    raise ValueError("job not found")
-                return {
-                    "job_id": r.job_id,
-                    "created_by": r.created_by,
-                    "status": r.status,
-                    "request": r.request,
-                    "row_count": r.row_count,
-                    "file_path": r.file_path,
-                    "error": r.error,
-                    "created_at": r.created_at,
-                    "updated_at": r.updated_at,
-                    "finished_at": r.finished_at,
-                }
-
-        return await asyncio.to_thread(_query)
+            try:
+                r = session.query(ChatExportJobModel).filter(ChatExportJobModel.job_id == job_id).first()
+            except ProgrammingError as e:
+                raise RuntimeError(f"chat_export_jobs unavailable: {e}")
+            if not r:
+                raise ValueError("job not found")
+            return {
+                "job_id": r.job_id,
+                "created_by": r.created_by,
+                "status": r.status,
+                "request": r.request,
+                "row_count": r.row_count,
+                "file_path": r.file_path,
+                "error": r.error,
+                "created_at": r.created_at,
+                "updated_at": r.updated_at,
+                "finished_at": r.finished_at,
+            }
+
+        return await self._run_db(_query)
 
     @staticmethod
     def _export_dir() -> pathlib.Path:
@@ -672,6 +1166,9 @@ class MessageStoreService:
     async def run_export_job(self, job_id: str) -> None:
         """
         Execute an export job (best-effort) and write CSV to disk.
+
+        Stays on the sync pool in a worker thread: rows are streamed
+        (`yield_per`) straight into the file, which is blocking I/O anyway.
         """
 
         def _run() -> None:
@@ -813,7 +1310,15 @@ class MessageStoreService:
         session_name: Optional[str] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None,
     ) -> dict[str, Any]:
+        """
+        Full-text message search ordered by (rank, created_at, id) descending.
+
+        Pass the previous page's `next_cursor` to continue without OFFSET (`page`
+        is then ignored). `count` works as in `get_messages_by_session`.
+        """
         query_text = (q or "").strip()
         if len(query_text) < 2:
             raise ValueError("query too short")
@@ -821,59 +1326,76 @@ class MessageStoreService:
         role_filter = role.strip().lower() if role else None
         if role_filter and role_filter not in {"user", "assistant", "agent"}:
             raise ValueError("invalid role")
+        after = _decode_cursor(cursor, (float, float, int)) if cursor else None
+        count_mode = _check_count_mode(count, cursor)
 
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
+        def _query(session: Any) -> dict[str, Any]:
             from infrastructure.database.models import ChatMessageModel
 
-            init_database()
-
             ts_query = func.websearch_to_tsquery("simple", query_text)
             rank = func.ts_rank(ChatMessageModel.content_tsv, ts_query)
 
-            with get_db_session() as session:
-                base = session.query(ChatMessageModel).filter(ChatMessageModel.content_tsv.op("@@")(ts_query))
-                if start_time is not None:
-                    base = base.filter(ChatMessageModel.created_at >= float(start_time))
-                if end_time is not None:
-                    base = base.filter(ChatMessageModel.created_at <= float(end_time))
-                if role_filter:
-                    base = base.filter(ChatMessageModel.role == role_filter)
-                if session_name:
-                    base = base.filter(ChatMessageModel.session_name == session_name)
-
-                total = base.count()
-                offset = max(page - 1, 0) * max(page_size, 1)
-
-                rows = (
-                    base.add_columns(rank.label("rank"))
-                    .order_by(rank.desc(), ChatMessageModel.created_at.desc())
-                    .offset(offset)
-                    .limit(page_size)
-                    .all()
-                )
+            base = session.query(ChatMessageModel).filter(ChatMessageModel.content_tsv.op("@@")(ts_query))
+            if start_time is not None:
+                base = base.filter(ChatMessageModel.created_at >= float(start_time))
+            if end_time is not None:
+                base = base.filter(ChatMessageModel.created_at <= float(end_time))
+            if role_filter:
+                base = base.filter(ChatMessageModel.role == role_filter)
+            if session_name:
+                base = base.filter(ChatMessageModel.session_name == session_name)
 
-                items = []
-                for msg, msg_rank in rows:
-                    items.append(
-                        {
-                            "id": msg.id,
-                            "message_id": msg.message_id,
-                            "session_name": msg.session_name,
-                            "conversation_id": msg.conversation_id,
-                            "role": msg.role,
-                            "content": msg.content,
-                            "agent_id": msg.agent_id,
-                            "agent_name": msg.agent_name,
-                            "response_time_ms": msg.response_time_ms,
-                            "created_at": msg.created_at,
-                            "rank": float(msg_rank or 0.0),
-                        }
-                    )
+            total, estimated = _count_rows(session, base, count_mode)
 
-                return {"items": items, "total": int(total), "page": int(page), "page_size": int(page_size)}
+            ordered = base.add_columns(rank.label("rank")).order_by(
+                rank.desc(), ChatMessageModel.created_at.desc(), ChatMessageModel.id.desc()
+            )
+            if after is not None:
+                # ts_rank() is real: compare as real so the cursor row itself is excluded
+                after_rank, after_created_at, after_id = after
+                ordered = ordered.filter(
+                    tuple_(rank, ChatMessageModel.created_at, ChatMessageModel.id)
+                    < tuple_(cast(after_rank, REAL), after_created_at, after_id)
+                )
+            else:
+                ordered = ordered.offset(max(page - 1, 0) * max(page_size, 1))
+            rows = ordered.limit(page_size + 1).all()
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+
+            items = []
+            for msg, msg_rank in rows:
+                items.append(
+                    {
+                        "id": msg.id,
+                        "message_id": msg.message_id,
+                        "session_name": msg.session_name,
+                        "conversation_id": msg.conversation_id,
+                        "role": msg.role,
+                        "content": msg.content,
+                        "agent_id": msg.agent_id,
+                        "agent_name": msg.agent_name,
+                        "response_time_ms": msg.response_time_ms,
+                        "created_at": msg.created_at,
+                        "rank": float(msg_rank or 0.0),
+                    }
+                )
 
-        return await asyncio.to_thread(_query)
+            next_cursor = None
+            if has_more:
+                last_msg, last_rank = rows[-1]
+                next_cursor = _encode_cursor([float(last_rank or 0.0), last_msg.created_at, last_msg.id])
+            return {
+                "items": items,
+                "total": total,
+                "total_is_estimate": estimated,
+                "page": int(page),
+                "page_size": int(page_size),
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+            }
+
+        return await self._run_db(_query)
 
     async def get_statistics(
         self,
@@ -881,43 +1403,89 @@ class MessageStoreService:
         start_time: Optional[float] = None,
         end_time: Optional[float] = None,
     ) -> dict[str, Any]:
-        def _query() -> dict[str, Any]:
-            from infrastructure.database import init_database, get_db_session
-            from infrastructure.database.models import ChatMessageModel
+        """
+        Message / session statistics.
 
-            init_database()
+        Without a time window the totals are summed from `chat_session_summary`;
+        a window is aggregated from `chat_messages` via the `created_at` index, so
+        its cost follows the window size rather than the retained history.
+        """
 
-            with get_db_session() as session:
-                base = session.query(ChatMessageModel)
-                if start_time is not None:
-                    base = base.filter(ChatMessageModel.created_at >= float(start_time))
-                if end_time is not None:
-                    base = base.filter(ChatMessageModel.created_at <= float(end_time))
-
-                total_messages = base.count()
-                total_sessions = (
-                    base.with_entities(ChatMessageModel.session_name).distinct().count()
-                )
-                by_role_rows = (
-                    base.with_entities(ChatMessageModel.role, func.count(ChatMessageModel.id))
-                    .group_by(ChatMessageModel.role)
-                    .all()
-                )
-                by_role = {r: int(c) for r, c in by_role_rows}
-                avg_resp = (
-                    base.filter(ChatMessageModel.role == "assistant")
-                    .with_entities(func.avg(ChatMessageModel.response_time_ms))
-                    .scalar()
-                )
+        if start_time is None and end_time is None:
+            try:
+                return await self._run_db(self._statistics_from_summary)
+            except ProgrammingError as e:
+                logger.warning("[MessageStore] chat_session_summary query failed, aggregating chat_messages: %s", e)
 
-                return {
-                    "total_messages": int(total_messages),
-                    "total_sessions": int(total_sessions),
-                    "by_role": by_role,
-                    "avg_response_time_ms": float(avg_resp) if avg_resp is not None else 0.0,
-                }
+        return await self._run_db(lambda session: self._statistics_from_messages(session, start_time, end_time))
+
+    @staticmethod
+    def _statistics_from_summary(session: Any) -> dict[str, Any]:
+        from infrastructure.database.models import ChatSessionSummaryModel as S
+
+        row = session.query(
+            func.count(S.session_name),
+            func.coalesce(func.sum(S.message_count), 0),
+            func.coalesce(func.sum(S.user_count), 0),
+            func.coalesce(func.sum(S.assistant_count), 0),
+            func.coalesce(func.sum(S.agent_count), 0),
+            func.coalesce(func.sum(S.response_time_ms_sum), 0),
+            func.coalesce(func.sum(S.response_time_count), 0),
+        ).one()
+        total_sessions, total_messages, users, assistants, agents, rt_sum, rt_count = row
+
+        by_role = {
+            role: int(count)
+            for role, count in (("user", users), ("assistant", assistants), ("agent", agents))
+            if count
+        }
+        other = int(total_messages) - sum(by_role.values())
+        if other > 0:
+            by_role["other"] = other
+
+        return {
+            "total_messages": int(total_messages),
+            "total_sessions": int(total_sessions),
+            "by_role": by_role,
+            "avg_response_time_ms": float(rt_sum) / int(rt_count) if rt_count else 0.0,
+        }
+
+    @staticmethod
+    def _statistics_from_messages(
+        session: Any,
+        start_time: Optional[float],
+        end_time: Optional[float],
+    ) -> dict[str, Any]:
+        from infrastructure.database.models import ChatMessageModel
+
+        base = session.query(ChatMessageModel)
+        if start_time is not None:
+            base = base.filter(ChatMessageModel.created_at >= float(start_time))
+        if end_time is not None:
+            base = base.filter(ChatMessageModel.created_at <= float(end_time))
+
+        total_messages = base.count()
+        total_sessions = (
+            base.with_entities(ChatMessageModel.session_name).distinct().count()
+        )
+        by_role_rows = (
+            base.with_entities(ChatMessageModel.role, func.count(ChatMessageModel.id))
+            .group_by(ChatMessageModel.role)
+            .all()
+        )
+        by_role = {r: int(c) for r, c in by_role_rows}
+        avg_resp = (
+            base.filter(ChatMessageModel.role == "assistant")
+            .with_entities(func.avg(ChatMessageModel.response_time_ms))
+            .scalar()
+        )
 
-        return await asyncio.to_thread(_query)
+        return {
+            "total_messages": int(total_messages),
+            "total_sessions": int(total_sessions),
+            "by_role": by_role,
+            "avg_response_time_ms": float(avg_resp) if avg_resp is not None else 0.0,
+        }
 
     async def export_messages_csv(
         self,
@@ -926,34 +1494,30 @@ class MessageStoreService:
         start_time: Optional[float] = None,
         end_time: Optional[float] = None,
     ) -> bytes:
-        def _query_rows() -> list[dict[str, Any]]:
-            from infrastructure.database import init_database, get_db_session
+        def _query_rows(session: Any) -> list[dict[str, Any]]:
             from infrastructure.database.models import ChatMessageModel
 
-            init_database()
+            q = session.query(ChatMessageModel).filter(ChatMessageModel.session_name == session_name)
+            if start_time is not None:
+                q = q.filter(ChatMessageModel.created_at >= float(start_time))
+            if end_time is not None:
+                q = q.filter(ChatMessageModel.created_at <= float(end_time))
+            rows = q.order_by(ChatMessageModel.created_at.asc()).all()
 
-            with get_db_session() as session:
-                q = session.query(ChatMessageModel).filter(ChatMessageModel.session_name == session_name)
-                if start_time is not None:
-                    q = q.filter(ChatMessageModel.created_at >= float(start_time))
-                if end_time is not None:
-                    q = q.filter(ChatMessageModel.created_at <= float(end_time))
-                rows = q.order_by(ChatMessageModel.created_at.asc()).all()
-
-                return [
-                    {
-                        "created_at": r.created_at,
-                        "role": r.role,
-                        "content": r.content,
-                        "conversation_id": r.conversation_id or "",
-                        "agent_id": r.agent_id or "",
-                        "agent_name": r.agent_name or "",
-                        "response_time_ms": r.response_time_ms if r.response_time_ms is not None else "",
-                    }
-                    for r in rows
-                ]
+            return [
+                {
+                    "created_at": r.created_at,
+                    "role": r.role,
+                    "content": r.content,
+                    "conversation_id": r.conversation_id or "",
+                    "agent_id": r.agent_id or "",
+                    "agent_name": r.agent_name or "",
+                    "response_time_ms": r.response_time_ms if r.response_time_ms is not None else "",
+                }
+                for r in rows
+            ]
 
-        rows = await asyncio.to_thread(_query_rows)
+        rows = await self._run_db(_query_rows)
 
         buf = io.StringIO()
         writer = csv.DictWriter(
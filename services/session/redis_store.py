@@ -9,12 +9,15 @@ Redis 会话状态存储实现
 遵守约束16：生产环境安全性与稳定性要求
 """
 
+import asyncio
 import redis
 import json
 import logging
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple, Any, Dict
 from datetime import datetime, timezone
 
+from pydantic import TypeAdapter
+
 from services.session.state import (
     SessionState,
     SessionStatus,
@@ -24,6 +27,167 @@ from services.session.state import (
 logger = logging.getLogger(__name__)
 
 
+def status_index_key(status) -> str:
+    """
+    状态索引 key（兼容枚举和字符串）
+
+    SessionStatus 是 str 混入枚举，Python 3.11+ 的 f-string 会渲染为
+    "SessionStatus.X"，这里统一取 value。
+    """
+    return f"status:{getattr(status, 'value', status)}"
+
+
+def legacy_status_index_keys() -> List[str]:
+    """旧版状态索引 key（"status:SessionStatus.X"），索引回填完成后删除"""
+    return [f"status:{SessionStatus.__name__}.{status.name}" for status in SessionStatus]
+
+
+# updated_at 有序集合索引（全局 + 按状态），用于分页列表
+UPDATED_INDEX_KEY = "sessions:by_updated"
+UPDATED_INDEX_VERSION_KEY = f"{UPDATED_INDEX_KEY}:version"
+UPDATED_INDEX_LOCK_KEY = f"{UPDATED_INDEX_KEY}:rebuild_lock"
+# 版本 2：回填时同时按 status_index_key 重建状态集合索引
+UPDATED_INDEX_VERSION = "2"
+# MGET 单批最大 key 数
+HYDRATE_BATCH_SIZE = 500
+
+_session_list_adapter = TypeAdapter(List[SessionState])
+
+
+def updated_index_key(status=None) -> str:
+    """updated_at 索引 key，status 为空时返回全局索引"""
+    if status is None:
+        return UPDATED_INDEX_KEY
+    return f"{UPDATED_INDEX_KEY}:{getattr(status, 'value', status)}"
+
+
+# 坐席负载索引：agent_load:{manual|pending}:{agent_id} 为该坐席的人工会话/待接入会话集合，
+# SCARD 即负载；agent_load:owner 记录每个会话当前所在集合，状态/坐席变化时据此移出旧集合
+AGENT_LOAD_PREFIX = "agent_load:"
+AGENT_LOAD_OWNER_KEY = f"{AGENT_LOAD_PREFIX}owner"
+AGENT_LOAD_VERSION_KEY = f"{AGENT_LOAD_PREFIX}version"
+AGENT_LOAD_LOCK_KEY = f"{AGENT_LOAD_PREFIX}rebuild_lock"
+AGENT_LOAD_VERSION = "1"
+AGENT_LOAD_BUCKETS = {
+    SessionStatus.MANUAL_LIVE: "manual",
+    SessionStatus.PENDING_MANUAL: "pending",
+}
+
+
+# 在服务端原子地把会话移到新的负载集合：读取 owner 记录、移出旧集合、加入新集合并更新记录
+# KEYS[1] = agent_load:owner；ARGV[1] = 会话名，ARGV[2] = 新 owner（空串表示不计入负载），
+# ARGV[3] = 负载集合 key 前缀
+AGENT_LOAD_MOVE_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous and previous ~= ARGV[2] then
+    redis.call('SREM', ARGV[3] .. previous, ARGV[1])
+end
+if ARGV[2] ~= '' then
+    redis.call('SADD', ARGV[3] .. ARGV[2], ARGV[1])
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+elseif previous then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return previous
+"""
+
+
+def agent_load_key(agent_id: str, bucket: str) -> str:
+    return f"{AGENT_LOAD_PREFIX}{bucket}:{agent_id}"
+
+
+def agent_load_owner(state: SessionState) -> Optional[str]:
+    """会话计入的负载集合（"{bucket}:{agent_id}"），不计入时返回 None"""
+    bucket = AGENT_LOAD_BUCKETS.get(state.status)
+    if bucket and state.assigned_agent:
+        return f"{bucket}:{state.assigned_agent.id}"
+    return None
+
+
+def queue_agent_load_move(pipe: Any, session_name: str, owner: Optional[str]) -> None:
+    """将坐席负载集合迁移加入 pipeline（AGENT_LOAD_MOVE_SCRIPT，旧 owner 在服务端读取）"""
+    pipe.eval(AGENT_LOAD_MOVE_SCRIPT, 1, AGENT_LOAD_OWNER_KEY, session_name, owner or "", AGENT_LOAD_PREFIX)
+
+
+def queue_session_save(pipe: Any, state: SessionState, ttl: int) -> None:
+    """
+    将会话保存命令加入 pipeline（同步/异步 pipeline 通用）
+
+    SETEX 会话数据，维护状态集合索引、updated_at 有序集合索引和坐席负载集合。
+    """
+    name = state.session_name
+    pipe.setex(f"session:{name}", ttl, state.model_dump_json())
+    queue_status_index(pipe, state)
+    queue_agent_load_move(pipe, name, agent_load_owner(state))
+
+
+def queue_status_index(pipe: Any, state: SessionState) -> None:
+    """将会话写入当前状态的集合索引和 updated_at 索引，并移出其他状态的索引（保存与回填共用）"""
+    name = state.session_name
+    current_key = status_index_key(state.status)
+    score = float(state.updated_at or 0)
+
+    pipe.sadd(current_key, name)
+    pipe.zadd(updated_index_key(), {name: score})
+    pipe.zadd(updated_index_key(state.status), {name: score})
+    for status in SessionStatus:
+        if status_index_key(status) != current_key:
+            pipe.srem(status_index_key(status), name)
+            pipe.zrem(updated_index_key(status), name)
+
+
+def queue_index_removal(pipe: Any, session_names: Sequence[str]) -> None:
+    """将会话从所有状态索引、updated_at 索引和坐席负载集合移除"""
+    if not session_names:
+        return
+    pipe.zrem(updated_index_key(), *session_names)
+    for status in SessionStatus:
+        pipe.srem(status_index_key(status), *session_names)
+        pipe.zrem(updated_index_key(status), *session_names)
+
+    for name in session_names:
+        queue_agent_load_move(pipe, name, None)
+
+
+def parse_agent_loads(agent_ids: Sequence[str], counts: Sequence[Any]) -> Dict[str, Dict[str, int]]:
+    """把按 (manual, pending) 顺序排列的 SCARD 结果整理为 {agent_id: {"manual", "pending"}}"""
+    loads: Dict[str, Dict[str, int]] = {}
+    for index, agent_id in enumerate(agent_ids):
+        loads[agent_id] = {
+            "manual": int(counts[index * 2] or 0),
+            "pending": int(counts[index * 2 + 1] or 0),
+        }
+    return loads
+
+
+def deserialize_sessions(
+    session_names: Sequence[str],
+    raw_items: Sequence[Optional[str]]
+) -> Tuple[List[SessionState], List[str]]:
+    """
+    批量反序列化 MGET 结果
+
+    Returns:
+        (会话列表（保持输入顺序）, 数据已不存在的会话名列表)
+    """
+    present = [raw for raw in raw_items if raw]
+    missing = [name for name, raw in zip(session_names, raw_items) if not raw]
+    if not present:
+        return [], missing
+
+    try:
+        states = _session_list_adapter.validate_json(f"[{','.join(present)}]")
+    except Exception:
+        # 单条数据损坏时逐条解析，跳过坏数据
+        states = []
+        for raw in present:
+            try:
+                states.append(SessionState.model_validate_json(raw))
+            except Exception as e:
+                logger.warning(f"⚠️ 会话数据解析失败，已跳过: {e}")
+    return states, missing
+
+
 class RedisSessionStore(SessionStateStore):
     """
     Redis 会话状态存储实现
@@ -68,6 +232,8 @@ class RedisSessionStore(SessionStateStore):
 
             self.redis = redis.Redis(connection_pool=pool)
             self.default_ttl = default_ttl
+            self._updated_index_ready = False
+            self._agent_load_ready = False
 
             # 验证连接
             self.redis.ping()
@@ -81,11 +247,13 @@ class RedisSessionStore(SessionStateStore):
         """
         保存会话到 Redis
 
-        工作流程:
+        工作流程（单次 MULTI 往返）:
         1. 将 SessionState 对象序列化为 JSON
         2. 存储到 Redis: session:{session_name}
         3. 更新状态索引: status:{status}
-        4. 设置 24 小时过期时间（约束16.1.1 - 必须设置 TTL）
+        4. 更新 updated_at 索引: sessions:by_updated[:{status}]
+        5. 更新坐席负载集合: agent_load:{bucket}:{agent_id}（Lua 脚本在服务端读取旧 owner）
+        6. 设置 24 小时过期时间（约束16.1.1 - 必须设置 TTL）
 
         Args:
             state: 会话状态对象
@@ -94,22 +262,9 @@ class RedisSessionStore(SessionStateStore):
             bool: 保存是否成功
         """
         try:
-            # 1. 序列化（使用 Pydantic 的 model_dump_json）
-            key = f"session:{state.session_name}"
-            json_data = state.model_dump_json()
-
-            # 2. 存储（带过期时间 - 约束16.1.1）
-            self.redis.setex(key, self.default_ttl, json_data)
-
-            # 3. 更新状态索引（用于按状态查询）
-            status_key = f"status:{state.status}"
-            self.redis.sadd(status_key, state.session_name)
-
-            # 4. 清理旧状态索引（如果状态发生变化）
-            for status in SessionStatus:
-                if status != state.status:
-                    old_status_key = f"status:{status}"
-                    self.redis.srem(old_status_key, state.session_name)
+            pipe = self.redis.pipeline(transaction=True)
+            queue_session_save(pipe, state, self.default_ttl)
+            pipe.execute()
 
             logger.debug(f"💾 会话已保存: {state.session_name} (状态: {state.status})")
             return True
@@ -212,17 +367,10 @@ class RedisSessionStore(SessionStateStore):
             bool: 删除是否成功
         """
         try:
-            # 1. 先获取会话状态，用于清理索引
-            state = await self.get(session_name)
-
-            # 2. 删除主数据
-            key = f"session:{session_name}"
-            self.redis.delete(key)
-
-            # 3. 清理状态索引
-            if state:
-                status_key = f"status:{state.status}"
-                self.redis.srem(status_key, session_name)
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.delete(f"session:{session_name}")
+            queue_index_removal(pipe, [session_name])
+            pipe.execute()
 
             logger.debug(f"🗑️  会话已删除: {session_name}")
             return True
@@ -241,9 +389,9 @@ class RedisSessionStore(SessionStateStore):
         按状态查询会话列表
 
         工作流程:
-        1. 从状态索引获取会话名称列表
-        2. 批量读取会话数据
-        3. 排序和分页
+        1. ZREVRANGE 状态 updated_at 索引取当前页会话名
+        2. 单次 MGET 读取并批量反序列化
+        （索引回填未完成时回退为 SCAN 全部会话）
 
         Args:
             status: 会话状态
@@ -254,23 +402,11 @@ class RedisSessionStore(SessionStateStore):
             会话列表
         """
         try:
-            status_key = f"status:{status}"
-            session_names = self.redis.smembers(status_key)
-
-            # 批量获取会话数据
-            sessions = []
-            for name in session_names:
-                state = await self.get(name)
-                if state:
-                    sessions.append(state)
-
-            # 排序（按更新时间倒序）
-            sessions.sort(key=lambda x: x.updated_at, reverse=True)
-
-            # 分页
-            result = sessions[offset:offset + limit]
-
-            logger.debug(f"📋 查询会话列表: 状态={status}, 总数={len(sessions)}, 返回={len(result)}")
+            if await self._updated_index_available():
+                result = self._page_from_index(updated_index_key(status), offset, limit)
+            else:
+                result = (await asyncio.to_thread(self._scan_sessions, status))[offset:offset + limit]
+            logger.debug(f"📋 查询会话列表: 状态={status}, 返回={len(result)}")
             return result
 
         except Exception as e:
@@ -288,13 +424,124 @@ class RedisSessionStore(SessionStateStore):
             int: 会话数量
         """
         try:
-            status_key = f"status:{status}"
-            count = self.redis.scard(status_key)
-            return count
+            if not await self._updated_index_available():
+                return len(await asyncio.to_thread(self._scan_sessions, status))
+            return self.redis.scard(status_index_key(status))
         except Exception as e:
             logger.error(f"❌ 统计会话数量失败 (状态={status}): {e}")
             return 0
 
+    async def get_agent_loads(self, agent_ids: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        """
+        坐席负载（单次 pipeline，每个坐席两次 SCARD）
+
+        Returns:
+            {agent_id: {"manual": 人工会话数, "pending": 已分配待接入数}}
+        """
+        ids = list(agent_ids)
+        if not ids:
+            return {}
+        try:
+            if not self._agent_load_ready and not await asyncio.to_thread(self._ensure_agent_load_index):
+                # 负载集合回填未完成（其他进程持锁或状态索引未就绪），按会话列表统计
+                return await super().get_agent_loads(ids)
+            pipe = self.redis.pipeline(transaction=False)
+            for agent_id in ids:
+                pipe.scard(agent_load_key(agent_id, "manual"))
+                pipe.scard(agent_load_key(agent_id, "pending"))
+            return parse_agent_loads(ids, pipe.execute())
+        except Exception as e:
+            logger.error(f"❌ 读取坐席负载失败: {e}")
+            return await super().get_agent_loads(ids)
+
+    def _ensure_agent_load_index(self) -> bool:
+        """
+        首次使用时按会话数据回填坐席负载集合（多进程通过 NX 锁互斥）
+
+        Returns:
+            负载集合是否可用；其他进程正在回填或状态索引未就绪时返回 False
+        """
+        if self._agent_load_ready:
+            return True
+        if self.redis.get(AGENT_LOAD_VERSION_KEY) == AGENT_LOAD_VERSION:
+            self._agent_load_ready = True
+            return True
+        # 负载集合按状态集合索引回填，需先完成状态索引迁移
+        if not self._ensure_updated_index():
+            return False
+        if not self.redis.set(AGENT_LOAD_LOCK_KEY, "1", nx=True, ex=300):
+            return False
+
+        try:
+            result = self.reconcile_agent_loads()
+            self.redis.set(AGENT_LOAD_VERSION_KEY, AGENT_LOAD_VERSION)
+            self._agent_load_ready = True
+            logger.info(f"✅ 坐席负载集合回填完成: {result['sessions']} 个会话")
+        finally:
+            self.redis.delete(AGENT_LOAD_LOCK_KEY)
+        return True
+
+    def reconcile_agent_loads(self) -> Dict[str, int]:
+        """
+        按会话实际状态校正坐席负载集合（定时任务调用）
+
+        修复 TTL 过期、并发写入等导致的偏差；校正期间 owner 记录发生变化的会话
+        说明有新的写入，以写入结果为准跳过。
+
+        Returns:
+            {"sessions": 计入负载的会话数, "fixed": 修正的会话数}
+        """
+        # 状态集合索引尚未迁移完成时跳过，避免把全部会话移出负载集合
+        if not self._ensure_updated_index():
+            return {"sessions": 0, "fixed": 0}
+
+        before = self.redis.hgetall(AGENT_LOAD_OWNER_KEY)
+
+        expected: Dict[str, str] = {}
+        for status in AGENT_LOAD_BUCKETS:
+            for state in self._hydrate(list(self.redis.smembers(status_index_key(status)))):
+                owner = agent_load_owner(state)
+                if owner:
+                    expected[state.session_name] = owner
+
+        # 当前集合成员：会话 -> 所在的负载集合
+        memberships: Dict[str, List[str]] = {}
+        for bucket in AGENT_LOAD_BUCKETS.values():
+            for key in self.redis.scan_iter(f"{AGENT_LOAD_PREFIX}{bucket}:*", count=100):
+                owner = key[len(AGENT_LOAD_PREFIX):]
+                for name in self.redis.smembers(key):
+                    memberships.setdefault(name, []).append(owner)
+
+        suspects = [
+            name for name in set(expected) | set(memberships) | set(before)
+            if memberships.get(name, []) != ([expected[name]] if name in expected else [])
+            or before.get(name) != expected.get(name)
+        ]
+        if not suspects:
+            return {"sessions": len(expected), "fixed": 0}
+
+        current = dict(zip(suspects, self._load_owners(suspects)))
+        pipe = self.redis.pipeline(transaction=False)
+        fixed = 0
+        for name in suspects:
+            if current.get(name) != before.get(name):
+                continue
+            owner = expected.get(name)
+            for stale in memberships.get(name, []):
+                if stale != owner:
+                    pipe.srem(f"{AGENT_LOAD_PREFIX}{stale}", name)
+            if owner:
+                pipe.sadd(f"{AGENT_LOAD_PREFIX}{owner}", name)
+                pipe.hset(AGENT_LOAD_OWNER_KEY, name, owner)
+            else:
+                pipe.hdel(AGENT_LOAD_OWNER_KEY, name)
+            fixed += 1
+        pipe.execute()
+
+        if fixed:
+            logger.info(f"🔧 坐席负载已校正: {fixed} 个会话")
+        return {"sessions": len(expected), "fixed": fixed}
+
     async def get_stats(self) -> dict:
         """
         获取会话统计信息
@@ -342,17 +589,12 @@ class RedisSessionStore(SessionStateStore):
             List[SessionState]: 会话列表
         """
         try:
-            # 获取所有会话
-            all_sessions = await self.get_all_sessions()
-
-            # 按更新时间倒序排序
-            all_sessions.sort(key=lambda x: x.updated_at, reverse=True)
-
-            # 分页
-            paginated_sessions = all_sessions[offset:offset + limit]
-
-            logger.debug(f"📋 获取会话列表: {len(paginated_sessions)}/{len(all_sessions)} 个")
-            return paginated_sessions
+            if await self._updated_index_available():
+                result = self._page_from_index(updated_index_key(), offset, limit)
+            else:
+                result = (await asyncio.to_thread(self._scan_sessions))[offset:offset + limit]
+            logger.debug(f"📋 获取会话列表: 返回={len(result)}")
+            return result
 
         except Exception as e:
             logger.error(f"❌ 获取会话列表失败: {e}")
@@ -388,14 +630,10 @@ class RedisSessionStore(SessionStateStore):
             所有会话列表
         """
         try:
-            sessions = []
-
-            # 使用 SCAN 遍历所有会话 key（约束16.2.1 - 避免 KEYS 命令阻塞）
-            for key in self.redis.scan_iter("session:*", count=100):
-                session_name = key.replace("session:", "")
-                state = await self.get(session_name)
-                if state:
-                    sessions.append(state)
+            if await self._updated_index_available():
+                sessions = self._hydrate(self.redis.zrevrange(updated_index_key(), 0, -1))
+            else:
+                sessions = await asyncio.to_thread(self._scan_sessions)
 
             logger.debug(f"📊 获取所有会话: 总数={len(sessions)}")
             return sessions
@@ -418,7 +656,12 @@ class RedisSessionStore(SessionStateStore):
                 deleted += self.redis.delete(*session_keys)
 
             for status in SessionStatus:
-                self.redis.delete(f"status:{status.value}")
+                self.redis.delete(status_index_key(status))
+                self.redis.delete(updated_index_key(status))
+            self.redis.delete(updated_index_key())
+            load_keys = list(self.redis.scan_iter(f"{AGENT_LOAD_PREFIX}*", count=100))
+            if load_keys:
+                self.redis.delete(*load_keys)
 
             logger.warning(f"🧹 已清空会话数据: 删除 {deleted} 条记录")
             return deleted
@@ -483,14 +726,22 @@ class RedisSessionStore(SessionStateStore):
             threshold = datetime.now(timezone.utc).timestamp() - days * 24 * 3600
             cleaned_count = 0
 
-            # 使用 SCAN 遍历（避免 KEYS 阻塞）
-            for key in self.redis.scan_iter("session:*", count=100):
-                session_name = key.replace("session:", "")
-                state = await self.get(session_name)
-
-                if state and state.updated_at < threshold:
-                    await self.delete(session_name)
-                    cleaned_count += 1
+            # 只取 updated_at 索引中低于阈值的候选，再以实际数据复核；
+            # 索引回填未完成时跳过本轮，过期会话仍由 TTL 清理
+            if not await self._updated_index_available():
+                return 0
+            candidates = self.redis.zrangebyscore(updated_index_key(), "-inf", threshold)
+            expired = [
+                state.session_name for state in self._hydrate(candidates)
+                if state.updated_at < threshold
+            ]
+            for start in range(0, len(expired), HYDRATE_BATCH_SIZE):
+                chunk = expired[start:start + HYDRATE_BATCH_SIZE]
+                pipe = self.redis.pipeline(transaction=True)
+                pipe.delete(*(f"session:{name}" for name in chunk))
+                queue_index_removal(pipe, chunk)
+                pipe.execute()
+            cleaned_count = len(expired)
 
             if cleaned_count > 0:
                 logger.info(f"🧹 清理过期会话: {cleaned_count} 个（超过 {days} 天未活跃）")
@@ -500,3 +751,122 @@ class RedisSessionStore(SessionStateStore):
         except Exception as e:
             logger.error(f"❌ 清理过期会话失败: {e}")
             return 0
+
+    # ==================== updated_at 索引 ====================
+
+    def _hydrate(self, session_names: Sequence[str]) -> List[SessionState]:
+        """按名称分批 MGET 加载会话，并清理已过期的索引成员"""
+        sessions: List[SessionState] = []
+        for start in range(0, len(session_names), HYDRATE_BATCH_SIZE):
+            chunk = list(session_names[start:start + HYDRATE_BATCH_SIZE])
+            raw_items = self.redis.mget([f"session:{name}" for name in chunk])
+            states, missing = deserialize_sessions(chunk, raw_items)
+            sessions.extend(states)
+            if missing:
+                self._prune_index(missing)
+        return sessions
+
+    def _page_from_index(self, index_key: str, offset: int, limit: int) -> List[SessionState]:
+        """
+        ZREVRANGE 分页 + 单次 MGET
+
+        会话数据随 TTL 过期后索引成员仍残留，读到时顺带清理并重取当前页。
+        调用方需先确认索引可用（_updated_index_available）。
+        """
+        if limit <= 0:
+            return []
+
+        states: List[SessionState] = []
+        for _ in range(3):
+            names = self.redis.zrevrange(index_key, offset, offset + limit - 1)
+            if not names:
+                return []
+            raw_items = self.redis.mget([f"session:{name}" for name in names])
+            states, missing = deserialize_sessions(names, raw_items)
+            if not missing:
+                break
+            self._prune_index(missing)
+        return states
+
+    def _prune_index(self, session_names: Sequence[str]) -> None:
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            queue_index_removal(pipe, session_names)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ 清理会话索引失败: {e}")
+
+    def _load_owners(self, session_names: Sequence[str]) -> List[Optional[str]]:
+        return self.redis.hmget(AGENT_LOAD_OWNER_KEY, list(session_names)) if session_names else []
+
+    async def _updated_index_available(self) -> bool:
+        """updated_at 索引是否可用；首次回填（全量 SCAN）放到线程池执行，避免阻塞事件循环"""
+        if self._updated_index_ready:
+            return True
+        return await asyncio.to_thread(self._ensure_updated_index)
+
+    def _ensure_updated_index(self) -> bool:
+        """
+        首次使用时回填 updated_at 索引和状态集合索引（多进程通过 NX 锁互斥）
+
+        回填完成后删除旧版 "status:SessionStatus.X" 状态集合。
+
+        Returns:
+            索引是否可用；其他进程正在回填时返回 False，调用方应走 _scan_sessions
+        """
+        if self._updated_index_ready:
+            return True
+        if self.redis.get(UPDATED_INDEX_VERSION_KEY) == UPDATED_INDEX_VERSION:
+            self._updated_index_ready = True
+            return True
+        if not self.redis.set(UPDATED_INDEX_LOCK_KEY, "1", nx=True, ex=300):
+            return False
+
+        try:
+            rebuilt = 0
+            batch: List[str] = []
+            for key in self.redis.scan_iter("session:*", count=HYDRATE_BATCH_SIZE):
+                batch.append(key.replace("session:", "", 1))
+                if len(batch) >= HYDRATE_BATCH_SIZE:
+                    rebuilt += self._reindex_batch(batch)
+                    batch = []
+            if batch:
+                rebuilt += self._reindex_batch(batch)
+
+            self.redis.delete(*legacy_status_index_keys())
+            self.redis.set(UPDATED_INDEX_VERSION_KEY, UPDATED_INDEX_VERSION)
+            self._updated_index_ready = True
+            logger.info(f"✅ 会话 updated_at 索引回填完成: {rebuilt} 个")
+        finally:
+            self.redis.delete(UPDATED_INDEX_LOCK_KEY)
+        return True
+
+    def _scan_sessions(self, status: Optional[SessionStatus] = None) -> List[SessionState]:
+        """
+        索引回填期间的回退读取：SCAN 全部会话，按 updated_at 倒序
+
+        回填中的 sessions:by_updated:* 和状态集合只包含部分会话，不能直接读取。
+        """
+        names = [
+            key.replace("session:", "", 1)
+            for key in self.redis.scan_iter("session:*", count=HYDRATE_BATCH_SIZE)
+        ]
+        sessions: List[SessionState] = []
+        for start in range(0, len(names), HYDRATE_BATCH_SIZE):
+            chunk = names[start:start + HYDRATE_BATCH_SIZE]
+            states, _ = deserialize_sessions(chunk, self.redis.mget([f"session:{name}" for name in chunk]))
+            sessions.extend(states)
+
+        if status is not None:
+            sessions = [state for state in sessions if state.status == status]
+        sessions.sort(key=lambda state: state.updated_at, reverse=True)
+        return sessions
+
+    def _reindex_batch(self, session_names: List[str]) -> int:
+        raw_items = self.redis.mget([f"session:{name}" for name in session_names])
+        states, _ = deserialize_sessions(session_names, raw_items)
+        pipe = self.redis.pipeline(transaction=False)
+        for state in states:
+            queue_status_index(pipe, state)
+        pipe.execute()
+        return len(states)
@@ -12,7 +12,7 @@
 import asyncio
 import json
 import os
-from typing import Optional, Dict, List, Any, Literal
+from typing import Optional, Dict, List, Any, Literal, Sequence
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -357,6 +357,22 @@ class SessionStateStore:
         """统计指定状态的会话数量"""
         raise NotImplementedError
 
+    async def get_agent_loads(self, agent_ids: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        """
+        统计坐席负载
+
+        默认实现遍历人工会话和待接入会话；Redis 存储改为读取增量维护的坐席负载集合。
+
+        Returns:
+            {agent_id: {"manual": 人工会话数, "pending": 已分配待接入数}}
+        """
+        loads = {agent_id: {"manual": 0, "pending": 0} for agent_id in agent_ids}
+        for status, bucket in ((SessionStatus.MANUAL_LIVE, "manual"), (SessionStatus.PENDING_MANUAL, "pending")):
+            for session in await self.list_by_status(status, limit=1000):
+                if session.assigned_agent and session.assigned_agent.id in loads:
+                    loads[session.assigned_agent.id][bucket] += 1
+        return loads
+
     async def clear_all(self) -> int:
         """清空所有会话，返回清理数量"""
         raise NotImplementedError
@@ -19,6 +19,8 @@ from services.shopify.service import (
     search_orders_by_email_across_sites,
     get_all_sites_health,
     get_configured_sites_list,
+    gather_across_sites,
+    first_across_sites,
 )
 from services.shopify.cache import ShopifyCache, get_shopify_cache
 from services.shopify.sites import (
@@ -43,6 +45,8 @@ __all__ = [
     "search_orders_by_email_across_sites",
     "get_all_sites_health",
     "get_configured_sites_list",
+    "gather_across_sites",
+    "first_across_sites",
     "ShopifyCache",
     "get_shopify_cache",
     "ShopifySiteConfig",
@@ -6,11 +6,33 @@ Shopify 多站点订单缓存层
 
 缓存策略：
 - 订单列表: 5 分钟 (用户可能频繁查询)
-- 订单详情: 48 小时 (订单信息稳定，适合预热)
-- 订单搜索: 48 小时 (按订单号查询，适合预热)
-- 物流信息: 6 小时 (物流状态会更新，需要适度刷新)
+- 订单详情: 7 天 (订单变化由 Shopify Webhook 写入，适合预热)
+- 订单搜索: 7 天 (按订单号查询，适合预热)
+- 物流信息: 48 小时 (发货变化由 fulfillment Webhook 写入，送达状态由 17track 推送写入)
 - 订单数量: 60 分钟 (统计数据)
 
+存储布局（每个订单只存一份完整数据）：
+- orders:detail:{订单ID}: 订单详情（唯一的完整订单文档）
+- orders:search:{订单号}: 指针 {"_ref": 订单ID}，或 {"_not_found": true}
+- orders:list:{邮箱}: 指针 {"_refs": [订单ID, ...]}；读取时优先从 orders:detail:{订单ID} 投影摘要字段，
+  详情未缓存的订单才单独写一份摘要 orders:summary:{订单ID}（TTL 同订单列表）
+- tracking:{订单ID}: 物流信息
+
+编码：首字节为格式版本（0x00 = JSON，0x01 = zlib 压缩 JSON），
+其后为 {"_swr": 1, "fresh_until": 时间戳, "value": 数据}；无版本字节的旧 JSON 仍可读取。
+
+两级缓存：
+- L1: 进程内 LRU（默认 2000 条，最长 30 秒，保存编码后的字节），热点订单查询不访问 Redis
+- L2: Redis，Redis TTL = 有效期 + 宽限期；旧格式数据视为新鲜数据
+- 单飞：get_or_load 对同一 key 只发起一次上游请求，并发调用方共享结果
+- 过期后宽限期内（stale-while-revalidate）直接返回旧数据，并在后台刷新
+
+配置环境变量：
+- SHOPIFY_L1_CACHE_SIZE: L1 条数（默认2000，0 关闭 L1）
+- SHOPIFY_L1_CACHE_TTL: L1 最长保留秒数（默认30，限制多进程间的不一致时间）
+- SHOPIFY_CACHE_STALE_GRACE: 过期后仍可返回旧数据的宽限期（秒，默认600，不超过该类数据的 TTL）
+- SHOPIFY_CACHE_COMPRESS_MIN_BYTES: 超过该大小的数据使用 zlib 压缩（默认256）
+
 遵循 CLAUDE.md 规范：
 - 使用连接池限制并发
 - 所有数据设置 TTL
@@ -18,14 +40,65 @@ Shopify 多站点订单缓存层
 """
 
 import os
+import copy
 import json
+import time
+import zlib
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple, Union
 
 import redis
 
+from services.shopify.client import ShopifyOrderSummary
+
 logger = logging.getLogger(__name__)
 
+# 缓存读取结果状态
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+# 缓存值格式版本（首字节）
+FORMAT_JSON = 0x00
+FORMAT_ZLIB_JSON = 0x01
+COMPRESS_MIN_BYTES = int(os.getenv("SHOPIFY_CACHE_COMPRESS_MIN_BYTES", "256"))
+
+# get_stats 每类缓存抽样统计内存的键数量
+MEMORY_SAMPLE_SIZE = 50
+
+# 订单列表条目字段（由订单详情投影列表摘要时保留）
+ORDER_SUMMARY_FIELDS = tuple(ShopifyOrderSummary.model_fields)
+
+# update_order 遇到并发写入（WATCH 冲突）时的最大重试次数
+ORDER_UPDATE_MAX_RETRIES = 5
+
+
+def _encode(data: Any) -> Tuple[bytes, int]:
+    """编码缓存值，返回 (编码结果, 压缩前 JSON 字节数)"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        return bytes([FORMAT_ZLIB_JSON]) + zlib.compress(payload, 6), len(payload)
+    return bytes([FORMAT_JSON]) + payload, len(payload)
+
+
+def encode_value(data: Any) -> bytes:
+    """编码缓存值：版本字节 + JSON（超过 COMPRESS_MIN_BYTES 时 zlib 压缩）"""
+    return _encode(data)[0]
+
+
+def decode_value(raw: Union[bytes, str]) -> Any:
+    """解码缓存值；兼容无版本字节的旧 JSON"""
+    if isinstance(raw, str):
+        return json.loads(raw)
+    version = raw[0] if raw else None
+    if version == FORMAT_JSON:
+        return json.loads(raw[1:])
+    if version == FORMAT_ZLIB_JSON:
+        return json.loads(zlib.decompress(raw[1:]))
+    return json.loads(raw)
+
 
 class ShopifyCache:
     """
@@ -40,9 +113,9 @@ class ShopifyCache:
     # 默认 TTL 配置 (秒)
     DEFAULT_TTL = {
         "order_list": 300,         # 5 分钟 - 用户频繁查询
-        "order_detail": 172800,    # 48 小时 - 订单信息稳定，适合预热
-        "order_search": 172800,    # 48 小时 - 按订单号查询，适合预热
-        "tracking": 21600,         # 6 小时 - 物流状态会更新
+        "order_detail": 604800,    # 7 天 - 订单变化由 Webhook 写入
+        "order_search": 604800,    # 7 天 - 按订单号查询，适合预热
+        "tracking": 172800,        # 48 小时 - 物流变化由 Webhook 写入
         "order_count": 3600,       # 60 分钟 - 统计数据
     }
 
@@ -56,7 +129,8 @@ class ShopifyCache:
 
         Args:
             site_code: 站点代码 (us/uk/eu/de/fr/it/es/nl/pl)
-            redis_client: Redis 客户端实例，如果不提供则创建新连接
+            redis_client: Redis 客户端实例（decode_responses=False，值为二进制），
+                如果不提供则创建新连接
         """
         self.site_code = site_code.lower().strip()
         self.prefix = f"shopify:{self.site_code}"
@@ -74,7 +148,7 @@ class ShopifyCache:
                 max_connections=max_connections,
                 socket_timeout=timeout,
                 socket_connect_timeout=timeout,
-                decode_responses=True
+                decode_responses=False
             )
             self.redis = redis.Redis(connection_pool=pool)
 
@@ -103,8 +177,262 @@ class ShopifyCache:
             )),
         }
 
+        # L1 进程内缓存：key -> (Redis 中的编码值, L1 过期时间)
+        self.l1_max_size = max(int(os.getenv("SHOPIFY_L1_CACHE_SIZE", "2000")), 0)
+        self.l1_ttl = float(os.getenv("SHOPIFY_L1_CACHE_TTL", "30"))
+        self.stale_grace = int(os.getenv("SHOPIFY_CACHE_STALE_GRACE", "600"))
+        self._l1: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: set = set()
+        self._counters = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "coalesced": 0,
+            "upstream_fetches": 0,
+            "refresh_errors": 0,
+            "bytes_json": 0,
+            "bytes_stored": 0,
+        }
+
         logger.info(f"✅ Shopify {site_upper} 缓存初始化完成 (TTL: {self.ttl})")
 
+    # ==================== 两级缓存读写 ====================
+
+    def _grace_for(self, ttl: int) -> int:
+        return max(min(self.stale_grace, ttl), 0)
+
+    @staticmethod
+    def _unwrap(raw: Union[bytes, str]) -> Tuple[Any, float]:
+        """解析 Redis 值，返回 (数据, 新鲜截止时间)；旧格式视为永远新鲜（由 Redis TTL 控制）"""
+        data = decode_value(raw)
+        if isinstance(data, dict) and data.get("_swr"):
+            return data.get("value"), float(data.get("fresh_until") or 0)
+        return data, float("inf")
+
+    def _wrap(self, value: Any, ttl: int) -> bytes:
+        raw, json_size = _encode({"_swr": 1, "fresh_until": round(time.time() + ttl, 3), "value": value})
+        self._counters["bytes_json"] += json_size
+        self._counters["bytes_stored"] += len(raw)
+        return raw
+
+    def _l1_get(self, key: str) -> Optional[bytes]:
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._l1.pop(key, None)
+            return None
+        self._l1.move_to_end(key)
+        return entry[0]
+
+    def _l1_put(self, key: str, raw: bytes) -> None:
+        if self.l1_max_size <= 0:
+            return
+        self._l1[key] = (raw, time.monotonic() + self.l1_ttl)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_max_size:
+            self._l1.popitem(last=False)
+
+    async def _read(self, key: str) -> Tuple[Any, str]:
+        """
+        读取缓存（L1 → L2）
+
+        Returns:
+            (数据, 状态)；状态为 CACHE_HIT / CACHE_STALE / CACHE_MISS
+        """
+        raw = self._l1_get(key)
+        if raw is not None:
+            self._counters["l1_hits"] += 1
+        else:
+            raw = await asyncio.to_thread(self.redis.get, key)
+            if raw is None:
+                self._counters["misses"] += 1
+                return None, CACHE_MISS
+            self._counters["l2_hits"] += 1
+            self._l1_put(key, raw)
+
+        value, fresh_until = self._unwrap(raw)
+        if time.time() >= fresh_until:
+            return value, CACHE_STALE
+        return value, CACHE_HIT
+
+    async def _read_many(self, keys: List[str]) -> List[Tuple[Any, str]]:
+        """批量读取（L1 未命中的键一次 MGET）"""
+        raws: List[Optional[bytes]] = [self._l1_get(key) for key in keys]
+        remote = [i for i, raw in enumerate(raws) if raw is None]
+        self._counters["l1_hits"] += len(keys) - len(remote)
+        if remote:
+            values = await asyncio.to_thread(self.redis.mget, [keys[i] for i in remote])
+            for i, raw in zip(remote, values):
+                if raw is None:
+                    self._counters["misses"] += 1
+                    continue
+                self._counters["l2_hits"] += 1
+                self._l1_put(keys[i], raw)
+                raws[i] = raw
+
+        now = time.time()
+        results: List[Tuple[Any, str]] = []
+        for raw in raws:
+            if raw is None:
+                results.append((None, CACHE_MISS))
+                continue
+            value, fresh_until = self._unwrap(raw)
+            results.append((value, CACHE_STALE if now >= fresh_until else CACHE_HIT))
+        return results
+
+    async def _write(self, key: str, value: Any, ttl: int) -> None:
+        await self._write_many([(key, value, ttl)])
+
+    async def _write_many(self, entries: List[Tuple[str, Any, int]]) -> None:
+        """一次流水线写入多个键：[(key, 数据, 有效期)]"""
+        wrapped = [(key, self._wrap(value, ttl), ttl) for key, value, ttl in entries]
+
+        def _store() -> None:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, raw, ttl in wrapped:
+                pipe.setex(key, ttl + self._grace_for(ttl), raw)
+            pipe.execute()
+
+        await asyncio.to_thread(_store)
+        for key, raw, _ in wrapped:
+            self._l1_put(key, raw)
+
+    @staticmethod
+    def _merge_status(*statuses: str) -> str:
+        if CACHE_MISS in statuses:
+            return CACHE_MISS
+        if CACHE_STALE in statuses:
+            return CACHE_STALE
+        return CACHE_HIT
+
+    async def _delete(self, *keys: str) -> int:
+        for key in keys:
+            self._l1.pop(key, None)
+        if not keys:
+            return 0
+        return await asyncio.to_thread(self.redis.delete, *keys)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Union[int, Callable[[Any], int]],
+        read: Optional[Callable[[], Awaitable[Tuple[Any, str]]]] = None,
+        store: Optional[Callable[[Any, int], Awaitable[None]]] = None,
+    ) -> Tuple[Any, str]:
+        """
+        读取缓存，未命中时调用 loader 回源（同一 key 并发只回源一次）
+
+        过期但仍在宽限期内的数据直接返回，并在后台刷新。
+
+        Args:
+            key: 完整缓存键（使用 _xxx_key 生成），同时作为单飞的合并键
+            loader: 回源函数，返回要缓存的数据
+            ttl: 有效期（秒），或根据数据计算有效期的函数
+            read: 自定义读取（指针类缓存需要解引用），默认读取 key
+            store: 自定义写入 (数据, 有效期)，默认写入 key
+
+        Returns:
+            (数据, 状态)；状态为 CACHE_HIT / CACHE_STALE / CACHE_MISS
+        """
+        if store is None:
+            async def store(value: Any, value_ttl: int) -> None:
+                await self._write(key, value, value_ttl)
+
+        try:
+            value, status = await (read() if read else self._read(key))
+        except Exception as e:
+            logger.error(f"❌ 读取 Shopify 缓存失败 {key}: {e}")
+            value, status = None, CACHE_MISS
+
+        if status == CACHE_HIT:
+            return value, status
+
+        if status == CACHE_STALE:
+            self._counters["stale_served"] += 1
+            if key not in self._inflight:
+                task = asyncio.create_task(self._refresh(key, loader, ttl, store))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value, status
+
+        future = self._inflight.get(key)
+        if future is None:
+            return await asyncio.shield(self._start_load(key, loader, ttl, store)), CACHE_MISS
+
+        # 合并到进行中的回源；返回副本，避免多个调用方共享同一对象
+        self._counters["coalesced"] += 1
+        return copy.deepcopy(await asyncio.shield(future)), CACHE_MISS
+
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Union[int, Callable[[Any], int]],
+        store: Callable[[Any, int], Awaitable[None]],
+    ) -> asyncio.Future:
+        """启动一次回源（结果写入缓存），返回所有等待方共享的 future"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+
+        async def _run() -> None:
+            try:
+                self._counters["upstream_fetches"] += 1
+                value = await loader()
+                future.set_result(value)
+                try:
+                    await store(value, ttl(value) if callable(ttl) else ttl)
+                except Exception as e:
+                    logger.error(f"❌ 写入 Shopify 缓存失败 {key}: {e}")
+            except BaseException as e:
+                if not future.done():
+                    future.set_exception(e)
+                    # 没有等待方时避免 "exception was never retrieved"
+                    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        task = loop.create_task(_run())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+        return future
+
+    async def _refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Union[int, Callable[[Any], int]],
+        store: Callable[[Any, int], Awaitable[None]],
+    ) -> None:
+        """后台刷新过期数据（失败时保留旧数据，等待宽限期结束）"""
+        try:
+            await self._start_load(key, loader, ttl, store)
+        except Exception as e:
+            self._counters["refresh_errors"] += 1
+            logger.warning(f"⚠️ 后台刷新 Shopify 缓存失败 {key}: {e}")
+
+    def get_counters(self) -> Dict[str, Any]:
+        """命中/未命中/过期返回等计数"""
+        lookups = self._counters["l1_hits"] + self._counters["l2_hits"] + self._counters["misses"]
+        hits = self._counters["l1_hits"] + self._counters["l2_hits"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "compression_ratio": (
+                round(self._counters["bytes_stored"] / self._counters["bytes_json"], 4)
+                if self._counters["bytes_json"] else None
+            ),
+            "l1_entries": len(self._l1),
+            "inflight": len(self._inflight),
+        }
+
     # ==================== 订单列表缓存 ====================
 
     def _order_list_key(self, email: str) -> str:
@@ -112,6 +440,69 @@ class ShopifyCache:
         # 使用邮箱的小写形式作为键
         return f"{self.prefix}:orders:list:{email.lower()}"
 
+    def _order_summary_key(self, order_id: str) -> str:
+        """生成订单摘要缓存键（详情未缓存时订单列表指针指向的数据）"""
+        return f"{self.prefix}:orders:summary:{order_id}"
+
+    @staticmethod
+    def _project_summary(order: Any) -> Any:
+        """订单详情投影为列表摘要"""
+        if not isinstance(order, dict):
+            return order
+        return {field: order.get(field) for field in ORDER_SUMMARY_FIELDS}
+
+    async def _read_order_list(self, email: str) -> Tuple[Optional[List[Dict]], str]:
+        """
+        读取订单列表指针并解引用
+
+        每个订单优先从订单详情投影，详情未缓存时读取摘要；任一订单两者都缺失视为未命中。
+        """
+        pointer, status = await self._read(self._order_list_key(email))
+        if status == CACHE_MISS:
+            return None, status
+        if not isinstance(pointer, dict):
+            # 旧格式：完整列表
+            return pointer, status
+
+        order_ids = pointer.get("_refs") or []
+        if not order_ids:
+            return [], status
+        items = [
+            (self._project_summary(value), item_status) if item_status != CACHE_MISS else (None, CACHE_MISS)
+            for value, item_status in await self._read_many(
+                [self._order_detail_key(order_id) for order_id in order_ids]
+            )
+        ]
+        missing = [i for i, (_, item_status) in enumerate(items) if item_status == CACHE_MISS]
+        if missing:
+            summaries = await self._read_many([self._order_summary_key(order_ids[i]) for i in missing])
+            for i, summary in zip(missing, summaries):
+                items[i] = summary
+
+        merged = self._merge_status(status, *(item_status for _, item_status in items))
+        if merged == CACHE_MISS:
+            return None, CACHE_MISS
+        return [summary for summary, _ in items], merged
+
+    async def _store_order_list(self, email: str, orders: List[Dict], ttl: int) -> None:
+        """写入邮箱指针，以及详情未缓存订单的摘要（EXISTS + 写入两次流水线往返）"""
+        order_ids = [str(order["order_id"]) for order in orders]
+
+        def _check() -> List[int]:
+            pipe = self.redis.pipeline(transaction=False)
+            for order_id in order_ids:
+                pipe.exists(self._order_detail_key(order_id))
+            return pipe.execute()
+
+        cached = await asyncio.to_thread(_check) if order_ids else []
+        entries = [
+            (self._order_summary_key(order_id), order, ttl)
+            for order_id, order, exists in zip(order_ids, orders, cached)
+            if not exists
+        ]
+        entries.append((self._order_list_key(email), {"_refs": order_ids}, ttl))
+        await self._write_many(entries)
+
     async def get_order_list(self, email: str) -> Optional[List[Dict]]:
         """
         获取订单列表缓存
@@ -123,12 +514,11 @@ class ShopifyCache:
             订单列表，缓存未命中返回 None
         """
         try:
-            key = self._order_list_key(email)
-            data = self.redis.get(key)
+            data, status = await self._read_order_list(email)
 
-            if data:
+            if status != CACHE_MISS:
                 logger.debug(f"🎯 缓存命中: 订单列表 ({self.site_code}:{email})")
-                return json.loads(data)
+                return data
 
             logger.debug(f"💨 缓存未命中: 订单列表 ({self.site_code}:{email})")
             return None
@@ -149,9 +539,7 @@ class ShopifyCache:
             是否设置成功
         """
         try:
-            key = self._order_list_key(email)
-            data = json.dumps(orders, ensure_ascii=False, default=str)
-            self.redis.setex(key, self.ttl["order_list"], data)
+            await self._store_order_list(email, orders, self.ttl["order_list"])
             logger.debug(f"💾 缓存写入: 订单列表 ({self.site_code}:{email}, TTL={self.ttl['order_list']}s)")
             return True
         except Exception as e:
@@ -176,11 +564,11 @@ class ShopifyCache:
         """
         try:
             key = self._order_detail_key(order_id)
-            data = self.redis.get(key)
+            data, status = await self._read(key)
 
-            if data:
+            if status != CACHE_MISS:
                 logger.debug(f"🎯 缓存命中: 订单详情 ({self.site_code}:{order_id})")
-                return json.loads(data)
+                return data
 
             logger.debug(f"💨 缓存未命中: 订单详情 ({self.site_code}:{order_id})")
             return None
@@ -202,8 +590,7 @@ class ShopifyCache:
         """
         try:
             key = self._order_detail_key(order_id)
-            data = json.dumps(order, ensure_ascii=False, default=str)
-            self.redis.setex(key, self.ttl["order_detail"], data)
+            await self._write(key, order, self.ttl["order_detail"])
             logger.debug(f"💾 缓存写入: 订单详情 ({self.site_code}:{order_id}, TTL={self.ttl['order_detail']}s)")
             return True
         except Exception as e:
@@ -218,6 +605,32 @@ class ShopifyCache:
         clean_number = order_number.strip().lstrip("#").upper()
         return f"{self.prefix}:orders:search:{clean_number}"
 
+    def _pointer_ttl(self) -> int:
+        """订单号指针不晚于订单详情过期"""
+        return min(self.ttl["order_search"], self.ttl["order_detail"])
+
+    async def _read_order_by_number(self, order_number: str) -> Tuple[Optional[Dict], str]:
+        """读取订单号指针并解引用订单详情；返回订单或 {"_not_found": True} 标记"""
+        pointer, status = await self._read(self._order_search_key(order_number))
+        if status == CACHE_MISS or not isinstance(pointer, dict) or "_ref" not in pointer:
+            # 未命中、"不存在"标记或旧格式的完整订单
+            return pointer, status
+
+        order, detail_status = await self._read(self._order_detail_key(pointer["_ref"]))
+        merged = self._merge_status(status, detail_status)
+        return (order, merged) if merged != CACHE_MISS else (None, CACHE_MISS)
+
+    async def _store_order_by_number(self, order_number: str, order: Dict, ttl: int) -> None:
+        """写入订单号缓存：订单写入详情文档，订单号键只保存指针"""
+        if order.get("_not_found"):
+            await self._write(self._order_search_key(order_number), order, ttl)
+            return
+        order_id = str(order["order_id"])
+        await self._write_many([
+            (self._order_detail_key(order_id), order, self.ttl["order_detail"]),
+            (self._order_search_key(order_number), {"_ref": order_id}, min(ttl, self._pointer_ttl())),
+        ])
+
     async def get_order_by_number(self, order_number: str) -> Optional[Dict]:
         """
         按订单号获取缓存
@@ -229,12 +642,11 @@ class ShopifyCache:
             订单详情，缓存未命中返回 None
         """
         try:
-            key = self._order_search_key(order_number)
-            data = self.redis.get(key)
+            data, status = await self._read_order_by_number(order_number)
 
-            if data:
+            if status != CACHE_MISS:
                 logger.debug(f"🎯 缓存命中: 订单搜索 ({self.site_code}:{order_number})")
-                return json.loads(data)
+                return data
 
             logger.debug(f"💨 缓存未命中: 订单搜索 ({self.site_code}:{order_number})")
             return None
@@ -255,15 +667,12 @@ class ShopifyCache:
             是否设置成功
         """
         try:
-            key = self._order_search_key(order_number)
-
             if order is None:
                 # 缓存"订单不存在"状态，使用较短的 TTL
-                self.redis.setex(key, 60, json.dumps({"_not_found": True}))
+                await self._store_order_by_number(order_number, {"_not_found": True}, 60)
                 logger.debug(f"💾 缓存写入: 订单不存在 ({self.site_code}:{order_number}, TTL=60s)")
             else:
-                data = json.dumps(order, ensure_ascii=False, default=str)
-                self.redis.setex(key, self.ttl["order_search"], data)
+                await self._store_order_by_number(order_number, order, self.ttl["order_search"])
                 logger.debug(f"💾 缓存写入: 订单搜索 ({self.site_code}:{order_number}, TTL={self.ttl['order_search']}s)")
 
             return True
@@ -289,11 +698,11 @@ class ShopifyCache:
         """
         try:
             key = self._tracking_key(order_id)
-            data = self.redis.get(key)
+            data, status = await self._read(key)
 
-            if data:
+            if status != CACHE_MISS:
                 logger.debug(f"🎯 缓存命中: 物流信息 ({self.site_code}:{order_id})")
-                return json.loads(data)
+                return data
 
             logger.debug(f"💨 缓存未命中: 物流信息 ({self.site_code}:{order_id})")
             return None
@@ -315,8 +724,7 @@ class ShopifyCache:
         """
         try:
             key = self._tracking_key(order_id)
-            data = json.dumps(tracking, ensure_ascii=False, default=str)
-            self.redis.setex(key, self.ttl["tracking"], data)
+            await self._write(key, tracking, self.ttl["tracking"])
             logger.debug(f"💾 缓存写入: 物流信息 ({self.site_code}:{order_id}, TTL={self.ttl['tracking']}s)")
             return True
         except Exception as e:
@@ -341,9 +749,9 @@ class ShopifyCache:
         """
         try:
             key = self._order_count_key(status)
-            data = self.redis.get(key)
+            data, cache_status = await self._read(key)
 
-            if data:
+            if cache_status != CACHE_MISS:
                 logger.debug(f"🎯 缓存命中: 订单数量 ({self.site_code}:{status})")
                 return int(data)
 
@@ -367,13 +775,204 @@ class ShopifyCache:
         """
         try:
             key = self._order_count_key(status)
-            self.redis.setex(key, self.ttl["order_count"], str(count))
+            await self._write(key, count, self.ttl["order_count"])
             logger.debug(f"💾 缓存写入: 订单数量 ({self.site_code}:{status}={count}, TTL={self.ttl['order_count']}s)")
             return True
         except Exception as e:
             logger.error(f"❌ 写入订单数量缓存失败: {e}")
             return False
 
+    # ==================== 回源加载（单飞 + 过期重验证） ====================
+
+    async def load_order_list(
+        self, email: str, loader: Callable[[], Awaitable[List[Dict]]]
+    ) -> Tuple[List[Dict], str]:
+        """读取订单列表缓存，未命中时调用 loader 回源，返回 (订单列表, 缓存状态)"""
+        async def _store(orders: List[Dict], ttl: int) -> None:
+            await self._store_order_list(email, orders, ttl)
+
+        return await self.get_or_load(
+            self._order_list_key(email),
+            loader,
+            self.ttl["order_list"],
+            read=lambda: self._read_order_list(email),
+            store=_store,
+        )
+
+    async def load_order_detail(
+        self, order_id: str, loader: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, str]:
+        """读取订单详情缓存，未命中时调用 loader 回源，返回 (订单详情, 缓存状态)"""
+        return await self.get_or_load(self._order_detail_key(order_id), loader, self.ttl["order_detail"])
+
+    async def load_order_by_number(
+        self, order_number: str, loader: Callable[[], Awaitable[Optional[Dict]]]
+    ) -> Tuple[Optional[Dict], str]:
+        """
+        按订单号读取缓存，未命中时调用 loader 回源
+
+        loader 返回 None 表示订单不存在，缓存 60 秒；此时返回的订单为 None。
+        """
+        async def _load() -> Dict:
+            order = await loader()
+            return order if order is not None else {"_not_found": True}
+
+        async def _store(order: Dict, ttl: int) -> None:
+            await self._store_order_by_number(order_number, order, ttl)
+
+        order, status = await self.get_or_load(
+            self._order_search_key(order_number),
+            _load,
+            lambda value: 60 if value.get("_not_found") else self.ttl["order_search"],
+            read=lambda: self._read_order_by_number(order_number),
+            store=_store,
+        )
+        if order.get("_not_found"):
+            return None, status
+        return order, status
+
+    async def load_tracking(
+        self, order_id: str, loader: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, str]:
+        """读取物流信息缓存，未命中时调用 loader 回源，返回 (物流信息, 缓存状态)"""
+        return await self.get_or_load(self._tracking_key(order_id), loader, self.ttl["tracking"])
+
+    async def load_order_count(
+        self, status: str, loader: Callable[[], Awaitable[int]]
+    ) -> Tuple[int, str]:
+        """读取订单数量缓存，未命中时调用 loader 回源，返回 (订单数量, 缓存状态)"""
+        count, cache_status = await self.get_or_load(self._order_count_key(status), loader, self.ttl["order_count"])
+        return int(count), cache_status
+
+    # ==================== 批量预热 ====================
+
+    async def filter_uncached_order_numbers(self, order_numbers: List[str]) -> List[str]:
+        """
+        批量检查订单号搜索缓存，返回未缓存的订单号（单次流水线往返）
+
+        Args:
+            order_numbers: 订单号列表
+
+        Returns:
+            未命中缓存的订单号列表（保持原顺序）；Redis 异常时视为全部未缓存
+        """
+        if not order_numbers:
+            return []
+        try:
+            def _check() -> List[int]:
+                pipe = self.redis.pipeline(transaction=False)
+                for order_number in order_numbers:
+                    pipe.exists(self._order_search_key(order_number))
+                return pipe.execute()
+
+            flags = await asyncio.to_thread(_check)
+            return [number for number, cached in zip(order_numbers, flags) if not cached]
+        except Exception as e:
+            logger.error(f"❌ 批量检查订单缓存失败: {e}")
+            return list(order_numbers)
+
+    async def set_order_bundle(
+        self,
+        order: Dict,
+        tracking: Optional[Dict] = None
+    ) -> bool:
+        """
+        一次写入订单详情、订单号指针和物流信息缓存（单次流水线往返）
+
+        Args:
+            order: 订单详情数据（需包含 order_id / order_number）
+            tracking: 物流信息数据（可选）
+
+        Returns:
+            是否设置成功
+        """
+        try:
+            order_id = str(order["order_id"])
+            entries = [
+                (self._order_detail_key(order_id), order, self.ttl["order_detail"]),
+                (self._order_search_key(order["order_number"]), {"_ref": order_id}, self._pointer_ttl()),
+            ]
+            if tracking is not None:
+                entries.append((self._tracking_key(order_id), tracking, self.ttl["tracking"]))
+            await self._write_many(entries)
+            logger.debug(f"💾 缓存写入: 订单批量预热 ({self.site_code}:{order['order_number']})")
+            return True
+        except Exception as e:
+            logger.error(f"❌ 写入订单批量缓存失败: {e}")
+            return False
+
+    # ==================== Webhook 写穿 ====================
+
+    async def update_order(
+        self,
+        order_id: str,
+        mutate: Callable[[Dict], bool]
+    ) -> Optional[Dict]:
+        """
+        修改已缓存的订单详情，并同步写回订单详情和订单号搜索缓存
+
+        读取-修改-写回在 WATCH 事务中完成：期间订单被其他写入（如 orders/updated
+        Webhook）覆盖时，基于新数据重新执行 mutate，不会回滚并发写入。
+
+        Args:
+            order_id: Shopify 订单 ID
+            mutate: 原地修改订单数据，返回是否有变化（冲突重试时可能被调用多次）
+
+        Returns:
+            修改后的订单数据；订单未缓存、无变化或重试耗尽时返回 None
+        """
+        detail_key = self._order_detail_key(order_id)
+        detail_ttl = self.ttl["order_detail"]
+        pointer_ttl = self._pointer_ttl()
+
+        def _update() -> Optional[Tuple[Dict, List[Tuple[str, bytes]]]]:
+            for _ in range(ORDER_UPDATE_MAX_RETRIES):
+                with self.redis.pipeline(transaction=True) as pipe:
+                    try:
+                        pipe.watch(detail_key)
+                        raw = pipe.get(detail_key)
+                        if raw is None:
+                            return None
+                        order, _ = self._unwrap(raw)
+                        if not order or not mutate(order):
+                            return None
+                        search_key = self._order_search_key(order["order_number"])
+                        entries = [
+                            (detail_key, self._wrap(order, detail_ttl), detail_ttl),
+                            (search_key, self._wrap({"_ref": order_id}, pointer_ttl), pointer_ttl),
+                        ]
+                        pipe.multi()
+                        for key, value, ttl in entries:
+                            pipe.setex(key, ttl + self._grace_for(ttl), value)
+                        pipe.execute()
+                        return order, [(key, value) for key, value, _ in entries]
+                    except redis.WatchError:
+                        continue
+            logger.warning(f"⚠️ 订单缓存并发写入冲突，放弃更新: {self.site_code}:{order_id}")
+            return None
+
+        try:
+            result = await asyncio.to_thread(_update)
+        except Exception as e:
+            logger.error(f"❌ 更新订单缓存失败: {e}")
+            return None
+        if result is None:
+            # L1 可能持有旧数据，丢弃后下次读取以 Redis 为准
+            self._l1.pop(detail_key, None)
+            return None
+        order, written = result
+        for key, value in written:
+            self._l1_put(key, value)
+        return order
+
+    async def invalidate_order_list(self, email: str) -> int:
+        """删除客户订单列表缓存（订单变化后列表需重新拉取）"""
+        try:
+            return await self._delete(self._order_list_key(email))
+        except Exception as e:
+            logger.error(f"❌ 删除订单列表缓存失败: {e}")
+            return 0
+
     # ==================== 缓存管理 ====================
 
     async def invalidate_order(self, order_id: str, order_number: Optional[str] = None) -> int:
@@ -388,20 +987,11 @@ class ShopifyCache:
             删除的缓存键数量
         """
         try:
-            deleted = 0
-
-            # 删除订单详情缓存
-            key = self._order_detail_key(order_id)
-            deleted += self.redis.delete(key)
-
-            # 删除物流信息缓存
-            key = self._tracking_key(order_id)
-            deleted += self.redis.delete(key)
-
-            # 删除订单号搜索缓存
+            # 订单详情、物流信息、订单号搜索缓存（L1 + Redis）
+            keys = [self._order_detail_key(order_id), self._tracking_key(order_id)]
             if order_number:
-                key = self._order_search_key(order_number)
-                deleted += self.redis.delete(key)
+                keys.append(self._order_search_key(order_number))
+            deleted = await self._delete(*keys)
 
             logger.info(f"🗑️ 缓存失效: {self.site_code}:order_id={order_id}, 删除 {deleted} 个键")
             return deleted
@@ -419,10 +1009,11 @@ class ShopifyCache:
         """
         try:
             pattern = f"{self.prefix}:*"
-            keys = list(self.redis.scan_iter(pattern, count=100))
+            keys = await asyncio.to_thread(lambda: list(self.redis.scan_iter(pattern, count=100)))
+            self._l1.clear()
 
             if keys:
-                deleted = self.redis.delete(*keys)
+                deleted = await self._delete(*keys)
                 logger.warning(f"🧹 清空 Shopify {self.site_code.upper()} 缓存: 删除 {deleted} 个键")
                 return deleted
 
@@ -432,44 +1023,93 @@ class ShopifyCache:
             logger.error(f"❌ 清空缓存失败: {e}")
             return 0
 
+    KEY_TYPES = (
+        ("order_list", ":orders:list:"),
+        ("order_summary", ":orders:summary:"),
+        ("order_detail", ":orders:detail:"),
+        ("order_search", ":orders:search:"),
+        ("tracking", ":tracking:"),
+        ("order_count", ":orders:count:"),
+    )
+
+    def _sample_memory(self, keys: List[str]) -> Tuple[List[int], str]:
+        """抽样键的内存占用：优先 MEMORY USAGE（含 Redis 对象开销），不支持时退化为 STRLEN"""
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.memory_usage(key)
+            return [int(size) for size in pipe.execute() if size is not None], "memory_usage"
+        except Exception:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.strlen(key)
+            return [int(size) for size in pipe.execute() if size], "strlen"
+
     def get_stats(self) -> Dict[str, Any]:
         """
         获取缓存统计信息
 
+        memory 为抽样估算：每类最多抽 MEMORY_SAMPLE_SIZE 个键取平均值，
+        bytes_per_order 为一个订单（详情 + 订单号指针 + 物流 + 列表摘要）的平均占用，用于估算 Redis 容量；
+        列表摘要只为详情未缓存的订单写入，按实际摘要数 / 详情数折算。
+
         Returns:
             统计信息字典
         """
         try:
-            stats = {
-                "site_code": self.site_code,
-                "order_list": 0,
-                "order_detail": 0,
-                "order_search": 0,
-                "tracking": 0,
-                "order_count": 0,
-                "total": 0,
-            }
+            stats: Dict[str, Any] = {name: 0 for name, _ in self.KEY_TYPES}
+            stats["site_code"] = self.site_code
+            stats["total"] = 0
+            samples: Dict[str, List[str]] = {name: [] for name, _ in self.KEY_TYPES}
 
             # 统计各类型缓存数量
             for key in self.redis.scan_iter(f"{self.prefix}:*", count=100):
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8", "replace")
                 stats["total"] += 1
 
-                if ":orders:list:" in key:
-                    stats["order_list"] += 1
-                elif ":orders:detail:" in key:
-                    stats["order_detail"] += 1
-                elif ":orders:search:" in key:
-                    stats["order_search"] += 1
-                elif ":tracking:" in key:
-                    stats["tracking"] += 1
-                elif ":orders:count:" in key:
-                    stats["order_count"] += 1
+                for name, marker in self.KEY_TYPES:
+                    if marker in key:
+                        stats[name] += 1
+                        if len(samples[name]) < MEMORY_SAMPLE_SIZE:
+                            samples[name].append(key)
+                        break
+
+            memory: Dict[str, Any] = {}
+            for name, keys in samples.items():
+                if not keys:
+                    continue
+                sizes, method = self._sample_memory(keys)
+                if not sizes:
+                    continue
+                avg = sum(sizes) / len(sizes)
+                memory[name] = {
+                    "sampled": len(sizes),
+                    "avg_bytes": int(avg),
+                    "estimated_total_bytes": int(avg * stats[name]),
+                    "method": method,
+                }
+            bytes_per_order = sum(
+                memory[name]["avg_bytes"]
+                for name in ("order_detail", "order_search", "tracking")
+                if name in memory
+            )
+            if "order_summary" in memory:
+                share = stats["order_summary"] / stats["order_detail"] if stats["order_detail"] else 1
+                bytes_per_order += int(memory["order_summary"]["avg_bytes"] * share)
+            memory["bytes_per_order"] = bytes_per_order
+            memory["estimated_total_bytes"] = sum(
+                item["estimated_total_bytes"] for item in memory.values() if isinstance(item, dict)
+            )
+            stats["memory"] = memory
 
+            # 本进程的命中/未命中/过期返回计数
+            stats["requests"] = self.get_counters()
             return stats
 
         except Exception as e:
             logger.error(f"❌ 获取缓存统计失败: {e}")
-            return {"site_code": self.site_code, "error": str(e)}
+            return {"site_code": self.site_code, "error": str(e), "requests": self.get_counters()}
 
 
 # ==================== 缓存工厂 ====================
@@ -5,8 +5,8 @@ Shopify 多站点 API 客户端
 仅支持只读操作（read_orders, read_shipping 权限）。
 
 遵循 CLAUDE.md 规范：
-- 使用连接池限制并发
-- 实现速率限制 (2次/秒)
+- 使用连接池限制并发（每站点一个长连接 AsyncClient，可用时启用 HTTP/2）
+- 实现速率限制（漏桶，按 X-Shopify-Shop-Api-Call-Limit 校准，429 按 Retry-After 退避）
 - 完善的错误处理
 """
 
@@ -14,16 +14,42 @@ import os
 import time
 import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import parse_qs, urlsplit
 
 import httpx
 from pydantic import BaseModel
 
 from services.shopify.sites import ShopifySiteConfig, get_site_config
 
+try:
+    import h2  # noqa: F401  # type: ignore
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    _HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# 漏桶参数（Shopify 标准计划: 容量 40，每秒漏出 2；Plus: 80 / 4）
+SHOPIFY_BUCKET_CAPACITY = _env_float("SHOPIFY_BUCKET_CAPACITY", 40)
+SHOPIFY_LEAK_RATE = _env_float("SHOPIFY_LEAK_RATE", 2.0)
+# 预留给其他进程/应用的桶余量
+SHOPIFY_BUCKET_HEADROOM = _env_float("SHOPIFY_BUCKET_HEADROOM", 4)
+# 单站点最大并发请求数
+SHOPIFY_MAX_CONCURRENCY = int(_env_float("SHOPIFY_MAX_CONCURRENCY", 8))
+# 429 最大重试次数
+SHOPIFY_MAX_RETRIES = int(_env_float("SHOPIFY_MAX_RETRIES", 2))
+SHOPIFY_HTTP2 = os.getenv("SHOPIFY_HTTP2", "true").lower() == "true"
+
+
 # ==================== 数据模型 ====================
 
 class ShopifyAddress(BaseModel):
@@ -119,6 +145,40 @@ class ShopifyAPIError(Exception):
         super().__init__(f"[{code}] {message}")
 
 
+# 商品图片关键词表（素材索引未命中时的回退）
+_PRODUCT_IMAGE_KEYWORDS = [
+    ("titan", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-titan.webp?v=1755064725"),
+    ("c11 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-c11-pro_dce92f31-e919-4a94-b8b0-f9cb9b037d75.webp?v=1740465827"),
+    ("c11", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-c11.png?v=1763374439"),
+    ("c21", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-L.webp?v=1739848641"),
+    ("c22", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-L.webp?v=1739848641"),
+    ("air", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/c31-img-1.webp?v=1750820407"),
+    ("d3 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d3pro-2024-1.jpg?v=1709777461"),
+    ("d3", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d3pro-2024-1.jpg?v=1709777461"),
+    ("d11", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d11-2024-1.webp?v=1709777461"),
+    ("d21", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d11-2024-1.webp?v=1709777461"),
+    ("l3", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/l3-main-1.jpg?v=1727161438"),
+    ("m1 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/7-m1-pro_a8e3269b-7ec7-4f38-a211-1cb2649c18ee.webp?v=1755851713"),
+    ("m1", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/7-m1-pro_a8e3269b-7ec7-4f38-a211-1cb2649c18ee.webp?v=1755851713"),
+    ("nomads", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/11-sunstone-yellow-m.webp?v=1751939345"),
+    ("t1", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/t1pro-main-1_56e88db4-5144-4e04-bf86-310a6bfa75d8.jpg?v=1719560237"),
+    ("t2", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/t2-main-1-green.jpg?v=1712557682"),
+]
+
+_ACCESSORY_IMAGE_KEYWORDS = [
+    ("pannier bag", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/bike-rack-pannier-bag.jpg?v=1690970482"),
+    ("rack bag", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/bike-rack-pannier-bag.jpg?v=1690970482"),
+    ("helmet", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1_2e3a8c93-9e21-42ba-9e2d-20185a8446eb.jpg?v=1710150097"),
+    ("brake pad", "https://cdn.shopify.com/s/files/1/0511/3308/7940/products/Fiido-Electric-Bike-BrakePads.jpg?v=1656662379"),
+    ("charger", "https://cdn.shopify.com/s/files/1/0511/3308/7940/products/Fiido-Electric-Bike-Charger-for-EU.jpg?v=1656905714"),
+    ("fender", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/M1_a985f037-e887-4f3c-8d49-8338e04bce73.jpg?v=1723106303"),
+    ("phone holder", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/phone-holder.jpg?v=1690970482"),
+    ("battery", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/battery-pack.jpg?v=1690970482"),
+    ("basket", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/front-basket.jpg?v=1690970482"),
+    ("mirror", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/rearview-mirror.jpg?v=1690970482"),
+    ("cap", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/fiido-cap.jpg?v=1690970482"),
+]
+
 ERROR_CODES = {
     "SHOPIFY_API_ERROR": {"code": 5001, "message": "Shopify API 调用失败"},
     "ORDER_NOT_FOUND": {"code": 5002, "message": "订单不存在"},
@@ -130,6 +190,102 @@ ERROR_CODES = {
 }
 
 
+# ==================== 速率限制 ====================
+
+class ShopifyRateLimiter:
+    """
+    Shopify 漏桶速率限制器（协程安全）
+
+    本地按漏出速率估算桶水位，每次响应后用
+    X-Shopify-Shop-Api-Call-Limit（如 "32/40"）校准；
+    水位未满时允许突发，接近容量时才等待。
+    收到 429 时按 Retry-After 暂停整个站点的请求。
+    """
+
+    def __init__(
+        self,
+        capacity: float = SHOPIFY_BUCKET_CAPACITY,
+        leak_rate: float = SHOPIFY_LEAK_RATE,
+        headroom: float = SHOPIFY_BUCKET_HEADROOM
+    ):
+        self.capacity = max(capacity, 1.0)
+        self.leak_rate = max(leak_rate, 0.1)
+        self.headroom = max(min(headroom, self.capacity - 1), 0.0)
+        self._level = 0.0
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _leak(self, now: float):
+        self._level = max(0.0, self._level - (now - self._updated_at) * self.leak_rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """占用一个桶位，必要时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._leak(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    overflow = self._level + 1 - (self.capacity - self.headroom)
+                    if overflow <= 0:
+                        self._level += 1
+                        return
+                    wait = overflow / self.leak_rate
+                await asyncio.sleep(wait)
+
+    def update_from_header(self, header_value: Optional[str]):
+        """按 X-Shopify-Shop-Api-Call-Limit 校准水位和容量"""
+        if not header_value:
+            return
+        try:
+            used, capacity = (float(part) for part in header_value.split("/", 1))
+        except ValueError:
+            return
+        self._leak(time.monotonic())
+        self.capacity = max(capacity, 1.0)
+        self._level = used
+
+    def penalize(self, retry_after: float):
+        """收到 429：水位置于限流阈值，并在 Retry-After 内暂停"""
+        now = time.monotonic()
+        self._leak(now)
+        self._level = max(self._level, self.capacity - self.headroom)
+        self._blocked_until = max(self._blocked_until, now + max(retry_after, 0.0))
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._leak(now)
+        return {
+            "capacity": self.capacity,
+            "leak_rate": self.leak_rate,
+            "level": round(self._level, 2),
+            "blocked_for": round(max(0.0, self._blocked_until - now), 2),
+        }
+
+
+def _parse_retry_after(value: Optional[str], default: float = 2.0) -> float:
+    try:
+        return max(float(value), 0.0) if value else default
+    except ValueError:
+        return default
+
+
+def _parse_next_page_info(link_header: Optional[str]) -> Optional[str]:
+    """从 Link 响应头中提取 rel="next" 的 page_info 游标"""
+    if not link_header:
+        return None
+    for part in link_header.split(","):
+        if 'rel="next"' not in part:
+            continue
+        url = part.split(";", 1)[0].strip().strip("<>")
+        values = parse_qs(urlsplit(url).query).get("page_info")
+        if values:
+            return values[0]
+    return None
+
+
 # ==================== API 客户端 ====================
 
 class ShopifyClient:
@@ -137,8 +293,8 @@ class ShopifyClient:
     Shopify 多站点 API 客户端
 
     特点：
-    - 速率限制: 2次/秒 (Shopify 标准计划限制)
-    - 连接池: 复用 HTTP 连接
+    - 速率限制: 漏桶（允许突发至桶容量），429 按 Retry-After 退避重试
+    - 连接池: 每站点一个长连接 AsyncClient，复用 TLS 连接
     - 超时保护: 连接 5s，读取 30s
     - 多站点支持: 通过 site_code 参数切换站点
     """
@@ -157,10 +313,9 @@ class ShopifyClient:
         self.site_code = site_config.code
         self.base_url = site_config.base_url
 
-        # 速率限制: 2次/秒
-        self._rate_limiter = asyncio.Semaphore(2)
-        self._last_request_time = 0.0
-        self._min_request_interval = 0.5  # 500ms
+        # 速率限制: 并发上限 + 漏桶
+        self._concurrency = asyncio.Semaphore(SHOPIFY_MAX_CONCURRENCY)
+        self.rate_limiter = ShopifyRateLimiter()
 
         # HTTP 客户端配置
         self._timeout = httpx.Timeout(
@@ -169,15 +324,43 @@ class ShopifyClient:
             write=10.0,
             pool=10.0
         )
+        self._limits = httpx.Limits(
+            max_connections=SHOPIFY_MAX_CONCURRENCY,
+            max_keepalive_connections=SHOPIFY_MAX_CONCURRENCY,
+            keepalive_expiry=60.0
+        )
+        self._http2 = SHOPIFY_HTTP2 and _HTTP2_AVAILABLE
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
         logger.info(f"✅ Shopify {self.site_code.upper()} 客户端初始化: {self.shop_domain}")
 
-    async def _wait_for_rate_limit(self):
-        """等待速率限制"""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_request_interval:
-            await asyncio.sleep(self._min_request_interval - elapsed)
-        self._last_request_time = time.time()
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """获取长连接 HTTP 客户端（懒加载，按站点复用）"""
+        loop = asyncio.get_running_loop()
+        if (
+            self._http_client is None
+            or self._http_client.is_closed
+            or self._http_client_loop is not loop
+        ):
+            self._http_client_loop = loop
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                headers={
+                    "X-Shopify-Access-Token": self.access_token,
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._http_client
+
+    async def aclose(self):
+        """关闭 HTTP 连接池"""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
 
     async def _request(
         self,
@@ -197,72 +380,88 @@ class ShopifyClient:
         Returns:
             响应 JSON 数据
         """
+        response = await self._send(method, endpoint, params=params, **kwargs)
+        return response.json()
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """发送 HTTP 请求并返回原始响应（需要读取 Link 等响应头时使用）"""
         if not self.access_token:
             raise ShopifyAPIError(
                 ERROR_CODES["TOKEN_INVALID"]["code"],
                 f"Shopify {self.site_code.upper()} Access Token 未配置"
             )
 
-        async with self._rate_limiter:
-            await self._wait_for_rate_limit()
-
-            headers = {
-                "X-Shopify-Access-Token": self.access_token,
-                "Content-Type": "application/json"
-            }
-
-            url = f"{self.base_url}{endpoint}"
-
-            try:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    response = await client.request(
+        async with self._concurrency:
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire()
+                try:
+                    response = await self._get_http_client().request(
                         method,
-                        url,
-                        headers=headers,
+                        endpoint,
                         params=params,
                         **kwargs
                     )
+                except httpx.TimeoutException:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
+                        "请求超时"
+                    )
+                except httpx.RequestError as e:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
+                        f"网络请求失败: {str(e)}"
+                    )
 
-                    # 处理错误响应
-                    if response.status_code == 401:
-                        raise ShopifyAPIError(
-                            ERROR_CODES["TOKEN_INVALID"]["code"],
-                            ERROR_CODES["TOKEN_INVALID"]["message"]
-                        )
-                    elif response.status_code == 403:
-                        raise ShopifyAPIError(
-                            ERROR_CODES["PERMISSION_DENIED"]["code"],
-                            ERROR_CODES["PERMISSION_DENIED"]["message"]
-                        )
-                    elif response.status_code == 404:
-                        raise ShopifyAPIError(
-                            ERROR_CODES["ORDER_NOT_FOUND"]["code"],
-                            ERROR_CODES["ORDER_NOT_FOUND"]["message"]
-                        )
-                    elif response.status_code == 429:
-                        raise ShopifyAPIError(
-                            ERROR_CODES["RATE_LIMITED"]["code"],
-                            ERROR_CODES["RATE_LIMITED"]["message"]
-                        )
-                    elif response.status_code >= 400:
-                        raise ShopifyAPIError(
-                            ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
-                            f"Shopify API 错误: {response.status_code}",
-                            {"status_code": response.status_code, "body": response.text}
+                self.rate_limiter.update_from_header(
+                    response.headers.get("X-Shopify-Shop-Api-Call-Limit")
+                )
+
+                if response.status_code == 429:
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.penalize(retry_after)
+                    if attempt < SHOPIFY_MAX_RETRIES:
+                        attempt += 1
+                        logger.warning(
+                            f"⚠️ Shopify {self.site_code.upper()} 触发限流，"
+                            f"{retry_after:.1f}s 后重试 ({attempt}/{SHOPIFY_MAX_RETRIES})"
                         )
+                        continue
+                    raise ShopifyAPIError(
+                        ERROR_CODES["RATE_LIMITED"]["code"],
+                        ERROR_CODES["RATE_LIMITED"]["message"]
+                    )
 
-                    return response.json()
+                # 处理错误响应
+                if response.status_code == 401:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["TOKEN_INVALID"]["code"],
+                        ERROR_CODES["TOKEN_INVALID"]["message"]
+                    )
+                elif response.status_code == 403:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["PERMISSION_DENIED"]["code"],
+                        ERROR_CODES["PERMISSION_DENIED"]["message"]
+                    )
+                elif response.status_code == 404:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["ORDER_NOT_FOUND"]["code"],
+                        ERROR_CODES["ORDER_NOT_FOUND"]["message"]
+                    )
+                elif response.status_code >= 400:
+                    raise ShopifyAPIError(
+                        ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
+                        f"Shopify API 错误: {response.status_code}",
+                        {"status_code": response.status_code, "body": response.text}
+                    )
 
-            except httpx.TimeoutException:
-                raise ShopifyAPIError(
-                    ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
-                    "请求超时"
-                )
-            except httpx.RequestError as e:
-                raise ShopifyAPIError(
-                    ERROR_CODES["SHOPIFY_API_ERROR"]["code"],
-                    f"网络请求失败: {str(e)}"
-                )
+                return response
 
     # ==================== 订单查询方法 ====================
 
@@ -375,6 +574,69 @@ class ShopifyClient:
         # 使用带 17track 缓存查询的版本
         return await self._parse_order_detail_with_tracking(order)
 
+    async def list_orders_page(
+        self,
+        params: Optional[Dict] = None,
+        page_info: Optional[str] = None,
+        limit: int = 250,
+        fields: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按游标分页获取订单原始数据
+
+        Shopify 游标分页规则：带 page_info 的请求只能携带 limit/fields，
+        过滤条件只在第一页传入。
+
+        Args:
+            params: 首页过滤条件 (status/created_at_min 等)
+            page_info: 上一页返回的游标，None 表示第一页
+            limit: 每页数量 (1-250)
+            fields: 返回字段
+
+        Returns:
+            (订单原始数据列表, 下一页游标)，没有下一页时游标为 None
+        """
+        query: Dict[str, Any] = {"limit": min(max(limit, 1), 250)}
+        if fields:
+            query["fields"] = fields
+        if page_info:
+            query["page_info"] = page_info
+        else:
+            query.update(params or {})
+
+        response = await self._send("GET", "/orders.json", params=query)
+        orders = response.json().get("orders", [])
+        return orders, _parse_next_page_info(response.headers.get("Link"))
+
+    async def get_orders_by_ids(
+        self,
+        order_ids: List[str],
+        fields: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按订单 ID 批量获取订单原始数据（ids= 参数，单次最多 250 个）
+
+        Args:
+            order_ids: Shopify 订单 ID 列表
+            fields: 返回字段（默认完整订单）
+
+        Returns:
+            订单原始数据列表（不存在的 ID 不返回）
+        """
+        orders: List[Dict[str, Any]] = []
+        for start in range(0, len(order_ids), 250):
+            chunk = order_ids[start:start + 250]
+            params = {
+                "ids": ",".join(str(order_id) for order_id in chunk),
+                "status": "any",
+                "limit": len(chunk),
+            }
+            if fields:
+                params["fields"] = fields
+            data = await self._request("GET", "/orders.json", params=params)
+            orders.extend(data.get("orders", []))
+        return orders
+
     async def get_order_count(
         self,
         status: str = "any",
@@ -441,7 +703,7 @@ class ShopifyClient:
         if selected_item:
             title = selected_item.get("title", "")
             # 通过商品名称关键词匹配图片 URL
-            image_url = self._get_product_image_by_title(title)
+            image_url = self._get_product_image_by_title(title, selected_item.get("sku"))
 
             # 构建商品详情页 URL
             product_url = None
@@ -470,52 +732,30 @@ class ShopifyClient:
             site_code=self.site_code
         )
 
-    def _get_product_image_by_title(self, title: str) -> Optional[str]:
-        """根据商品名称关键词匹配图片 URL"""
-        title_lower = title.lower()
+    def _get_product_image_by_title(self, title: str, sku: Optional[str] = None) -> Optional[str]:
+        """
+        根据商品名称/SKU 匹配图片 URL
 
-        # 产品图片映射表（按优先级排序）
-        product_images = [
-            ("titan", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-titan.webp?v=1755064725"),
-            ("c11 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-c11-pro_dce92f31-e919-4a94-b8b0-f9cb9b037d75.webp?v=1740465827"),
-            ("c11", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-c11.png?v=1763374439"),
-            ("c21", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-L.webp?v=1739848641"),
-            ("c22", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1-L.webp?v=1739848641"),
-            ("air", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/c31-img-1.webp?v=1750820407"),
-            ("d3 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d3pro-2024-1.jpg?v=1709777461"),
-            ("d3", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d3pro-2024-1.jpg?v=1709777461"),
-            ("d11", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d11-2024-1.webp?v=1709777461"),
-            ("d21", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/d11-2024-1.webp?v=1709777461"),
-            ("l3", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/l3-main-1.jpg?v=1727161438"),
-            ("m1 pro", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/7-m1-pro_a8e3269b-7ec7-4f38-a211-1cb2649c18ee.webp?v=1755851713"),
-            ("m1", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/7-m1-pro_a8e3269b-7ec7-4f38-a211-1cb2649c18ee.webp?v=1755851713"),
-            ("nomads", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/11-sunstone-yellow-m.webp?v=1751939345"),
-            ("t1", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/t1pro-main-1_56e88db4-5144-4e04-bf86-310a6bfa75d8.jpg?v=1719560237"),
-            ("t2", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/t2-main-1-green.jpg?v=1712557682"),
-        ]
+        优先使用素材服务的匹配索引（SKU + 标题，结果有缓存），
+        未命中或非 CDN 地址时回退到关键词表
+        """
+        try:
+            from services.asset.service import match_product_image
+            match = match_product_image(title, sku)
+            if match and str(match.get("image_url", "")).startswith("http"):
+                return match["image_url"]
+        except Exception as e:
+            logger.debug(f"素材索引匹配失败，回退关键词表: {e}")
 
-        # 配件图片映射表
-        accessory_images = [
-            ("pannier bag", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/bike-rack-pannier-bag.jpg?v=1690970482"),
-            ("rack bag", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/bike-rack-pannier-bag.jpg?v=1690970482"),
-            ("helmet", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/1_2e3a8c93-9e21-42ba-9e2d-20185a8446eb.jpg?v=1710150097"),
-            ("brake pad", "https://cdn.shopify.com/s/files/1/0511/3308/7940/products/Fiido-Electric-Bike-BrakePads.jpg?v=1656662379"),
-            ("charger", "https://cdn.shopify.com/s/files/1/0511/3308/7940/products/Fiido-Electric-Bike-Charger-for-EU.jpg?v=1656905714"),
-            ("fender", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/M1_a985f037-e887-4f3c-8d49-8338e04bce73.jpg?v=1723106303"),
-            ("phone holder", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/phone-holder.jpg?v=1690970482"),
-            ("battery", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/battery-pack.jpg?v=1690970482"),
-            ("basket", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/front-basket.jpg?v=1690970482"),
-            ("mirror", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/rearview-mirror.jpg?v=1690970482"),
-            ("cap", "https://cdn.shopify.com/s/files/1/0511/3308/7940/files/fiido-cap.jpg?v=1690970482"),
-        ]
+        title_lower = title.lower()
 
         # 先匹配产品
-        for keyword, url in product_images:
+        for keyword, url in _PRODUCT_IMAGE_KEYWORDS:
             if keyword in title_lower:
                 return url
 
         # 再匹配配件
-        for keyword, url in accessory_images:
+        for keyword, url in _ACCESSORY_IMAGE_KEYWORDS:
             if keyword in title_lower:
                 return url
 
@@ -812,7 +1052,7 @@ class ShopifyClient:
             status_zh, status_en = self._translate_delivery_status(delivery_status, fulfillment_status)
 
             # 获取商品图片和链接
-            image_url = self._get_product_image_by_title(item_title)
+            image_url = self._get_product_image_by_title(item_title, item.get("sku"))
             product_url = None
             product_id = item.get("product_id")
             if product_id:
@@ -897,7 +1137,8 @@ class ShopifyClient:
         解析订单详情的异步版本（支持主动查询 17track API）
 
         当 Shopify 的 shipment_status 为空时，会主动调用 17track API
-        获取真实的物流状态，而不是只依赖缓存。
+        获取真实的物流状态，而不是只依赖缓存。整单的运单通过
+        TrackingService.get_statuses 并发查询，超过截止时间的运单按无状态处理。
 
         Args:
             order: Shopify 订单原始数据
@@ -958,6 +1199,28 @@ class ShopifyClient:
         all_physical_refunded = (physical_items_count > 0 and
                                   physical_items_refunded_count == physical_items_count)
 
+        # 已发货但无 shipment_status 的运单：整单并发查询 17track（拆单发货时不再逐个等待）
+        track17_statuses = {}
+        if track17_service:
+            pending_trackings = {}
+            for item in all_line_items:
+                item_title = item.get("title", "")
+                if self._is_service_product(item_title, item.get("sku", "")) or item_title in item_refund_map:
+                    continue
+                fulfillment_info = item_fulfillment_map.get(item_title, {})
+                tracking_number = fulfillment_info.get("tracking_number")
+                if (tracking_number and fulfillment_info.get("status") == "success"
+                        and not fulfillment_info.get("shipment_status")):
+                    pending_trackings[tracking_number] = fulfillment_info.get("tracking_company")
+            if pending_trackings:
+                try:
+                    track17_statuses = await track17_service.get_statuses([
+                        {"number": number, "carrier": carrier}
+                        for number, carrier in pending_trackings.items()
+                    ])
+                except Exception as e:
+                    logger.warning(f"17track 查询失败: {list(pending_trackings)}, {e}")
+
         # 解析商品列表
         line_items = []
         for item in order.get("line_items", []):
@@ -1003,19 +1266,9 @@ class ShopifyClient:
                             delivery_status = shipment_status
                     elif f_status == "success":
                         # 发货成功但没有 shipment_status
-                        # 【主动查询】调用 17track API 获取真实状态
+                        # 【主动查询】17track 真实状态（上方已整单并发查询，超时未返回的视为无状态）
                         tracking_number = fulfillment_info.get("tracking_number")
-                        tracking_company = fulfillment_info.get("tracking_company")
-                        track17_status = None
-
-                        if tracking_number and track17_service:
-                            try:
-                                # 主动查询 17track API（会使用缓存）
-                                track17_status = await track17_service.get_status(
-                                    tracking_number, tracking_company
-                                )
-                            except Exception as e:
-                                logger.warning(f"17track 查询失败: {tracking_number}, {e}")
+                        track17_status = track17_statuses.get(tracking_number) if tracking_number else None
 
                         if track17_status:
                             from services.tracking import TrackingStatus
@@ -1037,7 +1290,7 @@ class ShopifyClient:
                     fulfillment_status = item.get("fulfillment_status")
 
             status_zh, status_en = self._translate_delivery_status(delivery_status, fulfillment_status)
-            image_url = self._get_product_image_by_title(item_title)
+            image_url = self._get_product_image_by_title(item_title, item.get("sku"))
             product_url = None
             product_id = item.get("product_id")
             if product_id:
@@ -1178,6 +1431,15 @@ def get_shopify_client(site_code: str) -> ShopifyClient:
     return _clients[code]
 
 
+async def close_all_clients():
+    """关闭所有站点客户端的 HTTP 连接池（应用关闭时调用）"""
+    for client in list(_clients.values()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ 关闭 Shopify {client.site_code.upper()} 连接池失败: {e}")
+
+
 def get_all_clients() -> Dict[str, ShopifyClient]:
     """
     获取所有已配置站点的客户端
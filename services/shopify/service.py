@@ -7,8 +7,10 @@ Shopify 多站点订单服务层
 用于 API 端点调用，自动处理缓存逻辑。
 """
 
+import os
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Iterable, Tuple
 
 from services.shopify.client import (
     ShopifyClient,
@@ -18,7 +20,7 @@ from services.shopify.client import (
     get_shopify_client,
     ERROR_CODES,
 )
-from services.shopify.cache import ShopifyCache, get_shopify_cache
+from services.shopify.cache import ShopifyCache, get_shopify_cache, CACHE_MISS
 from services.shopify.sites import (
     get_site_config,
     get_all_configured_sites,
@@ -26,19 +28,77 @@ from services.shopify.sites import (
     SiteCode,
 )
 from services.shopify.tracking import enrich_tracking_data
-from services.tracking import get_tracking_service, TrackingStatus
+from services.tracking import TrackingStatus, get_tracking_service
 
 logger = logging.getLogger(__name__)
 
+# 跨站点并发查询时单个站点的超时时间（秒），超时站点计入部分失败
+SHOPIFY_SITE_TIMEOUT = float(os.getenv("SHOPIFY_SITE_TIMEOUT", "8"))
+
+# 17track 状态 -> 商品 delivery_status（与 client 解析订单时的映射一致）
+TRACKING_DELIVERY_STATUS = {
+    TrackingStatus.DELIVERED: "success",
+    TrackingStatus.IN_TRANSIT: "in_transit",
+    TrackingStatus.OUT_FOR_DELIVERY: "out_for_delivery",
+    TrackingStatus.ALERT: "failure",
+    TrackingStatus.UNDELIVERED: "failure",
+    TrackingStatus.EXPIRED: "failure",
+}
+
+DELIVERY_STATUS_TEXT = {
+    "success": ("已收货", "Received"),
+    "in_transit": ("运输中", "In Transit"),
+    "out_for_delivery": ("派送中", "Out for Delivery"),
+    "failure": ("投递失败", "Delivery Failed"),
+}
+
+
+def apply_tracking_statuses(
+    order: Dict[str, Any],
+    statuses: Dict[str, TrackingStatus],
+    fill_only: bool = False
+) -> bool:
+    """
+    将 17track 状态写入订单中对应运单的已发货商品（原地修改）
+
+    Args:
+        order: 订单数据
+        statuses: 运单号 -> 17track 状态
+        fill_only: 只补全 delivery_status 为空的商品（不覆盖已有状态）
+
+    Returns:
+        是否有变化
+    """
+    updated = False
+    for item in order.get("line_items") or []:
+        delivery_status = TRACKING_DELIVERY_STATUS.get(statuses.get(item.get("tracking_number")))
+        if not delivery_status:
+            continue
+        if item.get("fulfillment_status") != "fulfilled":
+            continue
+        current = item.get("delivery_status")
+        if fill_only and current:
+            continue
+        # 退款/服务类等非物流状态不覆盖
+        if current == delivery_status or (current and current not in DELIVERY_STATUS_TEXT):
+            continue
+        status_zh, status_en = DELIVERY_STATUS_TEXT[delivery_status]
+        item["delivery_status"] = delivery_status
+        item["delivery_status_zh"] = status_zh
+        item["delivery_status_en"] = status_en
+        updated = True
+    return updated
+
 
 class ShopifyService:
     """
     Shopify 多站点订单服务
 
     特点：
-    - 自动缓存查询结果
+    - 自动缓存查询结果（进程内 L1 + Redis L2）
     - 缓存命中时响应 < 100ms
-    - 缓存未命中时调用 Shopify API
+    - 缓存未命中时调用 Shopify API，同一订单的并发查询只回源一次
+    - 缓存过期后宽限期内先返回旧数据，后台刷新
     - 支持多站点切换
     """
 
@@ -80,39 +140,24 @@ class ShopifyService:
         Returns:
             包含订单列表和缓存状态的字典
         """
-        cache_hit = False
+        async def load() -> List[Dict[str, Any]]:
+            # 缓存完整结果，供后续不同 limit 查询使用
+            logger.info(f"🔄 调用 Shopify API: 订单列表 ({self.site_code}:{email})")
+            orders = await self.client.get_orders_by_email(email, limit=50, status=status)
+            return [order.model_dump() for order in orders]
 
-        # 尝试从缓存获取
-        if use_cache:
-            cached_orders = await self.cache.get_order_list(email)
-            if cached_orders is not None:
-                cache_hit = True
-                # 从缓存返回时应用 limit
-                orders = cached_orders[:limit]
-                logger.info(f"🎯 缓存命中: 订单列表 ({self.site_code}:{email})")
-                return {
-                    "orders": orders,
-                    "total": len(cached_orders),
-                    "cached": True,
-                    "cache_ttl": self.cache.ttl["order_list"],
-                    "site_code": self.site_code
-                }
-
-        # 缓存未命中，调用 Shopify API
-        logger.info(f"🔄 调用 Shopify API: 订单列表 ({self.site_code}:{email})")
-        orders = await self.client.get_orders_by_email(email, limit=50, status=status)
-
-        # 转换为字典列表
-        orders_data = [order.model_dump() for order in orders]
-
-        # 保存到缓存（保存完整结果，供后续不同 limit 查询使用）
         if use_cache:
-            await self.cache.set_order_list(email, orders_data)
+            orders_data, cache_status = await self.cache.load_order_list(email, load)
+        else:
+            orders_data, cache_status = await load(), CACHE_MISS
+
+        if cache_status != CACHE_MISS:
+            logger.info(f"🎯 缓存命中: 订单列表 ({self.site_code}:{email}, {cache_status})")
 
         return {
             "orders": orders_data[:limit],
             "total": len(orders_data),
-            "cached": False,
+            "cached": cache_status != CACHE_MISS,
             "cache_ttl": self.cache.ttl["order_list"],
             "site_code": self.site_code
         }
@@ -132,131 +177,32 @@ class ShopifyService:
         Returns:
             包含订单详情和缓存状态的字典，如果订单不存在返回 None
         """
-        async def enrich_cached_delivery_status(order: Dict[str, Any]) -> bool:
-            """
-            缓存命中时的状态补全：
-            Shopify fulfillment.shipment_status 可能为空，导致商品显示为“已发货”。
-            若存在 tracking_number，则用 17track 的状态补全为“已收货/运输中/派送中/投递失败”。
-
-            Returns:
-                bool: 是否发生了更新（用于回写缓存）
-            """
-            line_items: List[Dict[str, Any]] = order.get("line_items") or []
-            if not line_items:
-                return False
-
-            # 仅补全：已发货（fulfilled）但 delivery_status 为空的实物商品
-            candidates: Dict[str, Optional[str]] = {}
-            for item in line_items:
-                if item.get("delivery_status"):
-                    continue
-                if item.get("fulfillment_status") != "fulfilled":
-                    continue
-                tracking_number = item.get("tracking_number")
-                if not tracking_number:
-                    continue
-                candidates.setdefault(tracking_number, item.get("tracking_company"))
-
-            if not candidates:
-                return False
-
-            status_text_map = {
-                "success": ("已收货", "Received"),
-                "in_transit": ("运输中", "In Transit"),
-                "out_for_delivery": ("派送中", "Out for Delivery"),
-                "failure": ("投递失败", "Delivery Failed"),
-            }
+        async def load() -> Optional[Dict[str, Any]]:
+            logger.info(f"🔄 调用 Shopify API: 订单搜索 ({self.site_code}:{order_number})")
+            order = await self.client.search_order_by_number(order_number)
+            return order.model_dump() if order is not None else None
 
-            track17_service = get_tracking_service()
-            updated = False
-
-            for tracking_number, tracking_company in candidates.items():
-                try:
-                    track17_status = await track17_service.get_status(tracking_number, tracking_company)
-                except Exception as exc:
-                    logger.warning(f"17track 查询失败: {tracking_number}, {exc}")
-                    continue
-
-                if not track17_status:
-                    continue
-
-                delivery_status = None
-                if track17_status == TrackingStatus.DELIVERED:
-                    delivery_status = "success"
-                elif track17_status == TrackingStatus.IN_TRANSIT:
-                    delivery_status = "in_transit"
-                elif track17_status == TrackingStatus.OUT_FOR_DELIVERY:
-                    delivery_status = "out_for_delivery"
-                elif track17_status in (TrackingStatus.ALERT, TrackingStatus.UNDELIVERED, TrackingStatus.EXPIRED):
-                    delivery_status = "failure"
-
-                if not delivery_status:
-                    continue
-
-                status_zh, status_en = status_text_map[delivery_status]
-
-                for item in line_items:
-                    if item.get("tracking_number") != tracking_number:
-                        continue
-                    if item.get("delivery_status"):
-                        continue
-                    if item.get("fulfillment_status") != "fulfilled":
-                        continue
-                    item["delivery_status"] = delivery_status
-                    item["delivery_status_zh"] = status_zh
-                    item["delivery_status_en"] = status_en
-                    updated = True
-
-            return updated
-
-        # 尝试从缓存获取
         if use_cache:
-            cached_order = await self.cache.get_order_by_number(order_number)
-            if cached_order is not None:
-                # 检查是否是"不存在"标记
-                if cached_order.get("_not_found"):
+            cached_order, cache_status = await self.cache.load_order_by_number(order_number, load)
+            if cached_order is None:
+                if cache_status != CACHE_MISS:
                     logger.info(f"🎯 缓存命中: 订单不存在 ({self.site_code}:{order_number})")
-                    return None
+                return None
 
+            if cache_status != CACHE_MISS:
                 # 缓存命中：对“已发货但实际已收货”的情况做 17track 补全，并回写缓存
-                try:
-                    updated = await enrich_cached_delivery_status(cached_order)
-                    if updated:
-                        await self.cache.set_order_by_number(order_number, cached_order)
-                        order_id = cached_order.get("order_id")
-                        if order_id:
-                            await self.cache.set_order_detail(str(order_id), cached_order)
-                except Exception as exc:
-                    logger.warning(f"缓存订单状态补全失败: {self.site_code}:{order_number}, {exc}")
-
-                logger.info(f"🎯 缓存命中: 订单搜索 ({self.site_code}:{order_number})")
-                return {
-                    "order": cached_order,
-                    "cached": True,
-                    "cache_ttl": self.cache.ttl["order_detail"],
-                    "site_code": self.site_code
-                }
-
-        # 缓存未命中，调用 Shopify API
-        logger.info(f"🔄 调用 Shopify API: 订单搜索 ({self.site_code}:{order_number})")
-        order = await self.client.search_order_by_number(order_number)
-
-        if order is None:
-            # 缓存"订单不存在"状态
-            if use_cache:
-                await self.cache.set_order_by_number(order_number, None)
-            return None
-
-        # 转换为字典
-        order_data = order.model_dump()
+                await self._enrich_and_write_back(cached_order)
+                logger.info(f"🎯 缓存命中: 订单搜索 ({self.site_code}:{order_number}, {cache_status})")
 
-        # 保存到缓存
-        if use_cache:
-            await self.cache.set_order_by_number(order_number, order_data)
+            order_data = cached_order
+        else:
+            order_data, cache_status = await load(), CACHE_MISS
+            if order_data is None:
+                return None
 
         return {
             "order": order_data,
-            "cached": False,
+            "cached": cache_status != CACHE_MISS,
             "cache_ttl": self.cache.ttl["order_detail"],
             "site_code": self.site_code
         }
@@ -276,32 +222,22 @@ class ShopifyService:
         Returns:
             包含订单详情和缓存状态的字典
         """
-        # 尝试从缓存获取
-        if use_cache:
-            cached_order = await self.cache.get_order_detail(order_id)
-            if cached_order is not None:
-                logger.info(f"🎯 缓存命中: 订单详情 ({self.site_code}:{order_id})")
-                return {
-                    "order": cached_order,
-                    "cached": True,
-                    "cache_ttl": self.cache.ttl["order_detail"],
-                    "site_code": self.site_code
-                }
-
-        # 缓存未命中，调用 Shopify API
-        logger.info(f"🔄 调用 Shopify API: 订单详情 ({self.site_code}:{order_id})")
-        order = await self.client.get_order_detail(order_id)
-
-        # 转换为字典
-        order_data = order.model_dump()
+        async def load() -> Dict[str, Any]:
+            logger.info(f"🔄 调用 Shopify API: 订单详情 ({self.site_code}:{order_id})")
+            order = await self.client.get_order_detail(order_id)
+            return order.model_dump()
 
-        # 保存到缓存
         if use_cache:
-            await self.cache.set_order_detail(order_id, order_data)
+            order_data, cache_status = await self.cache.load_order_detail(order_id, load)
+        else:
+            order_data, cache_status = await load(), CACHE_MISS
+
+        if cache_status != CACHE_MISS:
+            logger.info(f"🎯 缓存命中: 订单详情 ({self.site_code}:{order_id}, {cache_status})")
 
         return {
             "order": order_data,
-            "cached": False,
+            "cached": cache_status != CACHE_MISS,
             "cache_ttl": self.cache.ttl["order_detail"],
             "site_code": self.site_code
         }
@@ -321,23 +257,154 @@ class ShopifyService:
         Returns:
             包含物流信息和缓存状态的字典
         """
-        # 尝试从缓存获取
+        async def load() -> Dict[str, Any]:
+            # 获取订单详情提取物流信息（缓存丰富后的数据）
+            logger.info(f"🔄 调用 Shopify API: 物流信息 ({self.site_code}:{order_id})")
+            order = await self.client.get_order_detail(order_id)
+            return self.build_tracking_data(order)
+
         if use_cache:
-            cached_tracking = await self.cache.get_tracking(order_id)
-            if cached_tracking is not None:
-                logger.info(f"🎯 缓存命中: 物流信息 ({self.site_code}:{order_id})")
-                return {
-                    "tracking": cached_tracking,
-                    "cached": True,
-                    "cache_ttl": self.cache.ttl["tracking"],
-                    "site_code": self.site_code
-                }
-
-        # 缓存未命中，获取订单详情提取物流信息
-        logger.info(f"🔄 调用 Shopify API: 物流信息 ({self.site_code}:{order_id})")
+            tracking_data, cache_status = await self.cache.load_tracking(order_id, load)
+        else:
+            tracking_data, cache_status = await load(), CACHE_MISS
+
+        if cache_status != CACHE_MISS:
+            logger.info(f"🎯 缓存命中: 物流信息 ({self.site_code}:{order_id}, {cache_status})")
+
+        return {
+            "tracking": tracking_data,
+            "cached": cache_status != CACHE_MISS,
+            "cache_ttl": self.cache.ttl["tracking"],
+            "site_code": self.site_code
+        }
+
+    # ==================== Webhook 写穿 ====================
+
+    async def cache_order(self, order: ShopifyOrderDetail) -> Dict[str, Any]:
+        """
+        将最新订单数据写入订单号/订单详情/物流缓存，并删除客户订单列表缓存
+
+        Args:
+            order: 最新订单详情
+
+        Returns:
+            写入缓存的订单数据
+        """
+        order_data = order.model_dump()
+        tracking = self.build_tracking_data(order) if order.fulfillments else None
+        await self.cache.set_order_bundle(order_data, tracking)
+        if order.customer_email:
+            await self.cache.invalidate_order_list(order.customer_email)
+        logger.info(f"🔁 Webhook 写入订单缓存: {self.site_code}:{order.order_number}")
+        return order_data
+
+    async def apply_order_webhook(self, raw_order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        用 orders/create、orders/updated Webhook 中的订单原始数据刷新缓存（不调用 Shopify API）
+
+        Args:
+            raw_order: Webhook 推送的订单 JSON
+
+        Returns:
+            写入缓存的订单数据
+        """
+        order = await self.client._parse_order_detail_with_tracking(raw_order)
+        return await self.cache_order(order)
+
+    async def refresh_order(self, order_id: str) -> Dict[str, Any]:
+        """
+        重新拉取订单并刷新缓存（fulfillment Webhook 只包含发货信息，需要完整订单）
+
+        Args:
+            order_id: Shopify 订单 ID
+
+        Returns:
+            写入缓存的订单数据
+        """
         order = await self.client.get_order_detail(order_id)
+        return await self.cache_order(order)
 
-        # 提取物流信息
+    async def apply_delivery_status(
+        self,
+        order_id: str,
+        tracking_number: str,
+        status: TrackingStatus
+    ) -> bool:
+        """
+        将 17track 推送的物流状态写入已缓存订单中对应运单的商品
+
+        只更新已发货且不是退款/服务类状态的商品；订单未缓存时不做任何事。
+
+        Returns:
+            是否更新了缓存
+        """
+        if status not in TRACKING_DELIVERY_STATUS:
+            return False
+
+        def mutate(order: Dict[str, Any]) -> bool:
+            return apply_tracking_statuses(order, {tracking_number: status})
+
+        return await self.cache.update_order(order_id, mutate) is not None
+
+    async def enrich_cached_delivery_status(self, order: Dict[str, Any]) -> bool:
+        """
+        缓存命中时的状态补全（Webhook 写穿之外的兜底）
+
+        Shopify fulfillment.shipment_status 可能为空，导致商品显示为“已发货”。
+        若存在 tracking_number，则用 17track 的状态补全为“已收货/运输中/派送中/投递失败”，
+        订单内所有运单并发查询（推送状态/缓存优先）。
+
+        Returns:
+            bool: 是否发生了更新
+        """
+        statuses = await self._missing_delivery_statuses(order)
+        return bool(statuses) and apply_tracking_statuses(order, statuses, fill_only=True)
+
+    async def _missing_delivery_statuses(self, order: Dict[str, Any]) -> Dict[str, TrackingStatus]:
+        """查询 delivery_status 为空的已发货商品对应运单的 17track 状态"""
+        # 仅补全：已发货（fulfilled）但 delivery_status 为空的实物商品
+        candidates: Dict[str, Optional[str]] = {}
+        for item in order.get("line_items") or []:
+            if item.get("delivery_status") or item.get("fulfillment_status") != "fulfilled":
+                continue
+            tracking_number = item.get("tracking_number")
+            if tracking_number:
+                candidates.setdefault(tracking_number, item.get("tracking_company"))
+
+        if not candidates:
+            return {}
+
+        return await get_tracking_service().get_statuses([
+            {"number": number, "carrier": carrier} for number, carrier in candidates.items()
+        ])
+
+    async def _enrich_and_write_back(self, order: Dict[str, Any]) -> None:
+        """
+        缓存命中后补全物流状态，有变化时回写订单缓存
+
+        回写通过 cache.update_order 在最新缓存数据上重放补全，
+        避免覆盖查询 17track 期间到达的 orders/updated 写入。
+        """
+        try:
+            statuses = await self._missing_delivery_statuses(order)
+            if statuses and apply_tracking_statuses(order, statuses, fill_only=True):
+                await self.cache.update_order(
+                    str(order["order_id"]),
+                    lambda cached: apply_tracking_statuses(cached, statuses, fill_only=True)
+                )
+        except Exception as exc:
+            logger.warning(f"缓存订单状态补全失败: {self.site_code}:{order.get('order_number')}, {exc}")
+
+    def build_tracking_data(self, order: ShopifyOrderDetail) -> Dict[str, Any]:
+        """
+        从订单详情提取物流信息（与 get_order_tracking 缓存的数据结构一致）
+
+        Args:
+            order: 订单详情
+
+        Returns:
+            经翻译模块丰富后的物流信息
+        """
         tracking_data = {
             "order_id": order.order_id,
             "order_number": order.order_number,
@@ -358,18 +425,43 @@ class ShopifyService:
             }
 
         # 使用翻译模块丰富物流数据
-        tracking_data = enrich_tracking_data(tracking_data)
+        return enrich_tracking_data(tracking_data)
 
-        # 保存到缓存（保存丰富后的数据）
-        if use_cache:
-            await self.cache.set_tracking(order_id, tracking_data)
+    async def attach_fulfillment_statuses(self, tracking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为每个包裹补充 17track 物流状态（拆单发货的所有运单并发查询）
 
-        return {
-            "tracking": tracking_data,
-            "cached": False,
-            "cache_ttl": self.cache.ttl["tracking"],
-            "site_code": self.site_code
-        }
+        在截止时间内未返回的运单不补充状态，查询失败不影响主流程。
+
+        Args:
+            tracking_data: get_order_tracking 返回的物流信息
+
+        Returns:
+            补充了 fulfillments[].shipment_status / shipment_status_zh 的物流信息
+        """
+        fulfillments = [
+            f for f in tracking_data.get("fulfillments") or []
+            if isinstance(f, dict) and f.get("tracking_number")
+        ]
+        if not fulfillments:
+            return tracking_data
+
+        try:
+            statuses = await get_tracking_service().get_statuses([
+                {"number": f["tracking_number"], "carrier": f.get("tracking_company")}
+                for f in fulfillments
+            ])
+        except Exception as e:
+            logger.warning(f"包裹物流状态补全失败 ({self.site_code}): {e}")
+            return tracking_data
+
+        for f in fulfillments:
+            status = statuses.get(f["tracking_number"])
+            if status:
+                f["shipment_status"] = status.value
+                f["shipment_status_zh"] = status.zh
+
+        return tracking_data
 
     async def get_order_count(
         self,
@@ -386,31 +478,22 @@ class ShopifyService:
         Returns:
             包含订单数量和缓存状态的字典
         """
-        # 尝试从缓存获取
-        if use_cache:
-            cached_count = await self.cache.get_order_count(status)
-            if cached_count is not None:
-                logger.info(f"🎯 缓存命中: 订单数量 ({self.site_code}:{status})")
-                return {
-                    "count": cached_count,
-                    "status": status,
-                    "cached": True,
-                    "cache_ttl": self.cache.ttl["order_count"],
-                    "site_code": self.site_code
-                }
-
-        # 缓存未命中，调用 Shopify API
-        logger.info(f"🔄 调用 Shopify API: 订单数量 ({self.site_code}:{status})")
-        count = await self.client.get_order_count(status=status)
-
-        # 保存到缓存
+        async def load() -> int:
+            logger.info(f"🔄 调用 Shopify API: 订单数量 ({self.site_code}:{status})")
+            return await self.client.get_order_count(status=status)
+
         if use_cache:
-            await self.cache.set_order_count(status, count)
+            count, cache_status = await self.cache.load_order_count(status, load)
+        else:
+            count, cache_status = await load(), CACHE_MISS
+
+        if cache_status != CACHE_MISS:
+            logger.info(f"🎯 缓存命中: 订单数量 ({self.site_code}:{status}, {cache_status})")
 
         return {
             "count": count,
             "status": status,
-            "cached": False,
+            "cached": cache_status != CACHE_MISS,
             "cache_ttl": self.cache.ttl["order_count"],
             "site_code": self.site_code
         }
@@ -470,6 +553,90 @@ def get_shopify_service(site_code: str) -> ShopifyService:
     return _services[code]
 
 
+# ==================== 跨站点并发查询 ====================
+
+async def _call_site(
+    site_code: str,
+    fetch: Callable[[str], Awaitable[Any]],
+    timeout: Optional[float]
+) -> Any:
+    """对单个站点执行查询（带超时）"""
+    return await asyncio.wait_for(fetch(site_code), timeout=timeout or SHOPIFY_SITE_TIMEOUT)
+
+
+async def gather_across_sites(
+    site_codes: Iterable[str],
+    fetch: Callable[[str], Awaitable[Any]],
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    并发查询多个站点，总耗时取决于最慢的站点
+
+    Args:
+        site_codes: 站点代码列表
+        fetch: 站点查询协程工厂，参数为站点代码
+        timeout: 单站点超时（秒），默认 SHOPIFY_SITE_TIMEOUT
+
+    Returns:
+        站点代码到查询结果的映射；失败或超时的站点值为对应的异常对象
+    """
+    codes = list(site_codes)
+    results = await asyncio.gather(
+        *(_call_site(code, fetch, timeout) for code in codes),
+        return_exceptions=True
+    )
+    return dict(zip(codes, results))
+
+
+async def first_across_sites(
+    site_codes: Iterable[str],
+    fetch: Callable[[str], Awaitable[Any]],
+    timeout: Optional[float] = None
+) -> Tuple[Optional[str], Any, Dict[str, Exception]]:
+    """
+    并发查询多个站点，返回第一个非空结果并取消其余查询
+
+    Args:
+        site_codes: 站点代码列表
+        fetch: 站点查询协程工厂，参数为站点代码
+        timeout: 单站点超时（秒），默认 SHOPIFY_SITE_TIMEOUT
+
+    Returns:
+        (命中站点, 结果, 失败站点的异常)；均未命中时站点和结果为 None
+    """
+    tasks = {
+        asyncio.create_task(_call_site(code, fetch, timeout)): code
+        for code in site_codes
+    }
+    errors: Dict[str, Exception] = {}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                code = tasks[task]
+                exc = task.exception()
+                if exc is not None:
+                    errors[code] = exc
+                    continue
+                result = task.result()
+                if result:
+                    return code, result, errors
+        return None, None, errors
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _describe_error(exc: Exception) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(exc, ShopifyAPIError):
+        return exc.message
+    return str(exc) or exc.__class__.__name__
+
+
 async def search_order_across_sites(
     order_number: str,
     use_cache: bool = True
@@ -477,7 +644,8 @@ async def search_order_across_sites(
     """
     跨站点搜索订单
 
-    根据订单号前缀自动检测站点，或遍历所有站点搜索
+    根据订单号前缀自动检测站点；检测失败或未找到时并发查询其余站点，
+    第一个命中的站点返回后取消其他站点的查询
 
     Args:
         order_number: 订单号
@@ -486,59 +654,60 @@ async def search_order_across_sites(
     Returns:
         包含订单详情和站点信息的字典，如果未找到返回 None
     """
-    # 首先尝试自动检测站点
+    async def fetch(site_code: str) -> Optional[Dict[str, Any]]:
+        service = get_shopify_service(site_code)
+        return await service.search_order_by_number(order_number, use_cache)
+
+    # 首先尝试自动检测站点（绝大多数订单号带站点前缀，避免无谓的全站点请求）
     detected_site = detect_site_from_order_number(order_number)
     if detected_site:
         try:
-            service = get_shopify_service(detected_site)
-            result = await service.search_order_by_number(order_number, use_cache)
+            result = await _call_site(detected_site, fetch, None)
             if result:
                 return result
-        except ShopifyAPIError:
-            pass
+        except (ShopifyAPIError, asyncio.TimeoutError) as e:
+            logger.warning(f"站点 {detected_site} 搜索订单失败: {_describe_error(e)}")
 
-    # 如果自动检测失败，遍历所有已配置站点
-    configured_sites = get_all_configured_sites()
-    for site_code in configured_sites:
-        if site_code == detected_site:
-            continue  # 跳过已尝试的站点
-
-        try:
-            service = get_shopify_service(site_code)
-            result = await service.search_order_by_number(order_number, use_cache)
-            if result:
-                return result
-        except ShopifyAPIError:
-            continue
+    # 自动检测失败，并发查询其余已配置站点
+    other_sites = [code for code in get_all_configured_sites() if code != detected_site]
+    site_code, result, errors = await first_across_sites(other_sites, fetch)
 
-    return None
+    if errors:
+        logger.warning(
+            f"跨站点搜索订单 {order_number} 部分站点失败: "
+            + ", ".join(f"{code}={_describe_error(exc)}" for code, exc in errors.items())
+        )
+    return result
 
 
 async def get_all_sites_health() -> Dict[str, Any]:
     """
-    获取所有已配置站点的健康状态
+    获取所有已配置站点的健康状态（并发检查）
 
     Returns:
         各站点健康状态
     """
     configured_sites = get_all_configured_sites()
-    health_status = {}
+    results = await gather_across_sites(
+        configured_sites,
+        lambda site_code: get_shopify_service(site_code).health_check()
+    )
 
-    for site_code in configured_sites:
-        try:
-            service = get_shopify_service(site_code)
-            health_status[site_code] = await service.health_check()
-        except ShopifyAPIError as e:
+    health_status = {}
+    for site_code, result in results.items():
+        if isinstance(result, ShopifyAPIError):
             health_status[site_code] = {
                 "status": "error",
-                "error": e.message,
-                "code": e.code
+                "error": result.message,
+                "code": result.code
             }
-        except Exception as e:
+        elif isinstance(result, BaseException):
             health_status[site_code] = {
                 "status": "error",
-                "error": str(e)
+                "error": _describe_error(result)
             }
+        else:
+            health_status[site_code] = result
 
     return health_status
 
@@ -570,7 +739,8 @@ async def search_orders_by_email_across_sites(
     """
     跨站点按邮箱搜索订单
 
-    遍历所有已配置站点，汇总该邮箱的所有订单。
+    并发查询所有已配置站点，汇总该邮箱的所有订单；
+    失败或超时的站点记录在 sites_failed 中，其余站点结果照常返回。
 
     Args:
         email: 客户邮箱
@@ -581,31 +751,34 @@ async def search_orders_by_email_across_sites(
         包含所有站点订单的汇总结果
     """
     configured_sites = get_all_configured_sites()
+    results = await gather_across_sites(
+        configured_sites,
+        lambda site_code: get_shopify_service(site_code).get_orders_by_email(
+            email, limit=limit, use_cache=use_cache
+        )
+    )
+
     all_orders = []
     sites_searched = []
     sites_with_orders = []
+    sites_failed = []
 
-    for site_code in configured_sites:
-        try:
-            service = get_shopify_service(site_code)
-            result = await service.get_orders_by_email(email, limit=limit, use_cache=use_cache)
-
-            sites_searched.append(site_code)
+    for site_code, result in results.items():
+        if isinstance(result, BaseException):
+            error = _describe_error(result)
+            logger.warning(f"站点 {site_code} 查询失败: {error}")
+            sites_failed.append({"site_code": site_code, "error": error})
+            continue
 
-            if result.get("orders"):
-                # 为每个订单添加站点信息（如果尚未添加）
-                for order in result["orders"]:
-                    if "site_code" not in order:
-                        order["site_code"] = site_code
-                all_orders.extend(result["orders"])
-                sites_with_orders.append(site_code)
+        sites_searched.append(site_code)
 
-        except ShopifyAPIError as e:
-            logger.warning(f"站点 {site_code} 查询失败: {e.message}")
-            continue
-        except Exception as e:
-            logger.warning(f"站点 {site_code} 查询异常: {str(e)}")
-            continue
+        if result.get("orders"):
+            # 为每个订单添加站点信息（如果尚未添加）
+            for order in result["orders"]:
+                if "site_code" not in order:
+                    order["site_code"] = site_code
+            all_orders.extend(result["orders"])
+            sites_with_orders.append(site_code)
 
     # 按创建时间倒序排序
     all_orders.sort(key=lambda x: x.get("created_at", ""), reverse=True)
@@ -616,5 +789,7 @@ async def search_orders_by_email_across_sites(
         "email": email,
         "sites_searched": sites_searched,
         "sites_with_orders": sites_with_orders,
+        "sites_failed": sites_failed,
+        "partial": bool(sites_failed),
         "cached": False  # 汇总结果不标记缓存状态
     }
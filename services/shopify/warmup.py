@@ -1,15 +1,17 @@
 """
-Shopify UK 缓存预热服务
+Shopify 多站点缓存预热服务
 
 负责后台预热订单和物流数据，确保用户查询时能快速响应。
 
 设计原则：
-1. 用户请求优先：预热时检测到用户请求则暂停
-2. 低速率预热：0.5 次/秒，避免影响 Shopify API 限流
-3. 失败重试：单个订单失败不影响整体预热
-4. 详细日志：记录预热进度和错误
-
-版本: v4.2.0
+1. 用户请求优先：预热时检测到用户请求则暂停；站点漏桶水位过高时让出
+2. 站点级速率预算：每个站点按 WARMUP_RATE_LIMIT 次/秒发起预热请求
+3. 批量拉取：page_info 游标分页列出窗口内全部订单，ids= 批量获取详情
+4. 并发流水线：每站点一个有界队列 + WARMUP_CONCURRENCY 个 worker，所有站点并行
+5. 失败重试：单个订单失败不影响整体预热，批量失败降级为逐单预热
+6. 详细日志：记录预热进度和错误
+
+版本: v4.3.0
 """
 
 import os
@@ -17,11 +19,17 @@ import asyncio
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, AsyncIterator
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# 订单列表只取预热所需字段
+ORDER_LIST_FIELDS = "id,name,created_at,fulfillment_status,financial_status"
+
+# 有退款的订单需要走 /orders/{id}.json 才能拿到 refunds
+REFUND_FINANCIAL_STATUSES = {"refunded", "partially_refunded"}
+
 
 @dataclass
 class WarmupStats:
@@ -35,8 +43,14 @@ class WarmupStats:
     orders_skipped: int = 0  # 已有缓存跳过
     tracking_warmed: int = 0
     tracking_failed: int = 0
+    api_requests: int = 0
+    sites: Dict[str, Dict[str, int]] = field(default_factory=dict)
     errors: List[str] = field(default_factory=list)
 
+    def site(self, site_code: str) -> Dict[str, int]:
+        """获取站点维度计数（不存在则创建）"""
+        return self.sites.setdefault(site_code, {"total": 0, "warmed": 0, "skipped": 0, "failed": 0})
+
     @property
     def duration_seconds(self) -> float:
         """预热耗时（秒）"""
@@ -68,11 +82,49 @@ class WarmupStats:
             "orders_skipped": self.orders_skipped,
             "tracking_warmed": self.tracking_warmed,
             "tracking_failed": self.tracking_failed,
+            "api_requests": self.api_requests,
+            "sites": self.sites,
             "success_rate": f"{self.orders_warmed / max(self.total_orders, 1) * 100:.1f}%",
             "errors": self.errors[:10]  # 只返回前10个错误
         }
 
 
+class SiteRateBudget:
+    """
+    站点级预热请求预算（协程安全）
+
+    同一站点的所有预热 worker 共享一个预算：
+    - 按 rate 次/秒均匀放行
+    - ShopifyClient 漏桶水位超过 bucket_ratio 时等待漏出，把余量留给用户请求
+    """
+
+    def __init__(self, rate: float, rate_limiter=None, bucket_ratio: float = 0.5):
+        self.interval = 1.0 / max(rate, 0.01)
+        self.rate_limiter = rate_limiter
+        self.bucket_ratio = bucket_ratio
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    def _bucket_wait(self) -> float:
+        """漏桶水位降到阈值以下所需的等待时间"""
+        if self.rate_limiter is None:
+            return 0.0
+        status = self.rate_limiter.get_status()
+        overflow = status["level"] - status["capacity"] * self.bucket_ratio
+        return max(overflow / status["leak_rate"], status["blocked_for"], 0.0)
+
+    async def acquire(self):
+        """占用一个预热请求名额，必要时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(self._next_slot - now, self._bucket_wait())
+                if wait <= 0:
+                    self._next_slot = now + self.interval
+                    return
+                await asyncio.sleep(wait)
+
+
 class WarmupService:
     """
     缓存预热服务
@@ -88,7 +140,15 @@ class WarmupService:
         # 从环境变量读取配置
         self.enabled = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
         self.order_days = int(os.getenv("WARMUP_ORDER_DAYS", "7"))
-        self.rate_limit = float(os.getenv("WARMUP_RATE_LIMIT", "0.5"))  # 次/秒
+        self.rate_limit = float(os.getenv("WARMUP_RATE_LIMIT", "1.0"))  # 每站点 次/秒
+        self.concurrency = max(int(os.getenv("WARMUP_CONCURRENCY", "4")), 1)  # 每站点 worker 数
+        self.batch_size = min(max(int(os.getenv("WARMUP_BATCH_SIZE", "50")), 1), 250)  # ids= 每批订单数
+        self.bucket_ratio = float(os.getenv("WARMUP_BUCKET_RATIO", "0.5"))  # 漏桶水位阈值
+        self.sites = [
+            code.strip().lower()
+            for code in os.getenv("WARMUP_SITES", "").split(",")
+            if code.strip()
+        ]  # 为空表示所有已配置站点
         self.pause_on_user_request = os.getenv("WARMUP_PAUSE_ON_USER_REQUEST", "true").lower() == "true"
         self.max_retries = int(os.getenv("WARMUP_MAX_RETRIES", "3"))
 
@@ -103,7 +163,10 @@ class WarmupService:
         self._service = None
         self._client = None
 
-        logger.info(f"✅ 预热服务初始化完成 (enabled={self.enabled}, days={self.order_days}, rate={self.rate_limit}/s)")
+        logger.info(
+            f"✅ 预热服务初始化完成 (enabled={self.enabled}, days={self.order_days}, "
+            f"rate={self.rate_limit}/s/站点, concurrency={self.concurrency}, batch={self.batch_size})"
+        )
 
     @property
     def service(self):
@@ -155,55 +218,85 @@ class WarmupService:
         """是否有待处理的用户请求"""
         return len(self._pending_user_requests) > 0
 
-    async def _wait_for_rate_limit(self):
-        """等待速率限制"""
-        # 0.5次/秒 = 每2秒一次
-        wait_time = 1.0 / self.rate_limit
-        await asyncio.sleep(wait_time)
-
     async def _pause_for_user_request(self):
         """暂停等待用户请求完成"""
         if self.pause_on_user_request and self.has_pending_user_request():
             logger.info("⏸️  检测到用户请求，预热暂停 1 秒")
             await asyncio.sleep(1.0)
 
-    async def get_recent_orders(self, days: int = 7) -> List[Dict[str, Any]]:
+    def _target_sites(self) -> List[str]:
+        """本次预热的站点列表（WARMUP_SITES 为空时使用所有已配置站点）"""
+        from services.shopify.sites import get_all_configured_sites
+        configured = list(get_all_configured_sites().keys())
+        if not self.sites:
+            return configured
+        return [code for code in self.sites if code in configured]
+
+    async def _iter_order_pages(
+        self,
+        client,
+        since_str: str,
+        budget: Optional[SiteRateBudget] = None,
+        stats: Optional[WarmupStats] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        获取最近 N 天的订单列表
+        按 page_info 游标逐页列出 since_str 之后创建的订单
+
+        Yields:
+            每页订单列表 (包含订单号、订单ID、发货/支付状态)
+        """
+        params = {"status": "any", "created_at_min": since_str}
+        page_info: Optional[str] = None
+
+        while True:
+            await self._pause_for_user_request()
+            if budget:
+                await budget.acquire()
+            orders, page_info = await client.list_orders_page(
+                params=params,
+                page_info=page_info,
+                limit=250,
+                fields=ORDER_LIST_FIELDS
+            )
+            if stats:
+                stats.api_requests += 1
+
+            yield [
+                {
+                    "order_id": str(order.get("id")),
+                    "order_number": order.get("name", "").lstrip("#"),
+                    "created_at": order.get("created_at"),
+                    "fulfillment_status": order.get("fulfillment_status"),
+                    "financial_status": order.get("financial_status")
+                }
+                for order in orders
+            ]
+
+            if not page_info or self._should_stop:
+                return
+
+    async def get_recent_orders(self, days: int = 7, site_code: str = "uk") -> List[Dict[str, Any]]:
+        """
+        获取最近 N 天的订单列表（page_info 分页，返回窗口内全部订单）
 
         Args:
             days: 获取最近多少天的订单
+            site_code: 站点代码
 
         Returns:
             订单列表 (包含订单号和订单ID)
         """
-        # 计算起始日期
+        from services.shopify.client import get_shopify_client
+
         since_date = datetime.utcnow() - timedelta(days=days)
         since_str = since_date.strftime("%Y-%m-%dT00:00:00Z")
 
-        logger.info(f"📋 获取 {days} 天内的订单 (since: {since_str})")
-
-        # 使用 Shopify API 获取订单
-        # 注意：这里直接调用客户端，不使用缓存
-        params = {
-            "status": "any",
-            "limit": 250,  # Shopify API 最大限制
-            "created_at_min": since_str,
-            "fields": "id,name,created_at,fulfillment_status"
-        }
+        logger.info(f"📋 获取 {site_code.upper()} {days} 天内的订单 (since: {since_str})")
 
         try:
-            data = await self.client._request("GET", "/orders.json", params=params)
-            orders = data.get("orders", [])
-
-            result = []
-            for order in orders:
-                result.append({
-                    "order_id": str(order.get("id")),
-                    "order_number": order.get("name", "").lstrip("#"),
-                    "created_at": order.get("created_at"),
-                    "fulfillment_status": order.get("fulfillment_status")
-                })
+            result: List[Dict[str, Any]] = []
+            async for page in self._iter_order_pages(get_shopify_client(site_code), since_str):
+                result.extend(page)
 
             logger.info(f"✅ 获取到 {len(result)} 个订单")
             return result
@@ -300,63 +393,174 @@ class WarmupService:
 
         return False
 
-    async def full_warmup(self, days: Optional[int] = None) -> WarmupStats:
-        """
-        全量预热
-
-        预热最近 N 天的所有订单和物流信息
+    async def _cache_order(self, client, service, raw_order: Dict[str, Any], stats: WarmupStats) -> None:
+        """解析订单原始数据并一次写入订单号/订单详情/物流缓存"""
+        site_stats = stats.site(service.site_code)
+        order = await client._parse_order_detail_with_tracking(raw_order)
+        tracking = service.build_tracking_data(order) if raw_order.get("fulfillment_status") else None
+
+        if not await service.cache.set_order_bundle(order.model_dump(), tracking):
+            raise RuntimeError("写入缓存失败")
+
+        stats.orders_warmed += 1
+        site_stats["warmed"] += 1
+        if tracking is not None:
+            stats.tracking_warmed += 1
+
+    async def _warmup_order_by_id(
+        self,
+        client,
+        service,
+        budget: SiteRateBudget,
+        order: Dict[str, Any],
+        stats: WarmupStats
+    ) -> bool:
+        """逐单预热（/orders/{id}.json，用于有退款的订单和批量失败降级）"""
+        order_number = order["order_number"]
+        for retry in range(self.max_retries):
+            if self._should_stop:
+                return False
+            try:
+                await self._pause_for_user_request()
+                await budget.acquire()
+                stats.api_requests += 1
+                data = await client._request("GET", f"/orders/{order['order_id']}.json")
+                raw_order = data.get("order")
+                if not raw_order:
+                    raise RuntimeError("订单不存在")
+                await self._cache_order(client, service, raw_order, stats)
+                return True
 
-        Args:
-            days: 预热天数（默认使用配置值）
+            except Exception as e:
+                if retry < self.max_retries - 1:
+                    logger.warning(f"⚠️  预热订单 {order_number} 失败 (重试 {retry + 1}/{self.max_retries}): {e}")
+                    await asyncio.sleep(1.0)
+                else:
+                    stats.orders_failed += 1
+                    stats.site(service.site_code)["failed"] += 1
+                    stats.errors.append(f"订单 {service.site_code.upper()}/{order_number}: {str(e)}")
+                    logger.error(f"❌ 预热订单 {order_number} 最终失败: {e}")
+        return False
 
-        Returns:
-            预热统计数据
-        """
-        if self._is_running:
-            logger.warning("⚠️  预热已在运行中，跳过")
-            return self._last_warmup_stats
+    async def _warmup_batch(
+        self,
+        client,
+        service,
+        budget: SiteRateBudget,
+        batch: List[Dict[str, Any]],
+        stats: WarmupStats
+    ) -> None:
+        """预热一批订单：ids= 批量拉取，有退款的订单逐单拉取"""
+        singles = [o for o in batch if o.get("financial_status") in REFUND_FINANCIAL_STATUSES]
+        bulk = [o for o in batch if o.get("financial_status") not in REFUND_FINANCIAL_STATUSES]
+
+        if bulk:
+            raw_orders: List[Dict[str, Any]] = []
+            try:
+                await self._pause_for_user_request()
+                await budget.acquire()
+                stats.api_requests += 1
+                raw_orders = await client.get_orders_by_ids([o["order_id"] for o in bulk])
+            except Exception as e:
+                logger.warning(f"⚠️  {service.site_code.upper()} 批量获取 {len(bulk)} 个订单失败，降级为逐单预热: {e}")
+                singles.extend(bulk)
 
-        days = days or self.order_days
-        stats = WarmupStats(warmup_type="full")
-        stats.start_time = time.time()
+            for raw_order in raw_orders:
+                if self._should_stop:
+                    return
+                try:
+                    await self._cache_order(client, service, raw_order, stats)
+                except Exception as e:
+                    stats.orders_failed += 1
+                    stats.site(service.site_code)["failed"] += 1
+                    stats.errors.append(f"订单 {service.site_code.upper()}/{raw_order.get('name')}: {str(e)}")
+                    logger.error(f"❌ 预热订单 {raw_order.get('name')} 失败: {e}")
 
-        self._is_running = True
-        self._should_stop = False
+        for order in singles:
+            if self._should_stop:
+                return
+            await self._warmup_order_by_id(client, service, budget, order, stats)
 
-        logger.info(f"🚀 开始全量预热 ({days} 天)")
+    async def _warmup_site(self, site_code: str, since_str: str, stats: WarmupStats) -> None:
+        """
+        预热单个站点
 
+        生产者按页列出订单并过滤已缓存订单，未缓存订单按 batch_size 分批入队；
+        concurrency 个 worker 共享站点预算并发消费。
+        """
+        from services.shopify.client import get_shopify_client
+        from services.shopify.service import get_shopify_service
+
+        client = get_shopify_client(site_code)
+        service = get_shopify_service(site_code)
+        budget = SiteRateBudget(self.rate_limit, client.rate_limiter, self.bucket_ratio)
+        site_stats = stats.site(site_code)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                if self._should_stop:
+                    continue
+                try:
+                    await self._warmup_batch(client, service, budget, batch, stats)
+                except Exception as e:
+                    stats.errors.append(f"站点 {site_code.upper()} 批量预热异常: {str(e)}")
+                    logger.error(f"❌ 站点 {site_code.upper()} 批量预热异常: {e}")
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
         try:
-            # 1. 获取订单列表
-            orders = await self.get_recent_orders(days)
-            stats.total_orders = len(orders)
-
-            logger.info(f"📊 待预热订单: {stats.total_orders} 个")
-
-            # 2. 逐个预热
-            for i, order in enumerate(orders, 1):
+            async for page in self._iter_order_pages(client, since_str, budget, stats):
+                stats.total_orders += len(page)
+                site_stats["total"] += len(page)
+
+                uncached = set(await service.cache.filter_uncached_order_numbers(
+                    [o["order_number"] for o in page]
+                ))
+                pending = [o for o in page if o["order_number"] in uncached]
+                skipped = len(page) - len(pending)
+                stats.orders_skipped += skipped
+                site_stats["skipped"] += skipped
+
+                for start in range(0, len(pending), self.batch_size):
+                    if self._should_stop:
+                        break
+                    await queue.put(pending[start:start + self.batch_size])
+
+                logger.info(
+                    f"📈 {site_code.upper()} 预热进度: 已列出 {site_stats['total']}, "
+                    f"跳过 {site_stats['skipped']}, 完成 {site_stats['warmed']}"
+                )
                 if self._should_stop:
-                    logger.info("⏹️  预热被中断")
+                    logger.info(f"⏹️  {site_code.upper()} 预热被中断")
                     break
 
-                order_number = order["order_number"]
-                order_id = order["order_id"]
+        except Exception as e:
+            stats.errors.append(f"站点 {site_code.upper()} 预热异常: {str(e)}")
+            logger.error(f"❌ 站点 {site_code.upper()} 预热异常: {e}")
 
-                # 预热订单详情
-                await self.warmup_order(order_number, stats)
-                await self._wait_for_rate_limit()
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
 
-                # 预热物流信息（如果已发货）
-                if order.get("fulfillment_status"):
-                    await self.warmup_tracking(order_id, order_number, stats)
-                    await self._wait_for_rate_limit()
+    async def _run_warmup(self, stats: WarmupStats, since_str: str) -> WarmupStats:
+        """所有目标站点并行预热，并记录统计"""
+        self._is_running = True
+        self._should_stop = False
+        stats.start_time = time.time()
 
-                # 进度日志（每 50 个输出一次）
-                if i % 50 == 0:
-                    logger.info(f"📈 预热进度: {i}/{stats.total_orders} ({i * 100 // stats.total_orders}%)")
+        try:
+            sites = self._target_sites()
+            if not sites:
+                logger.warning("⚠️  没有已配置的 Shopify 站点，跳过预热")
+            await asyncio.gather(*(self._warmup_site(code, since_str, stats) for code in sites))
 
         except Exception as e:
-            stats.errors.append(f"全量预热异常: {str(e)}")
-            logger.error(f"❌ 全量预热异常: {e}")
+            stats.errors.append(f"预热异常: {str(e)}")
+            logger.error(f"❌ 预热异常: {e}")
 
         finally:
             self._is_running = False
@@ -369,21 +573,21 @@ class WarmupService:
                 self._warmup_history = self._warmup_history[-100:]
 
             logger.info(
-                f"✅ 全量预热完成 - 耗时: {stats.duration_str}, "
-                f"成功: {stats.orders_warmed}, 跳过: {stats.orders_skipped}, "
-                f"失败: {stats.orders_failed}, 物流: {stats.tracking_warmed}"
+                f"✅ {'全量' if stats.warmup_type == 'full' else '增量'}预热完成 - 耗时: {stats.duration_str}, "
+                f"订单: {stats.total_orders}, 成功: {stats.orders_warmed}, 跳过: {stats.orders_skipped}, "
+                f"失败: {stats.orders_failed}, 物流: {stats.tracking_warmed}, API 请求: {stats.api_requests}"
             )
 
         return stats
 
-    async def incremental_warmup(self, hours: int = 6) -> WarmupStats:
+    async def full_warmup(self, days: Optional[int] = None) -> WarmupStats:
         """
-        增量预热
+        全量预热
 
-        只预热新订单和刷新物流信息
+        并行预热所有站点最近 N 天的订单和物流信息
 
         Args:
-            hours: 预热最近多少小时的新订单
+            days: 预热天数（默认使用配置值）
 
         Returns:
             预热统计数据
@@ -392,67 +596,38 @@ class WarmupService:
             logger.warning("⚠️  预热已在运行中，跳过")
             return self._last_warmup_stats
 
-        stats = WarmupStats(warmup_type="incremental")
-        stats.start_time = time.time()
-
-        self._is_running = True
-        self._should_stop = False
-
-        logger.info(f"🔄 开始增量预热 ({hours} 小时内)")
-
-        try:
-            # 计算时间范围
-            since_date = datetime.utcnow() - timedelta(hours=hours)
-            since_str = since_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-            # 获取最近的订单
-            params = {
-                "status": "any",
-                "limit": 250,
-                "created_at_min": since_str,
-                "fields": "id,name,created_at,fulfillment_status"
-            }
-
-            data = await self.client._request("GET", "/orders.json", params=params)
-            orders = data.get("orders", [])
-            stats.total_orders = len(orders)
-
-            logger.info(f"📊 待预热订单: {stats.total_orders} 个 (增量)")
-
-            # 预热订单
-            for order in orders:
-                if self._should_stop:
-                    break
-
-                order_number = order.get("name", "").lstrip("#")
-                order_id = str(order.get("id"))
+        days = days or self.order_days
+        since_date = datetime.utcnow() - timedelta(days=days)
 
-                await self.warmup_order(order_number, stats)
-                await self._wait_for_rate_limit()
+        logger.info(f"🚀 开始全量预热 ({days} 天)")
+        return await self._run_warmup(
+            WarmupStats(warmup_type="full"),
+            since_date.strftime("%Y-%m-%dT00:00:00Z")
+        )
 
-                if order.get("fulfillment_status"):
-                    await self.warmup_tracking(order_id, order_number, stats)
-                    await self._wait_for_rate_limit()
+    async def incremental_warmup(self, hours: int = 6) -> WarmupStats:
+        """
+        增量预热
 
-        except Exception as e:
-            stats.errors.append(f"增量预热异常: {str(e)}")
-            logger.error(f"❌ 增量预热异常: {e}")
+        并行预热所有站点最近 N 小时的新订单
 
-        finally:
-            self._is_running = False
-            stats.end_time = time.time()
-            self._last_warmup_stats = stats
-            self._warmup_history.append(stats)
+        Args:
+            hours: 预热最近多少小时的新订单
 
-            if len(self._warmup_history) > 100:
-                self._warmup_history = self._warmup_history[-100:]
+        Returns:
+            预热统计数据
+        """
+        if self._is_running:
+            logger.warning("⚠️  预热已在运行中，跳过")
+            return self._last_warmup_stats
 
-            logger.info(
-                f"✅ 增量预热完成 - 耗时: {stats.duration_str}, "
-                f"成功: {stats.orders_warmed}, 跳过: {stats.orders_skipped}"
-            )
+        since_date = datetime.utcnow() - timedelta(hours=hours)
 
-        return stats
+        logger.info(f"🔄 开始增量预热 ({hours} 小时内)")
+        return await self._run_warmup(
+            WarmupStats(warmup_type="incremental"),
+            since_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        )
 
     def stop(self):
         """停止当前预热任务"""
@@ -468,6 +643,10 @@ class WarmupService:
             "config": {
                 "order_days": self.order_days,
                 "rate_limit": self.rate_limit,
+                "concurrency": self.concurrency,
+                "batch_size": self.batch_size,
+                "bucket_ratio": self.bucket_ratio,
+                "sites": self.sites or "all",
                 "pause_on_user_request": self.pause_on_user_request,
                 "max_retries": self.max_retries
             },
@@ -17,7 +17,7 @@ from services.ticket.models import (
 from services.ticket.store import TicketStore
 from services.ticket.assignment import SmartAssignmentEngine
 from services.ticket.template import TicketTemplateStore, TicketTemplate
-from services.ticket.sla import check_sla_alerts, SLAAlert, SLA_PAUSE_STATUSES
+from services.ticket.sla import check_sla_alerts, next_sla_deadline, SLAAlert, SLA_PAUSE_STATUSES
 from services.ticket.audit import AuditLogStore
 
 __all__ = [
@@ -35,6 +35,7 @@ __all__ = [
     "TicketTemplateStore",
     "TicketTemplate",
     "check_sla_alerts",
+    "next_sla_deadline",
     "SLAAlert",
     "SLA_PAUSE_STATUSES",
 ]
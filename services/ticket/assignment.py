@@ -19,7 +19,6 @@ from services.session.state import (
     AgentInfo,
     SessionState,
     SessionStateStore,
-    SessionStatus,
 )
 
 
@@ -88,7 +87,7 @@ class SmartAssignmentEngine:
         if not available_agents:
             return None
 
-        loads = await self._calculate_agent_loads()
+        loads = await self._calculate_agent_loads([agent.id for agent in available_agents])
         context_tags = self._collect_session_tags(session_state)
 
         candidates = self._filter_by_skills(available_agents, context_tags)
@@ -131,19 +130,10 @@ class SmartAssignmentEngine:
         """
         self._remember_customer(session_state, agent_id)
 
-    async def _calculate_agent_loads(self) -> Dict[str, Dict[str, int]]:
+    async def _calculate_agent_loads(self, agent_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """读取候选坐席的人工会话数和待接入会话数（Redis 存储为每个坐席两次 SCARD）"""
         loads: Dict[str, Dict[str, int]] = defaultdict(lambda: {"manual": 0, "pending": 0})
-
-        manual_sessions = await self.session_store.list_by_status(SessionStatus.MANUAL_LIVE, limit=1000)
-        for session in manual_sessions:
-            if session.assigned_agent:
-                loads[session.assigned_agent.id]["manual"] += 1
-
-        pending_sessions = await self.session_store.list_by_status(SessionStatus.PENDING_MANUAL, limit=1000)
-        for session in pending_sessions:
-            if session.assigned_agent:
-                loads[session.assigned_agent.id]["pending"] += 1
-
+        loads.update(await self.session_store.get_agent_loads(agent_ids))
         return loads
 
     def _get_available_agents(self) -> List[Agent]:
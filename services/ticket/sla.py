@@ -201,8 +201,13 @@ class SLATimer:
         else:
             total = now - self.created_at
 
-        # 减去暂停时间
-        return max(0, total - self.paused_duration)
+        # 减去暂停时间（含当前这段尚未结束的暂停）
+        paused = self.paused_duration
+        if self.is_paused() and not self.resolved_at:
+            pause_started = self.ticket.metadata.get("sla_pause_started_at")
+            if pause_started is not None:
+                paused += max(0.0, now - float(pause_started))
+        return max(0, total - paused)
 
     def get_rt_remaining(self, now: Optional[float] = None) -> float:
         """
@@ -364,6 +369,38 @@ def check_sla_alerts(ticket: Ticket, now: Optional[float] = None) -> List[SLAAle
     return alerts
 
 
+# SLA 状态切换点（已用时间 / 目标时效）：warning、urgent、violated
+SLA_THRESHOLD_RATIOS = (0.5, 0.8, 1.0)
+# 截止时间略晚于切换点，保证到期弹出时状态已切换
+_DEADLINE_SLACK = 0.01
+
+
+def next_sla_deadline(ticket: Ticket, now: Optional[float] = None) -> Optional[float]:
+    """
+    计算工单下一次 SLA 状态切换的时间点（FRT/RT 的 warning/urgent/violated）
+
+    RT 暂停期间计时冻结，不产生截止时间，恢复后按累计暂停时长顺延。
+
+    Returns:
+        时间戳；已关闭/归档、已完成或全部阈值都已过去时返回 None
+    """
+    if now is None:
+        now = time.time()
+    if ticket.status in {TicketStatus.CLOSED, TicketStatus.ARCHIVED}:
+        return None
+
+    timer = SLATimer(ticket)
+    points: List[float] = []
+    if not timer.first_response_at:
+        points.extend(timer.created_at + timer.frt_target * ratio for ratio in SLA_THRESHOLD_RATIOS)
+    if not timer.resolved_at and not timer.is_paused():
+        start = timer.created_at + float(timer.paused_duration or 0.0)
+        points.extend(start + timer.rt_target * ratio for ratio in SLA_THRESHOLD_RATIOS)
+
+    upcoming = [point + _DEADLINE_SLACK for point in points if point + _DEADLINE_SLACK > now]
+    return min(upcoming) if upcoming else None
+
+
 def format_alert_message(alert: SLAAlert) -> str:
     """
     格式化预警消息用于通知显示
@@ -10,8 +10,9 @@ from __future__ import annotations
 
 import json
 import time
+import uuid
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 
 try:
     import redis  # type: ignore
@@ -28,10 +29,116 @@ from services.ticket.models import (
     TicketAttachment,
     generate_ticket_id,
 )
-from services.ticket.sla import check_sla_alerts, SLAAlert, SLA_PAUSE_STATUSES
+from services.ticket.sla import check_sla_alerts, next_sla_deadline, SLAAlert, SLA_PAUSE_STATUSES
 
 logger = logging.getLogger(__name__)
 
+# 二级索引版本（索引结构变化时递增，触发重建）
+TICKET_INDEX_VERSION = "2"
+# 未指派工单在坐席索引中的占位值
+UNASSIGNED_INDEX_VALUE = "_unassigned"
+# 可直接用有序集合分页的排序字段
+INDEXED_SORT_FIELDS = ("created_at", "updated_at")
+# 索引写入 WATCH 冲突时的最大重试次数
+INDEX_WRITE_MAX_RETRIES = 5
+# 查询临时 key 的过期时间（秒），正常情况下在同一事务内删除
+QUERY_TEMP_KEY_TTL = 60
+# 未完成状态（SLA 检测范围）
+OPEN_TICKET_STATUSES = (
+    TicketStatus.PENDING,
+    TicketStatus.IN_PROGRESS,
+    TicketStatus.WAITING_CUSTOMER,
+    TicketStatus.WAITING_VENDOR,
+    TicketStatus.RESOLVED,
+)
+
+# 在事务内读取并更新 SLA 截止时间：已到期未弹出的条目（ARGV[4]=1）保留原时间，
+# 否则写入新截止时间（ARGV[3] 为空表示移出索引）
+SLA_DEADLINE_UPDATE_SCRIPT = """
+local current = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if current and tonumber(current) <= tonumber(ARGV[2]) and ARGV[4] == '1' then
+    return current
+end
+if ARGV[3] == '' then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+else
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+end
+return ARGV[3]
+"""
+
+# pop_due_sla_alerts 认领到期条目的租约（秒）：认领时把截止时间推迟到租约到期，
+# 处理进程崩溃时条目在租约到期后重新到期，不会从索引中丢失
+SLA_CLAIM_LEASE_SECONDS = 60
+
+# 原子认领到期条目：ARGV[1] = 当前时间，ARGV[2] = 租约到期时间，ARGV[3] = 最大数量
+SLA_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[3]))
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[2], member)
+end
+return due
+"""
+
+# 按下一个切换点重新入索引：ARGV[1] = 认领时的租约分数，其后为 (工单ID, 截止时间) 对（空串表示移出）。
+# 分数仍为租约时直接替换；期间被工单写入改动过（SLA_DEADLINE_UPDATE_SCRIPT）则较早的截止时间生效，
+# 已被移出的条目不再加回
+SLA_RESCHEDULE_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    local current = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if current then
+        if tonumber(current) == tonumber(ARGV[1]) then
+            if ARGV[i + 1] == '' then
+                redis.call('ZREM', KEYS[1], ARGV[i])
+            else
+                redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+            end
+        elseif ARGV[i + 1] ~= '' then
+            redis.call('ZADD', KEYS[1], 'LT', ARGV[i + 1], ARGV[i])
+        end
+    end
+end
+return 1
+"""
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _enum_value(value: Any) -> str:
+    return str(value.value if hasattr(value, "value") else value)
+
+
+def _ticket_tags(ticket: Ticket) -> Set[str]:
+    """提取工单标签（小写）"""
+    metadata_tags = (ticket.metadata or {}).get("tags", [])
+    if isinstance(metadata_tags, str):
+        metadata_values = [metadata_tags]
+    elif isinstance(metadata_tags, dict):
+        metadata_values = list(metadata_tags.values())
+    elif isinstance(metadata_tags, list):
+        metadata_values = metadata_tags
+    else:
+        metadata_values = []
+    return {str(tag).lower() for tag in metadata_values if tag}
+
+
+def _ticket_categories(ticket: Ticket) -> Set[str]:
+    """提取工单分类（小写）"""
+    metadata = ticket.metadata or {}
+    category_values: List[str] = []
+    if "category" in metadata and metadata["category"]:
+        category_values.append(str(metadata["category"]))
+    categories_value = metadata.get("categories")
+    if isinstance(categories_value, str):
+        category_values.append(categories_value)
+    elif isinstance(categories_value, list):
+        category_values.extend(str(item) for item in categories_value if item)
+    elif isinstance(categories_value, dict):
+        category_values.extend(str(item) for item in categories_value.values() if item)
+    return {value.lower() for value in category_values if value}
+
 
 class TicketStore:
     """工单存储（支持 PostgreSQL + Redis 双写模式）"""
@@ -46,6 +153,15 @@ class TicketStore:
         self.index_key = f"{self.key_prefix}:index"
         self._memory_store = {} if redis_client is None else None
         self._pg_enabled = enable_postgres
+        # 二级索引（Redis 模式）
+        self.idx_prefix = f"{self.key_prefix}:idx"
+        self.idx_version_key = f"{self.idx_prefix}:version"
+        self.idx_lock_key = f"{self.idx_prefix}:rebuild_lock"
+        self.hydrate_batch_size = 200
+        self._indexes_ready = False
+        # SLA 截止时间索引：ticket_id -> 下一次 SLA 状态切换时间
+        self.sla_deadline_key = f"{self.idx_prefix}:sla_deadline"
+        self._sla_deadlines: Dict[str, float] = {}
 
     def enable_postgres(self):
         """启用 PostgreSQL 双写"""
@@ -100,21 +216,45 @@ class TicketStore:
         data = json.dumps(ticket.to_dict(), ensure_ascii=False)
         if self.redis:
             try:
-                pipe = self.redis.pipeline()
-                pipe.set(f"{self.key_prefix}:{ticket.ticket_id}", data)
-                pipe.sadd(self.index_key, ticket.ticket_id)
-                pipe.execute()
+                self._redis_write_ticket(ticket, data)
             except Exception as e:
                 # Redis 失败重试一次
                 try:
-                    pipe = self.redis.pipeline()
-                    pipe.set(f"{self.key_prefix}:{ticket.ticket_id}", data)
-                    pipe.sadd(self.index_key, ticket.ticket_id)
-                    pipe.execute()
+                    self._redis_write_ticket(ticket, data)
                 except Exception:
                     logger.warning(f"[TicketStore] Redis 缓存写入失败: {e}")
         else:
             self._memory_store[ticket.ticket_id] = data  # type: ignore
+            current = self._sla_deadlines.get(ticket.ticket_id)
+            deadline = self._next_sla_deadline(ticket, current)
+            if deadline is None:
+                self._sla_deadlines.pop(ticket.ticket_id, None)
+            else:
+                self._sla_deadlines[ticket.ticket_id] = deadline
+
+    def _redis_write_ticket(self, ticket: Ticket, data: Optional[str] = None):
+        """
+        写入工单数据并同步二级索引（单次 MULTI）
+
+        WATCH terms:{ticket_id} 后读取旧索引项，并发写入同一工单时重试，
+        避免按过期的旧索引项做差量更新。data 为空时只更新索引。
+        """
+        terms_key = self._idx_terms_key(ticket.ticket_id)
+        for _ in range(INDEX_WRITE_MAX_RETRIES):
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(terms_key)
+                    old_terms = {_decode(term) for term in pipe.smembers(terms_key)}
+                    pipe.multi()
+                    if data is not None:
+                        pipe.set(f"{self.key_prefix}:{ticket.ticket_id}", data)
+                        pipe.sadd(self.index_key, ticket.ticket_id)
+                    self._queue_index_update(pipe, ticket, old_terms)
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+        raise RuntimeError(f"工单索引写入冲突重试次数超限: {ticket.ticket_id}")
 
     def _pg_save_ticket(self, ticket: Ticket):
         """写入 PostgreSQL"""
@@ -179,6 +319,9 @@ class TicketStore:
         else:
             data = self._memory_store.get(ticket_id) if self._memory_store else None  # type: ignore
 
+        return self._deserialize_ticket(data)
+
+    def _deserialize_ticket(self, data: Any) -> Optional[Ticket]:
         if not data:
             return None
 
@@ -187,14 +330,272 @@ class TicketStore:
 
         return Ticket.from_dict(json.loads(data))
 
+    def _load_tickets(self, ticket_ids: Iterable[str]) -> List[Ticket]:
+        """批量加载工单（Redis 模式使用 MGET 分批读取）"""
+        ids = list(ticket_ids)
+        if not self.redis:
+            return [ticket for ticket in (self._load_ticket(tid) for tid in ids) if ticket]
+
+        tickets: List[Ticket] = []
+        for start in range(0, len(ids), self.hydrate_batch_size):
+            chunk = ids[start:start + self.hydrate_batch_size]
+            raw_items = self.redis.mget([f"{self.key_prefix}:{tid}" for tid in chunk])
+            for raw in raw_items:
+                ticket = self._deserialize_ticket(raw)
+                if ticket:
+                    tickets.append(ticket)
+        return tickets
+
     def _load_all_ids(self) -> List[str]:
         if self.redis:
             ids = self.redis.smembers(self.index_key)
-            return [id_.decode("utf-8") if isinstance(id_, bytes) else str(id_) for id_ in ids]
+            return [_decode(id_) for id_ in ids]
         if self._memory_store:
             return list(self._memory_store.keys())
         return []
 
+    # ------------------
+    # 二级索引
+    # ------------------
+    def _idx_key(self, field: str, value: Any) -> str:
+        return f"{self.idx_prefix}:{field}:{value}"
+
+    def _idx_terms_key(self, ticket_id: str) -> str:
+        return f"{self.idx_prefix}:terms:{ticket_id}"
+
+    def _idx_sorted_key(self, field: str) -> str:
+        return f"{self.idx_prefix}:{field}"
+
+    def _index_terms(self, ticket: Ticket) -> Set[str]:
+        """计算工单所属的集合索引 key"""
+        terms = {
+            self._idx_key("status", _enum_value(ticket.status)),
+            self._idx_key("priority", _enum_value(ticket.priority)),
+            self._idx_key("type", _enum_value(ticket.ticket_type)),
+            self._idx_key("assignee", ticket.assigned_agent_id or UNASSIGNED_INDEX_VALUE),
+        }
+        terms.update(self._idx_key("tag", tag) for tag in _ticket_tags(ticket))
+        terms.update(self._idx_key("category", cat) for cat in _ticket_categories(ticket))
+        return terms
+
+    def _queue_index_update(self, pipe: Any, ticket: Ticket, old_terms: Set[str]):
+        """
+        将索引增量更新加入 pipeline
+
+        集合索引按 terms:{ticket_id} 中记录的旧 key（old_terms，由调用方在 WATCH 下读取）
+        做差量 SREM/SADD，时间索引直接 ZADD 覆盖。
+        """
+        ticket_id = ticket.ticket_id
+        terms_key = self._idx_terms_key(ticket_id)
+        new_terms = self._index_terms(ticket)
+
+        for key in old_terms - new_terms:
+            pipe.srem(key, ticket_id)
+        for key in new_terms - old_terms:
+            pipe.sadd(key, ticket_id)
+        if old_terms != new_terms:
+            pipe.delete(terms_key)
+            pipe.sadd(terms_key, *new_terms)
+
+        pipe.zadd(self._idx_sorted_key("created_at"), {ticket_id: float(ticket.created_at or 0)})
+        pipe.zadd(self._idx_sorted_key("updated_at"), {ticket_id: float(ticket.updated_at or 0)})
+
+        # 当前截止时间在脚本内读取，与本次写入处于同一事务
+        now = time.time()
+        deadline, keep_due = self._sla_deadline_update(ticket, now)
+        pipe.eval(
+            SLA_DEADLINE_UPDATE_SCRIPT, 1, self.sla_deadline_key,
+            ticket_id, now, "" if deadline is None else deadline, "1" if keep_due else "0",
+        )
+
+    @staticmethod
+    def _sla_deadline_update(ticket: Ticket, now: float) -> tuple:
+        """
+        计算写入索引的 SLA 截止时间
+
+        Returns:
+            (新截止时间, 已到期条目是否保留原时间)。已到期但尚未被弹出的条目保留原时间，
+            由 pop_due_sla_alerts 按最新工单状态推送，避免工单恰好在切换点后被更新时漏掉这次预警。
+        """
+        deadline = next_sla_deadline(ticket, now)
+        return deadline, deadline is not None or bool(check_sla_alerts(ticket, now))
+
+    @classmethod
+    def _next_sla_deadline(cls, ticket: Ticket, current: Optional[float]) -> Optional[float]:
+        """计算内存模式下写入的 SLA 截止时间（规则同 SLA_DEADLINE_UPDATE_SCRIPT）"""
+        now = time.time()
+        deadline, keep_due = cls._sla_deadline_update(ticket, now)
+        if current is not None and float(current) <= now and keep_due:
+            return float(current)
+        return deadline
+
+    def rebuild_indexes(self) -> int:
+        """
+        重建二级索引（按工单逐个差量写入，可重复执行）
+
+        Returns:
+            重建的工单数量
+        """
+        if not self.redis:
+            return 0
+
+        ids = self._load_all_ids()
+        rebuilt = 0
+        for start in range(0, len(ids), self.hydrate_batch_size):
+            tickets = self._load_tickets(ids[start:start + self.hydrate_batch_size])
+            for ticket in tickets:
+                self._redis_write_ticket(ticket)
+                rebuilt += 1
+
+        self.redis.set(self.idx_version_key, TICKET_INDEX_VERSION)
+        logger.info(f"[TicketStore] 二级索引重建完成: {rebuilt} 个工单")
+        return rebuilt
+
+    def _indexes_available(self) -> bool:
+        """
+        检查索引是否可用，首次调用时按需重建（多进程通过 NX 锁互斥）
+
+        索引不可用时调用方降级为全量批量加载。
+        """
+        if not self.redis:
+            return False
+        if self._indexes_ready:
+            return True
+
+        try:
+            version = self.redis.get(self.idx_version_key)
+            if version is not None and _decode(version) == TICKET_INDEX_VERSION:
+                self._indexes_ready = True
+                return True
+
+            if not self.redis.set(self.idx_lock_key, "1", nx=True, ex=300):
+                return False
+            try:
+                self.rebuild_indexes()
+            finally:
+                self.redis.delete(self.idx_lock_key)
+            self._indexes_ready = True
+        except Exception as e:
+            logger.warning(f"[TicketStore] 二级索引不可用，降级为全量扫描: {e}")
+        return self._indexes_ready
+
+    def _index_groups(
+        self,
+        *,
+        statuses: Optional[Iterable[Any]] = None,
+        priorities: Optional[Iterable[Any]] = None,
+        ticket_types: Optional[Iterable[Any]] = None,
+        assignees: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+    ) -> List[List[str]]:
+        """
+        将筛选条件转换为索引组：组内取并集（OR），组间取交集（AND）
+        """
+        groups: List[List[str]] = []
+        for field, values in (
+            ("status", statuses),
+            ("priority", priorities),
+            ("type", ticket_types),
+            ("assignee", assignees),
+            ("tag", tags),
+            ("category", categories),
+        ):
+            if values is None:
+                continue
+            keys = sorted({self._idx_key(field, _enum_value(value)) for value in values})
+            groups.append(keys)
+        return groups
+
+    def _query_index(
+        self,
+        groups: List[List[str]],
+        *,
+        score_field: str = "updated_at",
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        desc: bool = True,
+    ) -> tuple[int, List[str]]:
+        """
+        在 Redis 端求交集并按时间索引分页
+
+        一次 MULTI 完成 SUNIONSTORE/ZINTERSTORE/ZCOUNT/ZRANGEBYSCORE，
+        只返回总数和当前页 ID。
+        """
+        if any(not group for group in groups):
+            return 0, []
+
+        score_key = self._idx_sorted_key(score_field)
+        tmp_prefix = f"{self.idx_prefix}:tmp:{uuid.uuid4().hex}"
+        temp_keys: List[str] = []
+        pipe = self.redis.pipeline()
+
+        sources = [score_key]
+        for i, group in enumerate(groups):
+            if len(group) == 1:
+                sources.append(group[0])
+                continue
+            union_key = f"{tmp_prefix}:{i}"
+            pipe.sunionstore(union_key, group)
+            pipe.expire(union_key, QUERY_TEMP_KEY_TTL)
+            temp_keys.append(union_key)
+            sources.append(union_key)
+
+        result_key = score_key
+        if len(sources) > 1:
+            result_key = f"{tmp_prefix}:result"
+            # 集合成员分值按 1 计入，权重 0 保留时间索引原始分值
+            weights = {key: 0 for key in sources[1:]}
+            weights[score_key] = 1
+            pipe.zinterstore(result_key, weights, aggregate="SUM")
+            pipe.expire(result_key, QUERY_TEMP_KEY_TTL)
+            temp_keys.append(result_key)
+
+        low = "-inf" if min_score is None else min_score
+        high = "+inf" if max_score is None else max_score
+        page_args: Dict[str, Any] = {}
+        if limit is not None:
+            page_args = {"start": offset, "num": limit}
+
+        count_pos = len(pipe)
+        pipe.zcount(result_key, low, high)
+        if desc:
+            pipe.zrevrangebyscore(result_key, high, low, **page_args)
+        else:
+            pipe.zrangebyscore(result_key, low, high, **page_args)
+        if temp_keys:
+            pipe.delete(*temp_keys)
+
+        results = pipe.execute()
+        total = int(results[count_pos] or 0)
+        ids = [_decode(member) for member in results[count_pos + 1]]
+        return total, ids
+
+    def _candidate_ids(
+        self,
+        groups: List[List[str]],
+        *,
+        score_field: str = "updated_at",
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+    ) -> List[str]:
+        """按索引求候选工单 ID；索引不可用时返回全部 ID"""
+        if not self._indexes_available():
+            return self._load_all_ids()
+        try:
+            _, ids = self._query_index(
+                groups,
+                score_field=score_field,
+                min_score=min_score,
+                max_score=max_score,
+            )
+            return ids
+        except Exception as e:
+            logger.warning(f"[TicketStore] 索引查询失败，降级为全量扫描: {e}")
+            return self._load_all_ids()
+
     def _handle_sla_pause_transition(
         self,
         ticket: Ticket,
@@ -292,12 +693,19 @@ class TicketStore:
         limit: int = 50,
         offset: int = 0,
     ) -> tuple[int, List[Ticket]]:
-        ids = self._load_all_ids()
-        tickets: List[Ticket] = []
-        for ticket_id in ids:
-            ticket = self._load_ticket(ticket_id)
-            if ticket:
-                tickets.append(ticket)
+        if self._indexes_available():
+            groups = self._index_groups(
+                statuses=[status] if status else None,
+                priorities=[priority] if priority else None,
+                assignees=[assigned_agent_id] if assigned_agent_id else None,
+            )
+            try:
+                total, page_ids = self._query_index(groups, offset=offset, limit=limit)
+                return total, self._load_tickets(page_ids)
+            except Exception as e:
+                logger.warning(f"[TicketStore] 索引查询失败，降级为全量扫描: {e}")
+
+        tickets = self._load_tickets(self._load_all_ids())
 
         # 过滤
         if status:
@@ -323,11 +731,15 @@ class TicketStore:
         limit: int = 50,
         offset: int = 0
     ) -> tuple[int, List[Ticket]]:
-        ids = self._load_all_ids()
+        ids = self._candidate_ids(
+            self._index_groups(statuses=[TicketStatus.ARCHIVED]),
+            score_field="created_at",
+            min_score=start_ts or None,
+            max_score=end_ts or None,
+        )
         archived: List[Ticket] = []
-        for ticket_id in ids:
-            ticket = self._load_ticket(ticket_id)
-            if not ticket or ticket.status != TicketStatus.ARCHIVED:
+        for ticket in self._load_tickets(ids):
+            if ticket.status != TicketStatus.ARCHIVED:
                 continue
             if email and (not ticket.customer or (ticket.customer.email or "").lower() != email.lower()):
                 continue
@@ -587,10 +999,8 @@ class TicketStore:
         """自动归档关闭超过阈值的工单"""
         now = time.time()
         archived = []
-        for ticket_id in self._load_all_ids():
-            ticket = self._load_ticket(ticket_id)
-            if not ticket:
-                continue
+        ids = self._candidate_ids(self._index_groups(statuses=[TicketStatus.CLOSED]))
+        for ticket in self._load_tickets(ids):
             if ticket.status != TicketStatus.CLOSED:
                 continue
             if not ticket.closed_at:
@@ -598,7 +1008,7 @@ class TicketStore:
             if (now - ticket.closed_at) < older_than_seconds:
                 continue
             ticket = self.archive_ticket(
-                ticket_id,
+                ticket.ticket_id,
                 agent_id=agent_id,
                 reason=f"auto_archive_{older_than_seconds//86400}d"
             )
@@ -626,11 +1036,7 @@ class TicketStore:
         if ticket:
             return 1, [ticket]
 
-        all_tickets: List[Ticket] = []
-        for ticket_id in self._load_all_ids():
-            loaded = self._load_ticket(ticket_id)
-            if loaded:
-                all_tickets.append(loaded)
+        all_tickets = self._load_tickets(self._load_all_ids())
 
         # 精确匹配：订单号
         if normalized_upper.startswith("ORD"):
@@ -699,12 +1105,66 @@ class TicketStore:
         tags_set = {tag.lower() for tag in (tags or []) if tag}
         categories_set = {cat.lower() for cat in (categories or []) if cat}
 
-        filtered: List[Ticket] = []
-        for ticket_id in self._load_all_ids():
-            ticket = self._load_ticket(ticket_id)
-            if not ticket:
-                continue
+        assignee_filter: Optional[Iterable[str]] = None
+        if assigned == "unassigned":
+            assignee_filter = [UNASSIGNED_INDEX_VALUE]
+        elif assigned == "mine":
+            if not current_agent_id:
+                return 0, []
+            assignee_filter = [current_agent_id]
+        elif assigned:
+            assignee_filter = [assigned]
+
+        candidate_ids: Optional[List[str]] = None
+        if self._indexes_available():
+            groups = self._index_groups(
+                statuses=statuses_set,
+                priorities=priorities_set,
+                ticket_types=types_set,
+                assignees=assignee_filter,
+                tags=tags_set or None,
+                categories=categories_set or None,
+            )
+            if assigned_ids_set:
+                groups.extend(self._index_groups(assignees=assigned_ids_set))
+
+            # 时间排序且无关键词时，直接在 Redis 端分页，仅加载当前页
+            score_field = sort_by if sort_by in INDEXED_SORT_FIELDS else "updated_at"
+            ranges = {
+                "created_at": (created_start, created_end),
+                "updated_at": (updated_start, updated_end),
+            }
+            min_score, max_score = ranges[score_field]
+            other_field = "created_at" if score_field == "updated_at" else "updated_at"
+            other_range_free = ranges[other_field] == (None, None)
+            try:
+                if not keyword_lower and sort_by in INDEXED_SORT_FIELDS and other_range_free:
+                    total, page_ids = self._query_index(
+                        groups,
+                        score_field=score_field,
+                        min_score=min_score,
+                        max_score=max_score,
+                        offset=offset,
+                        limit=limit,
+                        desc=sort_desc,
+                    )
+                    return total, self._load_tickets(page_ids)
+
+                _, candidate_ids = self._query_index(
+                    groups,
+                    score_field=score_field,
+                    min_score=min_score,
+                    max_score=max_score,
+                )
+            except Exception as e:
+                logger.warning(f"[TicketStore] 索引查询失败，降级为全量扫描: {e}")
+                candidate_ids = None
 
+        if candidate_ids is None:
+            candidate_ids = self._load_all_ids()
+
+        filtered: List[Ticket] = []
+        for ticket in self._load_tickets(candidate_ids):
             if statuses_set and ticket.status not in statuses_set:
                 continue
             if priorities_set and ticket.priority not in priorities_set:
@@ -736,35 +1196,11 @@ class TicketStore:
             if updated_end is not None and ticket.updated_at > updated_end:
                 continue
 
-            if tags_set:
-                metadata_tags = (ticket.metadata or {}).get("tags", [])
-                if isinstance(metadata_tags, str):
-                    metadata_values = [metadata_tags]
-                elif isinstance(metadata_tags, dict):
-                    metadata_values = list(metadata_tags.values())
-                elif isinstance(metadata_tags, list):
-                    metadata_values = metadata_tags
-                else:
-                    metadata_values = []
-                normalized_tags = {str(tag).lower() for tag in metadata_values if tag}
-                if not normalized_tags.intersection(tags_set):
-                    continue
+            if tags_set and not _ticket_tags(ticket).intersection(tags_set):
+                continue
 
-            if categories_set:
-                metadata = ticket.metadata or {}
-                category_values: List[str] = []
-                if "category" in metadata and metadata["category"]:
-                    category_values.append(str(metadata["category"]))
-                categories_value = metadata.get("categories")
-                if isinstance(categories_value, str):
-                    category_values.append(categories_value)
-                elif isinstance(categories_value, list):
-                    category_values.extend(str(item) for item in categories_value if item)
-                elif isinstance(categories_value, dict):
-                    category_values.extend(str(item) for item in categories_value.values() if item)
-                normalized_categories = {value.lower() for value in category_values if value}
-                if not normalized_categories.intersection(categories_set):
-                    continue
+            if categories_set and not _ticket_categories(ticket).intersection(categories_set):
+                continue
 
             if keyword_lower:
                 searchable_fields = self._ticket_searchable_strings(ticket)
@@ -812,7 +1248,6 @@ class TicketStore:
 
     def get_sla_summary(self) -> Dict[str, Any]:
         """计算工单 SLA 概览"""
-        ids = self._load_all_ids()
         total = 0
         first_response_sum = 0.0
         first_response_count = 0
@@ -821,10 +1256,7 @@ class TicketStore:
         open_tickets = 0
         pending_tickets = 0
 
-        for ticket_id in ids:
-            ticket = self._load_ticket(ticket_id)
-            if not ticket:
-                continue
+        for ticket in self._load_tickets(self._load_all_ids()):
             total += 1
             if ticket.first_response_at:
                 first_response_sum += ticket.first_response_at - ticket.created_at
@@ -881,11 +1313,8 @@ class TicketStore:
         now = time.time()
         all_alerts: List[Dict[str, Any]] = []
 
-        for ticket_id in self._load_all_ids():
-            ticket = self._load_ticket(ticket_id)
-            if not ticket:
-                continue
-
+        ids = self._candidate_ids(self._index_groups(statuses=OPEN_TICKET_STATUSES))
+        for ticket in self._load_tickets(ids):
             # 只检查未完成的工单
             if ticket.status in {TicketStatus.CLOSED, TicketStatus.ARCHIVED}:
                 continue
@@ -918,6 +1347,66 @@ class TicketStore:
             "summary": summary
         }
 
+    def pop_due_sla_alerts(self, *, limit: int = 500) -> Dict[str, Any]:
+        """
+        弹出已到 SLA 状态切换点的工单并生成预警
+
+        只读取 SLA 截止时间索引中到期的工单，开销与到期数量成正比而非工单总数。
+        到期条目由 SLA_CLAIM_SCRIPT 原子认领（截止时间推迟为租约到期时间），多进程下同一条目只处理一次；
+        处理后由 SLA_RESCHEDULE_SCRIPT 按下一个切换点重新入索引，不覆盖期间工单写入的更早截止时间。
+        索引不可用时降级为 detect_sla_alerts 全量扫描（返回 full_scan=True，调用方应按原间隔轮询）。
+
+        内存模式下直接修改 _sla_deadlines，需与工单写入在同一线程（事件循环）调用。
+
+        Args:
+            limit: 单次最多处理的到期工单数
+
+        Returns:
+            {
+                "alerts": [...],           # 到期工单的当前预警
+                "next_due": float | None,  # 索引中最早的截止时间
+                "full_scan": bool          # 是否为降级的全量扫描
+            }
+        """
+        now = time.time()
+
+        if not self.redis:
+            claimed = [tid for tid, deadline in self._sla_deadlines.items() if deadline <= now][:limit]
+            for ticket_id in claimed:
+                del self._sla_deadlines[ticket_id]
+        elif self._indexes_available():
+            lease = repr(now + SLA_CLAIM_LEASE_SECONDS)
+            claimed = [_decode(tid) for tid in self.redis.eval(
+                SLA_CLAIM_SCRIPT, 1, self.sla_deadline_key, repr(now), lease, limit
+            )]
+        else:
+            result = self.detect_sla_alerts(status_filter=["warning", "urgent", "violated"])
+            return {"alerts": result["alerts"], "next_due": None, "full_scan": True}
+
+        alerts: List[Dict[str, Any]] = []
+        rescheduled: Dict[str, float] = {}
+        for ticket in self._load_tickets(claimed):
+            if ticket.status in {TicketStatus.CLOSED, TicketStatus.ARCHIVED}:
+                continue
+            alerts.extend(alert.to_dict() for alert in check_sla_alerts(ticket, now))
+            deadline = next_sla_deadline(ticket, now)
+            if deadline is not None:
+                rescheduled[ticket.ticket_id] = deadline
+
+        if self.redis:
+            if claimed:
+                args: List[Any] = [lease]
+                for ticket_id in claimed:
+                    args.extend([ticket_id, rescheduled.get(ticket_id, "")])
+                self.redis.eval(SLA_RESCHEDULE_SCRIPT, 1, self.sla_deadline_key, *args)
+            head = self.redis.zrange(self.sla_deadline_key, 0, 0, withscores=True)
+            next_due = float(head[0][1]) if head else None
+        else:
+            self._sla_deadlines.update(rescheduled)
+            next_due = min(self._sla_deadlines.values()) if self._sla_deadlines else None
+
+        return {"alerts": alerts, "next_due": next_due, "full_scan": False}
+
     def batch_assign(
         self,
         ticket_ids: List[str],
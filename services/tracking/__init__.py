@@ -8,6 +8,7 @@
 - 轨迹查询：获取完整物流轨迹事件
 - Webhook 解析：解析 17track 推送的状态变更数据
 - 运单→订单映射：通过运单号查找关联订单
+- 请求合并：并发的单运单查询/注册合并为 17track 批量请求
 
 使用示例：
     from services.tracking import Track17Client, get_track17_client
@@ -43,6 +44,7 @@ from .webhook import (
 )
 
 # Step 1.4: 服务层
+from .batcher import MicroBatcher
 from .service import TrackingService, get_tracking_service
 
 __all__ = [
@@ -65,6 +67,7 @@ __all__ = [
     "is_exception_event",
     "get_exception_type",
     # 服务层
+    "MicroBatcher",
     "TrackingService",
     "get_tracking_service",
 ]
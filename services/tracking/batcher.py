@@ -0,0 +1,109 @@
+"""
+17track 请求合并（micro-batching）
+
+在一个很短的时间窗口内收集并发的单运单查询/注册，合并成一次批量请求，
+按 key（运单号 + 承运商）把结果分发回各调用方，节省 17track 配额并降低工作台订单页的整体延迟。
+
+说明：
+- 同一窗口内相同 key 只请求一次，调用方共享结果；同一运单号指定不同承运商时分别请求
+- 攒满 max_size 个立即发送，否则等待 window 秒后发送
+- 批量请求整体失败时，窗口内所有调用方收到同一个异常
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# flush 函数：接收一批请求项，返回 key -> 结果（结果为 Exception 时抛给对应调用方）
+FlushFunc = Callable[[List[Dict[str, Any]]], Awaitable[Dict[Hashable, Any]]]
+
+
+class MicroBatcher:
+    """按 key 去重、按时间窗口合并的请求批处理器"""
+
+    def __init__(self, name: str, flush: FlushFunc, max_size: int, window: float):
+        """
+        Args:
+            name: 名称（用于日志）
+            flush: 批量执行函数
+            max_size: 单批最大数量
+            window: 合并窗口（秒）
+        """
+        self.name = name
+        self._flush = flush
+        self.max_size = max(max_size, 1)
+        self.window = max(window, 0.0)
+        self._pending: Dict[Hashable, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: Hashable, item: Dict[str, Any]) -> Any:
+        """
+        提交一个请求项并等待其结果
+
+        Args:
+            key: 去重 key（通常为 (运单号, 承运商)）
+            item: 请求项
+
+        Returns:
+            flush 返回的该 key 对应结果，缺失时为 None
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending[1])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = (item, future)
+
+        if len(self._pending) >= self.max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        """取出当前窗口的全部请求项并发起一次批量请求"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._flush([item for item, _ in batch.values()])
+        except Exception as e:
+            logger.warning(f"[{self.name}] 批量请求失败 ({len(batch)} 个): {e}")
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, (_, future) in batch.items():
+            if future.done():
+                continue
+            result = results.get(key)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+        }
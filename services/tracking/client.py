@@ -50,6 +50,9 @@ class Track17Client:
     # 默认 API 基础 URL (V2.4)
     DEFAULT_BASE_URL = "https://api.17track.net/track/v2.4"
 
+    # register / gettrackinfo 单次请求最多运单数
+    BATCH_LIMIT = 40
+
     # 承运商代码映射（常用）
     # 来源: https://res.17track.net/asset/carrier/info/apicarrier.all.csv
     CARRIER_CODES = {
@@ -488,26 +491,34 @@ class Track17Client:
                 - number: 运单号（必填）
                 - carrier: 承运商代码（可选）
                 - order: 订单号（可选）
+                - tag: 自定义标签（可选）
+                - destination_postal_code: 目的地邮编（可选）
 
         Returns:
-            注册结果
+            注册结果: {accepted: [...], rejected: [...]}（超过 BATCH_LIMIT 自动分批并合并）
         """
         # 标准化承运商代码
         data = []
         for item in trackings:
             tracking_data = {"number": item["number"]}
-            if "carrier" in item:
+            if item.get("carrier"):
                 carrier_id = self._normalize_carrier_code(item["carrier"])
                 if carrier_id:
                     tracking_data["carrier"] = carrier_id
-            if "order" in item:
-                tracking_data["order"] = item["order"]
+            for field in ("order", "tag", "destination_postal_code"):
+                if item.get(field):
+                    tracking_data[field] = item[field]
             data.append(tracking_data)
 
         logger.info(f"批量注册运单到 17track: {len(data)} 个")
 
-        result = await self._request("register", data)
-        return result.get("data", {})
+        merged: Dict[str, Any] = {"accepted": [], "rejected": []}
+        for start in range(0, len(data), self.BATCH_LIMIT):
+            result = await self._request("register", data[start:start + self.BATCH_LIMIT])
+            response_data = result.get("data", {})
+            merged["accepted"].extend(response_data.get("accepted", []))
+            merged["rejected"].extend(response_data.get("rejected", []))
+        return merged
 
     async def get_tracking_info(
         self,
@@ -563,7 +574,10 @@ class Track17Client:
                 "message": "未找到物流信息",
             }
 
-        tracking_info = accepted[0]
+        return self._build_tracking_result(tracking_number, accepted[0])
+
+    def _build_tracking_result(self, tracking_number: str, tracking_info: Dict[str, Any]) -> Dict[str, Any]:
+        """将 gettrackinfo 返回的 accepted 项解析为统一结构"""
         track_info = tracking_info.get("track_info", {})
 
         # V2.4 API: 状态在 latest_status
@@ -589,6 +603,68 @@ class Track17Client:
             "last_event": last_event,
         }
 
+    async def get_tracking_info_batch(
+        self,
+        trackings: List[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量查询物流轨迹（每次请求最多 BATCH_LIMIT 个运单，超出自动分批）
+
+        Args:
+            trackings: 运单列表，每项包含：
+                - number: 运单号（必填）
+                - carrier: 承运商代码或名称（可选）
+
+        Returns:
+            运单号 -> 查询结果（结构同 get_tracking_info；被拒绝的运单
+            success=False 并附带 error_code / message）
+
+        Raises:
+            Track17Error: API 调用失败
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(trackings), self.BATCH_LIMIT):
+            chunk = trackings[start:start + self.BATCH_LIMIT]
+            data = []
+            for item in chunk:
+                tracking_data = {"number": item["number"]}
+                if item.get("carrier"):
+                    carrier_id = self._normalize_carrier_code(item["carrier"])
+                    if carrier_id:
+                        tracking_data["carrier"] = carrier_id
+                data.append(tracking_data)
+
+            logger.info(f"批量查询物流轨迹: {len(data)} 个")
+
+            result = await self._request("gettrackinfo", data)
+            response_data = result.get("data", {})
+
+            for tracking_info in response_data.get("accepted", []):
+                number = tracking_info.get("number")
+                if number:
+                    results[number] = self._build_tracking_result(number, tracking_info)
+
+            for reject_info in response_data.get("rejected", []):
+                number = reject_info.get("number")
+                if number:
+                    error = reject_info.get("error", {})
+                    results[number] = {
+                        "success": False,
+                        "tracking_number": number,
+                        "error_code": error.get("code"),
+                        "message": f"查询失败: {error.get('message', 'unknown')}",
+                    }
+
+            for item in chunk:
+                results.setdefault(item["number"], {
+                    "success": False,
+                    "tracking_number": item["number"],
+                    "message": "未找到物流信息",
+                })
+
+        return results
+
     def _parse_events(self, tracking_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         解析物流事件列表 (旧版 V2.2 格式，保留兼容)
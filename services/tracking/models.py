@@ -234,7 +234,7 @@ class TrackingEvent(BaseModel):
             status=event.get("c"),
             location=event.get("d"),
             description=event.get("c"),
-            status_code=event.get("b"),
+            status_code=str(event["b"]) if event.get("b") is not None else None,
         )
 
     def with_translation(self, status_zh: str = None, description_zh: str = None) -> "TrackingEvent":
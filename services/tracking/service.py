@@ -7,7 +7,7 @@
 - 注册订单物流追踪
 - 查询物流轨迹事件
 - 运单号与订单号映射查询
-- 缓存管理
+- 缓存管理（17track 推送直接写入缓存，见 apply_push_event）
 
 使用示例：
     from services.tracking import get_tracking_service
@@ -29,23 +29,32 @@ import os
 import json
 import logging
 import asyncio
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
+from .batcher import MicroBatcher
 from .client import Track17Client, Track17Error, get_track17_client
 from .models import (
     TrackingStatus,
     TrackingEvent,
     TrackingInfo,
     CarrierInfo,
+    WebhookEvent,
 )
 
 logger = logging.getLogger(__name__)
 
 # 缓存配置
-CACHE_TTL_TRACKING = int(os.getenv("SHOPIFY_CACHE_TRACKING", 21600))  # 6 小时
+CACHE_TTL_TRACKING = int(os.getenv("SHOPIFY_CACHE_TRACKING", 172800))  # 48 小时，状态变化由推送写入
 CACHE_TTL_MAPPING = 86400 * 7  # 7 天
+# 17track 推送写入的运单状态（每次状态变化都会推送，因此可以长期保留）
+CACHE_TTL_PUSHED_STATUS = int(os.getenv("TRACKING_PUSHED_STATUS_TTL", 86400 * 30))
 REDIS_IO_TIMEOUT_SECONDS = float(os.getenv("TRACKING_REDIS_IO_TIMEOUT", "0.5"))
+# 并发的单运单查询/注册在该窗口内合并为一次 17track 批量请求
+BATCH_WINDOW_SECONDS = float(os.getenv("TRACKING_BATCH_WINDOW_MS", "25")) / 1000
+# 订单级物流状态补全：单个订单的并发查询数、整体截止时间
+ENRICH_CONCURRENCY = int(os.getenv("TRACKING_ENRICH_CONCURRENCY", "8"))
+ENRICH_DEADLINE_SECONDS = float(os.getenv("TRACKING_ENRICH_DEADLINE_MS", "2500")) / 1000
 
 
 class TrackingService:
@@ -75,18 +84,120 @@ class TrackingService:
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._mapping: Dict[str, str] = {}  # tracking_number -> order_id
         self._register_attempts: Dict[str, float] = {}  # tracking_number -> timestamp
+        self._redis_unavailable_logged = False
+        # 超过截止时间仍在后台完成的状态查询（结果写入缓存）
+        self._enrich_tasks: set = set()
+
+        # 17track 请求合并
+        self._query_batcher = MicroBatcher(
+            "17track-gettrackinfo", self._flush_queries, Track17Client.BATCH_LIMIT, BATCH_WINDOW_SECONDS
+        )
+        self._register_batcher = MicroBatcher(
+            "17track-register", self._flush_registrations, Track17Client.BATCH_LIMIT, BATCH_WINDOW_SECONDS
+        )
+
+    # ==================== 17track 请求合并 ====================
+
+    @staticmethod
+    def _batch_key(tracking_number: str, carrier: Optional[str]) -> Tuple[str, Optional[str]]:
+        """合并去重 key：同一运单号指定不同承运商时分别请求"""
+        return tracking_number, carrier or None
+
+    @staticmethod
+    def _split_by_number(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        拆分请求项，保证每个请求内运单号不重复
+
+        17track 只按运单号返回结果，同一运单号不同承运商的请求项放进后续请求。
+        """
+        rounds: List[List[Dict[str, Any]]] = []
+        seen: List[set] = []
+        for item in items:
+            for batch, numbers in zip(rounds, seen):
+                if item["number"] not in numbers:
+                    break
+            else:
+                batch, numbers = [], set()
+                rounds.append(batch)
+                seen.append(numbers)
+            batch.append(item)
+            numbers.add(item["number"])
+        return rounds
+
+    async def _flush_queries(self, items: List[Dict[str, Any]]) -> Dict[Any, Any]:
+        """批量 gettrackinfo，被拒绝的运单转为 Track17Error（与单个查询行为一致）"""
+        results: Dict[Any, Any] = {}
+        for batch in self._split_by_number(items):
+            by_number = await self.client.get_tracking_info_batch(batch)
+            for item in batch:
+                result = by_number.get(item["number"])
+                if result is not None and not result.get("success") and result.get("error_code") is not None:
+                    result = Track17Error(-2, result.get("message", "查询失败"))
+                results[self._batch_key(item["number"], item.get("carrier"))] = result
+        return results
+
+    async def _flush_registrations(self, items: List[Dict[str, Any]]) -> Dict[Any, Any]:
+        """批量 register，按运单号拆分为与 client.register_tracking 相同的结果结构"""
+        results: Dict[Any, Any] = {}
+        for batch in self._split_by_number(items):
+            data = await self.client.register_batch(batch)
+            for item in batch:
+                number = item["number"]
+                accepted = [a for a in data.get("accepted", []) if a.get("number") == number]
+                rejected = [r for r in data.get("rejected", []) if r.get("number") == number]
+                if rejected:
+                    logger.warning(
+                        f"运单注册被拒绝: {number}, "
+                        f"原因: {rejected[0].get('error', {}).get('message', 'unknown')}"
+                    )
+                results[self._batch_key(number, item.get("carrier"))] = {
+                    "success": len(accepted) > 0,
+                    "accepted": accepted,
+                    "rejected": rejected,
+                    "tracking_number": number,
+                }
+        return results
+
+    async def _query_tracking(self, tracking_number: str, carrier: Optional[str] = None) -> Dict[str, Any]:
+        """查询单个运单（与同一窗口内的其他查询合并为一次请求）"""
+        return await self._query_batcher.submit(
+            self._batch_key(tracking_number, carrier), {"number": tracking_number, "carrier": carrier}
+        )
+
+    async def _register_tracking(
+        self,
+        tracking_number: str,
+        carrier: Optional[str] = None,
+        order: Optional[str] = None,
+        tag: Optional[str] = None,
+        destination_postal_code: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """注册单个运单（与同一窗口内的其他注册合并为一次请求）"""
+        logger.info(f"注册运单到 17track: {tracking_number}, carrier={carrier}, postal_code={destination_postal_code}")
+        return await self._register_batcher.submit(self._batch_key(tracking_number, carrier), {
+            "number": tracking_number,
+            "carrier": carrier,
+            "order": order,
+            "tag": tag,
+            "destination_postal_code": destination_postal_code,
+        })
 
     def _get_redis(self):
-        """获取 Redis 客户端"""
+        """
+        获取共享的 Redis 客户端（redis.asyncio）
+
+        17track 推送由通知服务写入，客服/工作台读取，缓存必须跨进程共享。
+        Redis 不可用时记录错误，读写降级到进程内缓存（仅本进程可见）。
+        """
         if self.redis:
             return self.redis
 
-        # 尝试从全局获取
-        try:
-            from infrastructure.database.connection import get_redis_client
-            return get_redis_client()
-        except Exception:
-            return None
+        from infrastructure.bootstrap.redis import get_async_redis_client
+        redis = get_async_redis_client()
+        if redis is None and not self._redis_unavailable_logged:
+            logger.error("Redis 不可用：物流缓存降级为进程内存，17track 推送状态不会跨进程共享")
+            self._redis_unavailable_logged = True
+        return redis
 
     async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
         """从缓存获取数据"""
@@ -100,7 +211,7 @@ class TrackingService:
                 if data:
                     return json.loads(data)
             except Exception as e:
-                logger.debug(f"Redis 缓存读取失败: {e}")
+                logger.warning(f"Redis 缓存读取失败: {e}")
 
         # 降级到内存缓存
         cached = self._cache.get(key)
@@ -131,7 +242,7 @@ class TrackingService:
                 )
                 return
             except Exception as e:
-                logger.debug(f"Redis 缓存写入失败: {e}")
+                logger.warning(f"Redis 缓存写入失败: {e}")
 
         # 降级到内存缓存
         self._cache[key] = {
@@ -151,7 +262,7 @@ class TrackingService:
                 if order_id:
                     return order_id.decode() if isinstance(order_id, bytes) else order_id
             except Exception as e:
-                logger.debug(f"Redis 映射读取失败: {e}")
+                logger.warning(f"Redis 映射读取失败: {e}")
 
         return self._mapping.get(tracking_number)
 
@@ -170,7 +281,7 @@ class TrackingService:
                 )
                 return
             except Exception as e:
-                logger.debug(f"Redis 映射写入失败: {e}")
+                logger.warning(f"Redis 映射写入失败: {e}")
 
         self._mapping[tracking_number] = order_id
 
@@ -204,11 +315,11 @@ class TrackingService:
             # 构建标签（用于 Webhook 回调时识别订单）
             tag = f"order_{order_id}"
 
-            # 调用 17track API 注册
-            result = await self.client.register_tracking(
-                tracking_number=tracking_number,
-                carrier_code=carrier,
-                order_id=order_number or order_id,
+            # 调用 17track API 注册（合并批量请求）
+            result = await self._register_tracking(
+                tracking_number,
+                carrier=carrier,
+                order=order_number or order_id,
                 tag=tag,
                 destination_postal_code=destination_postal_code,
             )
@@ -311,86 +422,18 @@ class TrackingService:
                 return TrackingInfo(**cached)
 
         try:
-            # 调用 API 查询
-            result = await self.client.get_tracking_info(
-                tracking_number=tracking_number,
-                carrier_code=carrier,
-            )
+            # 调用 API 查询（合并批量请求）
+            result = await self._query_tracking(tracking_number, carrier)
 
-            if not result.get("success"):
+            if not result or not result.get("success"):
                 return None
 
             # 获取订单 ID
             order_id = await self._mapping_get(tracking_number)
-
-            # V2.4 API: 状态是字符串格式 (如 "InTransit", "Delivered")
-            status_str = result.get("status")
-            status = TrackingStatus.from_string(status_str) if status_str else None
-
-            # 承运商信息
-            carrier_data = result.get("carrier")
-            carrier_info = None
-            if carrier_data:
-                if isinstance(carrier_data, dict):
-                    carrier_info = CarrierInfo(
-                        code=carrier_data.get("key"),
-                        name=carrier_data.get("name"),
-                        url=carrier_data.get("url"),
-                    )
-                elif isinstance(carrier_data, int):
-                    # 只有承运商代码
-                    carrier_info = CarrierInfo(code=carrier_data)
-
-            # 事件列表 (已由 client._parse_events_v2 解析)
-            events: List[TrackingEvent] = []
-            raw_events = result.get("events") or []
-            for raw in raw_events:
-                event = TrackingEvent(
-                    timestamp_str=raw.get("timestamp"),
-                    status=raw.get("status"),
-                    location=raw.get("location"),
-                    description=raw.get("status"),
-                    status_code=raw.get("status_code"),
-                )
-
-                if event.timestamp_str:
-                    try:
-                        event.timestamp = datetime.fromisoformat(event.timestamp_str.replace(" ", "T"))
-                    except ValueError:
-                        pass
-                events.append(event)
-
-            # 最新事件 (V2.4 格式)
-            last_event_data = result.get("last_event", {})
-            last_event = None
-            if last_event_data:
-                last_event = TrackingEvent(
-                    timestamp_str=last_event_data.get("time_iso"),
-                    status=last_event_data.get("description"),
-                    location=last_event_data.get("location"),
-                    description=last_event_data.get("description"),
-                )
-                if last_event.timestamp_str:
-                    try:
-                        last_event.timestamp = datetime.fromisoformat(last_event.timestamp_str)
-                    except ValueError:
-                        pass
-
-            info = TrackingInfo(
-                tracking_number=tracking_number,
-                carrier=carrier_info,
-                status=status,
-                sub_status=result.get("sub_status"),
-                status_zh=status.zh if status else None,
-                events=events,
-                last_event=last_event,
-                order_id=order_id,
-                raw_data=result,
-            )
+            info = self._build_info(tracking_number, result, order_id)
 
             # 写入缓存
-            cache_data = info.model_dump()
-            await self._cache_set(cache_key, cache_data)
+            await self._cache_set(cache_key, self._cacheable_info(info))
 
             return info
 
@@ -398,6 +441,217 @@ class TrackingService:
             logger.error(f"查询物流信息失败: {tracking_number}, 错误: {e}")
             return None
 
+    async def get_tracking_info_batch(
+        self,
+        trackings: List[Dict[str, Any]],
+        use_cache: bool = True,
+    ) -> Dict[str, Optional[TrackingInfo]]:
+        """
+        批量获取物流信息
+
+        缓存未命中的运单合并为 gettrackinfo 批量请求（每批最多 40 个），
+        结果全部写入 tracking:info:{运单号} 缓存。
+
+        Args:
+            trackings: 运单列表，每项包含 number（必填）、carrier（可选）
+            use_cache: 是否使用缓存
+
+        Returns:
+            运单号 -> TrackingInfo，查询失败的运单为 None
+        """
+        unique: Dict[str, Dict[str, Any]] = {}
+        for item in trackings:
+            number = (item.get("number") or "").strip()
+            if number and number not in unique:
+                unique[number] = {"number": number, "carrier": item.get("carrier")}
+
+        results: Dict[str, Optional[TrackingInfo]] = {}
+        misses: List[Dict[str, Any]] = list(unique.values())
+
+        if use_cache and misses:
+            cached_items = await asyncio.gather(
+                *(self._cache_get(f"info:{number}") for number in unique)
+            )
+            misses = []
+            for (number, item), cached in zip(unique.items(), cached_items):
+                if cached:
+                    results[number] = TrackingInfo(**cached)
+                else:
+                    misses.append(item)
+
+        if not misses:
+            return results
+
+        try:
+            raw_results = await self.client.get_tracking_info_batch(misses)
+        except Track17Error as e:
+            logger.error(f"批量查询物流信息失败: {len(misses)} 个, 错误: {e}")
+            for item in misses:
+                results[item["number"]] = None
+            return results
+
+        numbers = [item["number"] for item in misses]
+        order_ids = await asyncio.gather(*(self._mapping_get(number) for number in numbers))
+
+        to_cache = []
+        for number, order_id in zip(numbers, order_ids):
+            result = raw_results.get(number)
+            if not result or not result.get("success"):
+                results[number] = None
+                continue
+            info = self._build_info(number, result, order_id)
+            results[number] = info
+            to_cache.append(self._cache_set(f"info:{number}", self._cacheable_info(info)))
+
+        if to_cache:
+            await asyncio.gather(*to_cache)
+
+        logger.info(f"批量查询物流信息: 请求 {len(unique)} 个, 缓存命中 {len(unique) - len(misses)} 个")
+        return results
+
+    @staticmethod
+    def _cacheable_info(info: TrackingInfo) -> Dict[str, Any]:
+        """缓存用的物流信息：不含 17track 原始响应（内容已解析到 events 等字段，不重复存储）"""
+        return info.model_dump(exclude={"raw_data"}, exclude_none=True)
+
+    def _build_info(
+        self,
+        tracking_number: str,
+        result: Dict[str, Any],
+        order_id: Optional[str],
+    ) -> TrackingInfo:
+        """将 17track 查询结果转换为 TrackingInfo"""
+        # V2.4 API: 状态是字符串格式 (如 "InTransit", "Delivered")
+        status_str = result.get("status")
+        status = TrackingStatus.from_string(status_str) if status_str else None
+
+        # 承运商信息
+        carrier_data = result.get("carrier")
+        carrier_info = None
+        if carrier_data:
+            if isinstance(carrier_data, dict):
+                carrier_info = CarrierInfo(
+                    code=carrier_data.get("key"),
+                    name=carrier_data.get("name"),
+                    url=carrier_data.get("url"),
+                )
+            elif isinstance(carrier_data, int):
+                # 只有承运商代码
+                carrier_info = CarrierInfo(code=carrier_data)
+
+        # 事件列表 (已由 client._parse_events_v2 解析)
+        events: List[TrackingEvent] = []
+        raw_events = result.get("events") or []
+        for raw in raw_events:
+            event = TrackingEvent(
+                timestamp_str=raw.get("timestamp"),
+                status=raw.get("status"),
+                location=raw.get("location"),
+                description=raw.get("status"),
+                status_code=raw.get("status_code"),
+            )
+
+            if event.timestamp_str:
+                try:
+                    event.timestamp = datetime.fromisoformat(event.timestamp_str.replace(" ", "T"))
+                except ValueError:
+                    pass
+            events.append(event)
+
+        # 最新事件 (V2.4 格式)
+        last_event_data = result.get("last_event", {})
+        last_event = None
+        if last_event_data:
+            last_event = TrackingEvent(
+                timestamp_str=last_event_data.get("time_iso"),
+                status=last_event_data.get("description"),
+                location=last_event_data.get("location"),
+                description=last_event_data.get("description"),
+            )
+            if last_event.timestamp_str:
+                try:
+                    last_event.timestamp = datetime.fromisoformat(last_event.timestamp_str)
+                except ValueError:
+                    pass
+
+        info = TrackingInfo(
+            tracking_number=tracking_number,
+            carrier=carrier_info,
+            status=status,
+            sub_status=result.get("sub_status"),
+            status_zh=status.zh if status else None,
+            events=events,
+            last_event=last_event,
+            order_id=order_id,
+            raw_data=result,
+        )
+
+        return info
+
+    async def apply_push_event(self, event: WebhookEvent) -> bool:
+        """
+        将 17track 推送写入缓存（不发起 API 请求）
+
+        - tracking:status:{运单号}: 最新状态，get_status / get_cached_status 优先读取
+        - tracking:info:{运单号}: 已缓存时合并状态和最新事件，物流轨迹无需回源
+
+        Args:
+            event: 解析后的推送事件
+
+        Returns:
+            是否写入了状态
+
+        Raises:
+            RuntimeError: 共享 Redis 不可用
+        """
+        if not event.tracking_number or not event.new_status:
+            return False
+
+        # 推送写入只在本进程内存中没有意义（读取方在其他服务进程）
+        if self._get_redis() is None:
+            raise RuntimeError(f"Redis 不可用，17track 推送状态无法写入共享缓存: {event.tracking_number}")
+
+        number = event.tracking_number
+        status = event.new_status
+        await self._cache_set(
+            f"status:{number}",
+            {
+                "status": status.value,
+                "sub_status": event.sub_status,
+                "updated_at": (event.push_time or datetime.now()).isoformat(),
+            },
+            ttl=CACHE_TTL_PUSHED_STATUS,
+        )
+
+        cached = await self._cache_get(f"info:{number}")
+        if cached:
+            info = TrackingInfo(**cached)
+            info.status = status
+            info.sub_status = event.sub_status
+            info.status_zh = status.zh
+            info.updated_at = event.push_time or datetime.now()
+            if event.last_event:
+                info.last_event = event.last_event
+                if not any(
+                    e.timestamp_str == event.last_event.timestamp_str and e.status == event.last_event.status
+                    for e in info.events
+                ):
+                    info.events.insert(0, event.last_event)
+            await self._cache_set(f"info:{number}", self._cacheable_info(info))
+
+        if event.order_id:
+            await self._mapping_set(number, event.order_id)
+
+        logger.debug(f"17track 推送写入缓存: {number} -> {status.value}")
+        return True
+
+    async def _pushed_status(self, tracking_number: str) -> Optional[TrackingStatus]:
+        """读取 17track 推送写入的状态"""
+        pushed = await self._cache_get(f"status:{tracking_number}")
+        if pushed and pushed.get("status"):
+            return TrackingStatus.from_string(pushed["status"])
+        return None
+
     async def find_order_by_tracking(
         self,
         tracking_number: str,
@@ -428,9 +682,70 @@ class TrackingService:
         Returns:
             TrackingStatus 枚举值，查询失败返回 None
         """
+        pushed = await self._pushed_status(tracking_number)
+        if pushed:
+            return pushed
+
         info = await self.get_tracking_info(tracking_number, carrier)
         return info.status if info else None
 
+    async def get_statuses(
+        self,
+        trackings: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, Optional[TrackingStatus]]:
+        """
+        并发获取一个订单的全部运单状态（订单级补全）
+
+        每个运单走 get_status（推送状态 / 缓存优先），缓存未命中的运单
+        通过请求合并在同一窗口内发起一次 gettrackinfo 批量请求。
+        超过截止时间仍未完成的运单不等待，结果中不包含；
+        这些查询在后台继续完成并写入缓存，下次请求可直接命中。
+
+        Args:
+            trackings: 运单列表，每项包含 number（必填）、carrier（可选）
+            deadline: 整体截止时间（秒），默认 ENRICH_DEADLINE_SECONDS
+            concurrency: 并发查询数，默认 ENRICH_CONCURRENCY
+
+        Returns:
+            运单号 -> TrackingStatus（查询失败为 None，超时未完成的运单不在结果中）
+        """
+        unique: Dict[str, Optional[str]] = {}
+        for item in trackings:
+            number = (item.get("number") or "").strip()
+            if number and number not in unique:
+                unique[number] = item.get("carrier")
+
+        if not unique:
+            return {}
+
+        semaphore = asyncio.Semaphore(max(concurrency or ENRICH_CONCURRENCY, 1))
+
+        async def resolve(number: str, carrier: Optional[str]) -> Optional[TrackingStatus]:
+            async with semaphore:
+                try:
+                    return await self.get_status(number, carrier)
+                except Exception as e:
+                    logger.warning(f"物流状态查询失败: {number}, {e}")
+                    return None
+
+        tasks = {
+            asyncio.create_task(resolve(number, carrier)): number
+            for number, carrier in unique.items()
+        }
+        done, pending = await asyncio.wait(
+            tasks, timeout=ENRICH_DEADLINE_SECONDS if deadline is None else deadline
+        )
+
+        if pending:
+            logger.info(f"物流状态补全超时: {len(pending)}/{len(tasks)} 个运单后台继续查询")
+            for task in pending:
+                self._enrich_tasks.add(task)
+                task.add_done_callback(self._enrich_tasks.discard)
+
+        return {tasks[task]: task.result() for task in done}
+
     async def get_cached_status(
         self,
         tracking_number: str,
@@ -456,7 +771,11 @@ class TrackingService:
         """
         cache_key = f"info:{tracking_number}"
 
-        # 只从缓存获取，不发起 API 请求
+        # 只从缓存获取，不发起 API 请求（17track 推送的状态最新）
+        pushed = await self._pushed_status(tracking_number)
+        if pushed:
+            return pushed
+
         cached = await self._cache_get(cache_key)
         if cached:
             status_data = cached.get("status")
@@ -494,7 +813,13 @@ class TrackingService:
         """
         cache_key = f"info:{tracking_number}"
 
-        # 只从内存缓存获取
+        # 只从内存缓存获取（17track 推送的状态优先）
+        pushed = self._cache.get(f"status:{tracking_number}")
+        if pushed and pushed.get("expires_at", 0) > datetime.now().timestamp():
+            status_value = pushed.get("data", {}).get("status")
+            if status_value:
+                return TrackingStatus.from_string(status_value)
+
         cached = self._cache.get(cache_key)
         if cached:
             if cached.get("expires_at", 0) > datetime.now().timestamp():
@@ -555,6 +880,7 @@ class TrackingService:
         keys = [
             f"tracking:events:{tracking_number}",
             f"tracking:info:{tracking_number}",
+            f"tracking:status:{tracking_number}",
         ]
 
         if redis:
@@ -570,6 +896,7 @@ class TrackingService:
         # 清除内存缓存
         self._cache.pop(f"events:{tracking_number}", None)
         self._cache.pop(f"info:{tracking_number}", None)
+        self._cache.pop(f"status:{tracking_number}", None)
 
     async def get_tracking_info_with_auto_register(
         self,
@@ -752,11 +1079,9 @@ class TrackingService:
                 if destination_postal_code:
                     logger.info(f"从订单 {order_number} 获取到邮编: {destination_postal_code}")
 
-            result = await self.client.register_tracking(
-                tracking_number=tracking_number,
-                carrier_code=carrier,
-                order_id=None,
-                tag=None,
+            result = await self._register_tracking(
+                tracking_number,
+                carrier=carrier,
                 destination_postal_code=destination_postal_code,
             )
             if result.get("success"):